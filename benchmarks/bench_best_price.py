@@ -0,0 +1,56 @@
+"""
+Best back/lay lookups on Runner against the previous sort-per-call implementation.
+
+    python -m benchmarks.bench_best_price
+"""
+
+import timeit
+
+from betfair_api_client.datamodel.bet_types import BetTypes
+from betfair_api_client.datamodel.runner import Runner
+from betfair_api_client.datamodel.runner_price import RunnerPrice
+
+DEPTH = 10
+NUMBER = 100000
+
+
+def _sorted_best_back_price(availableToBack):
+    if len(availableToBack) == 0:
+        return RunnerPrice(betType=BetTypes.BACK, price=0, size=0)
+    return sorted(availableToBack, key=lambda x: x.price, reverse=True)[0]
+
+
+def _sorted_best_lay_price(availableToLay):
+    if len(availableToLay) == 0:
+        return RunnerPrice(betType=BetTypes.LAY, price=0, size=0)
+    return sorted(availableToLay, key=lambda x: x.price)[0]
+
+
+def run() -> dict:
+    runner = Runner(runnerId=1, runnerName="runner", handicap=0.0)
+    runner.update_back_levels(
+        levels=[{"price": 2.0 - i * 0.02, "size": 10.0} for i in range(DEPTH)]
+    )
+    runner.update_lay_levels(
+        levels=[{"price": 2.02 + i * 0.02, "size": 10.0} for i in range(DEPTH)]
+    )
+    availableToBack = list(runner.availableToBack)
+    availableToLay = list(runner.availableToLay)
+    timings = {
+        "sortedBestBack": lambda: _sorted_best_back_price(availableToBack),
+        "sortedBestLay": lambda: _sorted_best_lay_price(availableToLay),
+        "bestBack": runner.get_best_back_price,
+        "bestLay": runner.get_best_lay_price,
+        "spread": runner.get_spread,
+        "midPrice": runner.get_mid_price,
+        "topThree": lambda: runner.get_back_depth(levels=3),
+    }
+    return {
+        name: NUMBER / timeit.timeit(function, number=NUMBER)
+        for name, function in timings.items()
+    }
+
+
+if __name__ == "__main__":
+    for name, callsPerSecond in run().items():
+        print(f"{name:>15}: {callsPerSecond:12.0f} calls/s")
@@ -0,0 +1,136 @@
+"""
+Decoding and hydrating a synthetic 10k-market listMarketCatalogue response, against the previous
+stdlib json + strptime implementation.
+
+    python -m benchmarks.bench_catalogue_parsing
+"""
+
+import json
+import timeit
+from datetime import datetime, timedelta
+
+from betfair_api_client import parsing
+from betfair_api_client.base_client import BaseBetfairApiClient
+from betfair_api_client.datamodel.competition import Competition
+from betfair_api_client.datamodel.event import Event
+from betfair_api_client.datamodel.market import Market
+from betfair_api_client.datamodel.runner import Runner
+
+NUM_MARKETS = 10000
+MARKETS_PER_EVENT = 5
+NUMBER = 5
+
+
+def build_catalogue_payload(numMarkets: int = NUM_MARKETS) -> bytes:
+    start = datetime(year=2020, month=8, day=4, hour=12)
+    rawMarkets = []
+    for i in range(numMarkets):
+        eventId = i // MARKETS_PER_EVENT
+        # kick offs on the quarter hour, as most fixtures are
+        startTime = (start + timedelta(minutes=15 * (eventId % 96))).strftime(
+            BaseBetfairApiClient.BETFAIR_DATETIME_FORMAT
+        )
+        rawMarkets.append(
+            {
+                "marketId": f"1.{170000000 + i}",
+                "marketName": f"market {i % MARKETS_PER_EVENT}",
+                "marketStartTime": startTime,
+                "totalMatched": 0.0,
+                "runners": [
+                    {
+                        "selectionId": 1000 + selection,
+                        "runnerName": f"runner {selection}",
+                        "handicap": 0.0,
+                        "sortPriority": selection + 1,
+                        "metadata": {"runnerId": str(1000 + selection)},
+                    }
+                    for selection in range(3)
+                ],
+                "eventType": {"id": "1", "name": "Soccer"},
+                "competition": {
+                    "id": str(eventId % 40),
+                    "name": f"league {eventId % 40}",
+                },
+                "event": {
+                    "id": str(eventId),
+                    "name": f"event {eventId}",
+                    "countryCode": "GB",
+                    "timezone": "GMT",
+                    "openDate": startTime,
+                },
+            }
+        )
+    return json.dumps({"jsonrpc": "2.0", "result": rawMarkets, "id": 1}).encode("utf-8")
+
+
+def _stdlib_process(payload: bytes):
+    rawMarketsData = json.loads(payload.decode("utf-8"))["result"]
+    processedEvents = {}
+    for rawMarket in rawMarketsData:
+        eventId = rawMarket["event"]["id"]
+        if eventId not in processedEvents:
+            competition = Competition(
+                competitionId=int(rawMarket["competition"]["id"]),
+                competitionName=rawMarket["competition"]["name"],
+            )
+            processedEvents[eventId] = Event(
+                eventId=int(eventId),
+                eventName=rawMarket["event"]["name"],
+                eventDate=datetime.strptime(
+                    rawMarket["event"]["openDate"],
+                    BaseBetfairApiClient.BETFAIR_DATETIME_FORMAT,
+                ),
+                competition=competition,
+                countryCode=rawMarket["event"].get("countryCode", None),
+            )
+        market = Market(
+            marketId=rawMarket["marketId"],
+            marketName=rawMarket["marketName"],
+            marketStartTime=datetime.strptime(
+                rawMarket["marketStartTime"],
+                BaseBetfairApiClient.BETFAIR_DATETIME_FORMAT,
+            ),
+        )
+        for selection in rawMarket["runners"]:
+            market.add_runner(
+                runner=Runner(
+                    runnerId=int(selection["selectionId"]),
+                    runnerName=selection["runnerName"],
+                    handicap=selection["handicap"],
+                )
+            )
+        processedEvents[eventId].add_market(market=market)
+    return list(processedEvents.values())
+
+
+def run() -> dict:
+    payload = build_catalogue_payload()
+    client = BaseBetfairApiClient(
+        username="username",
+        password="password",
+        apiKey="apiKey",
+        clientCertificatePath=None,
+        certificateKeyPath=None,
+        maxConcurrentRequests=1,
+    )
+
+    def process():
+        return client._process_raw_markets_data(
+            rawMarketsData=parsing.loads(payload)["result"]
+        )
+
+    timings = {
+        "stdlibDecode": lambda: json.loads(payload.decode("utf-8")),
+        f"{parsing.JSON_BACKEND}Decode": lambda: parsing.loads(payload),
+        "stdlibProcess": lambda: _stdlib_process(payload=payload),
+        "process": process,
+    }
+    return {
+        name: timeit.timeit(function, number=NUMBER) / NUMBER * 1000
+        for name, function in timings.items()
+    }
+
+
+if __name__ == "__main__":
+    for name, milliseconds in run().items():
+        print(f"{name:>15}: {milliseconds:8.1f} ms per {NUM_MARKETS} markets")
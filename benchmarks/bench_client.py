@@ -0,0 +1,161 @@
+"""
+End to end throughput and memory of BetfairApiClient against a local mock Betfair server serving
+synthetic markets, as the number of markets grows.  No credentials or network access needed.
+
+    python -m benchmarks.bench_client
+    python -m benchmarks.bench_client --markets 100 1000 10000 --latency 0.02
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import time
+import tracemalloc
+
+from betfair_api_client.datamodel.orders import OrderSides
+from betfair_api_client.tests.fake_betfair_server import (
+    FakeBetfairServer,
+    SyntheticMarkets,
+    create_client,
+)
+
+MARKET_COUNTS = [100, 1000, 5000]
+# place_bet sends one request per bet, so only the first markets are bet on
+MAX_BETS = 200
+REPEATS = 3
+
+
+def _serve(connection, numMarkets: int, latency: float) -> None:
+    with FakeBetfairServer(latency=latency) as server:
+        SyntheticMarkets(numMarkets=numMarkets).install(server=server)
+        connection.send(server.url)
+        # serve until the benchmark is done with this market count
+        connection.recv()
+
+
+class MockServerProcess:
+    def __init__(self, numMarkets: int, latency: float = 0.0):
+        """
+        FakeBetfairServer with SyntheticMarkets, run in a child process so that building and encoding
+        responses stays out of the client's timings and tracemalloc figures.
+        """
+        self.numMarkets = numMarkets
+        self.latency = latency
+        self.url = None
+        self._connection = None
+        self._process = None
+
+    def __enter__(self) -> "MockServerProcess":
+        self._connection, childConnection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve,
+            args=(childConnection, self.numMarkets, self.latency),
+            daemon=True,
+        )
+        self._process.start()
+        self.url = self._connection.recv()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._connection.send(None)
+        self._process.join()
+
+
+def _measure(function) -> dict:
+    """
+    Median wall time of REPEATS calls, then the peak memory allocated by one more call.
+    """
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function()
+    _, peakBytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": statistics.median(timings), "peakKiB": peakBytes / 1024}
+
+
+def _run_for(numMarkets: int, latency: float) -> dict:
+    with MockServerProcess(numMarkets=numMarkets, latency=latency) as server:
+        client = create_client(server=server)
+        try:
+            events = client.get_coming_events(sportTypeId=1, marketTypes=["MATCH_ODDS"])
+            markets = [market for event in events for market in event.get_all_markets()]
+            if len(markets) != numMarkets:
+                raise RuntimeError(
+                    f"expected {numMarkets} markets from the mock server, got {len(markets)}"
+                )
+            betMarkets = markets[:MAX_BETS]
+
+            def place_bets():
+                for market in betMarkets:
+                    client.place_bet(
+                        market=market,
+                        runner=next(iter(market.runners.values())),
+                        oddsToPlace=2.0,
+                        side=OrderSides.BACK,
+                        betSize=2.0,
+                    )
+
+            measurements = {
+                "get_coming_events": (
+                    _measure(
+                        lambda: client.get_coming_events(
+                            sportTypeId=1, marketTypes=["MATCH_ODDS"]
+                        )
+                    ),
+                    numMarkets,
+                ),
+                "update_prices_for_events": (
+                    _measure(lambda: client.update_prices_for_events(events=events)),
+                    numMarkets,
+                ),
+                "update_prices_for_markets": (
+                    _measure(lambda: client.update_prices_for_markets(markets=markets)),
+                    numMarkets,
+                ),
+                "place_bet": (_measure(place_bets), len(betMarkets)),
+            }
+        finally:
+            client.close()
+    return {
+        method: {
+            "ms": measurement["seconds"] * 1000,
+            "itemsPerSecond": itemCount / measurement["seconds"],
+            "peakKiB": measurement["peakKiB"],
+        }
+        for method, (measurement, itemCount) in measurements.items()
+    }
+
+
+def run(marketCounts=MARKET_COUNTS, latency: float = 0.0) -> dict:
+    """
+    :param marketCounts: (list)  Numbers of synthetic markets to benchmark with.
+    :param latency: (float)  Seconds the mock server waits before answering each request.
+    :return: (dict)  method -> "<n> markets" -> ms, itemsPerSecond (markets, or bets for place_bet)
+        and peakKiB.
+    """
+    results = {}
+    for numMarkets in marketCounts:
+        for method, measurement in _run_for(
+            numMarkets=numMarkets, latency=latency
+        ).items():
+            results.setdefault(method, {})[f"{numMarkets} markets"] = measurement
+    return results
+
+
+if __name__ == "__main__":
+    argumentParser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    argumentParser.add_argument("--markets", type=int, nargs="+", default=MARKET_COUNTS)
+    argumentParser.add_argument("--latency", type=float, default=0.0)
+    arguments = argumentParser.parse_args()
+    for method, scaled in run(
+        marketCounts=arguments.markets, latency=arguments.latency
+    ).items():
+        for size, measurement in scaled.items():
+            print(
+                f"{method:>26} {size:>14}: {measurement['ms']:9.1f} ms, "
+                f"{measurement['itemsPerSecond']:9.0f} /s, {measurement['peakKiB']:9.0f} KiB peak"
+            )
@@ -0,0 +1,103 @@
+"""
+listMarketBook throughput of BetfairClientPool as accounts are added, with every account limited to the
+same request rate by its own RequestScheduler and served by its own local mock Betfair server.
+
+    python -m benchmarks.bench_client_pool
+    python -m benchmarks.bench_client_pool --accounts 1 2 4 8 --requests-per-second 2
+"""
+
+import argparse
+import contextlib
+import time
+
+from betfair_api_client.client_pool import BetfairClientPool, RoutingStrategies
+from betfair_api_client.request_scheduler import RequestScheduler
+from betfair_api_client.tests.fake_betfair_server import create_client
+
+from .bench_client import MockServerProcess
+
+NUM_MARKETS = 1200
+ACCOUNT_COUNTS = [1, 2, 4]
+REQUESTS_PER_SECOND = 5.0
+LATENCY = 0.01
+
+
+def _measure(
+    numAccounts: int, routing: str, requestsPerSecond: float, latency: float
+) -> dict:
+    with contextlib.ExitStack() as stack:
+        servers = [
+            stack.enter_context(
+                MockServerProcess(numMarkets=NUM_MARKETS, latency=latency)
+            )
+            for _ in range(numAccounts)
+        ]
+        pool = BetfairClientPool(
+            clients=[
+                create_client(
+                    server=server,
+                    requestScheduler=RequestScheduler(
+                        requestsPerSecond=requestsPerSecond
+                    ),
+                )
+                for server in servers
+            ],
+            routing=routing,
+        )
+        try:
+            events = pool.clients[0].get_coming_events(
+                sportTypeId=1, marketTypes=["MATCH_ODDS"]
+            )
+            # let the request rate bucket refill after the catalogue requests
+            time.sleep(1.0)
+            start = time.perf_counter()
+            pool.update_prices_for_events(events=events)
+            seconds = time.perf_counter() - start
+        finally:
+            pool.close()
+    return {"seconds": seconds, "marketsPerSecond": NUM_MARKETS / seconds}
+
+
+def run(
+    accountCounts=ACCOUNT_COUNTS,
+    requestsPerSecond: float = REQUESTS_PER_SECOND,
+    latency: float = LATENCY,
+) -> dict:
+    """
+    :return: (dict)  routing -> "<n> accounts" -> seconds and marketsPerSecond of one refresh of all
+        the markets.
+    """
+    return {
+        routing: {
+            f"{numAccounts} accounts": _measure(
+                numAccounts=numAccounts,
+                routing=routing,
+                requestsPerSecond=requestsPerSecond,
+                latency=latency,
+            )
+            for numAccounts in accountCounts
+        }
+        for routing in RoutingStrategies.ALL
+    }
+
+
+if __name__ == "__main__":
+    argumentParser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    argumentParser.add_argument(
+        "--accounts", type=int, nargs="+", default=ACCOUNT_COUNTS
+    )
+    argumentParser.add_argument(
+        "--requests-per-second", type=float, default=REQUESTS_PER_SECOND
+    )
+    argumentParser.add_argument("--latency", type=float, default=LATENCY)
+    arguments = argumentParser.parse_args()
+    for routing, scaled in run(
+        accountCounts=arguments.accounts,
+        requestsPerSecond=arguments.requests_per_second,
+        latency=arguments.latency,
+    ).items():
+        for accounts, measurement in scaled.items():
+            print(
+                f"{routing:>15} {accounts:>11}: {measurement['seconds']:6.2f} s, "
+                f"{measurement['marketsPerSecond']:8.0f} markets/s"
+            )
@@ -0,0 +1,180 @@
+"""
+Memory per object, construction rate and equality/hash rate of the slotted datamodel classes,
+against the previous classes with a __dict__ per instance and hash-based equality.
+
+    python -m benchmarks.bench_datamodel
+"""
+
+import timeit
+import tracemalloc
+from datetime import datetime
+
+from betfair_api_client.datamodel.bet_types import BetTypes
+from betfair_api_client.datamodel.competition import Competition
+from betfair_api_client.datamodel.event import Event
+from betfair_api_client.datamodel.market import Market
+from betfair_api_client.datamodel.price_ladder import PriceLadder
+from betfair_api_client.datamodel.runner import Runner
+from betfair_api_client.datamodel.runner_price import RunnerPrice
+
+NUM_OBJECTS = 100000
+NUMBER = 200000
+START_TIME = datetime(year=2020, month=8, day=4, hour=19)
+
+
+class _DictRunnerPrice:
+    def __init__(self, betType, price, size):
+        super().__init__()
+        self.betType = betType
+        self.price = price
+        self.size = size
+
+    def __hash__(self):
+        return hash((self.betType, self.price, self.size))
+
+    def __eq__(self, other):
+        return self.__hash__() == other.__hash__()
+
+
+class _DictCompetition:
+    def __init__(self, competitionName: str, competitionId: int):
+        self.competitionName = competitionName.strip()
+        self.competitionId = int(competitionId)
+
+    def __eq__(self, other):
+        return self.__hash__() == other.__hash__()
+
+    def __hash__(self):
+        return hash((self.competitionName, self.competitionId))
+
+
+class _DictEvent:
+    def __init__(self, eventId, eventName, eventDate, competition, countryCode):
+        super().__init__()
+        self.eventId = eventId
+        self.eventName = eventName
+        self.eventDate = eventDate
+        self.competition = competition
+        self.countryCode = countryCode
+        self.markets = {}
+
+
+class _DictMarket:
+    def __init__(self, marketId, marketName, marketStartTime):
+        self.marketId = marketId
+        self.marketName = marketName
+        self.marketStartTime = marketStartTime
+        self.runners = {}
+
+
+class _DictRunner:
+    def __init__(self, runnerId, runnerName, handicap):
+        super().__init__()
+        self.runnerId = runnerId
+        self.runnerName = runnerName.strip()
+        self.handicap = float(handicap)
+        self.backLadder = PriceLadder(betType=BetTypes.BACK)
+        self.layLadder = PriceLadder(betType=BetTypes.LAY)
+
+
+def _constructors(
+    runnerPriceClass, competitionClass, eventClass, marketClass, runnerClass
+):
+    competition = competitionClass(competitionName="league", competitionId=1)
+    return {
+        "RunnerPrice": lambda: runnerPriceClass(
+            betType=BetTypes.BACK, price=2.0, size=10.0
+        ),
+        "Competition": lambda: competitionClass(
+            competitionName="league", competitionId=1
+        ),
+        "Event": lambda: eventClass(
+            eventId=1,
+            eventName="event",
+            eventDate=START_TIME,
+            competition=competition,
+            countryCode="GB",
+        ),
+        "Market": lambda: marketClass(
+            marketId="1.1", marketName="market", marketStartTime=START_TIME
+        ),
+        "Runner": lambda: runnerClass(runnerId=1, runnerName="runner", handicap=0.0),
+    }
+
+
+def _bytes_per_object(constructor) -> float:
+    tracemalloc.start()
+    objects = [constructor() for _ in range(NUM_OBJECTS)]
+    currentBytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return currentBytes / NUM_OBJECTS
+
+
+def _measure(constructors: dict, runnerPriceClass, competitionClass) -> dict:
+    results = {
+        name: {
+            "bytesPerObject": _bytes_per_object(constructor=constructor),
+            "constructionsPerSecond": NUMBER
+            / timeit.timeit(constructor, number=NUMBER),
+        }
+        for name, constructor in constructors.items()
+    }
+    for name, first, second in [
+        (
+            "RunnerPrice",
+            runnerPriceClass(betType=BetTypes.BACK, price=2.0, size=10.0),
+            runnerPriceClass(betType=BetTypes.BACK, price=2.0, size=10.0),
+        ),
+        (
+            "Competition",
+            competitionClass(competitionName="league", competitionId=1),
+            competitionClass(competitionName="league", competitionId=1),
+        ),
+    ]:
+        lookup = {first: True}
+        results[name]["comparisonsPerSecond"] = NUMBER / timeit.timeit(
+            lambda: first == second, number=NUMBER
+        )
+        results[name]["lookupsPerSecond"] = NUMBER / timeit.timeit(
+            lambda: second in lookup, number=NUMBER
+        )
+    return results
+
+
+def run() -> dict:
+    return {
+        "dict": _measure(
+            constructors=_constructors(
+                runnerPriceClass=_DictRunnerPrice,
+                competitionClass=_DictCompetition,
+                eventClass=_DictEvent,
+                marketClass=_DictMarket,
+                runnerClass=_DictRunner,
+            ),
+            runnerPriceClass=_DictRunnerPrice,
+            competitionClass=_DictCompetition,
+        ),
+        "slots": _measure(
+            constructors=_constructors(
+                runnerPriceClass=RunnerPrice,
+                competitionClass=Competition,
+                eventClass=Event,
+                marketClass=Market,
+                runnerClass=Runner,
+            ),
+            runnerPriceClass=RunnerPrice,
+            competitionClass=Competition,
+        ),
+    }
+
+
+if __name__ == "__main__":
+    for layout, classes in run().items():
+        for name, results in classes.items():
+            print(
+                f"{layout:>6} {name:>12}: "
+                + ", ".join(
+                    f"{metric} {value:,.0f}" for metric, value in results.items()
+                )
+            )
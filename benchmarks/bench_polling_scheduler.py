@@ -0,0 +1,67 @@
+"""
+listMarketBook requests PollingScheduler sends over two simulated hours before the first of 1,000 markets
+starts, against refreshing every market at the rate the soonest market needs.
+
+    python -m benchmarks.bench_polling_scheduler
+"""
+
+import math
+from datetime import timedelta
+
+from betfair_api_client.polling_scheduler import PollingScheduler
+from betfair_api_client.tests.fake_betfair_server import create_client
+
+from .bench_client import MockServerProcess
+
+NUM_MARKETS = 1000
+SIMULATED_SECONDS = 2 * 3600
+# every market as often as PollingScheduler refreshes those starting within 10 minutes
+FIXED_INTERVAL = 2.0
+
+
+def run() -> dict:
+    with MockServerProcess(numMarkets=NUM_MARKETS) as server:
+        client = create_client(server=server)
+        try:
+            events = client.get_coming_events(sportTypeId=1, marketTypes=["MATCH_ODDS"])
+            markets = [market for event in events for market in event.markets.values()]
+            firstStart = min(market.marketStartTime for market in markets)
+            now = [0.0]
+            scheduler = PollingScheduler(
+                client=client,
+                events=events,
+                clock=lambda: now[0],
+                utcNow=lambda: firstStart
+                - timedelta(seconds=SIMULATED_SECONDS - now[0]),
+            )
+            while now[0] < SIMULATED_SECONDS:
+                scheduler.run_pending()
+                now[0] += 1.0
+            stats = scheduler.get_stats()
+            marketsPerRequest = len(
+                client._chunk_market_ids(marketIds=["1.0"] * 1000)[0]
+            )
+        finally:
+            client.close()
+    fixedRequests = math.ceil(NUM_MARKETS / marketsPerRequest) * math.ceil(
+        SIMULATED_SECONDS / FIXED_INTERVAL
+    )
+    return {
+        "scheduler": {
+            "requests": stats["requests"],
+            "marketsRefreshed": stats["marketsRefreshed"],
+        },
+        "fixedInterval": {
+            "requests": fixedRequests,
+            "marketsRefreshed": NUM_MARKETS
+            * math.ceil(SIMULATED_SECONDS / FIXED_INTERVAL),
+        },
+    }
+
+
+if __name__ == "__main__":
+    for polling, counts in run().items():
+        print(
+            f"{polling:>13}: "
+            + ", ".join(f"{name} {value:,}" for name, value in counts.items())
+        )
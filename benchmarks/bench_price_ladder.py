@@ -0,0 +1,86 @@
+"""
+Memory and refresh cost of the array-backed PriceLadder against the previous layout,
+where each runner held lists of RunnerPrice objects.
+
+    python -m benchmarks.bench_price_ladder
+"""
+
+import time
+import tracemalloc
+
+from betfair_api_client.datamodel.bet_types import BetTypes
+from betfair_api_client.datamodel.price_ladder import PriceLadder
+from betfair_api_client.datamodel.runner_price import RunnerPrice
+
+NUM_RUNNERS = 10000
+DEPTH = 3
+NUM_REFRESHES = 20
+
+
+def _build_levels(offset: float):
+    return [{"price": 2.0 + offset + i * 0.02, "size": 10.0 + i} for i in range(DEPTH)]
+
+
+class _ListRunner:
+    """Previous layout: new RunnerPrice objects for every level on every refresh."""
+
+    def __init__(self):
+        self.availableToBack = []
+        self.availableToLay = []
+
+    def update(self, backLevels, layLevels):
+        self.availableToBack = [
+            RunnerPrice(betType=BetTypes.BACK, price=p["price"], size=p["size"])
+            for p in backLevels
+        ]
+        self.availableToLay = [
+            RunnerPrice(betType=BetTypes.LAY, price=p["price"], size=p["size"])
+            for p in layLevels
+        ]
+
+
+class _LadderRunner:
+    """Runner's layout: one PriceLadder per side."""
+
+    def __init__(self):
+        self.backLadder = PriceLadder(betType=BetTypes.BACK)
+        self.layLadder = PriceLadder(betType=BetTypes.LAY)
+
+    def update(self, backLevels, layLevels):
+        self.backLadder.update_from_levels(levels=backLevels)
+        self.layLadder.update_from_levels(levels=layLevels)
+
+
+def _measure(runnerClass) -> dict:
+    backLevels = _build_levels(offset=0.0)
+    layLevels = _build_levels(offset=0.02)
+    tracemalloc.start()
+    runners = [runnerClass() for _ in range(NUM_RUNNERS)]
+    for runner in runners:
+        runner.update(backLevels=backLevels, layLevels=layLevels)
+    currentBytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(NUM_REFRESHES):
+        for runner in runners:
+            runner.update(backLevels=backLevels, layLevels=layLevels)
+    refreshSeconds = time.perf_counter() - start
+    return {
+        "bytesPerRunner": currentBytes / NUM_RUNNERS,
+        "runnerRefreshesPerSecond": NUM_RUNNERS * NUM_REFRESHES / refreshSeconds,
+    }
+
+
+def run() -> dict:
+    return {
+        "runnerPriceLists": _measure(runnerClass=_ListRunner),
+        "priceLadder": _measure(runnerClass=_LadderRunner),
+    }
+
+
+if __name__ == "__main__":
+    for layout, results in run().items():
+        print(
+            f"{layout:>18}: {results['bytesPerRunner']:8.0f} bytes/runner, "
+            f"{results['runnerRefreshesPerSecond']:10.0f} runner refreshes/s"
+        )
@@ -0,0 +1,80 @@
+"""
+Applying listMarketBook snapshots to markets whose prices did not move, whose sizes moved, and whose
+prices moved, with the memory left allocated by one pass over all markets.
+
+    python -m benchmarks.bench_price_updates
+"""
+
+import time
+import tracemalloc
+
+from betfair_api_client.base_client import BaseBetfairApiClient
+from betfair_api_client.tests.fake_betfair_server import build_market_book
+
+from .bench_replay import SELECTION_IDS, _build_markets
+
+NUM_PASSES = 20
+
+
+def _market_books(markets, sizeShift: float, priceShift: float):
+    marketBooks = []
+    for market in markets:
+        marketBook = build_market_book(
+            marketId=market.marketId, selectionIds=SELECTION_IDS
+        )
+        for runner in marketBook["runners"]:
+            for levels in runner["ex"].values():
+                for level in levels:
+                    level["price"] = round(level["price"] + priceShift, 2)
+                    level["size"] += sizeShift
+        marketBooks.append(marketBook)
+    return marketBooks
+
+
+def _apply(markets, marketBooks, priceChanges) -> None:
+    for market, marketBook in zip(markets, marketBooks):
+        BaseBetfairApiClient._update_market_prices(
+            market=market, marketData=marketBook, priceChanges=priceChanges
+        )
+
+
+def _measure(sizeShift: float, priceShift: float) -> dict:
+    markets = _build_markets()
+    initialBooks = _market_books(markets=markets, sizeShift=0.0, priceShift=0.0)
+    movedBooks = _market_books(
+        markets=markets, sizeShift=sizeShift, priceShift=priceShift
+    )
+    seconds = 0.0
+    for _ in range(NUM_PASSES):
+        _apply(markets=markets, marketBooks=initialBooks, priceChanges=None)
+        priceChanges = []
+        start = time.perf_counter()
+        _apply(markets=markets, marketBooks=movedBooks, priceChanges=priceChanges)
+        seconds += time.perf_counter() - start
+    _apply(markets=markets, marketBooks=initialBooks, priceChanges=None)
+    tracemalloc.start()
+    priceChanges = []
+    _apply(markets=markets, marketBooks=movedBooks, priceChanges=priceChanges)
+    allocatedBytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "marketsPerSecond": len(markets) * NUM_PASSES / seconds,
+        "priceChanges": len(priceChanges),
+        "allocatedKiB": allocatedBytes / 1024,
+    }
+
+
+def run() -> dict:
+    return {
+        "unchanged": _measure(sizeShift=0.0, priceShift=0.0),
+        "sizesMoved": _measure(sizeShift=1.0, priceShift=0.0),
+        "pricesMoved": _measure(sizeShift=0.0, priceShift=0.02),
+    }
+
+
+if __name__ == "__main__":
+    for scenario, results in run().items():
+        print(
+            f"{scenario:>12}: "
+            + ", ".join(f"{name} {value:,.0f}" for name, value in results.items())
+        )
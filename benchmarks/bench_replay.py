@@ -0,0 +1,96 @@
+"""
+Recording and replaying listMarketBook snapshots with MarketBookRecorder/MarketBookReplayer, and the
+file size per runner snapshot against dumping the raw market books as JSON lines.
+
+    python -m benchmarks.bench_replay
+"""
+
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from betfair_api_client.base_client import BaseBetfairApiClient
+from betfair_api_client.datamodel.market import Market
+from betfair_api_client.datamodel.runner import Runner
+from betfair_api_client.recording import MarketBookRecorder, MarketBookReplayer
+from betfair_api_client.tests.fake_betfair_server import build_market_book
+
+NUM_MARKETS = 1000
+NUM_SNAPSHOTS = 100
+SELECTION_IDS = [101, 102, 103]
+
+
+def _build_markets():
+    markets = []
+    for i in range(NUM_MARKETS):
+        market = Market(
+            marketId=f"1.{170000000 + i}",
+            marketName=f"market {i}",
+            marketStartTime=datetime(year=2020, month=8, day=4),
+        )
+        for selectionId in SELECTION_IDS:
+            market.add_runner(
+                runner=Runner(
+                    runnerId=selectionId,
+                    runnerName=f"runner {selectionId}",
+                    handicap=0.0,
+                )
+            )
+        markets.append(market)
+    return markets
+
+
+def _measure(compress: bool, directory: str) -> dict:
+    markets = _build_markets()
+    marketBooks = [
+        build_market_book(marketId=market.marketId, selectionIds=SELECTION_IDS)
+        for market in markets
+    ]
+    path = os.path.join(directory, f"compress-{compress}.bfmb")
+    recordSeconds = 0.0
+    with MarketBookRecorder(path=path, compress=compress) as recorder:
+        for snapshot in range(NUM_SNAPSHOTS):
+            for market, marketBook in zip(markets, marketBooks):
+                BaseBetfairApiClient._update_market_prices(
+                    market=market, marketData=marketBook
+                )
+            start = time.perf_counter()
+            recorder.record_markets(markets=markets, timestamp=float(snapshot))
+            recordSeconds += time.perf_counter() - start
+    start = time.perf_counter()
+    MarketBookReplayer(path=path).replay()
+    replaySeconds = time.perf_counter() - start
+    runnerSnapshots = NUM_MARKETS * NUM_SNAPSHOTS * len(SELECTION_IDS)
+    return {
+        "bytesPerRunnerSnapshot": os.path.getsize(path) / runnerSnapshots,
+        "runnerSnapshotsRecordedPerSecond": runnerSnapshots / recordSeconds,
+        "runnerSnapshotsReplayedPerSecond": runnerSnapshots / replaySeconds,
+    }
+
+
+def _json_bytes_per_runner_snapshot() -> float:
+    marketBooks = [
+        build_market_book(marketId=f"1.{170000000 + i}", selectionIds=SELECTION_IDS)
+        for i in range(NUM_MARKETS)
+    ]
+    jsonLine = json.dumps({"timestamp": time.time(), "marketBooks": marketBooks})
+    return (len(jsonLine) + 1) / (NUM_MARKETS * len(SELECTION_IDS))
+
+
+def run() -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        return {
+            "uncompressed": _measure(compress=False, directory=directory),
+            "compressed": _measure(compress=True, directory=directory),
+            "jsonLines": {"bytesPerRunnerSnapshot": _json_bytes_per_runner_snapshot()},
+        }
+
+
+if __name__ == "__main__":
+    for layout, results in run().items():
+        print(
+            f"{layout:>12}: "
+            + ", ".join(f"{name} {value:,.0f}" for name, value in results.items())
+        )
@@ -0,0 +1,94 @@
+"""
+Writing listMarketBook results into a SharedPriceBook against applying them to Market objects, and
+reading the book back from another process as snapshots, as Markets and as NumPy arrays.
+
+    python -m benchmarks.bench_shared_prices
+"""
+
+import multiprocessing
+import time
+
+from betfair_api_client.base_client import BaseBetfairApiClient
+from betfair_api_client.price_ticks import np
+from betfair_api_client.shared_prices import SharedPriceBook
+from betfair_api_client.tests.fake_betfair_server import build_market_book
+
+from .bench_replay import SELECTION_IDS, _build_markets
+
+NUM_PASSES = 20
+
+
+def _read_book(bookName: str, results) -> None:
+    """
+    Consumer process: time each way of reading every market of the book.
+    """
+    priceBook = SharedPriceBook.attach(name=bookName)
+    markets = _build_markets()
+    readRates = {}
+    start = time.perf_counter()
+    for _ in range(NUM_PASSES):
+        for marketId in priceBook.marketIds:
+            priceBook.read_market(marketId=marketId)
+    readRates["snapshotMarketsPerSecond"] = (
+        len(markets) * NUM_PASSES / (time.perf_counter() - start)
+    )
+    start = time.perf_counter()
+    for _ in range(NUM_PASSES):
+        for market in markets:
+            priceBook.read_into_market(market=market)
+    readRates["marketObjectsPerSecond"] = (
+        len(markets) * NUM_PASSES / (time.perf_counter() - start)
+    )
+    if np is not None:
+        arrays = priceBook.get_arrays()
+        start = time.perf_counter()
+        for _ in range(NUM_PASSES):
+            # best back price of every runner of every market at once
+            arrays["backPrices"][:, :, 0].max(axis=1)
+        readRates["numpyBestBackMarketsPerSecond"] = (
+            len(markets) * NUM_PASSES / (time.perf_counter() - start)
+        )
+        del arrays
+    priceBook.close()
+    results.put(readRates)
+
+
+def run() -> dict:
+    markets = _build_markets()
+    marketBooks = [
+        build_market_book(marketId=market.marketId, selectionIds=SELECTION_IDS)
+        for market in markets
+    ]
+    start = time.perf_counter()
+    for _ in range(NUM_PASSES):
+        for market, marketBook in zip(markets, marketBooks):
+            BaseBetfairApiClient._update_market_prices(
+                market=market, marketData=marketBook
+            )
+    hydrateSeconds = time.perf_counter() - start
+    with SharedPriceBook.create(markets=markets) as priceBook:
+        start = time.perf_counter()
+        for _ in range(NUM_PASSES):
+            priceBook.write_market_books(marketBooks=marketBooks)
+        writeSeconds = time.perf_counter() - start
+        results = multiprocessing.Queue()
+        consumer = multiprocessing.Process(
+            target=_read_book,
+            kwargs={"bookName": priceBook.name, "results": results},
+        )
+        consumer.start()
+        readRates = results.get()
+        consumer.join()
+    return {
+        "write": {
+            "marketObjectsPerSecond": len(markets) * NUM_PASSES / hydrateSeconds,
+            "sharedBookPerSecond": len(markets) * NUM_PASSES / writeSeconds,
+        },
+        "read": readRates,
+    }
+
+
+if __name__ == "__main__":
+    for direction, rates in run().items():
+        for name, value in rates.items():
+            print(f"{direction:>5} {name:>30}: {value:12,.0f} markets/s")
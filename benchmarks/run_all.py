@@ -0,0 +1,111 @@
+"""
+Run every benchmark module, save the results as JSON and compare them with a saved baseline.
+
+    python -m benchmarks.run_all --save benchmarks/results/baseline.json
+    python -m benchmarks.run_all --baseline benchmarks/results/baseline.json
+
+Measurements that moved by more than --threshold against the baseline are listed and the exit status
+is 1.  Both directions are reported, as benchmarks mix timings with rates: check whether the change is
+a regression, and save a new baseline once it is understood.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import pkgutil
+import platform
+import sys
+from datetime import datetime
+
+import benchmarks
+
+RESULTS_DIRECTORY = os.path.join(os.path.dirname(__file__), "results")
+
+
+def run_benchmarks(names=None) -> dict:
+    """
+    :param names: (list)  Benchmark modules to run, eg. ["bench_client"].  Defaults to all of them.
+    :return: (dict)  Module name -> that module's run() results.
+    """
+    if names is None:
+        names = [
+            moduleInfo.name
+            for moduleInfo in pkgutil.iter_modules(benchmarks.__path__)
+            if moduleInfo.name.startswith("bench_")
+        ]
+    results = {}
+    for name in sorted(names):
+        print(f"running {name}", file=sys.stderr)
+        results[name] = importlib.import_module(f"benchmarks.{name}").run()
+    return results
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flattened = {}
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flattened.update(flatten(results=value, prefix=path))
+        elif isinstance(value, (int, float)):
+            flattened[path] = value
+    return flattened
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    :return: (list)  (measurement, baseline value, value, relative change) of the measurements that
+        moved by more than threshold, eg. 0.2 for 20%.
+    """
+    baselineValues = flatten(results=baseline)
+    changes = []
+    for path, value in flatten(results=results).items():
+        baselineValue = baselineValues.get(path)
+        if not baselineValue:
+            continue
+        change = (value - baselineValue) / abs(baselineValue)
+        if abs(change) > threshold:
+            changes.append((path, baselineValue, value, change))
+    return changes
+
+
+def main() -> int:
+    argumentParser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    argumentParser.add_argument("benchmarks", nargs="*", help="eg. bench_client")
+    argumentParser.add_argument("--save", help="results file, timestamped by default")
+    argumentParser.add_argument("--baseline", help="results file to compare with")
+    argumentParser.add_argument("--threshold", type=float, default=0.2)
+    arguments = argumentParser.parse_args()
+
+    results = run_benchmarks(names=arguments.benchmarks or None)
+    savePath = arguments.save or os.path.join(
+        RESULTS_DIRECTORY, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(savePath)), exist_ok=True)
+    with open(savePath, "w") as resultsFile:
+        json.dump(
+            {
+                "createdAt": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            },
+            resultsFile,
+            indent=2,
+        )
+    print(f"saved {savePath}")
+
+    if arguments.baseline is None:
+        return 0
+    with open(arguments.baseline) as baselineFile:
+        baseline = json.load(baselineFile)["results"]
+    changes = compare(results=results, baseline=baseline, threshold=arguments.threshold)
+    for path, baselineValue, value, change in changes:
+        print(f"{path}: {baselineValue:.4g} -> {value:.4g} ({change:+.0%})")
+    if not changes:
+        print(f"no measurement moved by more than {arguments.threshold:.0%}")
+    return 1 if changes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
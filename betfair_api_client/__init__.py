@@ -1 +1,8 @@
+from .async_betfair_client import AsyncBetfairApiClient
+from .async_transport import AsyncPooledHttpTransport, AsyncTransport
 from .betfair_client import BetfairApiClient
+from .client_pool import BetfairClientPool
+from .polling_scheduler import PollingScheduler
+from .shared_prices import MultiProcessPoller, SharedPriceBook
+from .streaming import BetfairStreamClient, MarketStreamCache
+from .transport import PooledHttpTransport, Transport
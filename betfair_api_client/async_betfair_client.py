@@ -0,0 +1,404 @@
+import asyncio
+import functools
+import logging
+import urllib.error
+
+from typing import Dict, List, Optional
+
+from .async_transport import AsyncPooledHttpTransport, AsyncTransport
+from .base_client import BaseBetfairApiClient
+from .catalogue_cache import CatalogueCache
+from .datamodel.competition import Competition
+from .datamodel.event import Event
+from .datamodel.exceptions import BetfairException
+from .datamodel.market import Market
+from .datamodel.price_change import PriceChange
+from .datamodel.price_projection import PriceProjection
+from .datamodel.orders import (
+    CancelInstruction,
+    InstructionReport,
+    OrderOperations,
+    PlaceInstruction,
+    ReplaceInstruction,
+    UpdateInstruction,
+)
+from .datamodel.runner import Runner
+from .instrumentation import Instrumentation
+from .request_scheduler import RequestScheduler
+from .request_weights import MAX_REQUEST_WEIGHT
+from .resilience import IDEMPOTENT_METHODS, ResiliencePolicy
+from .session_manager import AsyncSessionManager, is_session_error
+from .transport import TransportResponse
+
+
+class AsyncBetfairApiClient(BaseBetfairApiClient):
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        apiKey: str,
+        clientCertificatePath: str,
+        certificateKeyPath: str,
+        transport: Optional[AsyncTransport] = None,
+        maxConcurrentRequests: int = 16,
+        maxRequestWeight: int = MAX_REQUEST_WEIGHT,
+        catalogueCache: Optional[CatalogueCache] = None,
+        requestScheduler: Optional[RequestScheduler] = None,
+        keepAliveInterval: Optional[float] = None,
+        resiliencePolicy: Optional[ResiliencePolicy] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        priceProjection: Optional[PriceProjection] = None,
+    ):
+        """
+        asyncio client for non-interactive connections to the betfair API.
+        Unlike BetfairApiClient, construction does not log in: await login() (or use "async with").
+
+        :param username: (str)
+        :param password: (str)
+        :param apiKey: (str)
+        :param clientCertificatePath: (str)  Path to self-signed client certificate.
+        :param certificateKeyPath: (str)  Path to self-signed client certificate key.
+        :param transport: (AsyncTransport)  Defaults to an AsyncPooledHttpTransport.
+        :param maxConcurrentRequests: (int)  Number of listMarketBook or order requests in flight at once.
+        :param maxRequestWeight: (int)  Betfair data weight allowed per listMarketBook request.
+        :param catalogueCache: (CatalogueCache)  Optional cache for listCompetitions and listMarketCatalogue results.
+        :param requestScheduler: (RequestScheduler)  Optional throttle applied to every API call.
+        :param keepAliveInterval: (float)  Seconds between keep-alives sent from a background task started by
+                                  "async with".  Expired sessions are renewed and the failed call replayed either way.
+        :param resiliencePolicy: (ResiliencePolicy)  Optional retries, hedging and circuit breaking for API calls.
+        :param instrumentation: (Instrumentation)  Optional hooks receiving timings and sizes of every API call.
+        :param priceProjection: (PriceProjection)  Prices requested by listMarketBook, eg. deeper ladders or
+                                traded volume.  Defaults to the three best back and lay prices.
+        """
+        super().__init__(
+            username=username,
+            password=password,
+            apiKey=apiKey,
+            clientCertificatePath=clientCertificatePath,
+            certificateKeyPath=certificateKeyPath,
+            maxConcurrentRequests=maxConcurrentRequests,
+            maxRequestWeight=maxRequestWeight,
+            catalogueCache=catalogueCache,
+            requestScheduler=requestScheduler,
+            resiliencePolicy=resiliencePolicy,
+            instrumentation=instrumentation,
+            priceProjection=priceProjection,
+        )
+        self.transport = (
+            transport if transport is not None else AsyncPooledHttpTransport()
+        )
+        self.sessionManager = AsyncSessionManager(
+            client=self, keepAliveInterval=keepAliveInterval
+        )
+
+    async def __aenter__(self) -> "AsyncBetfairApiClient":
+        await self.login()
+        self.sessionManager.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def login(self) -> None:
+        await self.sessionManager.login()
+
+    async def send_heartbeat(self) -> TransportResponse:
+        response = await self.transport.post(**self._build_heartbeat_request())
+        logging.info(msg=response.json()["status"])
+        return response
+
+    async def _call_api(self, jsonrpcRequest: dict, endpointURL: str):
+        if self.resiliencePolicy is None:
+            return await self._call_api_once(
+                jsonrpcRequest=jsonrpcRequest, endpointURL=endpointURL
+            )
+        return await self.resiliencePolicy.call_async(
+            send=functools.partial(
+                self._call_api_once,
+                jsonrpcRequest=jsonrpcRequest,
+                endpointURL=endpointURL,
+            ),
+            jsonrpcRequest=jsonrpcRequest,
+            endpointURL=endpointURL,
+        )
+
+    async def _call_api_once(self, jsonrpcRequest: dict, endpointURL: str):
+        if self.requestScheduler is not None:
+            await self.requestScheduler.acquire_async(jsonrpcRequest=jsonrpcRequest)
+        sessionToken = self.sessionToken
+        result = await self._send_api_request(
+            jsonrpcRequest=jsonrpcRequest, endpointURL=endpointURL
+        )
+        if is_session_error(result=result):
+            await self.sessionManager.relogin(staleSessionToken=sessionToken)
+            result = await self._send_api_request(
+                jsonrpcRequest=jsonrpcRequest, endpointURL=endpointURL
+            )
+        return result
+
+    async def _send_api_request(self, jsonrpcRequest: dict, endpointURL: str):
+        apiRequest = self._build_api_request(
+            jsonrpcRequest=jsonrpcRequest, endpointURL=endpointURL
+        )
+        with self._instrument_call(
+            jsonrpcRequest=jsonrpcRequest, apiRequest=apiRequest
+        ) as callRecord:
+            try:
+                response = await self.transport.post(
+                    **apiRequest,
+                    idempotent=jsonrpcRequest["method"] in IDEMPOTENT_METHODS,
+                )
+                return self._parse_api_response(
+                    response=response, endpointURL=endpointURL, callRecord=callRecord
+                )
+            except urllib.error.URLError as ex:
+                logging.exception(msg=ex)
+                raise ex
+
+    async def _call_cached_api(self, jsonrpcRequest: dict, endpointURL: str):
+        cacheKey = self._get_catalogue_cache_key(jsonrpcRequest=jsonrpcRequest)
+        if cacheKey is not None:
+            result = self.catalogueCache.get(key=cacheKey)
+            if result is not None:
+                return result
+        result = await self._call_api(
+            jsonrpcRequest=jsonrpcRequest, endpointURL=endpointURL
+        )
+        # error responses come back as dicts and are not cached
+        if cacheKey is not None and isinstance(result, list):
+            self.catalogueCache.set(key=cacheKey, value=result)
+        return result
+
+    async def close(self) -> None:
+        await self.sessionManager.stop()
+        await self.transport.close()
+
+    async def check_balance(self):
+        return await self._call_api(
+            jsonrpcRequest=self._build_balance_request(),
+            endpointURL=self.ACCOUNT_ENDPOINT,
+        )
+
+    async def list_competitions(
+        self, sportTypeIds: List[int], countryCodes: Optional[List[str]] = None
+    ) -> List[Competition]:
+        rawCompetitionData = await self._call_cached_api(
+            jsonrpcRequest=self._build_competitions_request(
+                sportTypeIds=sportTypeIds, countryCodes=countryCodes
+            ),
+            endpointURL=self.BETTING_ENDPOINT,
+        )
+        return self._process_raw_competitions_data(
+            rawCompetitionData=rawCompetitionData
+        )
+
+    async def get_coming_events(
+        self,
+        sportTypeId: int,
+        marketTypes: List[str],
+        countryCodes: List[str] = None,
+        textQuery: str = None,
+        competitionIds: List[int] = None,
+        daysAhead: int = 7,
+    ) -> List[Event]:
+        catalogueRequest = self._build_catalogue_request(
+            sportTypeId=sportTypeId,
+            marketTypes=marketTypes,
+            countryCodes=countryCodes,
+            textQuery=textQuery,
+            competitionIds=competitionIds,
+            daysAhead=daysAhead,
+        )
+        rawMarketsData = await self._list_market_catalogue(
+            catalogueRequest=catalogueRequest
+        )
+        return self._process_raw_markets_data(rawMarketsData=rawMarketsData)
+
+    async def _list_market_catalogue(self, catalogueRequest: dict) -> List[dict]:
+        """
+        All markets matching a listMarketCatalogue request, however many pages they take.
+        """
+        cacheKey = self._get_catalogue_cache_key(jsonrpcRequest=catalogueRequest)
+        if cacheKey is not None:
+            rawMarketsData = self.catalogueCache.get(key=cacheKey)
+            if rawMarketsData is not None:
+                return rawMarketsData
+        marketIdToRawMarket = {}
+        catalogueRequests = [catalogueRequest]
+        while catalogueRequests:
+            slots = asyncio.Semaphore(value=self.maxConcurrentRequests)
+
+            async def list_market_catalogue(jsonrpcRequest: dict):
+                async with slots:
+                    return await self._call_api(
+                        jsonrpcRequest=jsonrpcRequest,
+                        endpointURL=self.BETTING_ENDPOINT,
+                    )
+
+            catalogueResponses = await asyncio.gather(
+                *[
+                    list_market_catalogue(jsonrpcRequest=jsonrpcRequest)
+                    for jsonrpcRequest in catalogueRequests
+                ]
+            )
+            catalogueRequests, eventSplitRequests = self._process_catalogue_pages(
+                catalogueRequests=catalogueRequests,
+                catalogueResponses=catalogueResponses,
+                marketIdToRawMarket=marketIdToRawMarket,
+            )
+            for eventSplitRequest in eventSplitRequests:
+                rawEventsData = await self._call_api(
+                    jsonrpcRequest=self._build_events_request(
+                        marketFilter=eventSplitRequest["params"]["filter"]
+                    ),
+                    endpointURL=self.BETTING_ENDPOINT,
+                )
+                catalogueRequests.extend(
+                    self._split_catalogue_request_by_event(
+                        catalogueRequest=eventSplitRequest, rawEventsData=rawEventsData
+                    )
+                )
+        rawMarketsData = list(marketIdToRawMarket.values())
+        if cacheKey is not None:
+            self.catalogueCache.set(key=cacheKey, value=rawMarketsData)
+        return rawMarketsData
+
+    async def update_prices_for_events(self, events: List[Event]) -> List[Event]:
+        await self._update_prices(
+            marketIdToMarketMap=self._get_event_markets(events=events)
+        )
+        return events
+
+    async def update_prices_for_markets(self, markets: List[Market]) -> List[Market]:
+        marketIdToMarketMap = self._get_markets_to_update(markets=markets)
+        await self._update_prices(marketIdToMarketMap=marketIdToMarketMap)
+        return list(marketIdToMarketMap.values())
+
+    async def get_price_changes_for_events(
+        self, events: List[Event]
+    ) -> List[PriceChange]:
+        """
+        :return: (list)  A PriceChange for every ladder level whose size changed.
+        """
+        priceChanges = []
+        await self._update_prices(
+            marketIdToMarketMap=self._get_event_markets(events=events),
+            priceChanges=priceChanges,
+        )
+        return priceChanges
+
+    async def get_price_changes_for_markets(
+        self, markets: List[Market]
+    ) -> List[PriceChange]:
+        """
+        :return: (list)  A PriceChange for every ladder level whose size changed.
+        """
+        priceChanges = []
+        await self._update_prices(
+            marketIdToMarketMap=self._get_markets_to_update(markets=markets),
+            priceChanges=priceChanges,
+        )
+        return priceChanges
+
+    async def _update_prices(
+        self,
+        marketIdToMarketMap: Dict[str, Market],
+        priceChanges: Optional[List[PriceChange]] = None,
+    ) -> None:
+        marketIdChunks = self._chunk_market_ids(
+            marketIds=list(marketIdToMarketMap.keys())
+        )
+        slots = asyncio.Semaphore(value=self.maxConcurrentRequests)
+
+        async def list_market_book(marketIds: List[str]) -> List[dict]:
+            async with slots:
+                return await self._call_api(
+                    jsonrpcRequest=self._build_market_book_request(marketIds=marketIds),
+                    endpointURL=self.BETTING_ENDPOINT,
+                )
+
+        marketBookChunks = await asyncio.gather(
+            *[list_market_book(marketIds=marketIds) for marketIds in marketIdChunks]
+        )
+        self._process_market_books(
+            marketIdToMarketMap=marketIdToMarketMap,
+            marketBookChunks=marketBookChunks,
+            priceChanges=priceChanges,
+        )
+
+    async def place_bet(
+        self,
+        market: Market,
+        runner: Runner,
+        oddsToPlace: float,
+        side: str,
+        betSize: float,
+    ):
+        placeOrderRequest = self._build_place_order_request(
+            market=market,
+            runner=runner,
+            oddsToPlace=oddsToPlace,
+            side=side,
+            betSize=betSize,
+        )
+        response = await self._call_api(
+            jsonrpcRequest=placeOrderRequest, endpointURL=self.BETTING_ENDPOINT
+        )
+        return self._process_place_order_response(response=response)
+
+    async def place_orders(
+        self, instructions: List[PlaceInstruction]
+    ) -> List[InstructionReport]:
+        return await self._send_orders(
+            operation=OrderOperations.PLACE, instructions=instructions
+        )
+
+    async def cancel_orders(
+        self, instructions: List[CancelInstruction]
+    ) -> List[InstructionReport]:
+        return await self._send_orders(
+            operation=OrderOperations.CANCEL, instructions=instructions
+        )
+
+    async def replace_orders(
+        self, instructions: List[ReplaceInstruction]
+    ) -> List[InstructionReport]:
+        return await self._send_orders(
+            operation=OrderOperations.REPLACE, instructions=instructions
+        )
+
+    async def update_orders(
+        self, instructions: List[UpdateInstruction]
+    ) -> List[InstructionReport]:
+        return await self._send_orders(
+            operation=OrderOperations.UPDATE, instructions=instructions
+        )
+
+    async def _send_orders(
+        self, operation: str, instructions: list
+    ) -> List[InstructionReport]:
+        orderRequests = self._build_order_requests(
+            operation=operation, instructions=instructions
+        )
+        slots = asyncio.Semaphore(value=self.maxConcurrentRequests)
+
+        async def send_order_request(jsonrpcRequest: dict):
+            # a failed request is reported rather than raised, so that it does not hide the others
+            async with slots:
+                try:
+                    return await self._call_api(
+                        jsonrpcRequest=jsonrpcRequest,
+                        endpointURL=self.BETTING_ENDPOINT,
+                    )
+                except (Exception, BetfairException) as ex:
+                    return ex
+
+        responses = await asyncio.gather(
+            *[
+                send_order_request(jsonrpcRequest=jsonrpcRequest)
+                for _, jsonrpcRequest in orderRequests
+            ]
+        )
+        return self._process_order_responses(
+            instructions=instructions, orderRequests=orderRequests, responses=responses
+        )
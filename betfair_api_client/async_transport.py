@@ -0,0 +1,333 @@
+import abc
+import asyncio
+import http.client
+import io
+import ssl
+import time
+import urllib.error
+
+from collections import deque
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .transport import STALE_CONNECTION_ERRORS, TransportResponse
+
+
+class AsyncTransport(abc.ABC):
+    @abc.abstractmethod
+    async def post(
+        self,
+        url: str,
+        data: bytes,
+        headers: Dict[str, str],
+        cert: Optional[Tuple[str, str]] = None,
+        idempotent: bool = False,
+    ) -> TransportResponse:
+        """
+        :param idempotent: (bool)  See Transport.post.
+        """
+
+    async def close(self) -> None:
+        pass
+
+
+class _AsyncConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.releasedAt = time.monotonic()
+
+    def is_usable(self, idleTimeout: float) -> bool:
+        return (
+            not self.reader.at_eof()
+            and not self.writer.is_closing()
+            and time.monotonic() - self.releasedAt <= idleTimeout
+        )
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncConnectionPool:
+    def __init__(
+        self,
+        scheme: str,
+        host: str,
+        port: int,
+        maxSize: int,
+        connectTimeout: float,
+        readTimeout: float,
+        idleTimeout: float,
+        sslContext: Optional[ssl.SSLContext] = None,
+    ):
+        """
+        asyncio counterpart of transport.ConnectionPool, speaking HTTP/1.1 over asyncio streams.
+        """
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.maxSize = maxSize
+        self.connectTimeout = connectTimeout
+        self.readTimeout = readTimeout
+        self.idleTimeout = idleTimeout
+        self.sslContext = sslContext
+        self.connectionsCreated = 0
+        self.connectionsReused = 0
+        self.requestsSent = 0
+        self.staleConnectionRetries = 0
+        self._idleConnections = deque()
+        self._slots = asyncio.Semaphore(value=maxSize)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes,
+        headers: Dict[str, str],
+        idempotent: bool = False,
+    ) -> TransportResponse:
+        """
+        :param idempotent: (bool)  See transport.ConnectionPool.stream_request.
+        """
+        serialisedRequest = self._serialise_request(
+            method=method, path=path, body=body, headers=headers
+        )
+        async with self._slots:
+            startedAt = time.perf_counter()
+            connection, isReused = await self._get_connection()
+            connectedAt = time.perf_counter()
+            isWritten = False
+            try:
+                try:
+                    connection.writer.write(serialisedRequest)
+                    await connection.writer.drain()
+                    isWritten = True
+                    response, willClose = await asyncio.wait_for(
+                        self._read_response(
+                            reader=connection.reader, connectedAt=connectedAt
+                        ),
+                        timeout=self.readTimeout,
+                    )
+                except STALE_CONNECTION_ERRORS:
+                    # a request that was written may have been processed before the connection dropped
+                    if not isReused or (isWritten and not idempotent):
+                        raise
+                    connection.close()
+                    connection = await self._new_connection()
+                    self.staleConnectionRetries += 1
+                    connectedAt = time.perf_counter()
+                    connection.writer.write(serialisedRequest)
+                    await connection.writer.drain()
+                    response, willClose = await asyncio.wait_for(
+                        self._read_response(
+                            reader=connection.reader, connectedAt=connectedAt
+                        ),
+                        timeout=self.readTimeout,
+                    )
+            except BaseException:
+                connection.close()
+                raise
+            response.connectTime = connectedAt - startedAt
+            self.requestsSent += 1
+            if willClose:
+                connection.close()
+            else:
+                connection.releasedAt = time.monotonic()
+                self._idleConnections.append(connection)
+            return response
+
+    async def close(self) -> None:
+        while self._idleConnections:
+            self._idleConnections.pop().close()
+
+    async def _get_connection(self) -> Tuple[_AsyncConnection, bool]:
+        """
+        :return: (tuple)  An idle connection, or a new one, and whether it was idle.
+        """
+        while self._idleConnections:
+            connection = self._idleConnections.pop()
+            if connection.is_usable(idleTimeout=self.idleTimeout):
+                self.connectionsReused += 1
+                return connection, True
+            connection.close()
+        return await self._new_connection(), False
+
+    async def _new_connection(self) -> _AsyncConnection:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                host=self.host,
+                port=self.port,
+                ssl=self.sslContext if self.scheme == "https" else None,
+            ),
+            timeout=self.connectTimeout,
+        )
+        self.connectionsCreated += 1
+        return _AsyncConnection(reader=reader, writer=writer)
+
+    def _serialise_request(
+        self, method: str, path: str, body: bytes, headers: Dict[str, str]
+    ) -> bytes:
+        hostHeader = self.host
+        if self.port not in (80, 443):
+            hostHeader = f"{self.host}:{self.port}"
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {hostHeader}",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive",
+        ]
+        lines.extend(
+            f"{name}: {value}" for name, value in headers.items() if value is not None
+        )
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    @staticmethod
+    async def _read_response(
+        reader: asyncio.StreamReader, connectedAt: float
+    ) -> Tuple[TransportResponse, bool]:
+        statusLine = await reader.readline()
+        timeToFirstByte = time.perf_counter() - connectedAt
+        if not statusLine:
+            raise http.client.RemoteDisconnected(
+                "Remote end closed connection without response"
+            )
+        version, status, reason = (
+            statusLine.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""]
+        )[:3]
+        rawHeaders = b""
+        while True:
+            line = await reader.readline()
+            rawHeaders += line
+            if line in (b"\r\n", b"\n", b""):
+                break
+        headers = http.client.parse_headers(io.BytesIO(rawHeaders))
+        willClose = (
+            version == "HTTP/1.0" or headers.get("Connection", "").lower() == "close"
+        )
+        if headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                chunkSize = int((await reader.readline()).split(b";")[0], 16)
+                if chunkSize == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(chunkSize))
+                await reader.readline()
+            content = b"".join(chunks)
+        elif "Content-Length" in headers:
+            content = await reader.readexactly(int(headers["Content-Length"]))
+        else:
+            content = await reader.read()
+            willClose = True
+        response = TransportResponse(
+            status_code=int(status),
+            reason=reason,
+            content=content,
+            headers=headers,
+            timeToFirstByte=timeToFirstByte,
+        )
+        return response, willClose
+
+
+class AsyncPooledHttpTransport(AsyncTransport):
+    def __init__(
+        self,
+        poolSize: int = 10,
+        connectTimeout: float = 10.0,
+        readTimeout: float = 30.0,
+        idleTimeout: float = 60.0,
+    ):
+        """
+        Transport keeping a pool of keep-alive connections per host on the running event loop.
+
+        :param poolSize: (int)  Maximum number of connections held per host (and client certificate).
+        :param connectTimeout: (float)  Seconds.
+        :param readTimeout: (float)  Seconds.
+        :param idleTimeout: (float)  Seconds an idle connection may be kept before it is discarded.
+        """
+        self.poolSize = poolSize
+        self.connectTimeout = connectTimeout
+        self.readTimeout = readTimeout
+        self.idleTimeout = idleTimeout
+        self._pools = {}
+
+    async def post(
+        self,
+        url: str,
+        data: bytes,
+        headers: Dict[str, str],
+        cert: Optional[Tuple[str, str]] = None,
+        idempotent: bool = False,
+    ) -> TransportResponse:
+        splitUrl = urlsplit(url)
+        path = splitUrl.path or "/"
+        if splitUrl.query:
+            path = f"{path}?{splitUrl.query}"
+        pool = self._get_pool(
+            scheme=splitUrl.scheme,
+            host=splitUrl.hostname,
+            port=splitUrl.port,
+            cert=cert,
+        )
+        try:
+            return await pool.request(
+                method="POST",
+                path=path,
+                body=data,
+                headers=headers,
+                idempotent=idempotent,
+            )
+        except (
+            OSError,
+            asyncio.TimeoutError,
+            asyncio.IncompleteReadError,
+            http.client.HTTPException,
+        ) as ex:
+            raise urllib.error.URLError(reason=ex) from ex
+
+    def get_pool_stats(self) -> Dict[str, dict]:
+        return {
+            f"{pool.scheme}://{pool.host}:{pool.port}": {
+                "connectionsCreated": pool.connectionsCreated,
+                "connectionsReused": pool.connectionsReused,
+                "requestsSent": pool.requestsSent,
+                "staleConnectionRetries": pool.staleConnectionRetries,
+            }
+            for pool in self._pools.values()
+        }
+
+    async def close(self) -> None:
+        pools = list(self._pools.values())
+        self._pools = {}
+        for pool in pools:
+            await pool.close()
+
+    def _get_pool(
+        self,
+        scheme: str,
+        host: str,
+        port: Optional[int],
+        cert: Optional[Tuple[str, str]],
+    ) -> AsyncConnectionPool:
+        if port is None:
+            port = 443 if scheme == "https" else 80
+        if scheme != "https" or cert is None or cert[0] is None:
+            cert = None
+        poolKey = (scheme, host, port, cert)
+        if poolKey not in self._pools:
+            sslContext = None
+            if scheme == "https":
+                sslContext = ssl.create_default_context()
+                if cert is not None:
+                    sslContext.load_cert_chain(certfile=cert[0], keyfile=cert[1])
+            self._pools[poolKey] = AsyncConnectionPool(
+                scheme=scheme,
+                host=host,
+                port=port,
+                maxSize=self.poolSize,
+                connectTimeout=self.connectTimeout,
+                readTimeout=self.readTimeout,
+                idleTimeout=self.idleTimeout,
+                sslContext=sslContext,
+            )
+        return self._pools[poolKey]
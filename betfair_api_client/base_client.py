@@ -0,0 +1,850 @@
+import logging
+import time
+import urllib.error
+import uuid
+
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from warnings import warn
+
+from .catalogue_cache import CatalogueCache
+from .datamodel.bet_types import BetTypes
+from .datamodel.competition import Competition
+from .datamodel.event import Event
+from .datamodel.exceptions import (
+    BetfairException,
+    ErrorCodes,
+    InvalidOdds,
+    LoginFailed,
+    TooMuchData,
+)
+from .datamodel.market import Market
+from .datamodel.orders import InstructionReport, OrderOperations
+from .datamodel.price_change import PriceChange
+from .datamodel.price_ladder import NO_CHANGES
+from .datamodel.price_data import PriceData
+from .datamodel.price_projection import PriceProjection
+from .datamodel.runner import Runner
+from .instrumentation import (
+    CallRecord,
+    Instrumentation,
+    notify_call,
+    notify_hydration,
+)
+from .parsing import CatalogueParser, dumps, iter_result_items
+from .price_ticks import is_valid_price, snap_price
+from .request_scheduler import RequestScheduler
+from .resilience import ResiliencePolicy
+from .request_weights import (
+    MAX_REQUEST_WEIGHT,
+    chunk_market_ids,
+    get_catalogue_max_results,
+)
+from .transport import StreamingTransportResponse, TransportResponse
+
+
+class BaseBetfairApiClient:
+    """
+    Request building and response parsing shared by the sync and async clients.
+    Subclasses only supply the I/O.
+    """
+
+    ACCOUNT_ENDPOINT = "https://api.betfair.com/exchange/account/json-rpc/v1"
+    BETTING_ENDPOINT = "https://api.betfair.com/exchange/betting/json-rpc/v1"
+    LOGIN_ENDPOINT = "https://identitysso-cert.betfair.com/api/certlogin"
+    KEEP_ALIVE_ENDPOINT = "https://identitysso.betfair.com/api/keepAlive"
+    BETFAIR_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+    CATALOGUE_WINDOW_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+    MIN_CATALOGUE_WINDOW = timedelta(minutes=1)
+    PRICE_DATA = [PriceData.EX_BEST_OFFERS]
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        apiKey: str,
+        clientCertificatePath: str,
+        certificateKeyPath: str,
+        maxConcurrentRequests: int,
+        maxRequestWeight: int = MAX_REQUEST_WEIGHT,
+        catalogueCache: Optional[CatalogueCache] = None,
+        requestScheduler: Optional[RequestScheduler] = None,
+        resiliencePolicy: Optional[ResiliencePolicy] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        priceProjection: Optional[PriceProjection] = None,
+    ):
+        self.username = username
+        self.password = password
+        self.apiKey = apiKey
+        self.clientCertificatePath = clientCertificatePath
+        self.certificateKeyPath = certificateKeyPath
+        self.maxConcurrentRequests = maxConcurrentRequests
+        self.maxRequestWeight = maxRequestWeight
+        self.catalogueCache = catalogueCache
+        self.requestScheduler = requestScheduler
+        self.resiliencePolicy = resiliencePolicy
+        self.instrumentation = instrumentation
+        self.priceProjection = (
+            priceProjection
+            if priceProjection is not None
+            else PriceProjection(priceData=self.PRICE_DATA)
+        )
+        self.sessionToken = None
+        self._catalogueParser = CatalogueParser()
+
+    def _build_login_request(self) -> dict:
+        return {
+            "url": self.LOGIN_ENDPOINT,
+            "data": f"username={self.username}&password={self.password}".encode(
+                "utf-8"
+            ),
+            "headers": {
+                "X-Application": self.apiKey,
+                "Content-Type": "application/x-www-form-urlencoded",
+            },
+            "cert": (self.clientCertificatePath, self.certificateKeyPath),
+        }
+
+    def _handle_login_response(self, response: TransportResponse) -> None:
+        jsonResponse = response.json()
+        logging.info(msg=f"Betfair client login status: {jsonResponse['loginStatus']}")
+        if response.status_code == 200:
+            self.sessionToken = jsonResponse["sessionToken"]
+        else:
+            logging.exception(msg="Request failed.")
+            logging.exception(msg=jsonResponse["loginStatus"])
+            raise LoginFailed(jsonResponse["loginStatus"])
+
+    def _build_heartbeat_request(self) -> dict:
+        return {
+            "url": self.KEEP_ALIVE_ENDPOINT,
+            "data": b"",
+            "headers": {
+                "X-Application": self.apiKey,
+                "X-Authentication": self.sessionToken,
+                "Accept": "application/json",
+            },
+        }
+
+    def _build_api_request(self, jsonrpcRequest: dict, endpointURL: str) -> dict:
+        return {
+            "url": endpointURL,
+            "data": dumps(jsonrpcRequest),
+            "headers": {
+                "X-Application": self.apiKey,
+                "X-Authentication": self.sessionToken,
+                "content-type": "application/json",
+            },
+        }
+
+    @staticmethod
+    def _parse_api_response(
+        response: TransportResponse,
+        endpointURL: str,
+        callRecord: Optional[CallRecord] = None,
+    ):
+        if callRecord is not None:
+            callRecord.record_response(response=response)
+        BaseBetfairApiClient._raise_for_status(
+            response=response, endpointURL=endpointURL
+        )
+        decodeStartedAt = time.perf_counter()
+        decodedResponse = response.json()
+        if callRecord is not None:
+            callRecord.decodeTime = time.perf_counter() - decodeStartedAt
+        if "result" in decodedResponse:
+            if callRecord is not None:
+                callRecord.record_result(result=decodedResponse["result"])
+            return decodedResponse["result"]
+        return decodedResponse
+
+    @contextmanager
+    def _instrument_call(
+        self, jsonrpcRequest: dict, apiRequest: dict
+    ) -> Iterator[Optional[CallRecord]]:
+        """
+        Yields the CallRecord to fill in, or None when the client has no instrumentation.
+        """
+        if self.instrumentation is None:
+            yield None
+            return
+        callRecord = CallRecord(
+            method=jsonrpcRequest["method"],
+            endpointURL=apiRequest["url"],
+            requestBytes=len(apiRequest["data"]),
+        )
+        try:
+            yield callRecord
+        except BaseException as ex:
+            callRecord.error = ex
+            raise
+        finally:
+            notify_call(instrumentation=self.instrumentation, record=callRecord)
+
+    def _notify_hydration(self, method: str, startedAt: float, itemCount: int) -> None:
+        if self.instrumentation is not None:
+            notify_hydration(
+                instrumentation=self.instrumentation,
+                method=method,
+                startedAt=startedAt,
+                itemCount=itemCount,
+            )
+
+    @staticmethod
+    def _iter_api_result(
+        response: StreamingTransportResponse, endpointURL: str
+    ) -> Iterator:
+        BaseBetfairApiClient._raise_for_status(
+            response=response, endpointURL=endpointURL
+        )
+        return iter_result_items(fileObject=response.raw)
+
+    @staticmethod
+    def _raise_for_status(response, endpointURL: str) -> None:
+        if not response.ok:
+            raise urllib.error.HTTPError(
+                url=endpointURL,
+                code=response.status_code,
+                msg=response.reason,
+                hdrs=response.headers,
+                fp=None,
+            )
+
+    def _get_catalogue_cache_key(self, jsonrpcRequest: dict) -> Optional[str]:
+        if self.catalogueCache is None:
+            return None
+        return CatalogueCache.make_key(
+            method=jsonrpcRequest["method"], params=jsonrpcRequest["params"]
+        )
+
+    @staticmethod
+    def _build_balance_request() -> dict:
+        return {
+            "jsonrpc": "2.0",
+            "method": "AccountAPING/v1.0/getAccountFunds",
+        }
+
+    @staticmethod
+    def _build_competitions_request(
+        sportTypeIds: List[int], countryCodes: Optional[List[str]] = None
+    ) -> dict:
+        competitionsRequest = {
+            "params": {
+                "filter": {
+                    "eventTypeIds": sportTypeIds,
+                }
+            },
+            "jsonrpc": "2.0",
+            "method": "SportsAPING/v1.0/listCompetitions",
+            "id": 1,
+        }
+        if countryCodes:
+            competitionsRequest["params"]["filter"].update(
+                {"marketCountries": countryCodes}
+            )
+        return competitionsRequest
+
+    @staticmethod
+    def _build_events_request(marketFilter: dict) -> dict:
+        return {
+            "params": {"filter": marketFilter},
+            "jsonrpc": "2.0",
+            "method": "SportsAPING/v1.0/listEvents",
+            "id": 1,
+        }
+
+    @staticmethod
+    def _process_raw_competitions_data(
+        rawCompetitionData: List[dict],
+    ) -> List[Competition]:
+        return [
+            Competition(
+                competitionId=int(competition["competition"]["id"]),
+                competitionName=competition["competition"]["name"],
+            )
+            for competition in rawCompetitionData
+        ]
+
+    @staticmethod
+    def _build_catalogue_request(
+        sportTypeId: int,
+        marketTypes: List[str],
+        countryCodes: List[str] = None,
+        textQuery: str = None,
+        competitionIds: List[int] = None,
+        daysAhead: int = 7,
+    ) -> dict:
+        parameterDictionary = {
+            "eventTypeIds": [sportTypeId],
+            "marketTypeCodes": marketTypes,
+            "marketStartTime": {
+                "from": datetime.now().strftime("%Y-%m-%d"),
+                "to": (datetime.now() + timedelta(days=daysAhead + 1)).strftime(
+                    "%Y-%m-%d"
+                ),
+            },
+        }
+        if countryCodes is not None:
+            parameterDictionary["marketCountries"] = countryCodes
+        if textQuery is not None:
+            parameterDictionary["textQuery"] = textQuery
+        if competitionIds is not None:
+            parameterDictionary["competitionIds"] = [
+                int(competitionId) for competitionId in competitionIds
+            ]
+        marketProjection = [
+            "COMPETITION",
+            "EVENT",
+            "EVENT_TYPE",
+            "RUNNER_DESCRIPTION",
+            "RUNNER_METADATA",
+            "MARKET_START_TIME",
+        ]
+        return {
+            "jsonrpc": "2.0",
+            "method": "SportsAPING/v1.0/listMarketCatalogue",
+            "params": {
+                "filter": parameterDictionary,
+                "maxResults": get_catalogue_max_results(
+                    marketProjection=marketProjection
+                ),
+                "marketProjection": marketProjection,
+            },
+            "id": 1,
+        }
+
+    def _process_catalogue_pages(
+        self,
+        catalogueRequests: List[dict],
+        catalogueResponses: Iterable,
+        marketIdToRawMarket: Dict[str, dict],
+    ) -> Tuple[List[dict], List[dict]]:
+        """
+        Collect the markets of each listMarketCatalogue page, de-duplicated by marketId.
+        Pages that failed with TooMuchData, or came back full and so may have dropped markets,
+        are split into narrower requests.
+
+        :return: (tuple)  The narrower requests still to be sent, and the requests whose window can not
+                 be narrowed any further, to be split by event with _split_catalogue_request_by_event.
+        """
+        nextCatalogueRequests = []
+        eventSplitRequests = []
+        for catalogueRequest, rawMarketsData in zip(
+            catalogueRequests, catalogueResponses
+        ):
+            isTooMuchData = self._is_too_much_data(rawMarketsData=rawMarketsData)
+            if not isTooMuchData:
+                rawMarketsData = self._process_catalogue_error(
+                    rawMarketsData=rawMarketsData
+                )
+                for rawMarket in rawMarketsData:
+                    marketIdToRawMarket.setdefault(rawMarket["marketId"], rawMarket)
+                if len(rawMarketsData) < catalogueRequest["params"]["maxResults"]:
+                    continue
+            splitRequests = self._split_catalogue_request(
+                catalogueRequest=catalogueRequest
+            )
+            if len(splitRequests) == 0:
+                if "eventIds" not in catalogueRequest["params"]["filter"]:
+                    eventSplitRequests.append(catalogueRequest)
+                    continue
+                if isTooMuchData:
+                    raise TooMuchData
+                warn(
+                    f"More than {catalogueRequest['params']['maxResults']} markets of event "
+                    f"{catalogueRequest['params']['filter']['eventIds'][0]} start between "
+                    f"{catalogueRequest['params']['filter']['marketStartTime']}, some are missing"
+                )
+            nextCatalogueRequests.extend(splitRequests)
+        return nextCatalogueRequests, eventSplitRequests
+
+    @staticmethod
+    def _is_too_much_data(rawMarketsData) -> bool:
+        return (
+            isinstance(rawMarketsData, dict)
+            and "error" in rawMarketsData
+            and rawMarketsData["error"].get("message") == ErrorCodes.TOO_MUCH_DATA
+        )
+
+    @staticmethod
+    def _process_catalogue_error(rawMarketsData):
+        if "error" in rawMarketsData:
+            raise BetfairException(rawMarketsData["error"]["message"])
+        return rawMarketsData
+
+    def _split_catalogue_request(self, catalogueRequest: dict) -> List[dict]:
+        """
+        Split a listMarketCatalogue request in two, by market type when it asks for several,
+        otherwise by halving its marketStartTime window.
+        """
+        marketFilter = catalogueRequest["params"]["filter"]
+        marketTypes = marketFilter.get("marketTypeCodes") or []
+        if len(marketTypes) > 1:
+            middle = len(marketTypes) // 2
+            splitFilters = [
+                dict(marketFilter, marketTypeCodes=marketTypes[:middle]),
+                dict(marketFilter, marketTypeCodes=marketTypes[middle:]),
+            ]
+        else:
+            windowStart = self._parse_window_time(
+                windowTime=marketFilter["marketStartTime"]["from"]
+            )
+            windowEnd = self._parse_window_time(
+                windowTime=marketFilter["marketStartTime"]["to"]
+            )
+            if windowEnd - windowStart <= self.MIN_CATALOGUE_WINDOW:
+                return []
+            windowMiddle = windowStart + (windowEnd - windowStart) / 2
+            windowMiddle = windowMiddle.replace(microsecond=0)
+            # both ends of a window are inclusive, and markets often start on round times that would
+            # otherwise land in both halves
+            firstWindowEnd = windowMiddle.strftime(self.CATALOGUE_WINDOW_FORMAT)
+            secondWindowStart = (windowMiddle + timedelta(seconds=1)).strftime(
+                self.CATALOGUE_WINDOW_FORMAT
+            )
+            splitFilters = [
+                dict(
+                    marketFilter,
+                    marketStartTime={
+                        "from": marketFilter["marketStartTime"]["from"],
+                        "to": firstWindowEnd,
+                    },
+                ),
+                dict(
+                    marketFilter,
+                    marketStartTime={
+                        "from": secondWindowStart,
+                        "to": marketFilter["marketStartTime"]["to"],
+                    },
+                ),
+            ]
+        return [
+            dict(
+                catalogueRequest,
+                params=dict(catalogueRequest["params"], filter=splitFilter),
+            )
+            for splitFilter in splitFilters
+        ]
+
+    def _split_catalogue_request_by_event(
+        self, catalogueRequest: dict, rawEventsData
+    ) -> List[dict]:
+        """
+        Split a listMarketCatalogue request into one request per event it matches.
+
+        :param rawEventsData: (list)  listEvents result for the request's filter.
+        """
+        rawEventsData = self._process_catalogue_error(rawMarketsData=rawEventsData)
+        return [
+            dict(
+                catalogueRequest,
+                params=dict(
+                    catalogueRequest["params"],
+                    filter=dict(
+                        catalogueRequest["params"]["filter"],
+                        eventIds=[rawEvent["event"]["id"]],
+                    ),
+                ),
+            )
+            for rawEvent in rawEventsData
+        ]
+
+    def _parse_window_time(self, windowTime: str) -> datetime:
+        if len(windowTime) == len("2020-08-04"):
+            return datetime.strptime(windowTime, "%Y-%m-%d")
+        return datetime.strptime(windowTime, self.CATALOGUE_WINDOW_FORMAT)
+
+    def _process_catalogue_response(self, rawMarketsData) -> List[Event]:
+        return self._process_raw_markets_data(
+            rawMarketsData=self._process_catalogue_error(rawMarketsData=rawMarketsData)
+        )
+
+    def _process_raw_markets_data(self, rawMarketsData: List[dict]) -> List[Event]:
+        startedAt = time.perf_counter()
+        parser = self._catalogueParser
+        processedEvents = {}
+        for rawMarket in rawMarketsData:
+            rawEvent = rawMarket["event"]
+            eventId = rawEvent["id"]
+            event = processedEvents.get(eventId)
+            if event is None:
+                event = processedEvents[eventId] = Event(
+                    eventId=int(eventId),
+                    eventName=rawEvent["name"],
+                    eventDate=parser.parse_datetime(value=rawEvent["openDate"]),
+                    competition=parser.get_competition(
+                        rawCompetition=rawMarket["competition"]
+                    ),
+                    countryCode=rawEvent.get("countryCode", None),
+                )
+            market = Market(
+                marketId=rawMarket["marketId"],
+                marketName=rawMarket["marketName"],
+                marketStartTime=parser.parse_datetime(
+                    value=rawMarket["marketStartTime"]
+                ),
+            )
+            for selection in rawMarket["runners"]:
+                market.add_runner(
+                    runner=Runner(
+                        runnerId=int(selection["selectionId"]),
+                        runnerName=selection["runnerName"],
+                        handicap=selection["handicap"],
+                    )
+                )
+            event.add_market(market=market)
+        self._notify_hydration(
+            method="SportsAPING/v1.0/listMarketCatalogue",
+            startedAt=startedAt,
+            itemCount=len(rawMarketsData),
+        )
+        return list(processedEvents.values())
+
+    @staticmethod
+    def _get_event_markets(events: List[Event]) -> Dict[str, Market]:
+        return {
+            marketId: market
+            for event in events
+            for marketId, market in event.markets.items()
+        }
+
+    @staticmethod
+    def _get_markets_to_update(markets: List[Market]) -> Dict[str, Market]:
+        for market in markets:
+            if len(market.runners) == 0:
+                raise Exception(
+                    "Updating markets requires Runners to already be present"
+                )
+        return {market.marketId: market for market in markets}
+
+    def _chunk_market_ids(self, marketIds: List[str]) -> List[List[str]]:
+        return chunk_market_ids(
+            marketIds=marketIds,
+            priceData=self.priceProjection.priceData,
+            maxRequestWeight=self.maxRequestWeight,
+            bestPricesDepth=self.priceProjection.bestPricesDepth,
+        )
+
+    def _build_market_book_request(self, marketIds: List[str]) -> dict:
+        return {
+            "jsonrpc": "2.0",
+            "method": "SportsAPING/v1.0/listMarketBook",
+            "params": {
+                "marketIds": marketIds,
+                "priceProjection": self.priceProjection.to_dict(),
+                "maxResults": "1000",
+            },
+            "id": 1,
+        }
+
+    def _process_market_books(
+        self,
+        marketIdToMarketMap: Dict[str, Market],
+        marketBookChunks: Iterable[List[dict]],
+        priceChanges: Optional[List[PriceChange]] = None,
+    ) -> None:
+        for i, recentMarketData in enumerate(marketBookChunks):
+            if isinstance(recentMarketData, dict) and "error" in recentMarketData:
+                raise BetfairException(recentMarketData["error"]["message"])
+            startedAt = time.perf_counter()
+            if i == 0:
+                self._warn_if_market_data_delayed(recentMarketData=recentMarketData)
+            for marketData in recentMarketData:
+                self._update_market_prices(
+                    market=marketIdToMarketMap[str(marketData["marketId"])],
+                    marketData=marketData,
+                    priceChanges=priceChanges,
+                )
+            self._notify_hydration(
+                method="SportsAPING/v1.0/listMarketBook",
+                startedAt=startedAt,
+                itemCount=len(recentMarketData),
+            )
+
+    def _process_streamed_market_books(
+        self,
+        marketIdToMarketMap: Dict[str, Market],
+        marketBooks: Iterable[dict],
+        warnIfDelayed: bool,
+        priceChanges: Optional[List[PriceChange]] = None,
+    ) -> int:
+        """
+        Apply each market book as soon as it has been decoded.
+
+        :return: (int)  Market books applied.
+        """
+        marketCount = 0
+        for marketData in marketBooks:
+            marketCount += 1
+            if warnIfDelayed:
+                self._warn_if_market_data_delayed(recentMarketData=[marketData])
+                warnIfDelayed = False
+            self._update_market_prices(
+                market=marketIdToMarketMap[str(marketData["marketId"])],
+                marketData=marketData,
+                priceChanges=priceChanges,
+            )
+        return marketCount
+
+    @staticmethod
+    def _warn_if_market_data_delayed(recentMarketData: List[dict]) -> None:
+        if len(recentMarketData) > 0:
+            if recentMarketData[0]["isMarketDataDelayed"]:
+                warn(
+                    message="Market data is delayed.  You may need to upgrade your Betfair Developer account to access live data."
+                )
+
+    @staticmethod
+    def _update_market_prices(
+        market: Market,
+        marketData: dict,
+        priceChanges: Optional[List[PriceChange]] = None,
+    ) -> None:
+        """
+        Only the ladder levels that differ from the runners' current ones are changed.  Data left out
+        of the priceProjection is missing from marketData, and leaves what the runners hold untouched.
+
+        :param priceChanges: (list)  When given, a PriceChange is appended for every changed level.
+        """
+        market.status = marketData.get("status", market.status)
+        market.inPlay = marketData.get("inplay", market.inPlay)
+        market.totalMatched = marketData.get("totalMatched", market.totalMatched)
+        market.betDelay = marketData.get("betDelay", market.betDelay)
+        for runnerInfo in marketData["runners"]:
+            selectionId = int(runnerInfo["selectionId"])
+            runner = market.runners[selectionId]
+            runner.status = runnerInfo.get("status", runner.status)
+            runner.lastPriceTraded = runnerInfo.get(
+                "lastPriceTraded", runner.lastPriceTraded
+            )
+            runner.totalMatched = runnerInfo.get("totalMatched", runner.totalMatched)
+            startingPrices = runnerInfo.get("sp")
+            if startingPrices is not None:
+                runner.nearPrice = startingPrices.get("nearPrice", runner.nearPrice)
+                runner.farPrice = startingPrices.get("farPrice", runner.farPrice)
+                runner.actualSP = startingPrices.get("actualSP", runner.actualSP)
+            exchangePrices = runnerInfo.get("ex", {})
+            backChanges = NO_CHANGES
+            layChanges = NO_CHANGES
+            if BetTypes.BACK in exchangePrices:
+                backChanges = runner.update_back_levels(
+                    levels=exchangePrices[BetTypes.BACK]
+                )
+            if BetTypes.LAY in exchangePrices:
+                layChanges = runner.update_lay_levels(
+                    levels=exchangePrices[BetTypes.LAY]
+                )
+            if BetTypes.TRADED in exchangePrices:
+                runner.update_traded_levels(levels=exchangePrices[BetTypes.TRADED])
+            if priceChanges is None:
+                continue
+            for betType, changes in [
+                (BetTypes.BACK, backChanges),
+                (BetTypes.LAY, layChanges),
+            ]:
+                for price, oldSize, newSize in changes:
+                    priceChanges.append(
+                        PriceChange(
+                            marketId=market.marketId,
+                            selectionId=selectionId,
+                            betType=betType,
+                            price=price,
+                            oldSize=oldSize,
+                            newSize=newSize,
+                        )
+                    )
+
+    @staticmethod
+    def _build_place_order_request(
+        market: Market,
+        runner: Runner,
+        oddsToPlace: float,
+        side: str,
+        betSize: float,
+    ) -> dict:
+        if not is_valid_price(oddsToPlace):
+            raise InvalidOdds(
+                f"{oddsToPlace} is not on the Betfair price ladder, nearest valid price is {snap_price(oddsToPlace)}"
+            )
+        return {
+            "jsonrpc": "2.0",
+            "method": "SportsAPING/v1.0/placeOrders",
+            "params": {
+                "marketId": market.marketId,
+                "customerRef": uuid.uuid4().hex,
+                "instructions": [
+                    {
+                        "selectionId": runner.runnerId,
+                        "side": side,
+                        "orderType": "LIMIT",
+                        "limitOrder": {
+                            "size": float(betSize),
+                            "price": float(oddsToPlace),
+                            "persistenceType": "LAPSE",
+                        },
+                    }
+                ],
+            },
+            "id": 1,
+        }
+
+    @staticmethod
+    def _process_place_order_response(response: dict) -> dict:
+        if "error" in response:
+            raise BetfairException(response["error"]["message"])
+        if response["status"] == "FAILURE":
+            logging.exception(msg=response)
+            raise BetfairException(response["errorCode"])
+        return response
+
+    @staticmethod
+    def _build_order_requests(
+        operation: str, instructions: list
+    ) -> List[Tuple[List[int], dict]]:
+        """
+        Group instructions by market, in the order they were given, and split each market's
+        instructions at Betfair's per-request limit for the operation.
+
+        :param operation: (str)  One of OrderOperations.ALL.
+        :param instructions: (list)  Instructions for that operation, on any number of markets.
+        :return: (list)  (instruction indices, jsonrpc request) pairs.
+        """
+        marketIdToIndices = {}
+        for index, instruction in enumerate(instructions):
+            if instruction.operation != operation:
+                raise ValueError(f"{instruction} can not be sent with {operation}")
+            if operation == OrderOperations.PLACE:
+                odds = instruction.price
+            elif operation == OrderOperations.REPLACE:
+                odds = instruction.newPrice
+            else:
+                odds = None
+            if odds is not None and not is_valid_price(odds):
+                raise InvalidOdds(
+                    f"{odds} is not on the Betfair price ladder, nearest valid price is {snap_price(odds)}"
+                )
+            marketIdToIndices.setdefault(instruction.market.marketId, []).append(index)
+        maxInstructions = OrderOperations.MAX_INSTRUCTIONS[operation]
+        orderRequests = []
+        for marketId, marketIndices in marketIdToIndices.items():
+            for start in range(0, len(marketIndices), maxInstructions):
+                indicesChunk = marketIndices[start : start + maxInstructions]
+                orderRequests.append(
+                    (
+                        indicesChunk,
+                        {
+                            "jsonrpc": "2.0",
+                            "method": f"SportsAPING/v1.0/{operation}",
+                            "params": {
+                                "marketId": marketId,
+                                # lets Betfair reject a retried request that did arrive the first time
+                                "customerRef": uuid.uuid4().hex,
+                                "instructions": [
+                                    instructions[index].to_dict()
+                                    for index in indicesChunk
+                                ],
+                            },
+                            "id": 1,
+                        },
+                    )
+                )
+        return orderRequests
+
+    def _process_order_responses(
+        self,
+        instructions: list,
+        orderRequests: List[Tuple[List[int], dict]],
+        responses: Iterable[Union[dict, BaseException]],
+    ) -> List[InstructionReport]:
+        """
+        :param responses: (list)  Result of each order request, or the exception it raised.
+        :return: (list)  One InstructionReport per instruction, in the order the instructions were given.
+                 When some requests failed, their instructions are reported as FAILURE with the exception,
+                 and the other requests' reports are kept.  When every request failed, the first
+                 exception is raised.
+        """
+        reports = [None] * len(instructions)
+        exceptions = []
+        for (indicesChunk, jsonrpcRequest), response in zip(orderRequests, responses):
+            startedAt = time.perf_counter()
+            if isinstance(response, dict) and "error" in response:
+                response = self._get_error_exception(error=response["error"])
+            if isinstance(response, BaseException):
+                exceptions.append(response)
+                logging.warning(
+                    msg=f"{jsonrpcRequest['params']['marketId']}: {jsonrpcRequest['method']} failed with {response!r}"
+                )
+                chunkReports = [
+                    InstructionReport(
+                        instruction=instructions[index],
+                        status="FAILURE",
+                        exception=response,
+                    )
+                    for index in indicesChunk
+                ]
+            else:
+                chunkReports = self._process_order_response(
+                    instructions=[instructions[index] for index in indicesChunk],
+                    response=response,
+                )
+            for index, report in zip(indicesChunk, chunkReports):
+                reports[index] = report
+            self._notify_hydration(
+                method=jsonrpcRequest["method"],
+                startedAt=startedAt,
+                itemCount=len(chunkReports),
+            )
+        if exceptions and len(exceptions) == len(orderRequests):
+            raise exceptions[0]
+        return reports
+
+    @staticmethod
+    def _get_error_exception(error: dict) -> BaseException:
+        """
+        The exception a JSON-RPC error stands for, as BetfairException raises it.
+        """
+        try:
+            # codes with an exception class of their own are raised by BetfairException itself
+            raise BetfairException(error["message"])
+        except (Exception, BetfairException) as ex:
+            return ex
+
+    @staticmethod
+    def _process_order_response(
+        instructions: list, response: dict
+    ) -> List[InstructionReport]:
+        if response["status"] != "SUCCESS":
+            logging.warning(
+                msg=f"{response.get('marketId')}: {response['status']} ({response.get('errorCode')})"
+            )
+        rawReports = response.get("instructionReports") or []
+        if len(rawReports) != len(instructions):
+            # the request failed as a whole (eg. MARKET_SUSPENDED), so no instruction got a report
+            return [
+                InstructionReport(
+                    instruction=instruction,
+                    status=response["status"],
+                    errorCode=response.get("errorCode"),
+                )
+                for instruction in instructions
+            ]
+        reports = []
+        for instruction, rawReport in zip(instructions, rawReports):
+            # replaceOrders reports nest the cancel of the old bet and the placing of the new one
+            placeReport = rawReport.get("placeInstructionReport", rawReport)
+            cancelReport = rawReport.get("cancelInstructionReport", rawReport)
+            reports.append(
+                InstructionReport(
+                    instruction=instruction,
+                    status=rawReport["status"],
+                    errorCode=rawReport.get("errorCode"),
+                    betId=placeReport.get("betId"),
+                    orderStatus=placeReport.get("orderStatus"),
+                    sizeMatched=placeReport.get("sizeMatched"),
+                    averagePriceMatched=placeReport.get("averagePriceMatched"),
+                    sizeCancelled=cancelReport.get("sizeCancelled"),
+                )
+            )
+        return reports
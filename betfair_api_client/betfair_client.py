@@ -1,30 +1,43 @@
-import json
+import functools
 import logging
-import requests
-import urllib
-import urllib.request
+import threading
+import time
 import urllib.error
 
-from datetime import datetime
-from datetime import timedelta
-from typing import List, Optional
-from warnings import warn
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 
-from .datamodel.bet_types import BetTypes
+from .base_client import BaseBetfairApiClient
+from .catalogue_cache import CatalogueCache
 from .datamodel.competition import Competition
 from .datamodel.event import Event
-from .datamodel.exceptions import BetfairException
+from .datamodel.exceptions import (
+    BetfairException,
+    InvalidSessionInformation,
+    NoSession,
+)
 from .datamodel.market import Market
+from .datamodel.price_change import PriceChange
+from .datamodel.price_projection import PriceProjection
+from .datamodel.orders import (
+    CancelInstruction,
+    InstructionReport,
+    OrderOperations,
+    PlaceInstruction,
+    ReplaceInstruction,
+    UpdateInstruction,
+)
 from .datamodel.runner import Runner
-from .datamodel.runner_price import RunnerPrice
+from .instrumentation import Instrumentation
+from .parsing import ijson
+from .request_scheduler import RequestScheduler
+from .request_weights import MAX_REQUEST_WEIGHT
+from .resilience import IDEMPOTENT_METHODS, ResiliencePolicy
+from .session_manager import SessionManager, is_session_error
+from .transport import PooledHttpTransport, Transport, TransportResponse
 
 
-class BetfairApiClient:
-
-    ACCOUNT_ENDPOINT = "https://api.betfair.com/exchange/account/json-rpc/v1"
-    BETTING_ENDPOINT = "https://api.betfair.com/exchange/betting/json-rpc/v1"
-    BETFAIR_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
-
+class BetfairApiClient(BaseBetfairApiClient):
     def __init__(
         self,
         username: str,
@@ -32,6 +45,16 @@ class BetfairApiClient:
         apiKey: str,
         clientCertificatePath: str,
         certificateKeyPath: str,
+        transport: Optional[Transport] = None,
+        maxConcurrentRequests: int = 4,
+        maxRequestWeight: int = MAX_REQUEST_WEIGHT,
+        catalogueCache: Optional[CatalogueCache] = None,
+        requestScheduler: Optional[RequestScheduler] = None,
+        streamResponses: bool = False,
+        keepAliveInterval: Optional[float] = None,
+        resiliencePolicy: Optional[ResiliencePolicy] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        priceProjection: Optional[PriceProjection] = None,
     ):
         """
         Client for non-interactive connections to the betfair API.
@@ -42,101 +65,144 @@ class BetfairApiClient:
         :param apiKey: (str)
         :param clientCertificatePath: (str)  Path to self-signed client certificate.
         :param certificateKeyPath: (str)  Path to self-signed client certificate key.
+        :param transport: (Transport)  HTTP transport shared by all calls.  Defaults to a PooledHttpTransport,
+                          which keeps connections to each endpoint alive between calls.
+        :param maxConcurrentRequests: (int)  Number of listMarketBook or order requests sent in parallel.
+        :param maxRequestWeight: (int)  Betfair data weight allowed per listMarketBook request.
+        :param catalogueCache: (CatalogueCache)  Optional cache for listCompetitions and listMarketCatalogue results.
+        :param requestScheduler: (RequestScheduler)  Optional throttle applied to every API call.
+        :param streamResponses: (bool)  Decode listMarketBook responses incrementally (requires ijson), applying
+                                each market as soon as it has been read instead of after the whole response.
+        :param keepAliveInterval: (float)  Seconds between keep-alives sent from a background thread.  Sessions
+                                  found to have expired are renewed and the failed call is replayed either way.
+        :param resiliencePolicy: (ResiliencePolicy)  Optional retries, hedging and circuit breaking for API calls.
+                                 Without one, a failed call raises straight away.
+        :param instrumentation: (Instrumentation)  Optional hooks receiving timings and sizes of every API call.
+        :param priceProjection: (PriceProjection)  Prices requested by listMarketBook, eg. deeper ladders or
+                                traded volume.  Defaults to the three best back and lay prices.
         """
-        self.username = username
-        self.password = password
-        self.apiKey = apiKey
-        self.clientCertificatePath = clientCertificatePath
-        self.certificateKeyPath = certificateKeyPath
-        self.sessionToken = None
+        super().__init__(
+            username=username,
+            password=password,
+            apiKey=apiKey,
+            clientCertificatePath=clientCertificatePath,
+            certificateKeyPath=certificateKeyPath,
+            maxConcurrentRequests=maxConcurrentRequests,
+            maxRequestWeight=maxRequestWeight,
+            catalogueCache=catalogueCache,
+            requestScheduler=requestScheduler,
+            resiliencePolicy=resiliencePolicy,
+            instrumentation=instrumentation,
+            priceProjection=priceProjection,
+        )
+        if streamResponses and ijson is None:
+            raise ImportError("streamResponses requires ijson to be installed")
+        self.streamResponses = streamResponses
+        self.transport = transport if transport is not None else PooledHttpTransport()
+        self._executor = None
+        self._executorLock = threading.Lock()
+        self.sessionManager = SessionManager(
+            client=self, keepAliveInterval=keepAliveInterval
+        )
         self.login()
+        self.sessionManager.start()
 
     def login(self) -> None:
-        response = requests.post(
-            url="https://identitysso-cert.betfair.com/api/certlogin",
-            data=f"username={self.username}&password={self.password}",
-            cert=(self.clientCertificatePath, self.certificateKeyPath),
-            headers={
-                "X-Application": self.apiKey,
-                "Content-Type": "application/x-www-form-urlencoded",
-            },
-        )
-        jsonResponse = response.json()
-        logging.info(msg=f"Betfair client login status: {jsonResponse['loginStatus']}")
-        if response.status_code == 200:
-            self.sessionToken = jsonResponse["sessionToken"]
-        else:
-            logging.exception(msg="Request failed.")
-            logging.exception(msg=jsonResponse["loginStatus"])
-            raise Exception(jsonResponse["loginStatus"])
-
-    def send_heartbeat(self):
-        response = requests.post(
-            url="https://identitysso.betfair.com/api/keepAlive",
-            headers={
-                "X-Authentication": self.sessionToken,
-                "Accept": "application/json",
-            },
-        )
+        self.sessionManager.login()
+
+    def send_heartbeat(self) -> TransportResponse:
+        response = self.transport.post(**self._build_heartbeat_request())
         logging.info(msg=response.json()["status"])
         return response
 
     def _call_api(self, jsonrpcRequest: dict, endpointURL: str):
-        try:
-            request = urllib.request.Request(
-                url=endpointURL,
-                data=json.dumps(jsonrpcRequest).encode("utf-8"),
-                headers={
-                    "X-Application": self.apiKey,
-                    "X-Authentication": self.sessionToken,
-                    "content-type": "application/json",
-                },
+        if self.resiliencePolicy is None:
+            return self._call_api_once(
+                jsonrpcRequest=jsonrpcRequest, endpointURL=endpointURL
+            )
+        return self.resiliencePolicy.call(
+            send=functools.partial(
+                self._call_api_once,
+                jsonrpcRequest=jsonrpcRequest,
+                endpointURL=endpointURL,
+            ),
+            jsonrpcRequest=jsonrpcRequest,
+            endpointURL=endpointURL,
+        )
+
+    def _call_api_once(self, jsonrpcRequest: dict, endpointURL: str):
+        if self.requestScheduler is not None:
+            self.requestScheduler.acquire(jsonrpcRequest=jsonrpcRequest)
+        sessionToken = self.sessionToken
+        result = self._send_api_request(
+            jsonrpcRequest=jsonrpcRequest, endpointURL=endpointURL
+        )
+        if is_session_error(result=result):
+            self.sessionManager.relogin(staleSessionToken=sessionToken)
+            result = self._send_api_request(
+                jsonrpcRequest=jsonrpcRequest, endpointURL=endpointURL
             )
-            response = urllib.request.urlopen(request).read()
-            decodedResponse = json.loads(response.decode("utf-8"))
-            if "result" in decodedResponse:
-                return decodedResponse["result"]
-            return decodedResponse
-        except urllib.error.URLError as ex:
-            logging.exception(msg=ex)
-            raise ex
+        return result
+
+    def _send_api_request(self, jsonrpcRequest: dict, endpointURL: str):
+        apiRequest = self._build_api_request(
+            jsonrpcRequest=jsonrpcRequest, endpointURL=endpointURL
+        )
+        with self._instrument_call(
+            jsonrpcRequest=jsonrpcRequest, apiRequest=apiRequest
+        ) as callRecord:
+            try:
+                response = self.transport.post(
+                    **apiRequest,
+                    idempotent=jsonrpcRequest["method"] in IDEMPOTENT_METHODS,
+                )
+                return self._parse_api_response(
+                    response=response, endpointURL=endpointURL, callRecord=callRecord
+                )
+            except urllib.error.URLError as ex:
+                logging.exception(msg=ex)
+                raise ex
+
+    def _call_cached_api(self, jsonrpcRequest: dict, endpointURL: str):
+        cacheKey = self._get_catalogue_cache_key(jsonrpcRequest=jsonrpcRequest)
+        if cacheKey is not None:
+            result = self.catalogueCache.get(key=cacheKey)
+            if result is not None:
+                return result
+        result = self._call_api(jsonrpcRequest=jsonrpcRequest, endpointURL=endpointURL)
+        # error responses come back as dicts and are not cached
+        if cacheKey is not None and isinstance(result, list):
+            self.catalogueCache.set(key=cacheKey, value=result)
+        return result
+
+    def close(self) -> None:
+        self.sessionManager.stop()
+        if self.resiliencePolicy is not None:
+            self.resiliencePolicy.close()
+        with self._executorLock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        self.transport.close()
 
     def check_balance(self):
-        balanceRequest = {
-            "jsonrpc": "2.0",
-            "method": "AccountAPING/v1.0/getAccountFunds",
-        }
         return self._call_api(
-            jsonrpcRequest=balanceRequest, endpointURL=self.ACCOUNT_ENDPOINT
+            jsonrpcRequest=self._build_balance_request(),
+            endpointURL=self.ACCOUNT_ENDPOINT,
         )
 
     def list_competitions(
         self, sportTypeIds: List[int], countryCodes: Optional[List[str]] = None
     ) -> List[Competition]:
-        competitionsRequest = {
-            "params": {
-                "filter": {
-                    "eventTypeIds": sportTypeIds,
-                }
-            },
-            "jsonrpc": "2.0",
-            "method": "SportsAPING/v1.0/listCompetitions",
-            "id": 1,
-        }
-        if countryCodes:
-            competitionsRequest["params"]["filter"].update(
-                {"marketCountries": countryCodes}
-            )
-        rawCompetitionData = self._call_api(
-            jsonrpcRequest=competitionsRequest, endpointURL=self.BETTING_ENDPOINT
+        rawCompetitionData = self._call_cached_api(
+            jsonrpcRequest=self._build_competitions_request(
+                sportTypeIds=sportTypeIds, countryCodes=countryCodes
+            ),
+            endpointURL=self.BETTING_ENDPOINT,
+        )
+        return self._process_raw_competitions_data(
+            rawCompetitionData=rawCompetitionData
         )
-        return [
-            Competition(
-                competitionId=int(competition["competition"]["id"]),
-                competitionName=competition["competition"]["name"],
-            )
-            for competition in rawCompetitionData
-        ]
 
     def get_coming_events(
         self,
@@ -147,174 +213,245 @@ class BetfairApiClient:
         competitionIds: List[int] = None,
         daysAhead: int = 7,
     ) -> List[Event]:
-        parameterDictionary = {
-            "eventTypeIds": [sportTypeId],
-            "marketTypeCodes": marketTypes,
-            "marketStartTime": {
-                "from": datetime.now().strftime("%Y-%m-%d"),
-                "to": (datetime.now() + timedelta(days=daysAhead + 1)).strftime(
-                    "%Y-%m-%d"
-                ),
-            },
-        }
-        if countryCodes is not None:
-            parameterDictionary["marketCountries"] = countryCodes
-        if textQuery is not None:
-            parameterDictionary["textQuery"] = textQuery
-        if competitionIds is not None:
-            parameterDictionary["competitionIds"] = [
-                int(competitionId) for competitionId in competitionIds
-            ]
-        catalogueRequest = {
-            "jsonrpc": "2.0",
-            "method": "SportsAPING/v1.0/listMarketCatalogue",
-            "params": {
-                "filter": parameterDictionary,
-                "maxResults": 1000,
-                "marketProjection": [
-                    "COMPETITION",
-                    "EVENT",
-                    "EVENT_TYPE",
-                    "RUNNER_DESCRIPTION",
-                    "RUNNER_METADATA",
-                    "MARKET_START_TIME",
-                ],
-            },
-            "id": 1,
-        }
-        rawMarketsData = self._call_api(
-            jsonrpcRequest=catalogueRequest, endpointURL=self.BETTING_ENDPOINT
+        catalogueRequest = self._build_catalogue_request(
+            sportTypeId=sportTypeId,
+            marketTypes=marketTypes,
+            countryCodes=countryCodes,
+            textQuery=textQuery,
+            competitionIds=competitionIds,
+            daysAhead=daysAhead,
         )
-        if "error" in rawMarketsData:
-            raise BetfairException(rawMarketsData["error"]["message"])
-        processedEvents = self._process_raw_markets_data(rawMarketsData=rawMarketsData)
-        return processedEvents
-
-    def _process_raw_markets_data(self, rawMarketsData: List[dict]) -> List[Event]:
-        processedEvents = {}
-        for rawMarket in rawMarketsData:
-            eventId = rawMarket["event"]["id"]
-            if eventId not in processedEvents:
-                competition = Competition(
-                    competitionId=int(rawMarket["competition"]["id"]),
-                    competitionName=rawMarket["competition"]["name"],
-                )
-                processedEvents[eventId] = Event(
-                    eventId=int(eventId),
-                    eventName=rawMarket["event"]["name"],
-                    eventDate=datetime.strptime(
-                        rawMarket["event"]["openDate"], self.BETFAIR_DATETIME_FORMAT
-                    ),
-                    competition=competition,
-                    countryCode=rawMarket["event"].get("countryCode", None),
+        rawMarketsData = self._list_market_catalogue(catalogueRequest=catalogueRequest)
+        return self._process_raw_markets_data(rawMarketsData=rawMarketsData)
+
+    def _list_market_catalogue(self, catalogueRequest: dict) -> List[dict]:
+        """
+        All markets matching a listMarketCatalogue request, however many pages they take.
+        """
+        cacheKey = self._get_catalogue_cache_key(jsonrpcRequest=catalogueRequest)
+        if cacheKey is not None:
+            rawMarketsData = self.catalogueCache.get(key=cacheKey)
+            if rawMarketsData is not None:
+                return rawMarketsData
+        marketIdToRawMarket = {}
+        catalogueRequests = [catalogueRequest]
+        while catalogueRequests:
+            if len(catalogueRequests) <= 1:
+                catalogueResponses = map(self._send_betting_request, catalogueRequests)
+            else:
+                catalogueResponses = self._get_executor().map(
+                    self._send_betting_request, catalogueRequests
                 )
-            market = Market(
-                marketId=rawMarket["marketId"],
-                marketName=rawMarket["marketName"],
-                marketStartTime=datetime.strptime(
-                    rawMarket["marketStartTime"], self.BETFAIR_DATETIME_FORMAT
-                ),
+            catalogueRequests, eventSplitRequests = self._process_catalogue_pages(
+                catalogueRequests=catalogueRequests,
+                catalogueResponses=catalogueResponses,
+                marketIdToRawMarket=marketIdToRawMarket,
             )
-            for selection in rawMarket["runners"]:
-                market.add_runner(
-                    runner=Runner(
-                        runnerId=int(selection["selectionId"]),
-                        runnerName=selection["runnerName"],
-                        handicap=selection["handicap"],
+            for eventSplitRequest in eventSplitRequests:
+                rawEventsData = self._send_betting_request(
+                    jsonrpcRequest=self._build_events_request(
+                        marketFilter=eventSplitRequest["params"]["filter"]
+                    )
+                )
+                catalogueRequests.extend(
+                    self._split_catalogue_request_by_event(
+                        catalogueRequest=eventSplitRequest, rawEventsData=rawEventsData
                     )
                 )
-            processedEvents[eventId].add_market(market=market)
-        return list(processedEvents.values())
+        rawMarketsData = list(marketIdToRawMarket.values())
+        if cacheKey is not None:
+            self.catalogueCache.set(key=cacheKey, value=rawMarketsData)
+        return rawMarketsData
 
     def update_prices_for_events(self, events: List[Event]) -> List[Event]:
-        for i, event in enumerate(events):
-            bookRequest = {
-                "jsonrpc": "2.0",
-                "method": "SportsAPING/v1.0/listMarketBook",
-                "params": {
-                    "marketIds": list(event.markets.keys()),
-                    "priceProjection": {"priceData": ["EX_BEST_OFFERS"]},
-                    "maxResults": "1000",
-                },
-                "id": 1,
-            }
-            recentMarketData = self._call_api(
-                jsonrpcRequest=bookRequest, endpointURL=self.BETTING_ENDPOINT
-            )
-            if i == 0 and len(recentMarketData) > 0:
-                if recentMarketData[0]["isMarketDataDelayed"]:
-                    warn(
-                        message="Market data is delayed.  You may need to upgrade your Betfair Developer account to access live data."
-                    )
-            for marketData in recentMarketData:
-                marketIdUpdate = str(marketData["marketId"])
-                for runnerInfo in marketData["runners"]:
-                    runnerUpdateId = int(runnerInfo["selectionId"])
-                    backPrices = [
-                        RunnerPrice(
-                            betType=BetTypes.BACK, price=p["price"], size=p["size"]
-                        )
-                        for p in runnerInfo["ex"][BetTypes.BACK]
-                    ]
-                    layPrices = [
-                        RunnerPrice(
-                            betType=BetTypes.LAY, price=p["price"], size=p["size"]
-                        )
-                        for p in runnerInfo["ex"][BetTypes.LAY]
-                    ]
-                    # TODO(Mike): this is horrible
-                    event.markets[marketIdUpdate].runners[
-                        runnerUpdateId
-                    ].update_back_odds(availableToBack=backPrices)
-                    event.markets[marketIdUpdate].runners[
-                        runnerUpdateId
-                    ].update_lay_odds(availableToLay=layPrices)
+        self._update_prices(marketIdToMarketMap=self._get_event_markets(events=events))
         return events
 
     def update_prices_for_markets(self, markets: List[Market]) -> List[Market]:
-        for market in markets:
-            if len(market.runners) == 0:
-                raise Exception(
-                    "Updating markets requires Runners to already be present"
-                )
-        marketIdToMarketMap = {market.marketId: market for market in markets}
-        bookRequest = {
-            "jsonrpc": "2.0",
-            "method": "SportsAPING/v1.0/listMarketBook",
-            "params": {
-                "marketIds": [market.marketId for market in markets],
-                "priceProjection": {"priceData": ["EX_BEST_OFFERS"]},
-                "maxResults": "1000",
-            },
-            "id": 1,
-        }
-        recentMarketData = self._call_api(
-            jsonrpcRequest=bookRequest, endpointURL=self.BETTING_ENDPOINT
+        marketIdToMarketMap = self._get_markets_to_update(markets=markets)
+        self._update_prices(marketIdToMarketMap=marketIdToMarketMap)
+        return list(marketIdToMarketMap.values())
+
+    def get_price_changes_for_events(self, events: List[Event]) -> List[PriceChange]:
+        """
+        Update the prices of all the events' markets, like update_prices_for_events.
+
+        :return: (list)  A PriceChange for every ladder level whose size changed.
+        """
+        priceChanges = []
+        self._update_prices(
+            marketIdToMarketMap=self._get_event_markets(events=events),
+            priceChanges=priceChanges,
+        )
+        return priceChanges
+
+    def get_price_changes_for_markets(self, markets: List[Market]) -> List[PriceChange]:
+        """
+        Update the markets' prices, like update_prices_for_markets.
+
+        :return: (list)  A PriceChange for every ladder level whose size changed.
+        """
+        priceChanges = []
+        self._update_prices(
+            marketIdToMarketMap=self._get_markets_to_update(markets=markets),
+            priceChanges=priceChanges,
+        )
+        return priceChanges
+
+    def _update_prices(
+        self,
+        marketIdToMarketMap: Dict[str, Market],
+        priceChanges: Optional[List[PriceChange]] = None,
+    ) -> None:
+        marketIdChunks = self._chunk_market_ids(
+            marketIds=list(marketIdToMarketMap.keys())
+        )
+        if self.streamResponses:
+            self._stream_prices(
+                marketIdToMarketMap=marketIdToMarketMap,
+                marketIdChunks=marketIdChunks,
+                priceChanges=priceChanges,
+            )
+            return
+        if len(marketIdChunks) <= 1:
+            marketBookChunks = map(self._list_market_book, marketIdChunks)
+        else:
+            marketBookChunks = self._get_executor().map(
+                self._list_market_book, marketIdChunks
+            )
+        self._process_market_books(
+            marketIdToMarketMap=marketIdToMarketMap,
+            marketBookChunks=marketBookChunks,
+            priceChanges=priceChanges,
         )
-        if len(recentMarketData) > 0:
-            if recentMarketData[0]["isMarketDataDelayed"]:
-                warn(
-                    message="Market data is delayed.  You may need to upgrade your Betfair Developer account to access live data."
+
+    def _stream_prices(
+        self,
+        marketIdToMarketMap: Dict[str, Market],
+        marketIdChunks: List[List[str]],
+        priceChanges: Optional[List[PriceChange]] = None,
+    ) -> None:
+        def stream_market_book(chunkIndex: int) -> None:
+            self._stream_market_book(
+                marketIds=marketIdChunks[chunkIndex],
+                marketIdToMarketMap=marketIdToMarketMap,
+                warnIfDelayed=chunkIndex == 0,
+                priceChanges=priceChanges,
+            )
+
+        if len(marketIdChunks) <= 1:
+            list(map(stream_market_book, range(len(marketIdChunks))))
+        else:
+            list(
+                self._get_executor().map(stream_market_book, range(len(marketIdChunks)))
+            )
+
+    def _stream_market_book(
+        self,
+        marketIds: List[str],
+        marketIdToMarketMap: Dict[str, Market],
+        warnIfDelayed: bool,
+        priceChanges: Optional[List[PriceChange]] = None,
+    ) -> None:
+        jsonrpcRequest = self._build_market_book_request(marketIds=marketIds)
+        if self.resiliencePolicy is None:
+            self._stream_market_book_once(
+                jsonrpcRequest=jsonrpcRequest,
+                marketIdToMarketMap=marketIdToMarketMap,
+                warnIfDelayed=warnIfDelayed,
+                priceChanges=priceChanges,
+            )
+            return
+        # two copies of one request must not update the same markets at once
+        self.resiliencePolicy.call(
+            send=functools.partial(
+                self._stream_market_book_once,
+                jsonrpcRequest=jsonrpcRequest,
+                marketIdToMarketMap=marketIdToMarketMap,
+                warnIfDelayed=warnIfDelayed,
+                priceChanges=priceChanges,
+            ),
+            jsonrpcRequest=jsonrpcRequest,
+            endpointURL=self.BETTING_ENDPOINT,
+            canHedge=False,
+        )
+
+    def _stream_market_book_once(
+        self,
+        jsonrpcRequest: dict,
+        marketIdToMarketMap: Dict[str, Market],
+        warnIfDelayed: bool,
+        priceChanges: Optional[List[PriceChange]] = None,
+    ) -> None:
+        if self.requestScheduler is not None:
+            self.requestScheduler.acquire(jsonrpcRequest=jsonrpcRequest)
+        sessionToken = self.sessionToken
+        try:
+            self._send_streaming_request(
+                jsonrpcRequest=jsonrpcRequest,
+                marketIdToMarketMap=marketIdToMarketMap,
+                warnIfDelayed=warnIfDelayed,
+                priceChanges=priceChanges,
+            )
+        except (InvalidSessionInformation, NoSession):
+            # error responses carry no market books, so nothing has been applied yet
+            self.sessionManager.relogin(staleSessionToken=sessionToken)
+            self._send_streaming_request(
+                jsonrpcRequest=jsonrpcRequest,
+                marketIdToMarketMap=marketIdToMarketMap,
+                warnIfDelayed=warnIfDelayed,
+                priceChanges=priceChanges,
+            )
+
+    def _send_streaming_request(
+        self,
+        jsonrpcRequest: dict,
+        marketIdToMarketMap: Dict[str, Market],
+        warnIfDelayed: bool,
+        priceChanges: Optional[List[PriceChange]] = None,
+    ) -> None:
+        apiRequest = self._build_api_request(
+            jsonrpcRequest=jsonrpcRequest, endpointURL=self.BETTING_ENDPOINT
+        )
+        with self._instrument_call(
+            jsonrpcRequest=jsonrpcRequest, apiRequest=apiRequest
+        ) as callRecord:
+            try:
+                with self.transport.stream_post(
+                    **apiRequest,
+                    idempotent=jsonrpcRequest["method"] in IDEMPOTENT_METHODS,
+                ) as response:
+                    if callRecord is not None:
+                        callRecord.record_response(response=response)
+                    decodeStartedAt = time.perf_counter()
+                    marketCount = self._process_streamed_market_books(
+                        marketIdToMarketMap=marketIdToMarketMap,
+                        marketBooks=self._iter_api_result(
+                            response=response, endpointURL=self.BETTING_ENDPOINT
+                        ),
+                        warnIfDelayed=warnIfDelayed,
+                        priceChanges=priceChanges,
+                    )
+                    if callRecord is not None:
+                        callRecord.decodeTime = time.perf_counter() - decodeStartedAt
+                        callRecord.marketCount = marketCount
+            except urllib.error.URLError as ex:
+                logging.exception(msg=ex)
+                raise ex
+
+    def _list_market_book(self, marketIds: List[str]) -> List[dict]:
+        return self._call_api(
+            jsonrpcRequest=self._build_market_book_request(marketIds=marketIds),
+            endpointURL=self.BETTING_ENDPOINT,
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executorLock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.maxConcurrentRequests
                 )
-        for marketData in recentMarketData:
-            marketIdToUpdate = str(marketData["marketId"])
-            for runnerInfo in marketData["runners"]:
-                runnerUpdateId = int(runnerInfo["selectionId"])
-                backPrices = [
-                    RunnerPrice(betType=BetTypes.BACK, price=p["price"], size=p["size"])
-                    for p in runnerInfo["ex"][BetTypes.BACK]
-                ]
-                layPrices = [
-                    RunnerPrice(betType=BetTypes.LAY, price=p["price"], size=p["size"])
-                    for p in runnerInfo["ex"][BetTypes.LAY]
-                ]
-                marketIdToMarketMap[marketIdToUpdate].runners[
-                    runnerUpdateId
-                ].update_back_odds(availableToBack=backPrices)
-                marketIdToMarketMap[marketIdToUpdate].runners[
-                    runnerUpdateId
-                ].update_lay_odds(availableToLay=layPrices)
-        return list(marketIdToMarketMap.values())
+            return self._executor
 
     def place_bet(
         self,
@@ -324,30 +461,80 @@ class BetfairApiClient:
         side: str,
         betSize: float,
     ):
-        placeOrderRequest = {
-            "jsonrpc": "2.0",
-            "method": "SportsAPING/v1.0/placeOrders",
-            "params": {
-                "marketId": market.marketId,
-                "instructions": [
-                    {
-                        "selectionId": runner.runnerId,
-                        "side": side,
-                        "orderType": "LIMIT",
-                        "limitOrder": {
-                            "size": float(betSize),
-                            "price": float(oddsToPlace),
-                            "persistenceType": "LAPSE",
-                        },
-                    }
-                ],
-            },
-            "id": 1,
-        }
+        placeOrderRequest = self._build_place_order_request(
+            market=market,
+            runner=runner,
+            oddsToPlace=oddsToPlace,
+            side=side,
+            betSize=betSize,
+        )
         response = self._call_api(
             jsonrpcRequest=placeOrderRequest, endpointURL=self.BETTING_ENDPOINT
         )
-        if response["status"] == "FAILURE":
-            logging.exception(msg=response)
-            raise BetfairException(response["errorCode"])
-        return response
+        return self._process_place_order_response(response=response)
+
+    def place_orders(
+        self, instructions: List[PlaceInstruction]
+    ) -> List[InstructionReport]:
+        """
+        Place many bets at once.  Instructions are grouped by market and split into placeOrders
+        requests of at most 200 instructions, which are sent in parallel.
+
+        :return: (list)  One InstructionReport per instruction, in the same order.
+        """
+        return self._send_orders(
+            operation=OrderOperations.PLACE, instructions=instructions
+        )
+
+    def cancel_orders(
+        self, instructions: List[CancelInstruction]
+    ) -> List[InstructionReport]:
+        return self._send_orders(
+            operation=OrderOperations.CANCEL, instructions=instructions
+        )
+
+    def replace_orders(
+        self, instructions: List[ReplaceInstruction]
+    ) -> List[InstructionReport]:
+        return self._send_orders(
+            operation=OrderOperations.REPLACE, instructions=instructions
+        )
+
+    def update_orders(
+        self, instructions: List[UpdateInstruction]
+    ) -> List[InstructionReport]:
+        return self._send_orders(
+            operation=OrderOperations.UPDATE, instructions=instructions
+        )
+
+    def _send_orders(
+        self, operation: str, instructions: list
+    ) -> List[InstructionReport]:
+        orderRequests = self._build_order_requests(
+            operation=operation, instructions=instructions
+        )
+        jsonrpcRequests = [jsonrpcRequest for _, jsonrpcRequest in orderRequests]
+        if len(jsonrpcRequests) <= 1:
+            responses = map(self._send_order_request, jsonrpcRequests)
+        else:
+            responses = self._get_executor().map(
+                self._send_order_request, jsonrpcRequests
+            )
+        return self._process_order_responses(
+            instructions=instructions, orderRequests=orderRequests, responses=responses
+        )
+
+    def _send_order_request(self, jsonrpcRequest: dict):
+        """
+        The response, or the exception the request failed with, so that one failed request does not hide
+        the reports of the others.
+        """
+        try:
+            return self._send_betting_request(jsonrpcRequest=jsonrpcRequest)
+        except (Exception, BetfairException) as ex:
+            return ex
+
+    def _send_betting_request(self, jsonrpcRequest: dict) -> dict:
+        return self._call_api(
+            jsonrpcRequest=jsonrpcRequest, endpointURL=self.BETTING_ENDPOINT
+        )
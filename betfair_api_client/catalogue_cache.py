@@ -0,0 +1,138 @@
+import json
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class CatalogueCache:
+    def __init__(
+        self,
+        maxEntries: int = 256,
+        ttl: float = 6 * 60 * 60,
+        path: Optional[str] = None,
+    ):
+        """
+        LRU cache of raw listMarketCatalogue/listCompetitions results, keyed by method and normalized
+        request params.  Results are cached before they are turned into Event/Market/Runner objects,
+        so every lookup still returns fresh objects and only prices need to be requested again.
+
+        :param maxEntries: (int)  Results kept in memory before the least recently used one is evicted.
+        :param ttl: (float)  Default seconds an entry stays valid.
+        :param path: (str)  Optional sqlite file backing the cache, so that a restarted process starts warm.
+        """
+        self.maxEntries = maxEntries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS catalogue_cache "
+                "(key TEXT PRIMARY KEY, expiresAt REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._connection.execute(
+                "DELETE FROM catalogue_cache WHERE expiresAt <= ?", (time.time(),)
+            )
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(method: str, params: dict) -> str:
+        """
+        Requests that only differ in the order of their filter lists or keys share a key.
+        """
+        return json.dumps(
+            [method, CatalogueCache._normalize(value=params)],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None and self._connection is not None:
+                entry = self._load(key=key, now=now)
+                if entry is not None:
+                    self._store_in_memory(key=key, entry=entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        """
+        :param value: JSON serializable result.
+        :param ttl: (float)  Seconds this entry stays valid, overriding the cache default.
+        """
+        expiresAt = time.time() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._store_in_memory(key=key, entry=(expiresAt, value))
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO catalogue_cache VALUES (?, ?, ?)",
+                    (key, expiresAt, json.dumps(value)),
+                )
+                self._connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM catalogue_cache")
+                self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+        }
+
+    def _store_in_memory(self, key: str, entry: tuple) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxEntries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, key: str, now: float) -> Optional[tuple]:
+        row = self._connection.execute(
+            "SELECT expiresAt, value FROM catalogue_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[0] <= now:
+            return None
+        return row[0], json.loads(row[1])
+
+    @staticmethod
+    def _normalize(value):
+        if isinstance(value, dict):
+            return {key: CatalogueCache._normalize(value=v) for key, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            items = [CatalogueCache._normalize(value=v) for v in value]
+            if all(isinstance(item, (str, int, float)) for item in items):
+                return sorted(items, key=lambda item: (str(type(item)), item))
+            return items
+        return value
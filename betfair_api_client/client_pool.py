@@ -0,0 +1,319 @@
+import bisect
+import hashlib
+import logging
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence
+
+from .base_client import BaseBetfairApiClient
+from .betfair_client import BetfairApiClient
+from .datamodel.event import Event
+from .datamodel.exceptions import (
+    BetfairException,
+    CircuitOpen,
+    InvalidSessionInformation,
+    LoginFailed,
+    NoSession,
+    ServiceBusy,
+    TimeoutException,
+    TooManyRequests,
+    UnexpectedError,
+)
+from .datamodel.market import Market
+from .datamodel.price_change import PriceChange
+from .resilience import is_retryable_exception
+
+# failures of the account or connection a request went through, rather than of the request itself
+FAILOVER_EXCEPTIONS = (
+    InvalidSessionInformation,
+    NoSession,
+    LoginFailed,
+    CircuitOpen,
+    TimeoutException,
+    TooManyRequests,
+    ServiceBusy,
+    UnexpectedError,
+)
+
+
+def is_failover_exception(ex: BaseException) -> bool:
+    """
+    Whether markets requested through one client should be requested again through another: session, login
+    and connection failures, open circuits and transient Betfair errors such as TOO_MANY_REQUESTS.  Other
+    errors, eg. INVALID_INPUT_DATA, come from the request itself and would fail through every client.
+    """
+    return isinstance(ex, FAILOVER_EXCEPTIONS) or is_retryable_exception(ex=ex)
+
+
+class RoutingStrategies:
+
+    LEAST_LOADED = "LEAST_LOADED"
+    CONSISTENT_HASH = "CONSISTENT_HASH"
+    ALL = [LEAST_LOADED, CONSISTENT_HASH]
+
+
+class BetfairClientPool:
+
+    # points per client on the consistent hashing ring
+    VIRTUAL_NODES = 100
+
+    def __init__(
+        self,
+        clients: Sequence[BetfairApiClient],
+        routing: str = RoutingStrategies.LEAST_LOADED,
+        failoverCooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Spreads listMarketBook requests over several logged in clients, eg. one per account or app key,
+        so that each account's rate limits only apply to its share of the markets.
+
+        :param clients: (list)  BetfairApiClients, each with its own session.  The pool closes them.
+        :param routing: (str)  RoutingStrategies.LEAST_LOADED sends each request through the client with the
+                        fewest requests in flight for its maxConcurrentRequests.  CONSISTENT_HASH always sends a
+                        market through the same client, and only moves the markets of a client that fails.
+        :param failoverCooldown: (float)  Seconds a client that failed is left out of the routing.  Its markets
+                                 go to the other clients meanwhile, and it is only used while all are left out.
+        :param clock: (callable)  Monotonic time in seconds, for tests.
+        """
+        if len(clients) == 0:
+            raise ValueError("A client pool needs at least one client")
+        if routing not in RoutingStrategies.ALL:
+            raise ValueError(f"Unknown routing {routing}")
+        self.clients = list(clients)
+        self.routing = routing
+        self.failoverCooldown = failoverCooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._inFlight = [0] * len(self.clients)
+        self._unavailableUntil = [None] * len(self.clients)
+        self._stats = [
+            {"requestsRouted": 0, "marketsRouted": 0, "failures": 0}
+            for _ in self.clients
+        ]
+        self._ring = sorted(
+            (_hash_key(key=f"{clientIndex}-{node}"), clientIndex)
+            for clientIndex in range(len(self.clients))
+            for node in range(self.VIRTUAL_NODES)
+        )
+        self._ringHashes = [keyHash for keyHash, _ in self._ring]
+        self._executor = ThreadPoolExecutor(
+            max_workers=sum(client.maxConcurrentRequests for client in self.clients)
+        )
+
+    def update_prices_for_events(self, events: List[Event]) -> List[Event]:
+        self._update_prices(
+            marketIdToMarketMap=BaseBetfairApiClient._get_event_markets(events=events)
+        )
+        return events
+
+    def update_prices_for_markets(self, markets: List[Market]) -> List[Market]:
+        marketIdToMarketMap = BaseBetfairApiClient._get_markets_to_update(
+            markets=markets
+        )
+        self._update_prices(marketIdToMarketMap=marketIdToMarketMap)
+        return list(marketIdToMarketMap.values())
+
+    def get_price_changes_for_events(self, events: List[Event]) -> List[PriceChange]:
+        priceChanges = []
+        self._update_prices(
+            marketIdToMarketMap=BaseBetfairApiClient._get_event_markets(events=events),
+            priceChanges=priceChanges,
+        )
+        return priceChanges
+
+    def get_price_changes_for_markets(self, markets: List[Market]) -> List[PriceChange]:
+        priceChanges = []
+        self._update_prices(
+            marketIdToMarketMap=BaseBetfairApiClient._get_markets_to_update(
+                markets=markets
+            ),
+            priceChanges=priceChanges,
+        )
+        return priceChanges
+
+    def get_stats(self) -> List[Dict[str, float]]:
+        """
+        :return: (list)  Requests and markets routed, failures and requests in flight of each client.
+        """
+        with self._lock:
+            return [
+                dict(stats, inFlight=inFlight)
+                for stats, inFlight in zip(self._stats, self._inFlight)
+            ]
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        for client in self.clients:
+            client.close()
+
+    def _chunk_market_ids(self, marketIds: List[str]) -> List[List[str]]:
+        # the clients are expected to share a price projection
+        return self.clients[0]._chunk_market_ids(marketIds=marketIds)
+
+    def _update_prices(
+        self,
+        marketIdToMarketMap: Dict[str, Market],
+        priceChanges: Optional[List[PriceChange]] = None,
+    ) -> None:
+        marketIds = list(marketIdToMarketMap.keys())
+        if self.routing == RoutingStrategies.CONSISTENT_HASH:
+            routes = list(
+                self._route_by_hash(
+                    marketIds=marketIds,
+                    clientIndexes=self._get_available_clients(excluded=frozenset()),
+                ).items()
+            )
+        else:
+            routes = [
+                (None, marketIdChunk)
+                for marketIdChunk in self._chunk_market_ids(marketIds=marketIds)
+            ]
+        futures = [
+            self._executor.submit(
+                self._send,
+                clientIndex=clientIndex,
+                marketIds=routeMarketIds,
+                marketIdToMarketMap=marketIdToMarketMap,
+                priceChanges=priceChanges,
+                excluded=frozenset(),
+            )
+            for clientIndex, routeMarketIds in routes
+        ]
+        for future in futures:
+            future.result()
+
+    def _send(
+        self,
+        clientIndex: Optional[int],
+        marketIds: List[str],
+        marketIdToMarketMap: Dict[str, Market],
+        priceChanges: Optional[List[PriceChange]],
+        excluded: FrozenSet[int],
+    ) -> None:
+        """
+        Update the markets through one client, or the least loaded one when clientIndex is None.  When the
+        client fails, the markets it had not updated yet are sent again through the clients that have not
+        failed them yet.
+        """
+        with self._lock:
+            if clientIndex is None:
+                clientIndex = self._get_least_loaded_client(
+                    clientIndexes=self._get_available_clients(excluded=excluded)
+                )
+            self._inFlight[clientIndex] += 1
+            self._stats[clientIndex]["requestsRouted"] += 1
+            self._stats[clientIndex]["marketsRouted"] += len(marketIds)
+        attemptPriceChanges = [] if priceChanges is not None else None
+        try:
+            self.clients[clientIndex]._update_prices(
+                marketIdToMarketMap={
+                    marketId: marketIdToMarketMap[marketId] for marketId in marketIds
+                },
+                priceChanges=attemptPriceChanges,
+            )
+            if priceChanges is not None:
+                priceChanges.extend(attemptPriceChanges)
+            return
+        except (Exception, BetfairException) as ex:
+            if not is_failover_exception(ex=ex):
+                raise
+            failure = ex
+        finally:
+            with self._lock:
+                self._inFlight[clientIndex] -= 1
+        if attemptPriceChanges is not None:
+            # the chunks applied before the failure have already updated their markets, so their changes are
+            # reported here and those markets are not requested again, where they would show no change
+            appliedPriceChanges = list(attemptPriceChanges)
+            priceChanges.extend(appliedPriceChanges)
+            updatedMarketIds = {
+                priceChange.marketId for priceChange in appliedPriceChanges
+            }
+            marketIds = [
+                marketId for marketId in marketIds if marketId not in updatedMarketIds
+            ]
+        self._mark_unavailable(clientIndex=clientIndex, failure=failure)
+        excluded = excluded | {clientIndex}
+        if len(excluded) == len(self.clients):
+            raise failure
+        if not marketIds:
+            return
+        if self.routing == RoutingStrategies.CONSISTENT_HASH:
+            routes = self._route_by_hash(
+                marketIds=marketIds,
+                clientIndexes=self._get_available_clients(excluded=excluded),
+            ).items()
+        else:
+            routes = [(None, marketIds)]
+        for nextClientIndex, routeMarketIds in routes:
+            self._send(
+                clientIndex=nextClientIndex,
+                marketIds=routeMarketIds,
+                marketIdToMarketMap=marketIdToMarketMap,
+                priceChanges=priceChanges,
+                excluded=excluded,
+            )
+
+    def _mark_unavailable(self, clientIndex: int, failure: BaseException) -> None:
+        logging.warning(
+            msg=f"Betfair client {clientIndex} failed with {failure!r}, moving its markets to the "
+            f"other clients for {self.failoverCooldown}s"
+        )
+        with self._lock:
+            self._stats[clientIndex]["failures"] += 1
+            self._unavailableUntil[clientIndex] = self._clock() + self.failoverCooldown
+
+    def _get_available_clients(self, excluded: FrozenSet[int]) -> List[int]:
+        """
+        Clients not excluded and not cooling down after a failure, or all those not excluded when every
+        one of them is cooling down.
+        """
+        now = self._clock()
+        clientIndexes = [
+            clientIndex
+            for clientIndex in range(len(self.clients))
+            if clientIndex not in excluded
+        ]
+        availableClientIndexes = [
+            clientIndex
+            for clientIndex in clientIndexes
+            if self._unavailableUntil[clientIndex] is None
+            or self._unavailableUntil[clientIndex] <= now
+        ]
+        return availableClientIndexes or clientIndexes
+
+    def _get_least_loaded_client(self, clientIndexes: List[int]) -> int:
+        return min(
+            clientIndexes,
+            key=lambda clientIndex: (
+                self._inFlight[clientIndex]
+                / self.clients[clientIndex].maxConcurrentRequests,
+                self._stats[clientIndex]["requestsRouted"],
+            ),
+        )
+
+    def _route_by_hash(
+        self, marketIds: List[str], clientIndexes: List[int]
+    ) -> Dict[int, List[str]]:
+        """
+        Each market goes to the first of the given clients found clockwise from its hash on the ring.
+        """
+        allowedClientIndexes = set(clientIndexes)
+        routes = {}
+        for marketId in marketIds:
+            position = bisect.bisect(self._ringHashes, _hash_key(key=marketId))
+            for offset in range(len(self._ring)):
+                _, clientIndex = self._ring[(position + offset) % len(self._ring)]
+                if clientIndex in allowedClientIndexes:
+                    break
+            routes.setdefault(clientIndex, []).append(marketId)
+        return routes
+
+
+def _hash_key(key: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big"
+    )
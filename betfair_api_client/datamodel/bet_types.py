@@ -3,3 +3,5 @@ class BetTypes:
     BACK = "availableToBack"
     LAY = "availableToLay"
     ALL = [BACK, LAY]
+    # the traded volume ladder of EX_TRADED, which is not a side
+    TRADED = "tradedVolume"
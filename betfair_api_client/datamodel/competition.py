@@ -1,7 +1,14 @@
 class Competition:
+    """
+    Compared and hashed by name and id, so treated as immutable: the hash is computed on first use and kept.
+    """
+
+    __slots__ = ("competitionName", "competitionId", "_hash")
+
     def __init__(self, competitionName: str, competitionId: int):
         self.competitionName = competitionName.strip()
         self.competitionId = int(competitionId)
+        self._hash = None
 
     def __repr__(self):
         return f"{self.competitionName} ({self.competitionId})"
@@ -10,7 +17,16 @@ class Competition:
         return self.__repr__()
 
     def __eq__(self, other):
-        return self.__hash__() == other.__hash__()
+        if self is other:
+            return True
+        if not isinstance(other, Competition):
+            return NotImplemented
+        return (
+            self.competitionId == other.competitionId
+            and self.competitionName == other.competitionName
+        )
 
     def __hash__(self):
-        return hash((self.competitionName, self.competitionId))
+        if self._hash is None:
+            self._hash = hash((self.competitionName, self.competitionId))
+        return self._hash
@@ -5,6 +5,16 @@ from .market import Market
 
 
 class Event:
+
+    __slots__ = (
+        "eventId",
+        "eventName",
+        "eventDate",
+        "competition",
+        "countryCode",
+        "markets",
+    )
+
     def __init__(
         self,
         eventId: int,
@@ -13,7 +23,6 @@ class Event:
         competition: Competition,
         countryCode: str,
     ):
-        super().__init__()
         self.eventId = eventId
         self.eventName = eventName
         self.eventDate = eventDate
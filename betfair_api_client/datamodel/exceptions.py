@@ -14,7 +14,14 @@ class ErrorCodes:
     SUBSCRIPTION_REQUIRED = "DSC-0037"
     OPERATION_FORBIDDEN = "DSC-0038"
     TOO_MUCH_DATA = "ANGX-0001"
+    INVALID_SESSION_INFORMATION = "ANGX-0003"
+    NO_SESSION = "ANGX-0005"
+    UNEXPECTED_ERROR = "ANGX-0006"
+    TOO_MANY_REQUESTS = "ANGX-0008"
+    SERVICE_BUSY = "ANGX-0009"
+    TIMEOUT_ERROR = "ANGX-0010"
     NOT_ENOUGH_FUNDS = "INSUFFICIENT_FUNDS"
+    INVALID_ODDS = "INVALID_ODDS"
 
 
 class BetfairException(BaseException):
@@ -62,9 +69,30 @@ class BetfairException(BaseException):
         elif betfairExceptionCode == ErrorCodes.TOO_MUCH_DATA:
             raise TooMuchData
 
+        elif betfairExceptionCode == ErrorCodes.INVALID_SESSION_INFORMATION:
+            raise InvalidSessionInformation
+
+        elif betfairExceptionCode == ErrorCodes.NO_SESSION:
+            raise NoSession
+
+        elif betfairExceptionCode == ErrorCodes.UNEXPECTED_ERROR:
+            raise UnexpectedError
+
+        elif betfairExceptionCode == ErrorCodes.TOO_MANY_REQUESTS:
+            raise TooManyRequests
+
+        elif betfairExceptionCode == ErrorCodes.SERVICE_BUSY:
+            raise ServiceBusy
+
+        elif betfairExceptionCode == ErrorCodes.TIMEOUT_ERROR:
+            raise TimeoutException
+
         elif betfairExceptionCode == ErrorCodes.NOT_ENOUGH_FUNDS:
             raise NotEnoughFunds
 
+        elif betfairExceptionCode == ErrorCodes.INVALID_ODDS:
+            raise InvalidOdds
+
 
 class JsonParseFailure(Exception):
     pass
@@ -122,5 +150,44 @@ class TooMuchData(Exception):
     pass
 
 
+class InvalidSessionInformation(Exception):
+    pass
+
+
+class NoSession(Exception):
+    pass
+
+
+class UnexpectedError(Exception):
+    pass
+
+
+class TooManyRequests(Exception):
+    pass
+
+
+class ServiceBusy(Exception):
+    pass
+
+
 class NotEnoughFunds(Exception):
     pass
+
+
+class InvalidOdds(Exception):
+    pass
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class LoginFailed(Exception):
+    pass
+
+
+class StreamException(Exception):
+    def __init__(self, errorCode: str, errorMessage: str = ""):
+        super().__init__(f"{errorCode}: {errorMessage}")
+        self.errorCode = errorCode
+        self.errorMessage = errorMessage
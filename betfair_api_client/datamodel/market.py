@@ -4,11 +4,28 @@ from .runner import Runner
 
 
 class Market:
+
+    __slots__ = (
+        "marketId",
+        "marketName",
+        "marketStartTime",
+        "runners",
+        "status",
+        "inPlay",
+        "totalMatched",
+        "betDelay",
+    )
+
     def __init__(self, marketId: str, marketName: str, marketStartTime: datetime):
         self.marketId = marketId
         self.marketName = marketName
         self.marketStartTime = marketStartTime
         self.runners = {}
+        # filled from listMarketBook
+        self.status = None
+        self.inPlay = None
+        self.totalMatched = None
+        self.betDelay = None
 
     def __repr__(self):
         return f'Market: "{self.marketName}".  Starts at: {self.marketStartTime}'
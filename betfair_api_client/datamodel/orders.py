@@ -0,0 +1,216 @@
+from typing import Optional
+
+from .market import Market
+from .runner import Runner
+
+
+class OrderSides:
+
+    BACK = "BACK"
+    LAY = "LAY"
+    ALL = [BACK, LAY]
+
+
+class PersistenceTypes:
+
+    LAPSE = "LAPSE"
+    PERSIST = "PERSIST"
+    MARKET_ON_CLOSE = "MARKET_ON_CLOSE"
+    ALL = [LAPSE, PERSIST, MARKET_ON_CLOSE]
+
+
+class OrderOperations:
+
+    PLACE = "placeOrders"
+    CANCEL = "cancelOrders"
+    REPLACE = "replaceOrders"
+    UPDATE = "updateOrders"
+    ALL = [PLACE, CANCEL, REPLACE, UPDATE]
+
+    # instructions allowed in a single request, exceeding them fails the whole request
+    MAX_INSTRUCTIONS = {PLACE: 200, CANCEL: 60, REPLACE: 60, UPDATE: 60}
+
+
+class PlaceInstruction:
+
+    operation = OrderOperations.PLACE
+
+    def __init__(
+        self,
+        market: Market,
+        runner: Runner,
+        side: str,
+        price: float,
+        size: float,
+        persistenceType: str = PersistenceTypes.LAPSE,
+        customerOrderRef: Optional[str] = None,
+    ):
+        self.market = market
+        self.runner = runner
+        self.side = side
+        self.price = price
+        self.size = size
+        self.persistenceType = persistenceType
+        self.customerOrderRef = customerOrderRef
+
+    def __repr__(self):
+        return f"Place {self.side} {self.size} @ {self.price} on {self.runner}"
+
+    def __str__(self):
+        return self.__repr__()
+
+    def to_dict(self) -> dict:
+        instruction = {
+            "selectionId": self.runner.runnerId,
+            "handicap": self.runner.handicap,
+            "side": self.side,
+            "orderType": "LIMIT",
+            "limitOrder": {
+                "size": float(self.size),
+                "price": float(self.price),
+                "persistenceType": self.persistenceType,
+            },
+        }
+        if self.customerOrderRef is not None:
+            instruction["customerOrderRef"] = self.customerOrderRef
+        return instruction
+
+
+class CancelInstruction:
+
+    operation = OrderOperations.CANCEL
+
+    def __init__(
+        self,
+        market: Market,
+        betId: str,
+        sizeReduction: Optional[float] = None,
+        runner: Optional[Runner] = None,
+    ):
+        """
+        :param sizeReduction: (float)  Size to cancel.  The whole remaining size is cancelled when None.
+        """
+        self.market = market
+        self.betId = betId
+        self.sizeReduction = sizeReduction
+        self.runner = runner
+
+    def __repr__(self):
+        return f"Cancel {self.betId}"
+
+    def __str__(self):
+        return self.__repr__()
+
+    def to_dict(self) -> dict:
+        instruction = {"betId": self.betId}
+        if self.sizeReduction is not None:
+            instruction["sizeReduction"] = float(self.sizeReduction)
+        return instruction
+
+
+class ReplaceInstruction:
+
+    operation = OrderOperations.REPLACE
+
+    def __init__(
+        self,
+        market: Market,
+        betId: str,
+        newPrice: float,
+        runner: Optional[Runner] = None,
+    ):
+        self.market = market
+        self.betId = betId
+        self.newPrice = newPrice
+        self.runner = runner
+
+    def __repr__(self):
+        return f"Replace {self.betId} @ {self.newPrice}"
+
+    def __str__(self):
+        return self.__repr__()
+
+    def to_dict(self) -> dict:
+        return {"betId": self.betId, "newPrice": float(self.newPrice)}
+
+
+class UpdateInstruction:
+
+    operation = OrderOperations.UPDATE
+
+    def __init__(
+        self,
+        market: Market,
+        betId: str,
+        newPersistenceType: str,
+        runner: Optional[Runner] = None,
+    ):
+        self.market = market
+        self.betId = betId
+        self.newPersistenceType = newPersistenceType
+        self.runner = runner
+
+    def __repr__(self):
+        return f"Update {self.betId} to {self.newPersistenceType}"
+
+    def __str__(self):
+        return self.__repr__()
+
+    def to_dict(self) -> dict:
+        return {"betId": self.betId, "newPersistenceType": self.newPersistenceType}
+
+
+class InstructionReport:
+    def __init__(
+        self,
+        instruction,
+        status: str,
+        errorCode: Optional[str] = None,
+        betId: Optional[str] = None,
+        orderStatus: Optional[str] = None,
+        sizeMatched: Optional[float] = None,
+        averagePriceMatched: Optional[float] = None,
+        sizeCancelled: Optional[float] = None,
+        exception: Optional[BaseException] = None,
+    ):
+        """
+        Outcome of one order instruction.  For replaces, betId is the id of the new bet.
+
+        :param instruction: The Place/Cancel/Replace/UpdateInstruction this report is for.
+        :param status: (str)  SUCCESS, FAILURE or TIMEOUT.
+        :param errorCode: (str)  Betfair InstructionReportErrorCode, or the ExecutionReportErrorCode
+                          of the whole request when it failed before reaching the instruction.
+        :param exception: (BaseException)  Error the instruction's request failed with, when Betfair did not
+                          answer it with a report.  After a timeout the instruction may still have been carried out.
+        """
+        self.instruction = instruction
+        self.status = status
+        self.errorCode = errorCode
+        self.betId = betId
+        self.orderStatus = orderStatus
+        self.sizeMatched = sizeMatched
+        self.averagePriceMatched = averagePriceMatched
+        self.sizeCancelled = sizeCancelled
+        self.exception = exception
+
+    def __repr__(self):
+        if self.errorCode is not None:
+            return f"{self.instruction}: {self.status} ({self.errorCode})"
+        if self.exception is not None:
+            return f"{self.instruction}: {self.status} ({self.exception!r})"
+        return f"{self.instruction}: {self.status}"
+
+    def __str__(self):
+        return self.__repr__()
+
+    @property
+    def market(self) -> Market:
+        return self.instruction.market
+
+    @property
+    def runner(self) -> Optional[Runner]:
+        return self.instruction.runner
+
+    @property
+    def isSuccess(self) -> bool:
+        return self.status == "SUCCESS"
@@ -0,0 +1,56 @@
+class PriceChange:
+    """
+    The size available at one price of a runner's back or lay ladder changed between two refreshes.
+    oldSize is 0.0 for a price that appeared and newSize 0.0 for one that went.
+    """
+
+    __slots__ = ("marketId", "selectionId", "betType", "price", "oldSize", "newSize")
+
+    def __init__(
+        self,
+        marketId: str,
+        selectionId: int,
+        betType: str,
+        price: float,
+        oldSize: float,
+        newSize: float,
+    ):
+        self.marketId = marketId
+        self.selectionId = selectionId
+        self.betType = betType
+        self.price = price
+        self.oldSize = oldSize
+        self.newSize = newSize
+
+    def __repr__(self):
+        return (
+            f"{self.marketId} {self.selectionId} {self.betType} {self.price}: "
+            f"{self.oldSize} -> {self.newSize}"
+        )
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __eq__(self, other):
+        if not isinstance(other, PriceChange):
+            return NotImplemented
+        return (
+            self.marketId == other.marketId
+            and self.selectionId == other.selectionId
+            and self.betType == other.betType
+            and self.price == other.price
+            and self.oldSize == other.oldSize
+            and self.newSize == other.newSize
+        )
+
+    def __hash__(self):
+        return hash(
+            (
+                self.marketId,
+                self.selectionId,
+                self.betType,
+                self.price,
+                self.oldSize,
+                self.newSize,
+            )
+        )
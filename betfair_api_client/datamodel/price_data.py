@@ -0,0 +1,8 @@
+class PriceData:
+
+    SP_AVAILABLE = "SP_AVAILABLE"
+    SP_TRADED = "SP_TRADED"
+    EX_BEST_OFFERS = "EX_BEST_OFFERS"
+    EX_ALL_OFFERS = "EX_ALL_OFFERS"
+    EX_TRADED = "EX_TRADED"
+    ALL = [SP_AVAILABLE, SP_TRADED, EX_BEST_OFFERS, EX_ALL_OFFERS, EX_TRADED]
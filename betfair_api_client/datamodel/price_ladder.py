@@ -0,0 +1,154 @@
+from array import array
+from typing import List, Optional, Sequence
+
+from ..price_ticks import np, price_to_tick
+from .bet_types import BetTypes
+from .runner_price import RunnerPrice
+
+# returned by update_from_levels when the levels are unchanged, so quiet runners allocate nothing
+NO_CHANGES = ()
+
+
+class PriceLadder:
+    """
+    One side of a runner's book, stored as two contiguous arrays of doubles (prices and sizes)
+    kept in best-first order: descending prices to back, ascending prices to lay.
+    Betfair already sends levels best-first, so updates normally only check the order.
+    RunnerPrice objects are only built when asked for, and then cached until the next update.
+    """
+
+    __slots__ = ("betType", "prices", "sizes", "_runnerPrices", "_descending")
+
+    def __init__(self, betType: str):
+        self.betType = betType
+        self.prices = array("d")
+        self.sizes = array("d")
+        self._runnerPrices = None
+        self._descending = betType == BetTypes.BACK
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def update(self, prices: Sequence[float], sizes: Sequence[float]) -> None:
+        if not self._is_best_first(prices=prices):
+            levels = sorted(zip(prices, sizes), reverse=self._descending)
+            prices = [price for price, _ in levels]
+            sizes = [size for _, size in levels]
+        self.prices = array("d", prices)
+        self.sizes = array("d", sizes)
+        self._runnerPrices = None
+
+    def update_from_arrays(self, prices: array, sizes: array) -> None:
+        """
+        Take over arrays of doubles that are already best-first, eg. read back from a recording,
+        without copying or checking them.
+        """
+        self.prices = prices
+        self.sizes = sizes
+        self._runnerPrices = None
+
+    def update_from_levels(self, levels: List[dict]) -> Sequence[tuple]:
+        """
+        Apply levels, changing only what differs from the current ones: identical levels leave the
+        ladder untouched, and new sizes at unchanged prices are written in place.
+
+        :param levels: (list)  Raw listMarketBook levels, eg. [{"price": 1.84, "size": 834.72}]
+        :return: (sequence)  (price, old size, new size) of every price whose size changed, with 0.0
+            for prices that appeared or went.  Empty when nothing changed.
+        """
+        prices = self.prices
+        sizes = self.sizes
+        if len(levels) == len(prices):
+            changedIndexes = None
+            for index, level in enumerate(levels):
+                if level["price"] != prices[index]:
+                    break
+                if level["size"] != sizes[index]:
+                    if changedIndexes is None:
+                        changedIndexes = []
+                    changedIndexes.append(index)
+            else:
+                if changedIndexes is None:
+                    return NO_CHANGES
+                changes = []
+                for index in changedIndexes:
+                    newSize = levels[index]["size"]
+                    changes.append((prices[index], sizes[index], newSize))
+                    sizes[index] = newSize
+                self._runnerPrices = None
+                return changes
+        oldSizes = dict(zip(prices, sizes))
+        self.update(
+            prices=[level["price"] for level in levels],
+            sizes=[level["size"] for level in levels],
+        )
+        changes = []
+        for price, size in zip(self.prices, self.sizes):
+            oldSize = oldSizes.pop(price, 0.0)
+            if oldSize != size:
+                changes.append((price, oldSize, size))
+        for price, oldSize in oldSizes.items():
+            changes.append((price, oldSize, 0.0))
+        return changes
+
+    def update_from_runner_prices(self, runnerPrices: List[RunnerPrice]) -> None:
+        runnerPrices = sorted(
+            runnerPrices, key=lambda x: x.price, reverse=self._descending
+        )
+        self.update(
+            prices=[runnerPrice.price for runnerPrice in runnerPrices],
+            sizes=[runnerPrice.size for runnerPrice in runnerPrices],
+        )
+        self._runnerPrices = runnerPrices
+
+    def get_runner_price(self, index: int) -> RunnerPrice:
+        if self._runnerPrices is not None:
+            return self._runnerPrices[index]
+        return RunnerPrice(
+            betType=self.betType, price=self.prices[index], size=self.sizes[index]
+        )
+
+    def get_runner_prices(self) -> List[RunnerPrice]:
+        if self._runnerPrices is None:
+            self._runnerPrices = [
+                RunnerPrice(betType=self.betType, price=price, size=size)
+                for price, size in zip(self.prices, self.sizes)
+            ]
+        return self._runnerPrices
+
+    def get_best_runner_price(self) -> Optional[RunnerPrice]:
+        if len(self.prices) == 0:
+            return None
+        return self.get_runner_price(index=0)
+
+    def get_best_price(self) -> Optional[float]:
+        if len(self.prices) == 0:
+            return None
+        return self.prices[0]
+
+    def get_depth(self, levels: int) -> List[RunnerPrice]:
+        return self.get_runner_prices()[:levels]
+
+    def get_ticks(self):
+        """
+        Tick ladder index of every level, as a NumPy array when NumPy is installed.
+        """
+        if np is not None:
+            return price_to_tick(np.frombuffer(self.prices, dtype=np.float64))
+        return [price_to_tick(price) for price in self.prices]
+
+    def get_volume_to_price(self, price: float) -> float:
+        """
+        Total size available at the given price or better.
+        """
+        volume = 0.0
+        for levelPrice, levelSize in zip(self.prices, self.sizes):
+            if (levelPrice < price) if self._descending else (levelPrice > price):
+                break
+            volume += levelSize
+        return volume
+
+    def _is_best_first(self, prices: Sequence[float]) -> bool:
+        if self._descending:
+            return all(prices[i] >= prices[i + 1] for i in range(len(prices) - 1))
+        return all(prices[i] <= prices[i + 1] for i in range(len(prices) - 1))
@@ -0,0 +1,84 @@
+from typing import List, Optional
+
+from .price_data import PriceData
+
+
+class RollupModels:
+
+    STAKE = "STAKE"
+    PAYOUT = "PAYOUT"
+    MANAGED_LIABILITY = "MANAGED_LIABILITY"
+    NONE = "NONE"
+    ALL = [STAKE, PAYOUT, MANAGED_LIABILITY, NONE]
+
+
+class PriceProjection:
+
+    def __init__(
+        self,
+        priceData: Optional[List[str]] = None,
+        bestPricesDepth: Optional[int] = None,
+        rollupModel: Optional[str] = None,
+        rollupLimit: Optional[int] = None,
+        rollupLiabilityThreshold: Optional[float] = None,
+        rollupLiabilityFactor: Optional[int] = None,
+        virtualise: Optional[bool] = None,
+        rolloverStakes: Optional[bool] = None,
+    ):
+        """
+        The priceProjection of listMarketBook requests: which PriceData to return and how to shape it.
+        https://docs.developer.betfair.com/display/1smk3cen4v3lu3yomq5qye0ni/Betting+Type+Definitions#BettingTypeDefinitions-PriceProjection
+
+        :param priceData: (list)  PriceData values, EX_BEST_OFFERS only by default.
+        :param bestPricesDepth: (int)  Back and lay levels returned with EX_BEST_OFFERS, 3 when not set.
+        :param rollupModel: (str)  RollupModels value for how small levels are rolled up with EX_BEST_OFFERS.
+        :param rollupLimit: (int)  Stake or payout below which levels are rolled up.
+        :param rollupLiabilityThreshold: (float)  For MANAGED_LIABILITY, the price above which liability is rolled up.
+        :param rollupLiabilityFactor: (int)  For MANAGED_LIABILITY, the liability multiplier above the threshold.
+        :param virtualise: (bool)  Include virtual (cross-matched) bets in the offers, as the website does.
+        :param rolloverStakes: (bool)  Roll unmatched stakes over to the next price with EX_ALL_OFFERS.
+        """
+        self.priceData = (
+            list(priceData) if priceData is not None else [PriceData.EX_BEST_OFFERS]
+        )
+        self.bestPricesDepth = bestPricesDepth
+        self.rollupModel = rollupModel
+        self.rollupLimit = rollupLimit
+        self.rollupLiabilityThreshold = rollupLiabilityThreshold
+        self.rollupLiabilityFactor = rollupLiabilityFactor
+        self.virtualise = virtualise
+        self.rolloverStakes = rolloverStakes
+        for priceDataType in self.priceData:
+            if priceDataType not in PriceData.ALL:
+                raise ValueError(f"Unknown priceData {priceDataType}")
+        if rollupModel is not None and rollupModel not in RollupModels.ALL:
+            raise ValueError(f"Unknown rollupModel {rollupModel}")
+        if bestPricesDepth is not None and bestPricesDepth < 1:
+            raise ValueError("bestPricesDepth must be at least 1")
+
+    def __repr__(self):
+        return f"PriceProjection: {self.to_dict()}"
+
+    def __str__(self):
+        return self.__repr__()
+
+    def to_dict(self) -> dict:
+        exBestOffersOverrides = {
+            name: value
+            for name, value in [
+                ("bestPricesDepth", self.bestPricesDepth),
+                ("rollupModel", self.rollupModel),
+                ("rollupLimit", self.rollupLimit),
+                ("rollupLiabilityThreshold", self.rollupLiabilityThreshold),
+                ("rollupLiabilityFactor", self.rollupLiabilityFactor),
+            ]
+            if value is not None
+        }
+        priceProjection = {"priceData": self.priceData}
+        if exBestOffersOverrides:
+            priceProjection["exBestOffersOverrides"] = exBestOffersOverrides
+        if self.virtualise is not None:
+            priceProjection["virtualise"] = self.virtualise
+        if self.rolloverStakes is not None:
+            priceProjection["rolloverStakes"] = self.rolloverStakes
+        return priceProjection
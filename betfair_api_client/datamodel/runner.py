@@ -1,17 +1,43 @@
-from typing import List
+from typing import List, Optional, Sequence
 
+from ..price_ticks import tick_distance
 from .bet_types import BetTypes
+from .price_ladder import PriceLadder
 from .runner_price import RunnerPrice
 
 
 class Runner:
+
+    __slots__ = (
+        "runnerId",
+        "runnerName",
+        "handicap",
+        "backLadder",
+        "layLadder",
+        "tradedLadder",
+        "status",
+        "lastPriceTraded",
+        "totalMatched",
+        "nearPrice",
+        "farPrice",
+        "actualSP",
+    )
+
     def __init__(self, runnerId: int, runnerName: str, handicap: float):
-        super().__init__()
         self.runnerId = runnerId
         self.runnerName = runnerName.strip()
         self.handicap = float(handicap)
-        self.availableToBack = []
-        self.availableToLay = []
+        self.backLadder = PriceLadder(betType=BetTypes.BACK)
+        self.layLadder = PriceLadder(betType=BetTypes.LAY)
+        # filled by EX_TRADED, lowest price first
+        self.tradedLadder = PriceLadder(betType=BetTypes.TRADED)
+        self.status = None
+        self.lastPriceTraded = None
+        self.totalMatched = None
+        # Betfair Starting Price projections and result, filled by SP_TRADED
+        self.nearPrice = None
+        self.farPrice = None
+        self.actualSP = None
 
     def __str__(self):
         return f"{self.runnerName} ({self.runnerId})"
@@ -19,21 +45,83 @@ class Runner:
     def __repr__(self):
         return self.__str__()
 
+    @property
+    def availableToBack(self) -> List[RunnerPrice]:
+        return self.backLadder.get_runner_prices()
+
+    @property
+    def availableToLay(self) -> List[RunnerPrice]:
+        return self.layLadder.get_runner_prices()
+
     def get_best_back_price(self):
-        if len(self.availableToBack) == 0:
+        bestBackPrice = self.backLadder.get_best_runner_price()
+        if bestBackPrice is None:
             return RunnerPrice(betType=BetTypes.BACK, price=0, size=0)
-        return sorted(self.availableToBack, key=lambda x: x.price, reverse=True)[0]
+        return bestBackPrice
 
     def get_best_lay_price(self):
-        if len(self.availableToLay) == 0:
+        bestLayPrice = self.layLadder.get_best_runner_price()
+        if bestLayPrice is None:
             return RunnerPrice(betType=BetTypes.LAY, price=0, size=0)
-        return sorted(self.availableToLay, key=lambda x: x.price)[0]
+        return bestLayPrice
+
+    @property
+    def tradedVolume(self) -> List[RunnerPrice]:
+        return self.tradedLadder.get_runner_prices()
+
+    def get_back_depth(self, levels: int) -> List[RunnerPrice]:
+        return self.backLadder.get_depth(levels=levels)
+
+    def get_lay_depth(self, levels: int) -> List[RunnerPrice]:
+        return self.layLadder.get_depth(levels=levels)
+
+    def get_spread(self) -> Optional[float]:
+        bestBackPrice = self.backLadder.get_best_price()
+        bestLayPrice = self.layLadder.get_best_price()
+        if bestBackPrice is None or bestLayPrice is None:
+            return None
+        return bestLayPrice - bestBackPrice
+
+    def get_spread_in_ticks(self) -> Optional[int]:
+        bestBackPrice = self.backLadder.get_best_price()
+        bestLayPrice = self.layLadder.get_best_price()
+        if bestBackPrice is None or bestLayPrice is None:
+            return None
+        return tick_distance(fromPrice=bestBackPrice, toPrice=bestLayPrice)
+
+    def get_mid_price(self) -> Optional[float]:
+        bestBackPrice = self.backLadder.get_best_price()
+        bestLayPrice = self.layLadder.get_best_price()
+        if bestBackPrice is None or bestLayPrice is None:
+            return None
+        return (bestBackPrice + bestLayPrice) / 2
+
+    def get_back_volume_to_price(self, price: float) -> float:
+        return self.backLadder.get_volume_to_price(price=price)
+
+    def get_lay_volume_to_price(self, price: float) -> float:
+        return self.layLadder.get_volume_to_price(price=price)
 
     def get_all_available_runner_prices(self):
         return self.availableToBack + self.availableToLay
 
     def update_back_odds(self, availableToBack: List[RunnerPrice]):
-        self.availableToBack = availableToBack
+        self.backLadder.update_from_runner_prices(runnerPrices=availableToBack)
 
     def update_lay_odds(self, availableToLay: List[RunnerPrice]):
-        self.availableToLay = availableToLay
+        self.layLadder.update_from_runner_prices(runnerPrices=availableToLay)
+
+    def update_back_levels(self, levels: List[dict]) -> Sequence[tuple]:
+        """
+        :return: (sequence)  (price, old size, new size) of the back prices that changed.
+        """
+        return self.backLadder.update_from_levels(levels=levels)
+
+    def update_lay_levels(self, levels: List[dict]) -> Sequence[tuple]:
+        """
+        :return: (sequence)  (price, old size, new size) of the lay prices that changed.
+        """
+        return self.layLadder.update_from_levels(levels=levels)
+
+    def update_traded_levels(self, levels: List[dict]) -> None:
+        self.tradedLadder.update_from_levels(levels=levels)
@@ -1,9 +1,16 @@
 class RunnerPrice:
+    """
+    One level of a runner's book.  Compared and hashed by value, so treated as immutable: the hash is
+    computed on first use and kept.
+    """
+
+    __slots__ = ("betType", "price", "size", "_hash")
+
     def __init__(self, betType, price, size):
-        super().__init__()
         self.betType = betType
         self.price = price
         self.size = size
+        self._hash = None
 
     def __str__(self):
         return f"betType: {self.betType}, price: {self.price}, size: {self.size}"
@@ -12,7 +19,17 @@ class RunnerPrice:
         return self.__str__()
 
     def __hash__(self):
-        return hash((self.betType, self.price, self.size))
+        if self._hash is None:
+            self._hash = hash((self.betType, self.price, self.size))
+        return self._hash
 
     def __eq__(self, other):
-        return self.__hash__() == other.__hash__()
+        if self is other:
+            return True
+        if not isinstance(other, RunnerPrice):
+            return NotImplemented
+        return (
+            self.price == other.price
+            and self.size == other.size
+            and self.betType == other.betType
+        )
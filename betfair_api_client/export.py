@@ -0,0 +1,326 @@
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+from .datamodel.bet_types import BetTypes
+from .datamodel.event import Event
+from .datamodel.market import Market
+from .parsing import loads
+
+# (column, Arrow type) of the tables built from Event/Market objects, by what a value belongs to
+EVENT_MARKET_COLUMNS = [
+    ("eventId", "int64"),
+    ("eventName", "string"),
+    ("eventDate", "timestamp"),
+    ("countryCode", "string"),
+    ("competitionId", "int64"),
+    ("competitionName", "string"),
+    ("marketId", "string"),
+    ("marketName", "string"),
+    ("marketStartTime", "timestamp"),
+]
+RUNNER_COLUMNS = [
+    ("selectionId", "int64"),
+    ("runnerName", "string"),
+    ("handicap", "float64"),
+]
+# (column, Arrow type) of the tables built straight from listMarketBook results
+MARKET_BOOK_COLUMNS = [
+    ("marketId", "string"),
+    ("marketStatus", "string"),
+    ("inplay", "bool"),
+    ("totalMatched", "float64"),
+]
+MARKET_BOOK_RUNNER_COLUMNS = [
+    ("selectionId", "int64"),
+    ("handicap", "float64"),
+    ("runnerStatus", "string"),
+    ("lastPriceTraded", "float64"),
+]
+LEVEL_COLUMNS = [
+    ("betType", "string"),
+    ("level", "int16"),
+    ("price", "float64"),
+    ("size", "float64"),
+]
+LADDER_SCHEMA = EVENT_MARKET_COLUMNS + RUNNER_COLUMNS + LEVEL_COLUMNS
+MARKET_BOOK_SCHEMA = MARKET_BOOK_COLUMNS + MARKET_BOOK_RUNNER_COLUMNS + LEVEL_COLUMNS
+
+
+class _LevelColumns:
+    def __init__(self, marketColumns: List[tuple], runnerColumns: List[tuple]):
+        """
+        Columns of a table with one row per runner price level.  Values shared by all rows of a market
+        or of a runner are stored once, with the runner of each row and the market of each runner,
+        and only repeated when the table is built.
+        """
+        self.marketColumns = marketColumns
+        self.runnerColumns = runnerColumns
+        self.marketValues = [[] for _ in marketColumns]
+        self.runnerValues = [[] for _ in runnerColumns]
+        self.runnerMarketIndexes = array("q")
+        self.rowRunnerIndexes = array("q")
+        self.betTypeIndexes = array("b")
+        self.levels = array("h")
+        self.prices = array("d")
+        self.sizes = array("d")
+
+    def add_market(self, values: Sequence) -> int:
+        for columnValues, value in zip(self.marketValues, values):
+            columnValues.append(value)
+        return len(self.marketValues[0]) - 1
+
+    def add_runner(self, marketIndex: int, values: Sequence) -> int:
+        for columnValues, value in zip(self.runnerValues, values):
+            columnValues.append(value)
+        self.runnerMarketIndexes.append(marketIndex)
+        return len(self.runnerMarketIndexes) - 1
+
+    def add_levels(
+        self, runnerIndex: int, betType: str, prices: Sequence, sizes: Sequence
+    ) -> None:
+        numLevels = len(prices)
+        self.rowRunnerIndexes.extend([runnerIndex] * numLevels)
+        self.betTypeIndexes.extend([BetTypes.ALL.index(betType)] * numLevels)
+        self.levels.extend(range(numLevels))
+        self.prices.extend(prices)
+        self.sizes.extend(sizes)
+
+    def expand(self) -> Dict[str, list]:
+        rowMarketIndexes = [
+            self.runnerMarketIndexes[runnerIndex]
+            for runnerIndex in self.rowRunnerIndexes
+        ]
+        columns = {}
+        for (column, _), values in zip(self.marketColumns, self.marketValues):
+            columns[column] = [values[marketIndex] for marketIndex in rowMarketIndexes]
+        for (column, _), values in zip(self.runnerColumns, self.runnerValues):
+            columns[column] = [
+                values[runnerIndex] for runnerIndex in self.rowRunnerIndexes
+            ]
+        columns["betType"] = [
+            BetTypes.ALL[betTypeIndex] for betTypeIndex in self.betTypeIndexes
+        ]
+        columns["level"] = self.levels.tolist()
+        columns["price"] = self.prices.tolist()
+        columns["size"] = self.sizes.tolist()
+        return columns
+
+    def to_arrow(self):
+        if pyarrow is None:
+            raise ImportError("Exporting to Arrow requires pyarrow to be installed")
+        rowRunnerIndexes = _arrow_buffer_array(
+            arrowType=pyarrow.int64(), values=self.rowRunnerIndexes
+        )
+        rowMarketIndexes = _arrow_buffer_array(
+            arrowType=pyarrow.int64(), values=self.runnerMarketIndexes
+        ).take(rowRunnerIndexes)
+        names = []
+        arrays = []
+        for columns, columnValues, indexes in [
+            (self.marketColumns, self.marketValues, rowMarketIndexes),
+            (self.runnerColumns, self.runnerValues, rowRunnerIndexes),
+        ]:
+            for (column, typeName), values in zip(columns, columnValues):
+                names.append(column)
+                arrays.append(
+                    pyarrow.array(values, type=_arrow_type(typeName=typeName)).take(
+                        indexes
+                    )
+                )
+        names.extend(column for column, _ in LEVEL_COLUMNS)
+        arrays.extend(
+            [
+                pyarrow.array(BetTypes.ALL, type=pyarrow.string()).take(
+                    _arrow_buffer_array(
+                        arrowType=pyarrow.int8(), values=self.betTypeIndexes
+                    )
+                ),
+                _arrow_buffer_array(arrowType=pyarrow.int16(), values=self.levels),
+                _arrow_buffer_array(arrowType=pyarrow.float64(), values=self.prices),
+                _arrow_buffer_array(arrowType=pyarrow.float64(), values=self.sizes),
+            ]
+        )
+        return pyarrow.Table.from_arrays(arrays, names=names)
+
+    def to_pandas(self):
+        if pandas is None:
+            raise ImportError("Exporting to pandas requires pandas to be installed")
+        if pyarrow is not None:
+            return self.to_arrow().to_pandas()
+        dataFrame = pandas.DataFrame(self.expand())
+        for column, typeName in self.marketColumns + self.runnerColumns + LEVEL_COLUMNS:
+            if typeName == "timestamp":
+                dataFrame[column] = pandas.to_datetime(dataFrame[column])
+            elif typeName in ("int16", "float64"):
+                dataFrame[column] = dataFrame[column].astype(typeName)
+        return dataFrame
+
+
+def _collect_ladders(
+    events: Optional[List[Event]], markets: Optional[List[Market]]
+) -> _LevelColumns:
+    levelColumns = _LevelColumns(
+        marketColumns=EVENT_MARKET_COLUMNS, runnerColumns=RUNNER_COLUMNS
+    )
+    marketsWithEvents = [
+        (event, market) for event in events or [] for market in event.get_all_markets()
+    ] + [(None, market) for market in markets or []]
+    for event, market in marketsWithEvents:
+        competition = event.competition if event is not None else None
+        marketIndex = levelColumns.add_market(
+            values=(
+                event.eventId if event is not None else None,
+                event.eventName if event is not None else None,
+                event.eventDate if event is not None else None,
+                event.countryCode if event is not None else None,
+                competition.competitionId if competition is not None else None,
+                competition.competitionName if competition is not None else None,
+                market.marketId,
+                market.marketName,
+                market.marketStartTime,
+            )
+        )
+        for runner in market.runners.values():
+            runnerIndex = levelColumns.add_runner(
+                marketIndex=marketIndex,
+                values=(runner.runnerId, runner.runnerName, runner.handicap),
+            )
+            for betType, ladder in [
+                (BetTypes.BACK, runner.backLadder),
+                (BetTypes.LAY, runner.layLadder),
+            ]:
+                levelColumns.add_levels(
+                    runnerIndex=runnerIndex,
+                    betType=betType,
+                    prices=ladder.prices,
+                    sizes=ladder.sizes,
+                )
+    return levelColumns
+
+
+def _collect_market_books(marketBooks) -> _LevelColumns:
+    if isinstance(marketBooks, (bytes, bytearray, memoryview, str)):
+        marketBooks = loads(marketBooks)
+    if isinstance(marketBooks, dict):
+        marketBooks = marketBooks["result"]
+    levelColumns = _LevelColumns(
+        marketColumns=MARKET_BOOK_COLUMNS, runnerColumns=MARKET_BOOK_RUNNER_COLUMNS
+    )
+    for marketBook in marketBooks:
+        marketIndex = levelColumns.add_market(
+            values=(
+                str(marketBook["marketId"]),
+                marketBook.get("status"),
+                marketBook.get("inplay"),
+                marketBook.get("totalMatched"),
+            )
+        )
+        for runner in marketBook.get("runners", []):
+            runnerIndex = levelColumns.add_runner(
+                marketIndex=marketIndex,
+                values=(
+                    int(runner["selectionId"]),
+                    float(runner.get("handicap", 0.0)),
+                    runner.get("status"),
+                    runner.get("lastPriceTraded"),
+                ),
+            )
+            exchangePrices = runner.get("ex", {})
+            for betType in BetTypes.ALL:
+                levels = exchangePrices.get(betType) or []
+                levelColumns.add_levels(
+                    runnerIndex=runnerIndex,
+                    betType=betType,
+                    prices=[level["price"] for level in levels],
+                    sizes=[level["size"] for level in levels],
+                )
+    return levelColumns
+
+
+def build_ladder_columns(
+    events: Optional[List[Event]] = None, markets: Optional[List[Market]] = None
+) -> Dict[str, list]:
+    """
+    The rows of to_arrow as plain lists, for use without pyarrow or pandas.  Runners without prices
+    have no rows, and event and competition columns are None for markets passed without their event.
+
+    :return: (dict)  Column name -> list, in LADDER_SCHEMA order.
+    """
+    return _collect_ladders(events=events, markets=markets).expand()
+
+
+def build_market_book_columns(marketBooks) -> Dict[str, list]:
+    """
+    The rows of market_books_to_arrow as plain lists, for use without pyarrow or pandas.
+
+    :return: (dict)  Column name -> list, in MARKET_BOOK_SCHEMA order.
+    """
+    return _collect_market_books(marketBooks=marketBooks).expand()
+
+
+def to_arrow(
+    events: Optional[List[Event]] = None, markets: Optional[List[Market]] = None
+):
+    """
+    Requires pyarrow.
+
+    :param events: (list)  Events, eg. from get_coming_events, exported with all their markets.
+    :param markets: (list)  Markets to export without event columns.
+    :return: (pyarrow.Table)  One row per runner price level, with the columns of LADDER_SCHEMA.
+    """
+    return _collect_ladders(events=events, markets=markets).to_arrow()
+
+
+def to_pandas(
+    events: Optional[List[Event]] = None, markets: Optional[List[Market]] = None
+):
+    """
+    Requires pandas, and goes through Arrow when pyarrow is installed.
+
+    :return: (pandas.DataFrame)  One row per runner price level, with the columns of LADDER_SCHEMA.
+    """
+    return _collect_ladders(events=events, markets=markets).to_pandas()
+
+
+def market_books_to_arrow(marketBooks):
+    """
+    Straight from listMarketBook results to Arrow, without building Market or Runner objects.
+    Requires pyarrow.
+
+    :param marketBooks: (list, bytes or str)  listMarketBook results, or a JSON-RPC response or
+        result list as JSON.
+    :return: (pyarrow.Table)  One row per runner price level, with the columns of MARKET_BOOK_SCHEMA.
+    """
+    return _collect_market_books(marketBooks=marketBooks).to_arrow()
+
+
+def market_books_to_pandas(marketBooks):
+    """
+    :return: (pandas.DataFrame)  market_books_to_arrow as a DataFrame.  Requires pandas.
+    """
+    return _collect_market_books(marketBooks=marketBooks).to_pandas()
+
+
+def _arrow_type(typeName: str):
+    if typeName == "timestamp":
+        return pyarrow.timestamp("us")
+    return pyarrow.type_for_alias(typeName)
+
+
+def _arrow_buffer_array(arrowType, values: array):
+    """
+    Arrow array over the memory of an array.array, without converting value by value.
+    """
+    return pyarrow.Array.from_buffers(
+        arrowType, len(values), [None, pyarrow.py_buffer(values)]
+    )
@@ -0,0 +1,277 @@
+import logging
+import threading
+import time
+
+from typing import Callable, Dict, Optional
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+from .resilience import LatencyTracker
+
+# methods whose results are lists of markets
+MARKET_METHODS = {
+    "SportsAPING/v1.0/listMarketBook",
+    "SportsAPING/v1.0/listMarketCatalogue",
+}
+
+
+class CallRecord:
+    def __init__(self, method: str, endpointURL: str, requestBytes: int):
+        """
+        Timings and sizes of one JSON-RPC call, handed to Instrumentation.on_call once it has finished.
+        Fields the transport does not report stay None.  All times are in seconds.
+
+        :param method: (str)  JSON-RPC method, eg. "SportsAPING/v1.0/listMarketBook".
+        """
+        self.method = method
+        self.endpointURL = endpointURL
+        self.requestBytes = requestBytes
+        self.responseBytes = None
+        self.statusCode = None
+        # getting a connection from the pool, including the TCP/TLS handshake of a new one
+        self.connectTime = None
+        # from having a connection until the response headers arrived
+        self.timeToFirstByte = None
+        # decoding the body; for streamed responses this includes applying each market book
+        self.decodeTime = None
+        self.totalTime = None
+        self.marketCount = None
+        self.error = None
+        self.startedAt = time.perf_counter()
+
+    def __repr__(self):
+        return f"{self.method}: {self.totalTime}s, {self.responseBytes} bytes"
+
+    def __str__(self):
+        return self.__repr__()
+
+    def record_response(self, response) -> None:
+        self.statusCode = response.status_code
+        self.connectTime = response.connectTime
+        self.timeToFirstByte = response.timeToFirstByte
+        content = getattr(response, "content", None)
+        if content is not None:
+            self.responseBytes = len(content)
+        elif "Content-Length" in response.headers:
+            self.responseBytes = int(response.headers["Content-Length"])
+
+    def record_result(self, result) -> None:
+        if self.method in MARKET_METHODS and isinstance(result, list):
+            self.marketCount = len(result)
+
+
+class Instrumentation:
+    """
+    No-op base class.  Override on_call and/or on_hydration and pass an instance to the client.
+    Clients without instrumentation skip all timing, so there is no cost unless one is set.
+    """
+
+    def on_call(self, record: CallRecord) -> None:
+        pass
+
+    def on_hydration(self, method: str, duration: float, itemCount: int) -> None:
+        """
+        Called after the results of a method have been turned into Events and Markets, applied to
+        existing Markets, or turned into InstructionReports.
+
+        :param itemCount: (int)  Markets or instruction reports processed.
+        """
+        pass
+
+
+class CallbackInstrumentation(Instrumentation):
+    def __init__(
+        self,
+        onCall: Optional[Callable[[CallRecord], None]] = None,
+        onHydration: Optional[Callable[[str, float, int], None]] = None,
+    ):
+        """
+        :param onCall: (callable)  Called with each CallRecord.
+        :param onHydration: (callable)  Called with method, duration and itemCount.
+        """
+        self.onCall = onCall
+        self.onHydration = onHydration
+
+    def on_call(self, record: CallRecord) -> None:
+        if self.onCall is not None:
+            self.onCall(record)
+
+    def on_hydration(self, method: str, duration: float, itemCount: int) -> None:
+        if self.onHydration is not None:
+            self.onHydration(method, duration, itemCount)
+
+
+class _MethodStats:
+    def __init__(self, windowSize: int):
+        self.calls = 0
+        self.errors = 0
+        self.requestBytes = 0
+        self.responseBytes = 0
+        self.markets = 0
+        self.hydrationTime = 0.0
+        self.latencies = LatencyTracker(windowSize=windowSize)
+
+
+class LatencyStats(Instrumentation):
+    def __init__(self, windowSize: int = 1000):
+        """
+        Keeps per-method counters and the latencies of the last `windowSize` calls of each method in memory.
+
+        :param windowSize: (int)  Latencies per method that percentiles are computed over.
+        """
+        self.windowSize = windowSize
+        self._methodStats: Dict[str, _MethodStats] = {}
+        self._lock = threading.Lock()
+
+    def on_call(self, record: CallRecord) -> None:
+        with self._lock:
+            methodStats = self._get_method_stats(method=record.method)
+            methodStats.calls += 1
+            if record.error is not None:
+                methodStats.errors += 1
+            methodStats.requestBytes += record.requestBytes
+            methodStats.responseBytes += record.responseBytes or 0
+            methodStats.markets += record.marketCount or 0
+            methodStats.latencies.record(latency=record.totalTime)
+
+    def on_hydration(self, method: str, duration: float, itemCount: int) -> None:
+        with self._lock:
+            self._get_method_stats(method=method).hydrationTime += duration
+
+    def get_stats(self) -> Dict[str, dict]:
+        """
+        :return: (dict)  Per method: calls, errors, bytes, markets, hydrationTime and p50/p99 latency.
+        """
+        with self._lock:
+            return {
+                method: {
+                    "calls": methodStats.calls,
+                    "errors": methodStats.errors,
+                    "requestBytes": methodStats.requestBytes,
+                    "responseBytes": methodStats.responseBytes,
+                    "markets": methodStats.markets,
+                    "hydrationTime": methodStats.hydrationTime,
+                    "p50": methodStats.latencies.get_quantile(quantile=0.5),
+                    "p99": methodStats.latencies.get_quantile(quantile=0.99),
+                }
+                for method, methodStats in self._methodStats.items()
+            }
+
+    def _get_method_stats(self, method: str) -> _MethodStats:
+        methodStats = self._methodStats.get(method)
+        if methodStats is None:
+            methodStats = self._methodStats[method] = _MethodStats(
+                windowSize=self.windowSize
+            )
+        return methodStats
+
+
+class PrometheusInstrumentation(Instrumentation):
+
+    PHASES = ["connect", "firstByte", "decode"]
+
+    def __init__(self, registry=None, namespace: str = "betfair_api"):
+        """
+        Exports call metrics with prometheus_client, labelled by JSON-RPC method.  Requires prometheus_client.
+
+        :param registry: (prometheus_client.CollectorRegistry)  Defaults to the global registry.
+        :param namespace: (str)  Prefix of the metric names.
+        """
+        if prometheus_client is None:
+            raise ImportError(
+                "PrometheusInstrumentation requires prometheus_client to be installed"
+            )
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+        self.callSeconds = prometheus_client.Histogram(
+            name="call_seconds",
+            documentation="Duration of JSON-RPC calls",
+            labelnames=["method"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.phaseSeconds = prometheus_client.Histogram(
+            name="call_phase_seconds",
+            documentation="Duration of the connect, first byte and decode phases of JSON-RPC calls",
+            labelnames=["method", "phase"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.hydrationSeconds = prometheus_client.Histogram(
+            name="hydration_seconds",
+            documentation="Time spent turning results into model objects",
+            labelnames=["method"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.errors = prometheus_client.Counter(
+            name="call_errors",
+            documentation="JSON-RPC calls that raised",
+            labelnames=["method", "error"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.bytes = prometheus_client.Counter(
+            name="bytes",
+            documentation="Request and response bytes of JSON-RPC calls",
+            labelnames=["method", "direction"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.markets = prometheus_client.Counter(
+            name="markets",
+            documentation="Markets returned by JSON-RPC calls",
+            labelnames=["method"],
+            namespace=namespace,
+            registry=registry,
+        )
+
+    def on_call(self, record: CallRecord) -> None:
+        self.callSeconds.labels(method=record.method).observe(record.totalTime)
+        for phase, duration in zip(
+            self.PHASES,
+            [record.connectTime, record.timeToFirstByte, record.decodeTime],
+        ):
+            if duration is not None:
+                self.phaseSeconds.labels(method=record.method, phase=phase).observe(
+                    duration
+                )
+        if record.error is not None:
+            self.errors.labels(
+                method=record.method, error=type(record.error).__name__
+            ).inc()
+        self.bytes.labels(method=record.method, direction="request").inc(
+            record.requestBytes
+        )
+        if record.responseBytes is not None:
+            self.bytes.labels(method=record.method, direction="response").inc(
+                record.responseBytes
+            )
+        if record.marketCount is not None:
+            self.markets.labels(method=record.method).inc(record.marketCount)
+
+    def on_hydration(self, method: str, duration: float, itemCount: int) -> None:
+        self.hydrationSeconds.labels(method=method).observe(duration)
+
+
+def notify_call(instrumentation: Instrumentation, record: CallRecord) -> None:
+    """
+    Finish the record and hand it over.  A failing hook is logged rather than failing the call.
+    """
+    record.totalTime = time.perf_counter() - record.startedAt
+    try:
+        instrumentation.on_call(record)
+    except Exception as ex:
+        logging.exception(msg=ex)
+
+
+def notify_hydration(
+    instrumentation: Instrumentation, method: str, startedAt: float, itemCount: int
+) -> None:
+    try:
+        instrumentation.on_hydration(method, time.perf_counter() - startedAt, itemCount)
+    except Exception as ex:
+        logging.exception(msg=ex)
@@ -0,0 +1,130 @@
+import json
+
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator
+
+from .datamodel.competition import Competition
+from .datamodel.exceptions import BetfairException
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+BETFAIR_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+elif ujson is not None:
+    JSON_BACKEND = "ujson"
+else:
+    JSON_BACKEND = "json"
+
+
+def loads(data: bytes):
+    """
+    Decode a JSON document with the fastest installed backend (orjson, then ujson, then json).
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if ujson is not None:
+        return ujson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    if ujson is not None:
+        return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj).encode("utf-8")
+
+
+def iter_result_items(fileObject: BinaryIO) -> Iterator:
+    """
+    Decode the "result" array of a JSON-RPC response one element at a time while it is read.
+    Requires ijson.  An "error" response yields nothing and raises BetfairException once read.
+    """
+    if ijson is None:
+        raise ImportError("Streaming responses requires ijson to be installed")
+    reader = _HeadRecordingReader(fileObject=fileObject)
+    itemCount = 0
+    for item in ijson.items(reader, "result.item", use_float=True):
+        itemCount += 1
+        yield item
+    if itemCount == 0 and not reader.isTruncated:
+        decodedResponse = loads(bytes(reader.head))
+        if "error" in decodedResponse:
+            raise BetfairException(decodedResponse["error"]["message"])
+
+
+class _HeadRecordingReader:
+    def __init__(self, fileObject: BinaryIO, limit: int = 65536):
+        """
+        Passes reads through, keeping the first `limit` bytes so that short (error) responses
+        can be decoded again in full.
+        """
+        self.fileObject = fileObject
+        self.limit = limit
+        self.head = bytearray()
+        self.isTruncated = False
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.fileObject.read(size)
+        if not self.isTruncated:
+            self.head += data
+            if len(self.head) > self.limit:
+                self.head = bytearray()
+                self.isTruncated = True
+        return data
+
+
+def parse_betfair_datetime(value: str) -> datetime:
+    try:
+        # fromisoformat is far quicker than strptime, but before Python 3.11 does not accept the "Z"
+        return datetime.fromisoformat(value[:-1] if value.endswith("Z") else value)
+    except ValueError:
+        return datetime.strptime(value, BETFAIR_DATETIME_FORMAT)
+
+
+class CatalogueParser:
+    def __init__(self, maxCachedDatetimes: int = 100000):
+        """
+        Parses the repeated parts of listMarketCatalogue results once.  Start times are shared by
+        most markets of an event (and many events), and a handful of competitions cover thousands
+        of markets, so timestamps are cached by their string and Competitions interned by id.
+
+        :param maxCachedDatetimes: (int)  Cached timestamps before the cache is cleared.
+        """
+        self.maxCachedDatetimes = maxCachedDatetimes
+        self._datetimes: Dict[str, datetime] = {}
+        self._competitions: Dict[str, Competition] = {}
+
+    def parse_datetime(self, value: str) -> datetime:
+        parsed = self._datetimes.get(value)
+        if parsed is None:
+            if len(self._datetimes) >= self.maxCachedDatetimes:
+                self._datetimes.clear()
+            parsed = parse_betfair_datetime(value=value)
+            self._datetimes[value] = parsed
+        return parsed
+
+    def get_competition(self, rawCompetition: dict) -> Competition:
+        competition = self._competitions.get(rawCompetition["id"])
+        if competition is None:
+            competition = Competition(
+                competitionId=int(rawCompetition["id"]),
+                competitionName=rawCompetition["name"],
+            )
+            self._competitions[rawCompetition["id"]] = competition
+        return competition
@@ -0,0 +1,323 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .betfair_client import BetfairApiClient
+from .client_pool import BetfairClientPool
+from .datamodel.event import Event
+from .datamodel.exceptions import BetfairException
+from .datamodel.market import Market
+from .datamodel.price_change import PriceChange
+from .request_scheduler import TokenBucket
+
+CLOSED_MARKET_STATUS = "CLOSED"
+# (time to the market start, seconds between refreshes) of markets that have not gone in play, closest first
+DEFAULT_START_TIME_INTERVALS = (
+    (timedelta(minutes=10), 2.0),
+    (timedelta(hours=1), 10.0),
+    (timedelta(hours=6), 60.0),
+    (timedelta(days=1), 300.0),
+)
+
+
+def _utc_now() -> datetime:
+    # market start times are parsed as naive UTC datetimes
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class PollingScheduler:
+    def __init__(
+        self,
+        client: Union[BetfairApiClient, BetfairClientPool],
+        events: Sequence[Event] = (),
+        inPlayInterval: float = 1.0,
+        startTimeIntervals: Sequence[Tuple[timedelta, float]] = (
+            DEFAULT_START_TIME_INTERVALS
+        ),
+        maxInterval: float = 900.0,
+        minInterval: float = 0.5,
+        volatilityFactor: float = 4.0,
+        volatilityWeight: float = 0.3,
+        requestsPerSecond: Optional[float] = None,
+        batchWindow: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        utcNow: Callable[[], datetime] = _utc_now,
+    ):
+        """
+        Refreshes each market as often as it needs to be, rather than every market at the caller's rate.
+        Markets are kept in a priority queue by the time they are next due, and due markets are refreshed
+        together in as few listMarketBook requests as their weight allows.  In play markets are refreshed
+        every inPlayInterval, other markets more often as their start gets closer, and markets whose prices
+        have been moving more often still.  Closed markets are dropped.
+
+        :param client: (BetfairApiClient or BetfairClientPool)  Client the refreshes go through.
+        :param events: (list)  Events whose markets to refresh, eg. from get_coming_events.
+        :param inPlayInterval: (float)  Seconds between refreshes of in play markets.
+        :param startTimeIntervals: (list)  (time to start, seconds between refreshes) pairs, closest first.  A
+                                   market gets the interval of the first pair its start is within.
+        :param maxInterval: (float)  Seconds between refreshes of markets starting later than every pair.
+        :param minInterval: (float)  Shortest interval that price volatility can bring a market down to.
+        :param volatilityFactor: (float)  Intervals are divided by 1 + volatilityFactor * volatility, where
+                                 volatility is the share of recent refreshes in which the market's prices moved.
+        :param volatilityWeight: (float)  Weight of the latest refresh in the volatility moving average.
+        :param requestsPerSecond: (float)  Budget of listMarketBook requests for all markets.  The markets
+                                  overdue longest go first when due markets need more.  Unlimited when None.
+        :param batchWindow: (float)  Markets due within this many seconds are refreshed with those already due.
+        :param clock: (callable)  Monotonic time in seconds, for tests.
+        :param utcNow: (callable)  Current naive UTC datetime to compare market start times with, for tests.
+        """
+        if not startTimeIntervals or any(
+            interval <= 0 for _, interval in startTimeIntervals
+        ):
+            raise ValueError("startTimeIntervals needs at least one positive interval")
+        self.client = client
+        self.inPlayInterval = inPlayInterval
+        self.startTimeIntervals = sorted(startTimeIntervals)
+        self.maxInterval = maxInterval
+        self.minInterval = minInterval
+        self.volatilityFactor = volatilityFactor
+        self.volatilityWeight = volatilityWeight
+        self.batchWindow = batchWindow
+        self.requestBucket = (
+            TokenBucket(
+                rate=requestsPerSecond,
+                capacity=max(1.0, requestsPerSecond),
+                clock=clock,
+            )
+            if requestsPerSecond is not None
+            else None
+        )
+        self._clock = clock
+        self._utcNow = utcNow
+        self._lock = threading.Lock()
+        self._markets = {}
+        self._dueAt = {}
+        self._volatility = {}
+        self._queue = []
+        self._order = itertools.count()
+        self._stats = {
+            "refreshes": 0,
+            "requests": 0,
+            "marketsRefreshed": 0,
+            "marketsDeferred": 0,
+        }
+        self.add_events(events=events)
+
+    def add_events(self, events: Sequence[Event]) -> None:
+        self.add_markets(
+            markets=[market for event in events for market in event.markets.values()]
+        )
+
+    def add_markets(self, markets: Sequence[Market]) -> None:
+        """
+        Schedule markets not scheduled yet, due straight away.
+        """
+        now = self._clock()
+        with self._lock:
+            for market in markets:
+                if market.marketId in self._markets:
+                    continue
+                self._markets[market.marketId] = market
+                self._volatility[market.marketId] = None
+                self._schedule(marketId=market.marketId, dueAt=now)
+
+    def remove_market(self, marketId: str) -> None:
+        with self._lock:
+            self._markets.pop(marketId, None)
+            self._dueAt.pop(marketId, None)
+            self._volatility.pop(marketId, None)
+
+    def get_markets(self) -> List[Market]:
+        with self._lock:
+            return list(self._markets.values())
+
+    def get_refresh_interval(self, market: Market) -> float:
+        """
+        :return: (float)  Seconds until the market is next refreshed, given its state and price volatility.
+        """
+        if market.inPlay:
+            interval = self.inPlayInterval
+        else:
+            interval = self.maxInterval
+            if market.marketStartTime is not None:
+                timeToStart = market.marketStartTime - self._utcNow()
+                for startsWithin, startTimeInterval in self.startTimeIntervals:
+                    if timeToStart <= startsWithin:
+                        interval = startTimeInterval
+                        break
+        volatility = self._volatility.get(market.marketId) or 0.0
+        return min(
+            interval,
+            max(self.minInterval, interval / (1 + self.volatilityFactor * volatility)),
+        )
+
+    def get_volatility(self, marketId: str) -> Optional[float]:
+        """
+        :return: (float)  Moving average of how often the market's prices moved between refreshes, from 0
+                 to 1.  None until the market has first been refreshed.
+        """
+        return self._volatility.get(marketId)
+
+    def get_wait_time(self) -> Optional[float]:
+        """
+        :return: (float)  Seconds until the next market is due, 0.0 if one already is, None if none is left.
+        """
+        with self._lock:
+            self._drop_stale_entries()
+            if not self._queue:
+                return None
+            return max(0.0, self._queue[0][0] - self._clock())
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        :return: (dict)  Refreshes made, listMarketBook requests sent, markets refreshed, due markets put off
+                 for lack of request budget, and markets scheduled.
+        """
+        with self._lock:
+            return dict(self._stats, scheduledMarkets=len(self._markets))
+
+    def run_pending(self) -> List[PriceChange]:
+        """
+        Refresh the markets that are due, as far as the request budget allows, and schedule their next refresh.
+
+        :return: (list)  A PriceChange for every ladder level whose size changed.
+        """
+        with self._lock:
+            marketIds = self._pop_due_market_ids(dueBy=self._clock() + self.batchWindow)
+            marketIds = self._take_within_budget(marketIds=marketIds)
+            markets = [self._markets[marketId] for marketId in marketIds]
+        if not markets:
+            return []
+        try:
+            priceChanges = self.client.get_price_changes_for_markets(markets=markets)
+        except (Exception, BetfairException):
+            with self._lock:
+                self._reschedule(markets=markets, priceChanges=None)
+            raise
+        with self._lock:
+            self._reschedule(markets=markets, priceChanges=priceChanges)
+        return priceChanges
+
+    def run(
+        self,
+        stopEvent: threading.Event,
+        onPriceChanges: Optional[Callable[[List[PriceChange]], None]] = None,
+    ) -> None:
+        """
+        Refresh markets as they fall due until stopEvent is set or no market is left.  Failed refreshes are
+        logged and their markets retried at their next interval.
+
+        :param onPriceChanges: (callable)  Called with the price changes of every refresh that has some.
+        """
+        while not stopEvent.is_set():
+            try:
+                priceChanges = self.run_pending()
+            except (Exception, BetfairException) as ex:
+                logging.exception(msg=ex)
+                priceChanges = []
+            if priceChanges and onPriceChanges is not None:
+                onPriceChanges(priceChanges)
+            waitTime = self.get_wait_time()
+            if waitTime is None:
+                return
+            if self.requestBucket is not None:
+                waitTime = max(waitTime, self.requestBucket.get_wait_time(tokens=1))
+            stopEvent.wait(timeout=waitTime)
+
+    def _schedule(self, marketId: str, dueAt: float) -> None:
+        self._dueAt[marketId] = dueAt
+        heapq.heappush(self._queue, (dueAt, next(self._order), marketId))
+
+    def _drop_stale_entries(self) -> None:
+        # rescheduled and removed markets leave their old entries in the queue
+        while self._queue:
+            dueAt, _, marketId = self._queue[0]
+            if self._dueAt.get(marketId) == dueAt:
+                return
+            heapq.heappop(self._queue)
+
+    def _pop_due_market_ids(self, dueBy: float) -> List[str]:
+        """
+        Markets due by `dueBy`, most overdue first.  They stay out of the queue until rescheduled.
+        """
+        marketIds = []
+        while True:
+            self._drop_stale_entries()
+            if not self._queue or self._queue[0][0] > dueBy:
+                return marketIds
+            _, _, marketId = heapq.heappop(self._queue)
+            marketIds.append(marketId)
+
+    def _take_within_budget(self, marketIds: List[str]) -> List[str]:
+        """
+        The most overdue markets that fit in the requests the budget allows now.  The others go back in
+        the queue as they were, ahead of markets that fall due later.
+        """
+        if not marketIds:
+            return marketIds
+        marketIdChunks = self.client._chunk_market_ids(marketIds=marketIds)
+        if self.requestBucket is not None:
+            self.requestBucket.get_wait_time(tokens=1)
+            allowedRequests = int(self.requestBucket.tokens)
+            deferredMarketIds = [
+                marketId
+                for marketIdChunk in marketIdChunks[allowedRequests:]
+                for marketId in marketIdChunk
+            ]
+            for marketId in deferredMarketIds:
+                heapq.heappush(
+                    self._queue, (self._dueAt[marketId], next(self._order), marketId)
+                )
+            self._stats["marketsDeferred"] += len(deferredMarketIds)
+            marketIdChunks = marketIdChunks[:allowedRequests]
+            self.requestBucket.consume(tokens=len(marketIdChunks))
+        if marketIdChunks:
+            self._stats["refreshes"] += 1
+            self._stats["requests"] += len(marketIdChunks)
+        return [
+            marketId for marketIdChunk in marketIdChunks for marketId in marketIdChunk
+        ]
+
+    def _reschedule(
+        self, markets: List[Market], priceChanges: Optional[List[PriceChange]]
+    ) -> None:
+        """
+        Schedule the next refresh of markets just refreshed, or that failed to refresh when priceChanges is None.
+        """
+        # prices that appeared or went, rather than sizes that changed at the same prices
+        movedMarketIds = {
+            priceChange.marketId
+            for priceChange in priceChanges or []
+            if priceChange.oldSize == 0.0 or priceChange.newSize == 0.0
+        }
+        now = self._clock()
+        for market in markets:
+            if market.marketId not in self._markets:
+                continue
+            if market.status == CLOSED_MARKET_STATUS:
+                self._markets.pop(market.marketId)
+                self._dueAt.pop(market.marketId)
+                self._volatility.pop(market.marketId)
+                continue
+            volatility = self._volatility[market.marketId]
+            if priceChanges is None:
+                pass
+            elif volatility is None:
+                # the first refresh fills empty ladders, which says nothing about volatility
+                self._volatility[market.marketId] = 0.0
+            else:
+                moved = 1.0 if market.marketId in movedMarketIds else 0.0
+                self._volatility[market.marketId] = (
+                    1 - self.volatilityWeight
+                ) * volatility + self.volatilityWeight * moved
+            if priceChanges is not None:
+                self._stats["marketsRefreshed"] += 1
+            self._schedule(
+                marketId=market.marketId,
+                dueAt=now + self.get_refresh_interval(market=market),
+            )
@@ -0,0 +1,167 @@
+import math
+
+from bisect import bisect_left
+from typing import Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class PriceRounding:
+
+    NEAREST = "NEAREST"
+    UP = "UP"
+    DOWN = "DOWN"
+    ALL = [NEAREST, UP, DOWN]
+
+
+# (lower price, upper price, increment), in hundredths so that the table is exact
+# https://docs.developer.betfair.com/display/1smk3cen4v3lu3yomq5qye0ni/Betfair+Price+Increments
+_TICK_BANDS_IN_CENTS = (
+    (100, 200, 1),
+    (200, 300, 2),
+    (300, 400, 5),
+    (400, 600, 10),
+    (600, 1000, 20),
+    (1000, 2000, 50),
+    (2000, 3000, 100),
+    (3000, 5000, 200),
+    (5000, 10000, 500),
+    (10000, 100000, 1000),
+)
+
+
+def _build_tick_table() -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    pricesInCents = []
+    bandFirstTicks = []
+    for lowerCents, upperCents, incrementCents in _TICK_BANDS_IN_CENTS:
+        bandFirstTicks.append(len(pricesInCents))
+        pricesInCents.extend(
+            range(lowerCents + incrementCents, upperCents + 1, incrementCents)
+        )
+    return tuple(pricesInCents), tuple(bandFirstTicks)
+
+
+_PRICES_IN_CENTS, _BAND_FIRST_TICKS = _build_tick_table()
+_BAND_UPPER_CENTS = tuple(upperCents for _, upperCents, _ in _TICK_BANDS_IN_CENTS)
+_TICKS_BY_CENTS = {cents: tick for tick, cents in enumerate(_PRICES_IN_CENTS)}
+
+PRICES = tuple(cents / 100 for cents in _PRICES_IN_CENTS)
+MIN_PRICE = PRICES[0]
+MAX_PRICE = PRICES[-1]
+NUM_TICKS = len(PRICES)
+_PRICES_ARRAY = np.array(PRICES) if np is not None else None
+
+
+def is_valid_price(price: float) -> bool:
+    cents = round(price * 100)
+    return abs(price * 100 - cents) < 1e-6 and cents in _TICKS_BY_CENTS
+
+
+def price_to_tick(price):
+    """
+    Index of a valid Betfair price in the tick ladder (1.01 is tick 0, 1000 is tick 349).
+    Accepts a NumPy array of prices, returning an array of ticks.
+    """
+    if _is_array(price):
+        ticks = np.searchsorted(_PRICES_ARRAY, price - 1e-9)
+        if not np.all(
+            np.isclose(
+                _PRICES_ARRAY[np.minimum(ticks, NUM_TICKS - 1)],
+                price,
+                rtol=0,
+                atol=1e-8,
+            )
+        ):
+            raise ValueError("Not all prices are valid Betfair prices")
+        return ticks
+    tick = _TICKS_BY_CENTS.get(round(price * 100))
+    if tick is None or not is_valid_price(price):
+        raise ValueError(f"{price} is not a valid Betfair price")
+    return tick
+
+
+def tick_to_price(tick):
+    """
+    Accepts a NumPy array of ticks, returning an array of prices.
+    """
+    if _is_array(tick):
+        return _PRICES_ARRAY[tick]
+    if tick < 0 or tick >= NUM_TICKS:
+        raise IndexError(f"Tick {tick} is outside the Betfair price ladder")
+    return PRICES[tick]
+
+
+def tick_distance(fromPrice: float, toPrice: float):
+    """
+    Number of ticks from one valid price to another, negative if toPrice is lower.
+    """
+    return price_to_tick(toPrice) - price_to_tick(fromPrice)
+
+
+def add_ticks(price: float, ticks: int) -> float:
+    """
+    Move a valid price by a number of ticks, clamped to the ends of the ladder.
+    """
+    return PRICES[min(max(price_to_tick(price) + ticks, 0), NUM_TICKS - 1)]
+
+
+def snap_price(price, rounding: str = PriceRounding.NEAREST):
+    """
+    Round any price onto the Betfair ladder, clamped to [MIN_PRICE, MAX_PRICE].
+    Accepts a NumPy array of prices, returning an array of prices.
+    """
+    if _is_array(price):
+        return _PRICES_ARRAY[_snap_to_ticks(prices=price, rounding=rounding)]
+    return PRICES[_snap_to_tick(price=price, rounding=rounding)]
+
+
+def snap_price_to_tick(price, rounding: str = PriceRounding.NEAREST):
+    if _is_array(price):
+        return _snap_to_ticks(prices=price, rounding=rounding)
+    return _snap_to_tick(price=price, rounding=rounding)
+
+
+def _snap_to_tick(price: float, rounding: str) -> int:
+    # tolerate float noise, eg. 1.1 * 100 == 110.00000000000001
+    cents = round(price * 100, 6)
+    if cents <= _PRICES_IN_CENTS[0]:
+        return 0
+    if cents >= _PRICES_IN_CENTS[-1]:
+        return NUM_TICKS - 1
+    band = bisect_left(_BAND_UPPER_CENTS, cents)
+    lowerCents, _, incrementCents = _TICK_BANDS_IN_CENTS[band]
+    stepsAboveLower = (cents - lowerCents) / incrementCents
+    if rounding == PriceRounding.UP:
+        steps = math.ceil(stepsAboveLower)
+    elif rounding == PriceRounding.DOWN:
+        steps = math.floor(stepsAboveLower)
+    elif rounding == PriceRounding.NEAREST:
+        steps = math.floor(stepsAboveLower + 0.5)
+    else:
+        raise ValueError(f"Unknown rounding {rounding}")
+    return _BAND_FIRST_TICKS[band] + steps - 1
+
+
+def _snap_to_ticks(prices, rounding: str):
+    prices = np.clip(np.round(prices, 8), MIN_PRICE, MAX_PRICE)
+    upperTicks = np.searchsorted(_PRICES_ARRAY, prices - 1e-9)
+    exact = np.isclose(_PRICES_ARRAY[upperTicks], prices, rtol=0, atol=1e-8)
+    lowerTicks = np.where(exact, upperTicks, upperTicks - 1)
+    if rounding == PriceRounding.UP:
+        return upperTicks
+    if rounding == PriceRounding.DOWN:
+        return lowerTicks
+    if rounding == PriceRounding.NEAREST:
+        # ties round up, as in the scalar path
+        upperIsCloser = (_PRICES_ARRAY[upperTicks] - prices) <= (
+            prices - _PRICES_ARRAY[lowerTicks] + 1e-9
+        )
+        return np.where(upperIsCloser, upperTicks, lowerTicks)
+    raise ValueError(f"Unknown rounding {rounding}")
+
+
+def _is_array(value) -> bool:
+    return np is not None and isinstance(value, np.ndarray)
@@ -0,0 +1,453 @@
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from array import array
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .datamodel.market import Market
+from .datamodel.runner import Runner
+
+FILE_MAGIC = b"BFMB"
+FORMAT_VERSION = 1
+# magic, version
+FILE_HEADER = struct.Struct("<4sB3x")
+BLOCK_MAGIC = b"BLCK"
+# magic, flags, rows, levels, market table bytes, payload bytes, first and last timestamp
+BLOCK_HEADER = struct.Struct("<4sB3xIIIIdd")
+COMPRESSED = 1
+IS_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class _Block:
+    """
+    One block of a recording, with its columns as memoryviews over the file (or over the
+    decompressed payload) and the market ids its rows refer to.
+    """
+
+    __slots__ = (
+        "timestamps",
+        "selectionIds",
+        "prices",
+        "sizes",
+        "marketIndexes",
+        "backCounts",
+        "layCounts",
+        "marketIds",
+    )
+
+    def __init__(self, payload, numRows: int, numLevels: int, marketTableLength: int):
+        offset = 0
+        columns = []
+        for typecode, count in [
+            ("d", numRows),
+            ("q", numRows),
+            ("d", numLevels),
+            ("d", numLevels),
+            ("I", numRows),
+            ("H", numRows),
+            ("H", numRows),
+        ]:
+            columnLength = count * array(typecode).itemsize
+            columns.append(
+                _read_column(
+                    payload=payload[offset : offset + columnLength], typecode=typecode
+                )
+            )
+            offset += columnLength
+        (
+            self.timestamps,
+            self.selectionIds,
+            self.prices,
+            self.sizes,
+            self.marketIndexes,
+            self.backCounts,
+            self.layCounts,
+        ) = columns
+        marketTable = bytes(payload[offset : offset + marketTableLength])
+        self.marketIds = marketTable.decode("utf-8").split("\n")
+
+
+class MarketBookRecorder:
+    def __init__(
+        self,
+        path: str,
+        compress: bool = False,
+        blockSize: int = 50000,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Appends timestamped snapshots of Market price ladders to a binary file for MarketBookReplayer.
+        Each runner snapshot is one row of a columnar block: timestamp, market, selection id and
+        its back and lay levels as doubles.  Rows are buffered and written a block at a time.
+
+        :param path: (str)  Recording to create, or to append to if it exists.
+        :param compress: (bool)  zlib compress each block.  Uncompressed blocks replay straight from
+            a memory map; compressed ones are decompressed a block at a time.
+        :param blockSize: (int)  Runner snapshots buffered before a block is written.
+        :param clock: (callable)  Timestamp of snapshots recorded without one, in seconds.
+        """
+        self.path = path
+        self.compress = compress
+        self.blockSize = blockSize
+        self.clock = clock
+        isNewFile = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not isNewFile:
+            _check_file_header(path=path)
+            # blocks are only appended after the last complete one, so that an earlier recorder
+            # stopped mid-write does not leave a partial block in the middle of the recording
+            completeLength = _get_complete_length(path=path)
+            if completeLength < os.path.getsize(path):
+                os.truncate(path, completeLength)
+        self._file = open(path, "ab")
+        if isNewFile:
+            self._file.write(FILE_HEADER.pack(FILE_MAGIC, FORMAT_VERSION))
+        self._lock = threading.Lock()
+        self._reset_block()
+
+    def record_market(self, market: Market, timestamp: Optional[float] = None) -> None:
+        """
+        Record the current ladders of every runner of the market.  Can be passed to
+        BetfairStreamClient.add_callback to record a stream.
+        """
+        self.record_markets(markets=[market], timestamp=timestamp)
+
+    def record_markets(
+        self, markets: List[Market], timestamp: Optional[float] = None
+    ) -> None:
+        """
+        Record the markets as of one moment, eg. the Markets returned by update_prices_for_markets.
+
+        :param timestamp: (float)  Seconds since the epoch.  Defaults to now.
+        """
+        if timestamp is None:
+            timestamp = self.clock()
+        with self._lock:
+            for market in markets:
+                marketIndex = self._marketIdToIndex.get(market.marketId)
+                if marketIndex is None:
+                    marketIndex = self._marketIdToIndex[market.marketId] = len(
+                        self._marketIdToIndex
+                    )
+                for runner in market.runners.values():
+                    backLadder = runner.backLadder
+                    layLadder = runner.layLadder
+                    self._timestamps.append(timestamp)
+                    self._marketIndexes.append(marketIndex)
+                    self._selectionIds.append(runner.runnerId)
+                    self._backCounts.append(len(backLadder.prices))
+                    self._layCounts.append(len(layLadder.prices))
+                    self._prices.extend(backLadder.prices)
+                    self._prices.extend(layLadder.prices)
+                    self._sizes.extend(backLadder.sizes)
+                    self._sizes.extend(layLadder.sizes)
+            if len(self._timestamps) >= self.blockSize:
+                self._write_block()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write_block()
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> "MarketBookRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _reset_block(self) -> None:
+        self._timestamps = array("d")
+        self._selectionIds = array("q")
+        self._prices = array("d")
+        self._sizes = array("d")
+        self._marketIndexes = array("I")
+        self._backCounts = array("H")
+        self._layCounts = array("H")
+        self._marketIdToIndex = {}
+
+    def _write_block(self) -> None:
+        numRows = len(self._timestamps)
+        if numRows == 0:
+            return
+        marketTable = "\n".join(self._marketIdToIndex).encode("utf-8")
+        payload = b"".join(
+            [
+                _column_bytes(column=column)
+                for column in [
+                    self._timestamps,
+                    self._selectionIds,
+                    self._prices,
+                    self._sizes,
+                    self._marketIndexes,
+                    self._backCounts,
+                    self._layCounts,
+                ]
+            ]
+            + [marketTable]
+        )
+        flags = 0
+        if self.compress:
+            payload = zlib.compress(payload, 1)
+            flags |= COMPRESSED
+        # keep every block and its columns 8-byte aligned in the memory map
+        payload += b"\0" * (-len(payload) % 8)
+        self._file.write(
+            BLOCK_HEADER.pack(
+                BLOCK_MAGIC,
+                flags,
+                numRows,
+                len(self._prices),
+                len(marketTable),
+                len(payload),
+                self._timestamps[0],
+                self._timestamps[-1],
+            )
+        )
+        self._file.write(payload)
+        self._reset_block()
+
+
+class MarketBookReplayer:
+    def __init__(self, path: str, markets: Optional[List[Market]] = None):
+        """
+        Feeds a MarketBookRecorder recording back into Market/Runner objects.
+        Markets passed in are updated in place, like MarketStreamCache does; markets and runners
+        only seen in the recording are created with their ids as names.
+
+        :param path: (str)  Recording written by MarketBookRecorder.
+        :param markets: (list)  Optional Market objects to update.
+        """
+        self.path = path
+        self.markets = {market.marketId: market for market in markets or []}
+        self._callbacks = []
+
+    def add_callback(self, callback: Callable[[Market], None]) -> None:
+        """
+        :param callback: (callable)  Called with each Market after a recorded snapshot of it has been
+            applied, like the callbacks of BetfairStreamClient.
+        """
+        self._callbacks.append(callback)
+
+    def replay(
+        self,
+        speed: Optional[float] = None,
+        startTime: Optional[float] = None,
+        endTime: Optional[float] = None,
+    ) -> int:
+        """
+        Apply every recorded market snapshot in order and call the callbacks after each.
+
+        :param speed: (float)  None to replay as fast as possible, otherwise a multiple of the recorded
+            pace, eg. 1.0 for real time or 60.0 for an hour a minute.
+        :param startTime: (float)  Skip snapshots recorded before this timestamp.
+        :param endTime: (float)  Stop after snapshots recorded at this timestamp.
+        :return: (int)  Market snapshots applied.
+        """
+        marketUpdates = 0
+        firstTimestamp = None
+        wallClockStart = time.monotonic()
+        for timestamp, market in self.iter_updates(
+            startTime=startTime, endTime=endTime
+        ):
+            if speed is not None:
+                if firstTimestamp is None:
+                    firstTimestamp = timestamp
+                delay = (
+                    wallClockStart
+                    + (timestamp - firstTimestamp) / speed
+                    - time.monotonic()
+                )
+                if delay > 0:
+                    time.sleep(delay)
+            for callback in self._callbacks:
+                callback(market)
+            marketUpdates += 1
+        return marketUpdates
+
+    def iter_updates(
+        self, startTime: Optional[float] = None, endTime: Optional[float] = None
+    ) -> Iterator[Tuple[float, Market]]:
+        """
+        Apply the recorded snapshots one market at a time.
+
+        :return: (iterator)  (timestamp, Market) after each market snapshot has been applied.
+        """
+        with open(self.path, "rb") as recordingFile:
+            # unmapped once the last view into it has been released
+            recording = mmap.mmap(recordingFile.fileno(), 0, access=mmap.ACCESS_READ)
+        for firstTimestamp, lastTimestamp, block in self._iter_blocks(
+            buffer=memoryview(recording)
+        ):
+            if startTime is not None and lastTimestamp < startTime:
+                continue
+            if endTime is not None and firstTimestamp > endTime:
+                break
+            yield from self._apply_block(
+                block=block, startTime=startTime, endTime=endTime
+            )
+
+    def get_time_range(self) -> Optional[Tuple[float, float]]:
+        """
+        :return: (tuple)  First and last recorded timestamps, or None for an empty recording.
+        """
+        timeRange = None
+        with open(self.path, "rb") as recordingFile:
+            _check_file_header(path=self.path)
+            recordingFile.seek(FILE_HEADER.size)
+            while True:
+                header = recordingFile.read(BLOCK_HEADER.size)
+                if len(header) < BLOCK_HEADER.size:
+                    return timeRange
+                _, _, _, _, _, payloadLength, first, last = BLOCK_HEADER.unpack(header)
+                if timeRange is None:
+                    timeRange = (first, last)
+                timeRange = (min(timeRange[0], first), max(timeRange[1], last))
+                recordingFile.seek(payloadLength, os.SEEK_CUR)
+
+    def _iter_blocks(self, buffer: memoryview) -> Iterator[Tuple[float, float, _Block]]:
+        magic, version = FILE_HEADER.unpack_from(buffer, 0)
+        if magic != FILE_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a market book recording")
+        offset = FILE_HEADER.size
+        while offset + BLOCK_HEADER.size <= len(buffer):
+            (
+                magic,
+                flags,
+                numRows,
+                numLevels,
+                marketTableLength,
+                payloadLength,
+                firstTimestamp,
+                lastTimestamp,
+            ) = BLOCK_HEADER.unpack_from(buffer, offset)
+            if magic != BLOCK_MAGIC:
+                raise ValueError(f"Corrupt block at byte {offset} of {self.path}")
+            offset += BLOCK_HEADER.size
+            if offset + payloadLength > len(buffer):
+                # the recorder was stopped while writing this block
+                return
+            payload = buffer[offset : offset + payloadLength]
+            offset += payloadLength
+            if flags & COMPRESSED:
+                payload = memoryview(zlib.decompress(payload))
+            yield firstTimestamp, lastTimestamp, _Block(
+                payload=payload,
+                numRows=numRows,
+                numLevels=numLevels,
+                marketTableLength=marketTableLength,
+            )
+
+    def _apply_block(
+        self, block: _Block, startTime: Optional[float], endTime: Optional[float]
+    ) -> Iterator[Tuple[float, Market]]:
+        timestamps = block.timestamps
+        selectionIds = block.selectionIds
+        marketIndexes = block.marketIndexes
+        backCounts = block.backCounts
+        layCounts = block.layCounts
+        priceBytes = memoryview(block.prices).cast("B")
+        sizeBytes = memoryview(block.sizes).cast("B")
+        markets = [self._get_market(marketId=marketId) for marketId in block.marketIds]
+        numRows = len(timestamps)
+        levelOffset = 0
+        for row in range(numRows):
+            timestamp = timestamps[row]
+            backEnd = levelOffset + backCounts[row]
+            layEnd = backEnd + layCounts[row]
+            if (startTime is None or timestamp >= startTime) and (
+                endTime is None or timestamp <= endTime
+            ):
+                market = markets[marketIndexes[row]]
+                selectionId = selectionIds[row]
+                runner = market.runners.get(selectionId)
+                if runner is None:
+                    runner = Runner(
+                        runnerId=selectionId, runnerName=str(selectionId), handicap=0.0
+                    )
+                    market.add_runner(runner=runner)
+                runner.backLadder.update_from_arrays(
+                    prices=_to_array(buffer=priceBytes[levelOffset * 8 : backEnd * 8]),
+                    sizes=_to_array(buffer=sizeBytes[levelOffset * 8 : backEnd * 8]),
+                )
+                runner.layLadder.update_from_arrays(
+                    prices=_to_array(buffer=priceBytes[backEnd * 8 : layEnd * 8]),
+                    sizes=_to_array(buffer=sizeBytes[backEnd * 8 : layEnd * 8]),
+                )
+                nextRow = row + 1
+                if (
+                    nextRow == numRows
+                    or timestamps[nextRow] != timestamp
+                    or marketIndexes[nextRow] != marketIndexes[row]
+                ):
+                    yield timestamp, market
+            levelOffset = layEnd
+
+    def _get_market(self, marketId: str) -> Market:
+        market = self.markets.get(marketId)
+        if market is None:
+            market = self.markets[marketId] = Market(
+                marketId=marketId, marketName=marketId, marketStartTime=None
+            )
+        return market
+
+
+def _check_file_header(path: str) -> None:
+    with open(path, "rb") as recordingFile:
+        header = recordingFile.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header) != (
+        FILE_MAGIC,
+        FORMAT_VERSION,
+    ):
+        raise ValueError(f"{path} is not a market book recording")
+
+
+def _get_complete_length(path: str) -> int:
+    """
+    :return: (int)  Length of the file header and the blocks up to the first incomplete or corrupt one.
+    """
+    completeLength = FILE_HEADER.size
+    with open(path, "rb") as recordingFile:
+        recordingFile.seek(completeLength)
+        while True:
+            header = recordingFile.read(BLOCK_HEADER.size)
+            if len(header) < BLOCK_HEADER.size:
+                return completeLength
+            magic, _, _, _, _, payloadLength, _, _ = BLOCK_HEADER.unpack(header)
+            if magic != BLOCK_MAGIC:
+                return completeLength
+            if len(recordingFile.read(payloadLength)) < payloadLength:
+                return completeLength
+            completeLength += BLOCK_HEADER.size + payloadLength
+
+
+def _column_bytes(column: array) -> bytes:
+    if IS_LITTLE_ENDIAN:
+        return column.tobytes()
+    column = array(column.typecode, column)
+    column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(payload: memoryview, typecode: str):
+    if IS_LITTLE_ENDIAN:
+        return payload.cast(typecode)
+    column = array(typecode)
+    column.frombytes(payload)
+    column.byteswap()
+    return column
+
+
+def _to_array(buffer: memoryview) -> array:
+    levels = array("d")
+    levels.frombytes(buffer)
+    return levels
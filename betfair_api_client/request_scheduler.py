@@ -0,0 +1,230 @@
+import asyncio
+import threading
+import time
+
+from typing import Callable, Dict, Optional, Tuple
+
+from .datamodel.exceptions import TooMuchData
+from .datamodel.orders import OrderOperations
+from .request_weights import (
+    MARKET_PROJECTION_WEIGHTS,
+    MAX_REQUEST_WEIGHT,
+    get_market_book_weight,
+)
+
+ORDER_METHODS = {f"SportsAPING/v1.0/{operation}" for operation in OrderOperations.ALL}
+# only placed and replaced instructions count towards the hourly transaction limit
+TRANSACTION_METHODS = {
+    f"SportsAPING/v1.0/{OrderOperations.PLACE}",
+    f"SportsAPING/v1.0/{OrderOperations.REPLACE}",
+}
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param rate: (float)  Tokens added per second.
+        :param capacity: (float)  Most tokens the bucket holds, ie. the largest burst allowed.
+        :param clock: (callable)  Monotonic time in seconds, for tests.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._updatedAt = clock()
+
+    def get_wait_time(self, tokens: float) -> float:
+        """
+        Seconds until `tokens` can be taken.  Requests larger than the capacity only wait for a full bucket.
+        """
+        self._refill()
+        missingTokens = min(tokens, self.capacity) - self.tokens
+        if missingTokens <= 0:
+            return 0.0
+        return missingTokens / self.rate
+
+    def consume(self, tokens: float) -> None:
+        self._refill()
+        self.tokens -= tokens
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updatedAt) * self.rate
+        )
+        self._updatedAt = now
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        requestsPerSecond: Optional[float] = None,
+        ordersPerHour: Optional[float] = None,
+        maxRequestWeight: int = MAX_REQUEST_WEIGHT,
+    ):
+        """
+        Central throttle that every API call of a client goes through.
+        Data requests heavier than the weight limit are rejected before they are sent, request rate
+        and hourly order transactions are limited by token buckets, and order calls waiting for
+        capacity go before any waiting data call.
+
+        :param requestsPerSecond: (float)  Sustained rate of API calls.  Unlimited when None.
+        :param ordersPerHour: (float)  Placed or replaced instructions per hour (Betfair allows 5000
+                              before charging).  Unlimited when None.
+        :param maxRequestWeight: (int)  Betfair data weight allowed per request.
+        """
+        self.maxRequestWeight = maxRequestWeight
+        self.requestBucket = (
+            TokenBucket(rate=requestsPerSecond, capacity=max(1.0, requestsPerSecond))
+            if requestsPerSecond is not None
+            else None
+        )
+        self.orderBucket = (
+            TokenBucket(rate=ordersPerHour / 3600, capacity=ordersPerHour)
+            if ordersPerHour is not None
+            else None
+        )
+        self.requestsScheduled = 0
+        self.requestsDelayed = 0
+        self.secondsWaited = 0.0
+        self._waitingOrderCalls = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, jsonrpcRequest: dict) -> float:
+        """
+        Block until the request may be sent.
+
+        :return: (float)  Seconds waited.
+        """
+        isOrder, transactions = self._check_request(jsonrpcRequest=jsonrpcRequest)
+        startedAt = time.monotonic()
+        with self._condition:
+            # an order call waiting out the hourly limit does not hold up data calls
+            while True:
+                waitTime = self._get_transaction_wait_time(transactions=transactions)
+                if waitTime == 0:
+                    break
+                self._condition.wait(timeout=waitTime)
+            if isOrder:
+                self._waitingOrderCalls += 1
+            try:
+                while True:
+                    waitTime = self._get_wait_time(
+                        isOrder=isOrder, transactions=transactions
+                    )
+                    if waitTime == 0:
+                        break
+                    self._condition.wait(timeout=waitTime)
+                self._consume(transactions=transactions)
+            finally:
+                if isOrder:
+                    self._waitingOrderCalls -= 1
+                    self._condition.notify_all()
+            return self._record_wait(startedAt=startedAt)
+
+    async def acquire_async(self, jsonrpcRequest: dict) -> float:
+        isOrder, transactions = self._check_request(jsonrpcRequest=jsonrpcRequest)
+        startedAt = time.monotonic()
+        while True:
+            with self._condition:
+                waitTime = self._get_transaction_wait_time(transactions=transactions)
+            if waitTime == 0:
+                break
+            await asyncio.sleep(waitTime)
+        with self._condition:
+            if isOrder:
+                self._waitingOrderCalls += 1
+        try:
+            while True:
+                with self._condition:
+                    waitTime = self._get_wait_time(
+                        isOrder=isOrder, transactions=transactions
+                    )
+                    if waitTime == 0:
+                        self._consume(transactions=transactions)
+                        break
+                await asyncio.sleep(waitTime if waitTime is not None else 0.01)
+        finally:
+            if isOrder:
+                with self._condition:
+                    self._waitingOrderCalls -= 1
+                    self._condition.notify_all()
+        with self._condition:
+            return self._record_wait(startedAt=startedAt)
+
+    def get_request_weight(self, jsonrpcRequest: dict) -> int:
+        """
+        Betfair data weight of a listMarketBook or listMarketCatalogue request, 0 for any other call.
+        """
+        method = jsonrpcRequest["method"]
+        params = jsonrpcRequest.get("params", {})
+        if method.endswith("/listMarketBook"):
+            priceProjection = params.get("priceProjection", {})
+            marketWeight = get_market_book_weight(
+                priceData=priceProjection.get("priceData", []),
+                bestPricesDepth=priceProjection.get("exBestOffersOverrides", {}).get(
+                    "bestPricesDepth"
+                ),
+            )
+            return marketWeight * len(params["marketIds"])
+        if method.endswith("/listMarketCatalogue"):
+            projectionWeight = sum(
+                MARKET_PROJECTION_WEIGHTS.get(projection, 0)
+                for projection in params.get("marketProjection", [])
+            )
+            return projectionWeight * int(params.get("maxResults", 0))
+        return 0
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "requestsScheduled": self.requestsScheduled,
+            "requestsDelayed": self.requestsDelayed,
+            "secondsWaited": self.secondsWaited,
+        }
+
+    def _check_request(self, jsonrpcRequest: dict) -> Tuple[bool, int]:
+        weight = self.get_request_weight(jsonrpcRequest=jsonrpcRequest)
+        if weight > self.maxRequestWeight:
+            raise TooMuchData(
+                f"Request weight {weight} is over the limit of {self.maxRequestWeight}"
+            )
+        method = jsonrpcRequest["method"]
+        transactions = 0
+        if method in TRANSACTION_METHODS:
+            transactions = len(jsonrpcRequest["params"]["instructions"])
+        return method in ORDER_METHODS, transactions
+
+    def _get_wait_time(self, isOrder: bool, transactions: int) -> Optional[float]:
+        """
+        Seconds to wait before checking again, None to wait for an order call to go first.
+        """
+        if not isOrder and self._waitingOrderCalls > 0:
+            return None
+        waitTime = self._get_transaction_wait_time(transactions=transactions)
+        if self.requestBucket is not None:
+            waitTime = max(waitTime, self.requestBucket.get_wait_time(tokens=1))
+        return waitTime
+
+    def _get_transaction_wait_time(self, transactions: int) -> float:
+        if transactions == 0 or self.orderBucket is None:
+            return 0.0
+        return self.orderBucket.get_wait_time(tokens=transactions)
+
+    def _consume(self, transactions: int) -> None:
+        if self.requestBucket is not None:
+            self.requestBucket.consume(tokens=1)
+        if transactions > 0 and self.orderBucket is not None:
+            self.orderBucket.consume(tokens=transactions)
+
+    def _record_wait(self, startedAt: float) -> float:
+        waited = time.monotonic() - startedAt
+        self.requestsScheduled += 1
+        if waited > 0.001:
+            self.requestsDelayed += 1
+            self.secondsWaited += waited
+        return waited
@@ -0,0 +1,92 @@
+import math
+
+from typing import List, Optional, Sequence
+
+from .datamodel.price_data import PriceData
+
+# https://docs.developer.betfair.com/display/1smk3cen4v3lu3yomq5qye0ni/Market+Data+Request+Limits
+MAX_REQUEST_WEIGHT = 200
+NO_PRICE_DATA_WEIGHT = 2
+PRICE_DATA_WEIGHTS = {
+    PriceData.SP_AVAILABLE: 3,
+    PriceData.SP_TRADED: 7,
+    PriceData.EX_BEST_OFFERS: 5,
+    PriceData.EX_ALL_OFFERS: 17,
+    PriceData.EX_TRADED: 17,
+}
+# EX_ALL_OFFERS and EX_TRADED requested together weigh less than the sum of their weights
+ALL_OFFERS_AND_TRADED_WEIGHT = 20
+# EX_BEST_OFFERS weighs PRICE_DATA_WEIGHTS[EX_BEST_OFFERS] * bestPricesDepth / 3 beyond this depth
+BASE_BEST_PRICES_DEPTH = 3
+MAX_CATALOGUE_RESULTS = 1000
+MARKET_PROJECTION_WEIGHTS = {
+    "COMPETITION": 0,
+    "EVENT": 0,
+    "EVENT_TYPE": 0,
+    "MARKET_START_TIME": 0,
+    "MARKET_DESCRIPTION": 1,
+    "RUNNER_DESCRIPTION": 0,
+    "RUNNER_METADATA": 1,
+}
+
+
+def get_market_book_weight(
+    priceData: Sequence[str], bestPricesDepth: Optional[int] = None
+) -> int:
+    """
+    Weight of a single market in a listMarketBook request with the given priceData projection.
+
+    :param bestPricesDepth: (int)  exBestOffersOverrides.bestPricesDepth of the projection, if set.
+    """
+    if len(priceData) == 0:
+        return NO_PRICE_DATA_WEIGHT
+    weight = 0
+    priceData = set(priceData)
+    if {PriceData.EX_ALL_OFFERS, PriceData.EX_TRADED} <= priceData:
+        weight += ALL_OFFERS_AND_TRADED_WEIGHT
+        priceData -= {PriceData.EX_ALL_OFFERS, PriceData.EX_TRADED}
+    for priceDataType in priceData:
+        priceDataWeight = PRICE_DATA_WEIGHTS[priceDataType]
+        if (
+            priceDataType == PriceData.EX_BEST_OFFERS
+            and bestPricesDepth is not None
+            and bestPricesDepth > BASE_BEST_PRICES_DEPTH
+        ):
+            priceDataWeight = math.ceil(
+                priceDataWeight * bestPricesDepth / BASE_BEST_PRICES_DEPTH
+            )
+        weight += priceDataWeight
+    return weight
+
+
+def get_catalogue_max_results(
+    marketProjection: Sequence[str], maxRequestWeight: int = MAX_REQUEST_WEIGHT
+) -> int:
+    """
+    Largest listMarketCatalogue maxResults that stays within the weight limit for the given marketProjection.
+    """
+    marketWeight = sum(
+        MARKET_PROJECTION_WEIGHTS[projection] for projection in marketProjection
+    )
+    if marketWeight == 0:
+        return MAX_CATALOGUE_RESULTS
+    return min(MAX_CATALOGUE_RESULTS, max(1, maxRequestWeight // marketWeight))
+
+
+def chunk_market_ids(
+    marketIds: Sequence[str],
+    priceData: Sequence[str],
+    maxRequestWeight: int = MAX_REQUEST_WEIGHT,
+    bestPricesDepth: Optional[int] = None,
+) -> List[List[str]]:
+    """
+    Split market ids into the fewest listMarketBook requests that each stay within the weight limit.
+    """
+    marketWeight = get_market_book_weight(
+        priceData=priceData, bestPricesDepth=bestPricesDepth
+    )
+    marketsPerRequest = max(1, maxRequestWeight // marketWeight)
+    return [
+        list(marketIds[i : i + marketsPerRequest])
+        for i in range(0, len(marketIds), marketsPerRequest)
+    ]
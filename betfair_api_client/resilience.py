@@ -0,0 +1,476 @@
+import asyncio
+import logging
+import random
+import socket
+import threading
+import time
+import urllib.error
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Dict, Optional
+
+from .datamodel.exceptions import CircuitOpen, ErrorCodes
+from .request_scheduler import ORDER_METHODS
+
+# reads that can be sent any number of times without side effects
+IDEMPOTENT_METHODS = {
+    "SportsAPING/v1.0/listMarketBook",
+    "SportsAPING/v1.0/listMarketCatalogue",
+    "SportsAPING/v1.0/listEvents",
+    "SportsAPING/v1.0/listCompetitions",
+    "AccountAPING/v1.0/getAccountFunds",
+}
+# Betfair rejects a resubmitted order request with the same customerRef for this long
+ORDER_DEDUPLICATION_WINDOW = 60.0
+RETRYABLE_HTTP_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRYABLE_ERROR_CODES = {
+    ErrorCodes.TIMEOUT,
+    ErrorCodes.UNEXPECTED_ERROR,
+    ErrorCodes.TOO_MANY_REQUESTS,
+    ErrorCodes.SERVICE_BUSY,
+    ErrorCodes.TIMEOUT_ERROR,
+}
+# failures after which an order request is known not to have been processed, so that resending it can not
+# place the bets twice, or come back as DUPLICATE_TRANSACTION for bets that are live
+UNSENT_HTTP_STATUS_CODES = {429, 503}
+UNSENT_ERROR_CODES = {ErrorCodes.TOO_MANY_REQUESTS}
+
+
+def is_retryable_exception(ex: BaseException) -> bool:
+    """
+    Connection failures, timeouts and 5xx/429 responses.  Other HTTP errors come from the request itself.
+    """
+    if isinstance(ex, urllib.error.HTTPError):
+        return ex.code in RETRYABLE_HTTP_STATUS_CODES
+    return isinstance(ex, (urllib.error.URLError, ConnectionError, TimeoutError))
+
+
+def is_unsent_exception(ex: BaseException) -> bool:
+    """
+    Whether the request never reached Betfair (connection refused, host not found) or was turned away
+    before being processed.  Timeouts and dropped connections may come after Betfair acted on it.
+    """
+    if isinstance(ex, urllib.error.HTTPError):
+        return ex.code in UNSENT_HTTP_STATUS_CODES
+    if isinstance(ex, urllib.error.URLError):
+        ex = ex.reason
+    return isinstance(ex, (ConnectionRefusedError, socket.gaierror))
+
+
+def is_retryable_result(result) -> bool:
+    """
+    Whether a decoded JSON-RPC response is a transient error, eg. SERVICE_BUSY.
+    """
+    if not isinstance(result, dict) or "error" not in result:
+        return False
+    error = result["error"]
+    return isinstance(error, dict) and error.get("message") in RETRYABLE_ERROR_CODES
+
+
+class CircuitStates:
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    def __init__(self, failureThreshold: int = 5, resetTimeout: float = 30.0):
+        """
+        Rejects calls to an endpoint after `failureThreshold` failures in a row.  Once `resetTimeout`
+        seconds have passed one trial call is let through, which closes the circuit again if it succeeds.
+        """
+        self.failureThreshold = failureThreshold
+        self.resetTimeout = resetTimeout
+        self.state = CircuitStates.CLOSED
+        self.consecutiveFailures = 0
+        self._openedAt = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == CircuitStates.CLOSED:
+                return True
+            # a trial call that never reported back does not keep the circuit half open forever
+            if time.monotonic() - self._openedAt < self.resetTimeout:
+                return False
+            self.state = CircuitStates.HALF_OPEN
+            self._openedAt = time.monotonic()
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CircuitStates.CLOSED
+            self.consecutiveFailures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutiveFailures += 1
+            if (
+                self.state == CircuitStates.HALF_OPEN
+                or self.consecutiveFailures >= self.failureThreshold
+            ):
+                if self.state != CircuitStates.OPEN:
+                    logging.warning(
+                        msg=f"Opening circuit after {self.consecutiveFailures} failures"
+                    )
+                self.state = CircuitStates.OPEN
+                self._openedAt = time.monotonic()
+
+
+class LatencyTracker:
+    def __init__(self, windowSize: int = 200):
+        """
+        Latencies of the last `windowSize` successful calls to one method.
+        """
+        self._latencies = deque(maxlen=windowSize)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def get_quantile(self, quantile: float) -> Optional[float]:
+        with self._lock:
+            if not self._latencies:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(quantile * len(latencies)))]
+
+
+class ResiliencePolicy:
+    def __init__(
+        self,
+        maxAttempts: int = 3,
+        backoffBase: float = 0.1,
+        backoffMax: float = 2.0,
+        hedgeRequests: bool = False,
+        hedgeQuantile: float = 0.95,
+        minHedgeSamples: int = 20,
+        failureThreshold: int = 5,
+        resetTimeout: float = 30.0,
+    ):
+        """
+        Retries, hedging and circuit breaking for the API calls of a client.
+        Idempotent reads are retried after connection errors, 5xx responses and transient Betfair errors,
+        with full-jitter exponential backoff.  Order requests are only retried when the failure shows Betfair
+        did not act on them (connection refused, 429/503, TOO_MANY_REQUESTS), when they carry a customerRef
+        and within Betfair's de-duplication window.  After a timeout or a dropped connection the bets may be
+        live, so the error is raised instead.  Orders are never hedged.
+
+        :param maxAttempts: (int)  Attempts per call, including the first.
+        :param backoffBase: (float)  Seconds of the first backoff, doubled for every further attempt.
+        :param backoffMax: (float)  Longest backoff in seconds.
+        :param hedgeRequests: (bool)  Send a duplicate of a read that is slower than the `hedgeQuantile` of its
+                              method's recent latencies, and use whichever answer comes first.
+        :param minHedgeSamples: (int)  Latencies recorded for a method before its reads are hedged.
+        :param failureThreshold: (int)  Failures in a row before an endpoint's circuit opens.
+        :param resetTimeout: (float)  Seconds an open circuit rejects calls before letting a trial call through.
+        """
+        self.maxAttempts = maxAttempts
+        self.backoffBase = backoffBase
+        self.backoffMax = backoffMax
+        self.hedgeRequests = hedgeRequests
+        self.hedgeQuantile = hedgeQuantile
+        self.minHedgeSamples = minHedgeSamples
+        self.failureThreshold = failureThreshold
+        self.resetTimeout = resetTimeout
+        self.retries = 0
+        self.hedgesSent = 0
+        self.hedgesWon = 0
+        self.circuitRejections = 0
+        self._circuitBreakers: Dict[str, CircuitBreaker] = {}
+        self._latencyTrackers: Dict[str, LatencyTracker] = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get_circuit_breaker(self, endpointURL: str) -> CircuitBreaker:
+        with self._lock:
+            circuitBreaker = self._circuitBreakers.get(endpointURL)
+            if circuitBreaker is None:
+                circuitBreaker = CircuitBreaker(
+                    failureThreshold=self.failureThreshold,
+                    resetTimeout=self.resetTimeout,
+                )
+                self._circuitBreakers[endpointURL] = circuitBreaker
+            return circuitBreaker
+
+    def get_latency_tracker(self, method: str) -> LatencyTracker:
+        with self._lock:
+            latencyTracker = self._latencyTrackers.get(method)
+            if latencyTracker is None:
+                latencyTracker = LatencyTracker()
+                self._latencyTrackers[method] = latencyTracker
+            return latencyTracker
+
+    def get_hedge_deadline(self, method: str) -> Optional[float]:
+        latencyTracker = self.get_latency_tracker(method=method)
+        if len(latencyTracker) < self.minHedgeSamples:
+            return None
+        return latencyTracker.get_quantile(quantile=self.hedgeQuantile)
+
+    def get_backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoffMax, self.backoffBase * 2**attempt))
+
+    def call(
+        self,
+        send: Callable[[], object],
+        jsonrpcRequest: dict,
+        endpointURL: str,
+        canHedge: bool = True,
+    ):
+        """
+        :param send: (callable)  Sends the request once and returns the decoded result.
+        :param canHedge: (bool)  False when two copies of the request must not run at once.
+        """
+        method = jsonrpcRequest["method"]
+        circuitBreaker = self.get_circuit_breaker(endpointURL=endpointURL)
+        isHedged = canHedge and self.hedgeRequests and method in IDEMPOTENT_METHODS
+        startedAt = time.monotonic()
+        attempt = 0
+        while True:
+            self._check_circuit(circuitBreaker=circuitBreaker, endpointURL=endpointURL)
+            try:
+                if isHedged:
+                    result = self._send_hedged(send=send, method=method)
+                else:
+                    result = self._send_timed(send=send, method=method)
+            except Exception as ex:
+                if not self._should_retry(
+                    ex=ex,
+                    circuitBreaker=circuitBreaker,
+                    jsonrpcRequest=jsonrpcRequest,
+                    attempt=attempt,
+                    startedAt=startedAt,
+                ):
+                    raise
+            else:
+                if not self._should_retry_result(
+                    result=result,
+                    circuitBreaker=circuitBreaker,
+                    jsonrpcRequest=jsonrpcRequest,
+                    attempt=attempt,
+                    startedAt=startedAt,
+                ):
+                    return result
+            attempt += 1
+            time.sleep(self.get_backoff(attempt=attempt))
+
+    async def call_async(
+        self,
+        send: Callable[[], Awaitable],
+        jsonrpcRequest: dict,
+        endpointURL: str,
+        canHedge: bool = True,
+    ):
+        method = jsonrpcRequest["method"]
+        circuitBreaker = self.get_circuit_breaker(endpointURL=endpointURL)
+        isHedged = canHedge and self.hedgeRequests and method in IDEMPOTENT_METHODS
+        startedAt = time.monotonic()
+        attempt = 0
+        while True:
+            self._check_circuit(circuitBreaker=circuitBreaker, endpointURL=endpointURL)
+            try:
+                if isHedged:
+                    result = await self._send_hedged_async(send=send, method=method)
+                else:
+                    result = await self._send_timed_async(send=send, method=method)
+            except Exception as ex:
+                if not self._should_retry(
+                    ex=ex,
+                    circuitBreaker=circuitBreaker,
+                    jsonrpcRequest=jsonrpcRequest,
+                    attempt=attempt,
+                    startedAt=startedAt,
+                ):
+                    raise
+            else:
+                if not self._should_retry_result(
+                    result=result,
+                    circuitBreaker=circuitBreaker,
+                    jsonrpcRequest=jsonrpcRequest,
+                    attempt=attempt,
+                    startedAt=startedAt,
+                ):
+                    return result
+            attempt += 1
+            await asyncio.sleep(self.get_backoff(attempt=attempt))
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "retries": self.retries,
+            "hedgesSent": self.hedgesSent,
+            "hedgesWon": self.hedgesWon,
+            "circuitRejections": self.circuitRejections,
+            "openCircuits": sum(
+                circuitBreaker.state != CircuitStates.CLOSED
+                for circuitBreaker in list(self._circuitBreakers.values())
+            ),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _check_circuit(self, circuitBreaker: CircuitBreaker, endpointURL: str) -> None:
+        if not circuitBreaker.allow_request():
+            with self._lock:
+                self.circuitRejections += 1
+            raise CircuitOpen(
+                f"{endpointURL} failed {circuitBreaker.consecutiveFailures} times in a row"
+            )
+
+    def _can_retry(
+        self, jsonrpcRequest: dict, attempt: int, startedAt: float, mayBeSent: bool
+    ) -> bool:
+        """
+        :param mayBeSent: (bool)  Whether Betfair may have acted on the failed attempt.
+        """
+        if attempt + 1 >= self.maxAttempts:
+            return False
+        method = jsonrpcRequest["method"]
+        if method in IDEMPOTENT_METHODS:
+            return True
+        if method in ORDER_METHODS:
+            # a resent order that had gone through is rejected as DUPLICATE_TRANSACTION, hiding live bets
+            return (
+                not mayBeSent
+                and "customerRef" in jsonrpcRequest.get("params", {})
+                and time.monotonic() - startedAt < ORDER_DEDUPLICATION_WINDOW
+            )
+        return False
+
+    def _should_retry(
+        self,
+        ex: Exception,
+        circuitBreaker: CircuitBreaker,
+        jsonrpcRequest: dict,
+        attempt: int,
+        startedAt: float,
+    ) -> bool:
+        if not is_retryable_exception(ex=ex):
+            # the endpoint answered, the request itself was wrong
+            circuitBreaker.record_success()
+            return False
+        circuitBreaker.record_failure()
+        if not self._can_retry(
+            jsonrpcRequest=jsonrpcRequest,
+            attempt=attempt,
+            startedAt=startedAt,
+            mayBeSent=not is_unsent_exception(ex=ex),
+        ):
+            return False
+        self._record_retry(jsonrpcRequest=jsonrpcRequest, reason=ex)
+        return True
+
+    def _should_retry_result(
+        self,
+        result,
+        circuitBreaker: CircuitBreaker,
+        jsonrpcRequest: dict,
+        attempt: int,
+        startedAt: float,
+    ) -> bool:
+        if not is_retryable_result(result=result):
+            circuitBreaker.record_success()
+            return False
+        circuitBreaker.record_failure()
+        if not self._can_retry(
+            jsonrpcRequest=jsonrpcRequest,
+            attempt=attempt,
+            startedAt=startedAt,
+            mayBeSent=result["error"]["message"] not in UNSENT_ERROR_CODES,
+        ):
+            return False
+        self._record_retry(
+            jsonrpcRequest=jsonrpcRequest, reason=result["error"]["message"]
+        )
+        return True
+
+    def _record_retry(self, jsonrpcRequest: dict, reason) -> None:
+        with self._lock:
+            self.retries += 1
+        logging.warning(msg=f"Retrying {jsonrpcRequest['method']} after {reason}")
+
+    def _send_timed(self, send: Callable[[], object], method: str):
+        startedAt = time.monotonic()
+        result = send()
+        self.get_latency_tracker(method=method).record(
+            latency=time.monotonic() - startedAt
+        )
+        return result
+
+    async def _send_timed_async(self, send: Callable[[], Awaitable], method: str):
+        startedAt = time.monotonic()
+        result = await send()
+        self.get_latency_tracker(method=method).record(
+            latency=time.monotonic() - startedAt
+        )
+        return result
+
+    def _send_hedged(self, send: Callable[[], object], method: str):
+        deadline = self.get_hedge_deadline(method=method)
+        if deadline is None:
+            return self._send_timed(send=send, method=method)
+        executor = self._get_executor()
+        first = executor.submit(self._send_timed, send=send, method=method)
+        done, _ = wait([first], timeout=deadline)
+        if done:
+            return first.result()
+        with self._lock:
+            self.hedgesSent += 1
+        hedge = executor.submit(self._send_timed, send=send, method=method)
+        pending = {first, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedgesWon += 1
+                    return future.result()
+        return first.result()
+
+    async def _send_hedged_async(self, send: Callable[[], Awaitable], method: str):
+        deadline = self.get_hedge_deadline(method=method)
+        if deadline is None:
+            return await self._send_timed_async(send=send, method=method)
+        first = asyncio.ensure_future(self._send_timed_async(send=send, method=method))
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({first}, timeout=deadline)
+            if done:
+                return first.result()
+            with self._lock:
+                self.hedgesSent += 1
+            hedge = asyncio.ensure_future(
+                self._send_timed_async(send=send, method=method)
+            )
+            pending = {first, hedge}
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            with self._lock:
+                                self.hedgesWon += 1
+                        return task.result()
+            return first.result()
+        finally:
+            for task in (first, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="hedge")
+            return self._executor
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import threading
+import time
+
+from typing import Dict, Optional
+
+from .datamodel.exceptions import ErrorCodes
+
+SESSION_ERROR_CODES = {ErrorCodes.INVALID_SESSION_INFORMATION, ErrorCodes.NO_SESSION}
+SESSION_ERROR_NAMES = {"INVALID_SESSION_INFORMATION", "NO_SESSION"}
+
+
+def is_session_error(result) -> bool:
+    """
+    Whether a decoded JSON-RPC response failed because the session token has expired or is invalid.
+    """
+    if not isinstance(result, dict) or "error" not in result:
+        return False
+    error = result["error"]
+    if not isinstance(error, dict):
+        return False
+    if error.get("message") in SESSION_ERROR_CODES:
+        return True
+    exceptionData = error.get("data") or {}
+    for exceptionDetails in exceptionData.values():
+        if (
+            isinstance(exceptionDetails, dict)
+            and exceptionDetails.get("errorCode") in SESSION_ERROR_NAMES
+        ):
+            return True
+    return False
+
+
+class _SessionMetrics:
+    def __init__(self):
+        self.heartbeatsSent = 0
+        self.heartbeatFailures = 0
+        self.logins = 0
+        self.lastHeartbeatLatency = None
+        self.lastLoginLatency = None
+        self.totalHeartbeatLatency = 0.0
+        self.totalLoginLatency = 0.0
+
+    def record_heartbeat(self, latency: float, isSuccess: bool) -> None:
+        self.heartbeatsSent += 1
+        if not isSuccess:
+            self.heartbeatFailures += 1
+        self.lastHeartbeatLatency = latency
+        self.totalHeartbeatLatency += latency
+
+    def record_login(self, latency: float) -> None:
+        self.logins += 1
+        self.lastLoginLatency = latency
+        self.totalLoginLatency += latency
+
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        return {
+            "heartbeatsSent": self.heartbeatsSent,
+            "heartbeatFailures": self.heartbeatFailures,
+            "logins": self.logins,
+            "lastHeartbeatLatency": self.lastHeartbeatLatency,
+            "lastLoginLatency": self.lastLoginLatency,
+            "meanHeartbeatLatency": (
+                self.totalHeartbeatLatency / self.heartbeatsSent
+                if self.heartbeatsSent
+                else None
+            ),
+            "meanLoginLatency": (
+                self.totalLoginLatency / self.logins if self.logins else None
+            ),
+        }
+
+
+class SessionManager:
+    def __init__(self, client, keepAliveInterval: Optional[float] = None):
+        """
+        Keeps a BetfairApiClient's session alive and logs it back in when the session is lost.
+
+        :param client: (BetfairApiClient)
+        :param keepAliveInterval: (float)  Seconds between keep-alives sent from a background thread.
+                                  No keep-alives are sent when None; expired sessions are still renewed.
+        """
+        self.client = client
+        self.keepAliveInterval = keepAliveInterval
+        self.metrics = _SessionMetrics()
+        self._loginLock = threading.Lock()
+        self._stopEvent = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self.keepAliveInterval is None or self._thread is not None:
+            return
+        self._stopEvent.clear()
+        self._thread = threading.Thread(target=self._keep_alive_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopEvent.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def login(self) -> None:
+        startedAt = time.monotonic()
+        response = self.client.transport.post(**self.client._build_login_request())
+        self.client._handle_login_response(response=response)
+        self.metrics.record_login(latency=time.monotonic() - startedAt)
+
+    def relogin(self, staleSessionToken: Optional[str]) -> None:
+        """
+        Log in again, unless another caller has already replaced the stale token while this one waited.
+        """
+        with self._loginLock:
+            if self.client.sessionToken != staleSessionToken:
+                return
+            logging.warning(msg="Betfair session expired, logging in again")
+            self.login()
+
+    def send_keep_alive(self) -> bool:
+        sessionToken = self.client.sessionToken
+        startedAt = time.monotonic()
+        response = self.client.transport.post(**self.client._build_heartbeat_request())
+        isSuccess = response.ok and response.json().get("status") == "SUCCESS"
+        self.metrics.record_heartbeat(
+            latency=time.monotonic() - startedAt, isSuccess=isSuccess
+        )
+        if not isSuccess:
+            self.relogin(staleSessionToken=sessionToken)
+        return isSuccess
+
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        return self.metrics.get_stats()
+
+    def _keep_alive_loop(self) -> None:
+        while not self._stopEvent.wait(timeout=self.keepAliveInterval):
+            try:
+                self.send_keep_alive()
+            except Exception as ex:
+                logging.exception(msg=ex)
+
+
+class AsyncSessionManager:
+    def __init__(self, client, keepAliveInterval: Optional[float] = None):
+        """
+        SessionManager for an AsyncBetfairApiClient, sending keep-alives from an asyncio task.
+        """
+        self.client = client
+        self.keepAliveInterval = keepAliveInterval
+        self.metrics = _SessionMetrics()
+        self._loginLock = None
+        self._stopEvent = None
+        self._task = None
+        self._isRunning = False
+
+    def start(self) -> None:
+        if self.keepAliveInterval is None or self._task is not None:
+            return
+        self._isRunning = True
+        # created here so that it belongs to the running loop
+        self._stopEvent = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._keep_alive_loop())
+
+    async def stop(self) -> None:
+        """
+        Wake the keep-alive task and wait for it to finish, as SessionManager joins its thread.
+        """
+        if self._task is not None:
+            self._isRunning = False
+            self._stopEvent.set()
+            await self._task
+            self._task = None
+
+    async def login(self) -> None:
+        startedAt = time.monotonic()
+        response = await self.client.transport.post(
+            **self.client._build_login_request()
+        )
+        self.client._handle_login_response(response=response)
+        self.metrics.record_login(latency=time.monotonic() - startedAt)
+
+    async def relogin(self, staleSessionToken: Optional[str]) -> None:
+        if self._loginLock is None:
+            self._loginLock = asyncio.Lock()
+        async with self._loginLock:
+            if self.client.sessionToken != staleSessionToken:
+                return
+            logging.warning(msg="Betfair session expired, logging in again")
+            await self.login()
+
+    async def send_keep_alive(self) -> bool:
+        sessionToken = self.client.sessionToken
+        startedAt = time.monotonic()
+        response = await self.client.transport.post(
+            **self.client._build_heartbeat_request()
+        )
+        isSuccess = response.ok and response.json().get("status") == "SUCCESS"
+        self.metrics.record_heartbeat(
+            latency=time.monotonic() - startedAt, isSuccess=isSuccess
+        )
+        if not isSuccess:
+            await self.relogin(staleSessionToken=sessionToken)
+        return isSuccess
+
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        return self.metrics.get_stats()
+
+    async def _keep_alive_loop(self) -> None:
+        while self._isRunning:
+            try:
+                await asyncio.wait_for(
+                    self._stopEvent.wait(), timeout=self.keepAliveInterval
+                )
+            except asyncio.TimeoutError:
+                pass
+            if not self._isRunning:
+                return
+            try:
+                await self.send_keep_alive()
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                logging.exception(msg=ex)
@@ -0,0 +1,684 @@
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import struct
+import threading
+import time
+
+from array import array
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .betfair_client import BetfairApiClient
+from .datamodel.bet_types import BetTypes
+from .datamodel.exceptions import BetfairException
+from .datamodel.market import Market
+from .price_ticks import np
+
+BOOK_MAGIC = b"BFPB"
+FORMAT_VERSION = 1
+# magic, version, markets, runner slots per market, levels per side, bytes per market id
+BOOK_HEADER = struct.Struct("<4sB3xIIII")
+HEADER_SIZE = 32
+MARKET_ID_LENGTH = 32
+# seconds a reader waits for a write in progress, far longer than any write takes
+DEFAULT_READ_TIMEOUT = 1.0
+_ATTACH_LOCK = threading.Lock()
+
+
+def _get_layout(numMarkets: int, maxRunners: int, depth: int) -> List[tuple]:
+    """
+    (name, typecode, shape, offset) of every table column, 8-byte columns first so that all are aligned.
+    """
+    columns = [
+        ("sequences", "Q", (numMarkets,)),
+        ("updatedAt", "d", (numMarkets,)),
+        ("selectionIds", "q", (numMarkets, maxRunners)),
+        ("lastPriceTraded", "d", (numMarkets, maxRunners)),
+        ("backPrices", "d", (numMarkets, maxRunners, depth)),
+        ("backSizes", "d", (numMarkets, maxRunners, depth)),
+        ("layPrices", "d", (numMarkets, maxRunners, depth)),
+        ("laySizes", "d", (numMarkets, maxRunners, depth)),
+        ("backCounts", "I", (numMarkets, maxRunners)),
+        ("layCounts", "I", (numMarkets, maxRunners)),
+        ("marketIds", "B", (numMarkets, MARKET_ID_LENGTH)),
+    ]
+    layout = []
+    offset = HEADER_SIZE
+    for name, typecode, shape in columns:
+        layout.append((name, typecode, shape, offset))
+        offset += math.prod(shape) * array(typecode).itemsize
+    return layout
+
+
+def _get_size(layout: List[tuple]) -> int:
+    name, typecode, shape, offset = layout[-1]
+    return offset + math.prod(shape) * array(typecode).itemsize
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Open an existing segment without registering it with this process's resource tracker, which would
+    unlink it when this process exits (https://github.com/python/cpython/issues/82300).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    # before Python 3.13 attaching always registers the segment
+    with _ATTACH_LOCK:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedPriceBook:
+    def __init__(self, sharedMemory: shared_memory.SharedMemory, isOwner: bool):
+        """
+        Latest back and lay ladders of a fixed set of markets in shared memory, as one table of doubles per
+        side indexed by market, runner slot and level, readable from any process without copying or
+        pickling.  Use SharedPriceBook.create, then SharedPriceBook.attach(name) in other processes.
+
+        Each market has a sequence number, odd while a writer is updating it, so readers retry instead
+        of seeing a half written market.  A market must only ever be written by one process at a time.
+        """
+        self._sharedMemory = sharedMemory
+        self.isOwner = isOwner
+        magic, version, numMarkets, maxRunners, depth, marketIdLength = (
+            BOOK_HEADER.unpack_from(sharedMemory.buf, 0)
+        )
+        if magic != BOOK_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{sharedMemory.name} is not a shared price book")
+        self.numMarkets = numMarkets
+        self.maxRunners = maxRunners
+        self.depth = depth
+        self._layout = _get_layout(
+            numMarkets=numMarkets, maxRunners=maxRunners, depth=depth
+        )
+        self._columns = {}
+        for name, typecode, shape, offset in self._layout:
+            length = math.prod(shape) * array(typecode).itemsize
+            self._columns[name] = sharedMemory.buf[offset : offset + length].cast(
+                typecode
+            )
+        self._sequences = self._columns["sequences"]
+        self._updatedAt = self._columns["updatedAt"]
+        self._selectionIds = self._columns["selectionIds"]
+        self._lastPriceTraded = self._columns["lastPriceTraded"]
+        self._backPrices = self._columns["backPrices"]
+        self._backSizes = self._columns["backSizes"]
+        self._layPrices = self._columns["layPrices"]
+        self._laySizes = self._columns["laySizes"]
+        self._backCounts = self._columns["backCounts"]
+        self._layCounts = self._columns["layCounts"]
+        self._sides = [
+            (BetTypes.BACK, self._backPrices, self._backSizes, self._backCounts),
+            (BetTypes.LAY, self._layPrices, self._laySizes, self._layCounts),
+        ]
+        marketIds = self._columns["marketIds"]
+        self.marketIds = [
+            bytes(marketIds[i : i + marketIdLength]).rstrip(b"\0").decode("utf-8")
+            for i in range(0, numMarkets * marketIdLength, marketIdLength)
+        ]
+        self._marketIndexes = {
+            marketId: marketIndex for marketIndex, marketId in enumerate(self.marketIds)
+        }
+        self._runnerSlots = [None] * numMarkets
+
+    @classmethod
+    def create(
+        cls,
+        markets: List[Market],
+        depth: int = 3,
+        maxRunners: Optional[int] = None,
+        name: Optional[str] = None,
+    ) -> "SharedPriceBook":
+        """
+        :param markets: (list)  Markets of the book, with their runners, eg. from get_coming_events.
+        :param depth: (int)  Levels kept per side.  Deeper levels in the data written are left out.
+        :param maxRunners: (int)  Runner slots per market, at least the most runners of any market.  Spare
+            slots take runners that only appear in later market books.
+        :param name: (str)  Name of the shared memory segment.  A unique one is chosen by default.
+        """
+        mostRunners = max((len(market.runners) for market in markets), default=0)
+        maxRunners = mostRunners if maxRunners is None else maxRunners
+        if maxRunners < mostRunners:
+            raise ValueError(f"maxRunners must be at least {mostRunners}")
+        for market in markets:
+            if len(market.marketId.encode("utf-8")) > MARKET_ID_LENGTH:
+                raise ValueError(f"Market id {market.marketId} is too long")
+        layout = _get_layout(
+            numMarkets=len(markets), maxRunners=maxRunners, depth=depth
+        )
+        sharedMemory = shared_memory.SharedMemory(
+            name=name, create=True, size=_get_size(layout=layout)
+        )
+        BOOK_HEADER.pack_into(
+            sharedMemory.buf,
+            0,
+            BOOK_MAGIC,
+            FORMAT_VERSION,
+            len(markets),
+            maxRunners,
+            depth,
+            MARKET_ID_LENGTH,
+        )
+        _, _, _, marketIdsOffset = layout[-1]
+        for marketIndex, market in enumerate(markets):
+            marketId = market.marketId.encode("utf-8")
+            offset = marketIdsOffset + marketIndex * MARKET_ID_LENGTH
+            sharedMemory.buf[offset : offset + len(marketId)] = marketId
+        priceBook = cls(sharedMemory=sharedMemory, isOwner=True)
+        for marketIndex, market in enumerate(markets):
+            for slot, selectionId in enumerate(market.runners):
+                priceBook._selectionIds[marketIndex * maxRunners + slot] = selectionId
+        for runnerIndex in range(len(markets) * maxRunners):
+            priceBook._lastPriceTraded[runnerIndex] = math.nan
+        return priceBook
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedPriceBook":
+        """
+        Open a book created by another process.  Only the creator unlinks it.
+        """
+        return cls(sharedMemory=_attach_shared_memory(name=name), isOwner=False)
+
+    @property
+    def name(self) -> str:
+        return self._sharedMemory.name
+
+    def get_market_index(self, marketId: str) -> Optional[int]:
+        return self._marketIndexes.get(marketId)
+
+    def get_runner_slots(self, marketId: str) -> Dict[int, int]:
+        """
+        :return: (dict)  Selection id -> runner slot of the market's runners.
+        """
+        marketIndex = self._marketIndexes[marketId]
+        runnerBase = marketIndex * self.maxRunners
+        return {
+            selectionId: slot
+            for slot, selectionId in enumerate(
+                self._selectionIds[runnerBase : runnerBase + self.maxRunners]
+            )
+            if selectionId != 0
+        }
+
+    def get_sequence(self, marketId: str) -> int:
+        """
+        Goes up every time the market is written, so readers can skip markets that have not changed.
+        """
+        return self._sequences[self._marketIndexes[marketId]]
+
+    def get_arrays(self) -> dict:
+        """
+        The table itself, without copying: NumPy arrays when NumPy is installed, eg. "backPrices" of shape
+        (markets, runner slots, depth), or else flat memoryviews in the same order.  Reading them directly
+        skips the sequence check, so a market being written can be seen half updated.  Levels beyond
+        "backCounts"/"layCounts" hold stale values.
+        """
+        if np is None:
+            return {
+                name: self._columns[name]
+                for name, _, _, _ in self._layout
+                if name != "marketIds"
+            }
+        return {
+            name: np.frombuffer(self._columns[name], dtype=typecode).reshape(shape)
+            for name, typecode, shape, _ in self._layout
+            if name != "marketIds"
+        }
+
+    def write_market_books(
+        self, marketBooks: List[dict], timestamp: Optional[float] = None
+    ) -> int:
+        """
+        Write listMarketBook results straight into the book, without building Market objects.  Levels are
+        taken in the order Betfair sends them, best first.  Sides missing from a market book, because the
+        price projection left them out, keep their levels.
+
+        :param timestamp: (float)  Seconds since the epoch the markets are as of.  Defaults to now.
+        :return: (int)  Market books written.  Markets not in the book are skipped.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        depth = self.depth
+        marketsWritten = 0
+        for marketData in marketBooks:
+            marketIndex = self._marketIndexes.get(str(marketData["marketId"]))
+            if marketIndex is None:
+                continue
+            sequence = self._begin_write(marketIndex=marketIndex)
+            try:
+                for runnerInfo in marketData["runners"]:
+                    runnerIndex = self._get_runner_index(
+                        marketIndex=marketIndex,
+                        selectionId=int(runnerInfo["selectionId"]),
+                    )
+                    if runnerIndex is None:
+                        continue
+                    lastPriceTraded = runnerInfo.get("lastPriceTraded")
+                    if lastPriceTraded is not None:
+                        self._lastPriceTraded[runnerIndex] = lastPriceTraded
+                    exchangePrices = runnerInfo.get("ex", {})
+                    offset = runnerIndex * depth
+                    for betType, prices, sizes, counts in self._sides:
+                        levels = exchangePrices.get(betType)
+                        if levels is None:
+                            continue
+                        index = offset
+                        for level in levels[:depth]:
+                            prices[index] = level["price"]
+                            sizes[index] = level["size"]
+                            index += 1
+                        counts[runnerIndex] = index - offset
+                self._updatedAt[marketIndex] = timestamp
+            finally:
+                self._sequences[marketIndex] = sequence + 2
+            marketsWritten += 1
+        return marketsWritten
+
+    def write_market(self, market: Market, timestamp: Optional[float] = None) -> None:
+        """
+        Write the current ladders of a Market, eg. one kept up to date by BetfairStreamClient.
+        """
+        marketIndex = self._marketIndexes[market.marketId]
+        sequence = self._begin_write(marketIndex=marketIndex)
+        try:
+            for runner in market.runners.values():
+                runnerIndex = self._get_runner_index(
+                    marketIndex=marketIndex, selectionId=runner.runnerId
+                )
+                if runnerIndex is None:
+                    continue
+                if runner.lastPriceTraded is not None:
+                    self._lastPriceTraded[runnerIndex] = runner.lastPriceTraded
+                for ladder, prices, sizes, counts in [
+                    (
+                        runner.backLadder,
+                        self._backPrices,
+                        self._backSizes,
+                        self._backCounts,
+                    ),
+                    (
+                        runner.layLadder,
+                        self._layPrices,
+                        self._laySizes,
+                        self._layCounts,
+                    ),
+                ]:
+                    count = min(len(ladder.prices), self.depth)
+                    offset = runnerIndex * self.depth
+                    prices[offset : offset + count] = ladder.prices[:count]
+                    sizes[offset : offset + count] = ladder.sizes[:count]
+                    counts[runnerIndex] = count
+            self._updatedAt[marketIndex] = (
+                timestamp if timestamp is not None else time.time()
+            )
+        finally:
+            self._sequences[marketIndex] = sequence + 2
+
+    def read_market(self, marketId: str, timeout: float = DEFAULT_READ_TIMEOUT) -> dict:
+        """
+        Consistent copy of one market.
+
+        :param timeout: (float)  Seconds to wait for a write in progress before raising TimeoutError, eg.
+            when its writer died mid-write.
+        :return: (dict)  "sequence", "updatedAt" (0.0 until first written) and "runners", selection id ->
+            "lastPriceTraded" (None when unknown), "availableToBack" and "availableToLay" lists of
+            (price, size), best first.
+        """
+        marketIndex = self._marketIndexes[marketId]
+        runnerBase = marketIndex * self.maxRunners
+        deadline = time.monotonic() + timeout
+        while True:
+            sequence = self._wait_for_sequence(
+                marketIndex=marketIndex, deadline=deadline
+            )
+            runners = {}
+            for runnerIndex in range(runnerBase, runnerBase + self.maxRunners):
+                selectionId = self._selectionIds[runnerIndex]
+                if selectionId == 0:
+                    continue
+                lastPriceTraded = self._lastPriceTraded[runnerIndex]
+                offset = runnerIndex * self.depth
+                backEnd = offset + self._backCounts[runnerIndex]
+                layEnd = offset + self._layCounts[runnerIndex]
+                runners[selectionId] = {
+                    "lastPriceTraded": (
+                        None if math.isnan(lastPriceTraded) else lastPriceTraded
+                    ),
+                    BetTypes.BACK: list(
+                        zip(
+                            self._backPrices[offset:backEnd],
+                            self._backSizes[offset:backEnd],
+                        )
+                    ),
+                    BetTypes.LAY: list(
+                        zip(
+                            self._layPrices[offset:layEnd],
+                            self._laySizes[offset:layEnd],
+                        )
+                    ),
+                }
+            updatedAt = self._updatedAt[marketIndex]
+            if self._sequences[marketIndex] == sequence:
+                return {
+                    "sequence": sequence,
+                    "updatedAt": updatedAt,
+                    "runners": runners,
+                }
+
+    def read_into_market(
+        self, market: Market, timeout: float = DEFAULT_READ_TIMEOUT
+    ) -> int:
+        """
+        Copy the market's latest ladders into its Runners, eg. to use Runner methods in a consumer process.
+
+        :param timeout: (float)  See read_market.
+        :return: (int)  Sequence of the copy, to compare with get_sequence later.
+        """
+        marketIndex = self._marketIndexes[market.marketId]
+        runnerBase = marketIndex * self.maxRunners
+        deadline = time.monotonic() + timeout
+        while True:
+            sequence = self._wait_for_sequence(
+                marketIndex=marketIndex, deadline=deadline
+            )
+            ladders = []
+            for runnerIndex in range(runnerBase, runnerBase + self.maxRunners):
+                runner = market.runners.get(self._selectionIds[runnerIndex])
+                if runner is None:
+                    continue
+                offset = runnerIndex * self.depth
+                backEnd = offset + self._backCounts[runnerIndex]
+                layEnd = offset + self._layCounts[runnerIndex]
+                ladders.append(
+                    (
+                        runner,
+                        _to_array(self._backPrices[offset:backEnd]),
+                        _to_array(self._backSizes[offset:backEnd]),
+                        _to_array(self._layPrices[offset:layEnd]),
+                        _to_array(self._laySizes[offset:layEnd]),
+                        self._lastPriceTraded[runnerIndex],
+                    )
+                )
+            if self._sequences[marketIndex] == sequence:
+                break
+        for (
+            runner,
+            backPrices,
+            backSizes,
+            layPrices,
+            laySizes,
+            lastPriceTraded,
+        ) in ladders:
+            runner.backLadder.update_from_arrays(prices=backPrices, sizes=backSizes)
+            runner.layLadder.update_from_arrays(prices=layPrices, sizes=laySizes)
+            if not math.isnan(lastPriceTraded):
+                runner.lastPriceTraded = lastPriceTraded
+        return sequence
+
+    def close(self) -> None:
+        try:
+            for column in self._columns.values():
+                column.release()
+            self._sharedMemory.close()
+        except BufferError:
+            # arrays from get_arrays still point into the segment, it is unmapped once they are released
+            pass
+        self._columns = {}
+
+    def unlink(self) -> None:
+        """
+        Free the segment once every process has closed it.  Only the creator should call this.
+        """
+        self._sharedMemory.unlink()
+
+    def __enter__(self) -> "SharedPriceBook":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+        if self.isOwner:
+            self.unlink()
+
+    def _begin_write(self, marketIndex: int) -> int:
+        sequence = self._sequences[marketIndex]
+        self._sequences[marketIndex] = sequence + 1
+        return sequence
+
+    def _wait_for_sequence(self, marketIndex: int, deadline: float) -> int:
+        sequence = self._sequences[marketIndex]
+        while sequence % 2 == 1:
+            if time.monotonic() > deadline:
+                raise TimeoutError(
+                    f"Market {self.marketIds[marketIndex]} is still being written, its writer may have died"
+                )
+            time.sleep(0)
+            sequence = self._sequences[marketIndex]
+        return sequence
+
+    def _get_runner_index(self, marketIndex: int, selectionId: int) -> Optional[int]:
+        """
+        Table row of the runner, given a spare slot if it is new to the market.  None when the market has
+        no slot left for it.
+        """
+        runnerSlots = self._runnerSlots[marketIndex]
+        if runnerSlots is None:
+            runnerSlots = self._runnerSlots[marketIndex] = self.get_runner_slots(
+                marketId=self.marketIds[marketIndex]
+            )
+        slot = runnerSlots.get(selectionId)
+        if slot is None:
+            freeSlots = set(range(self.maxRunners)) - set(runnerSlots.values())
+            if not freeSlots:
+                logging.warning(
+                    msg=f"No runner slot left for {selectionId} in market {self.marketIds[marketIndex]}"
+                )
+                return None
+            slot = runnerSlots[selectionId] = min(freeSlots)
+            self._selectionIds[marketIndex * self.maxRunners + slot] = selectionId
+        return marketIndex * self.maxRunners + slot
+
+
+def _to_array(buffer: memoryview) -> array:
+    levels = array("d")
+    levels.frombytes(buffer.cast("B"))
+    return levels
+
+
+class _WorkerShutdown:
+    """
+    SIGTERM handler of a poller worker.  It exits through the worker's finally blocks, after the write
+    in progress if there is one, so that no market is left half written.
+    """
+
+    def __init__(self):
+        self.isWriting = False
+        self.isRequested = False
+
+    def __call__(self, signum, frame) -> None:
+        self.isRequested = True
+        if not self.isWriting:
+            raise SystemExit(0)
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        self.isWriting = True
+        try:
+            yield
+        finally:
+            self.isWriting = False
+        if self.isRequested:
+            raise SystemExit(0)
+
+
+def _poll_markets(
+    clientFactory: Callable[[], BetfairApiClient],
+    bookName: str,
+    marketIds: List[str],
+    interval: float,
+    stopEvent,
+    polls,
+    errors,
+    workerIndex: int,
+) -> None:
+    shutdown = _WorkerShutdown()
+    signal.signal(signal.SIGTERM, shutdown)
+    priceBook = SharedPriceBook.attach(name=bookName)
+    client = clientFactory()
+    try:
+        while not stopEvent.is_set():
+            startedAt = time.monotonic()
+            try:
+                marketIdChunks = client._chunk_market_ids(marketIds=marketIds)
+                if len(marketIdChunks) <= 1:
+                    marketBookChunks = map(client._list_market_book, marketIdChunks)
+                else:
+                    marketBookChunks = client._get_executor().map(
+                        client._list_market_book, marketIdChunks
+                    )
+                for marketBooks in marketBookChunks:
+                    if isinstance(marketBooks, dict) and "error" in marketBooks:
+                        raise client._get_error_exception(error=marketBooks["error"])
+                    with shutdown.writing():
+                        priceBook.write_market_books(marketBooks=marketBooks)
+                polls[workerIndex] += 1
+            except (Exception, BetfairException) as ex:
+                errors[workerIndex] += 1
+                logging.exception(msg=ex)
+            stopEvent.wait(max(0.0, interval - (time.monotonic() - startedAt)))
+    finally:
+        client.close()
+        priceBook.close()
+
+
+class MultiProcessPoller:
+    def __init__(
+        self,
+        clientFactory: Callable[[], BetfairApiClient],
+        markets: List[Market],
+        numWorkers: Optional[int] = None,
+        interval: float = 1.0,
+        depth: int = 3,
+        maxRunners: Optional[int] = None,
+        startMethod: Optional[str] = None,
+    ):
+        """
+        Polls listMarketBook from several processes, so that decoding responses is not limited to one core
+        by the GIL.  The markets are split between worker processes, each logged in with its own client,
+        which write the latest ladders into a SharedPriceBook that any process can read.
+
+        :param clientFactory: (callable)  Builds a logged in BetfairApiClient in each worker.  It must be
+            picklable with the start method in use, eg. a module level function or a functools.partial.
+        :param markets: (list)  Markets to poll, with their runners.
+        :param numWorkers: (int)  Worker processes, one per CPU by default.
+        :param interval: (float)  Seconds from the start of one poll of a worker's markets to the next.
+        :param depth: (int)  Levels kept per side, see SharedPriceBook.create.
+        :param maxRunners: (int)  Runner slots per market, see SharedPriceBook.create.
+        :param startMethod: (str)  multiprocessing start method, the platform default when None.
+        """
+        self.clientFactory = clientFactory
+        self.markets = list(markets)
+        self.numWorkers = min(
+            numWorkers if numWorkers is not None else os.cpu_count() or 1,
+            max(1, len(self.markets)),
+        )
+        self.interval = interval
+        self.depth = depth
+        self.maxRunners = maxRunners
+        self.priceBook = None
+        self._context = multiprocessing.get_context(startMethod)
+        self._stopEvent = None
+        self._polls = None
+        self._errors = None
+        self._workers = []
+
+    def start(self) -> "MultiProcessPoller":
+        self.priceBook = SharedPriceBook.create(
+            markets=self.markets, depth=self.depth, maxRunners=self.maxRunners
+        )
+        self._stopEvent = self._context.Event()
+        self._polls = self._context.Array("Q", self.numWorkers, lock=False)
+        self._errors = self._context.Array("Q", self.numWorkers, lock=False)
+        marketIds = [market.marketId for market in self.markets]
+        for workerIndex in range(self.numWorkers):
+            worker = self._context.Process(
+                target=_poll_markets,
+                kwargs={
+                    "clientFactory": self.clientFactory,
+                    "bookName": self.priceBook.name,
+                    "marketIds": marketIds[workerIndex :: self.numWorkers],
+                    "interval": self.interval,
+                    "stopEvent": self._stopEvent,
+                    "polls": self._polls,
+                    "errors": self._errors,
+                    "workerIndex": workerIndex,
+                },
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+        return self
+
+    def get_stats(self) -> List[Dict[str, int]]:
+        """
+        :return: (list)  Completed polls and failed polls of each worker, and whether it is still running.
+        """
+        return [
+            {
+                "polls": self._polls[workerIndex],
+                "errors": self._errors[workerIndex],
+                "alive": worker.is_alive(),
+            }
+            for workerIndex, worker in enumerate(self._workers)
+        ]
+
+    def wait_for_polls(self, polls: int = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every worker has completed `polls` polls.
+
+        :return: (bool)  False if the timeout passed first, or a worker died.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while any(
+            self._polls[workerIndex] < polls for workerIndex in range(self.numWorkers)
+        ):
+            if not all(worker.is_alive() for worker in self._workers):
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Ask the workers to stop after their current poll.  Workers still running after `timeout` seconds,
+        eg. waiting on a slow response, are sent SIGTERM, which they handle once any write in progress is
+        complete.
+        """
+        if self._stopEvent is not None:
+            self._stopEvent.set()
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self._workers = []
+        if self.priceBook is not None:
+            self.priceBook.close()
+            self.priceBook.unlink()
+            self.priceBook = None
+
+    def __enter__(self) -> "MultiProcessPoller":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,2 @@
+from .market_stream_cache import MarketStreamCache
+from .stream_client import BetfairStreamClient
@@ -0,0 +1,153 @@
+from datetime import datetime
+from typing import List, Optional
+
+from ..datamodel.market import Market
+from ..datamodel.price_ladder import PriceLadder
+from ..datamodel.runner import Runner
+
+STREAM_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+
+class _RunnerLadders:
+    """
+    Stream state for one runner: full depth ladders keyed by price ("atb"/"atl")
+    and best-offer ladders keyed by level ("batb"/"batl").
+    """
+
+    __slots__ = ("back", "lay", "bestBack", "bestLay")
+
+    def __init__(self):
+        self.back = {}
+        self.lay = {}
+        self.bestBack = {}
+        self.bestLay = {}
+
+    def apply(self, runnerChange: dict) -> None:
+        self._apply_price_deltas(ladder=self.back, deltas=runnerChange.get("atb"))
+        self._apply_price_deltas(ladder=self.lay, deltas=runnerChange.get("atl"))
+        self._apply_level_deltas(ladder=self.bestBack, deltas=runnerChange.get("batb"))
+        self._apply_level_deltas(ladder=self.bestLay, deltas=runnerChange.get("batl"))
+
+    def back_levels(self) -> List[tuple]:
+        if self.bestBack:
+            return [self.bestBack[level] for level in sorted(self.bestBack)]
+        return sorted(self.back.items(), reverse=True)
+
+    def lay_levels(self) -> List[tuple]:
+        if self.bestLay:
+            return [self.bestLay[level] for level in sorted(self.bestLay)]
+        return sorted(self.lay.items())
+
+    @staticmethod
+    def _apply_price_deltas(ladder: dict, deltas: Optional[List[list]]) -> None:
+        if not deltas:
+            return
+        for price, size in deltas:
+            if size == 0:
+                ladder.pop(price, None)
+            else:
+                ladder[price] = size
+
+    @staticmethod
+    def _apply_level_deltas(ladder: dict, deltas: Optional[List[list]]) -> None:
+        if not deltas:
+            return
+        for level, price, size in deltas:
+            if size == 0:
+                ladder.pop(level, None)
+            else:
+                ladder[level] = (price, size)
+
+
+class MarketStreamCache:
+    def __init__(self, markets: Optional[List[Market]] = None):
+        """
+        In-memory market books maintained from Exchange Stream API market change messages.
+        Markets passed in (eg. from get_coming_events) are updated in place, keeping their names;
+        markets only seen on the stream are created from their market definition.
+
+        :param markets: (list)  Optional Market objects to keep up to date.
+        """
+        self.markets = {market.marketId: market for market in markets or []}
+        self._runnerLadders = {}
+
+    def apply_market_changes(self, marketChanges: List[dict]) -> List[Market]:
+        return [
+            self.apply_market_change(marketChange=marketChange)
+            for marketChange in marketChanges
+        ]
+
+    def apply_market_change(self, marketChange: dict) -> Market:
+        marketId = marketChange["id"]
+        marketDefinition = marketChange.get("marketDefinition")
+        market = self.markets.get(marketId)
+        if market is None:
+            market = Market(
+                marketId=marketId,
+                marketName=marketId,
+                marketStartTime=self._parse_market_time(
+                    marketDefinition=marketDefinition
+                ),
+            )
+            self.markets[marketId] = market
+        if marketDefinition is not None:
+            market.status = marketDefinition.get("status", market.status)
+            market.inPlay = marketDefinition.get("inPlay", market.inPlay)
+            market.betDelay = marketDefinition.get("betDelay", market.betDelay)
+            for runnerDefinition in marketDefinition.get("runners", []):
+                self._get_runner(market=market, selectionId=runnerDefinition["id"])
+        if marketChange.get("img"):
+            for runner in market.get_all_runners():
+                self._runnerLadders.pop((marketId, runner.runnerId), None)
+                runner.backLadder.update(prices=[], sizes=[])
+                runner.layLadder.update(prices=[], sizes=[])
+        for runnerChange in marketChange.get("rc", []):
+            runner = self._get_runner(market=market, selectionId=runnerChange["id"])
+            runnerLadders = self._runnerLadders.setdefault(
+                (marketId, runner.runnerId), _RunnerLadders()
+            )
+            runnerLadders.apply(runnerChange=runnerChange)
+            self._update_ladder(
+                ladder=runner.backLadder, levels=runnerLadders.back_levels()
+            )
+            self._update_ladder(
+                ladder=runner.layLadder, levels=runnerLadders.lay_levels()
+            )
+        return market
+
+    def clear_ladders(self) -> None:
+        """
+        Empty every runner's ladders, eg. before a new subscription image replaces them.
+        """
+        self._runnerLadders.clear()
+        for market in self.markets.values():
+            for runner in market.get_all_runners():
+                runner.backLadder.update(prices=[], sizes=[])
+                runner.layLadder.update(prices=[], sizes=[])
+
+    def get_market(self, marketId: str) -> Optional[Market]:
+        return self.markets.get(marketId)
+
+    def get_all_markets(self) -> List[Market]:
+        return list(self.markets.values())
+
+    def _get_runner(self, market: Market, selectionId: int) -> Runner:
+        runner = market.runners.get(int(selectionId))
+        if runner is None:
+            runner = Runner(
+                runnerId=int(selectionId), runnerName=str(selectionId), handicap=0.0
+            )
+            market.add_runner(runner=runner)
+        return runner
+
+    @staticmethod
+    def _update_ladder(ladder: PriceLadder, levels: List[tuple]) -> None:
+        ladder.update(
+            prices=[price for price, _ in levels], sizes=[size for _, size in levels]
+        )
+
+    @staticmethod
+    def _parse_market_time(marketDefinition: Optional[dict]) -> Optional[datetime]:
+        if marketDefinition is None or "marketTime" not in marketDefinition:
+            return None
+        return datetime.strptime(marketDefinition["marketTime"], STREAM_DATETIME_FORMAT)
@@ -0,0 +1,301 @@
+import logging
+import socket
+import ssl
+import threading
+import time
+
+from typing import Callable, List, Optional
+
+from ..datamodel.exceptions import StreamException
+from ..datamodel.market import Market
+from ..parsing import dumps, loads
+from .market_stream_cache import MarketStreamCache
+
+SUB_IMAGE = "SUB_IMAGE"
+SEG_START = "SEG_START"
+SEG_END = "SEG_END"
+INVALID_CLOCK = "INVALID_CLOCK"
+# stream errors that a new connection can get past; others, eg. an invalid session, stop run()
+RECOVERABLE_ERROR_CODES = {
+    "TIMEOUT",
+    "UNEXPECTED_ERROR",
+    "CONNECTION_FAILED",
+    "TOO_MANY_REQUESTS",
+    INVALID_CLOCK,
+}
+
+
+class BetfairStreamClient:
+
+    STREAM_HOST = "stream-api.betfair.com"
+    STREAM_PORT = 443
+    DEFAULT_MARKET_DATA_FILTER = {
+        "fields": ["EX_BEST_OFFERS", "EX_MARKET_DEF"],
+        "ladderLevels": 3,
+    }
+
+    def __init__(
+        self,
+        apiKey: str,
+        sessionToken: str,
+        marketFilter: dict,
+        marketDataFilter: Optional[dict] = None,
+        markets: Optional[List[Market]] = None,
+        host: str = STREAM_HOST,
+        port: int = STREAM_PORT,
+        useSsl: bool = True,
+        heartbeatMs: int = 5000,
+        conflateMs: Optional[int] = None,
+        reconnectDelay: float = 1.0,
+        maxReconnectAttempts: int = 5,
+    ):
+        """
+        Client for the Exchange Stream API market subscription.
+        Keeps one socket open, applies market change messages to Market/Runner objects as they
+        arrive, and resubscribes from the last clock after a reconnect so that only the missed
+        deltas are resent.  Segmented messages are applied once their last segment has arrived.
+
+        :param apiKey: (str)
+        :param sessionToken: (str)  Session token of a logged in BetfairApiClient.
+        :param marketFilter: (dict)  Stream marketFilter, eg. {"marketIds": ["1.23"]}.
+        :param marketDataFilter: (dict)  Stream marketDataFilter.  Defaults to best offers and market definitions.
+        :param markets: (list)  Optional Market objects (eg. from get_coming_events) to update in place.
+        :param host: (str)
+        :param port: (int)
+        :param useSsl: (bool)
+        :param heartbeatMs: (int)  Interval at which the server sends heartbeats when nothing changes.
+        :param conflateMs: (int)  Optional conflation window.
+        :param reconnectDelay: (float)  Seconds before the first reconnect attempt, doubling after each failure.
+        :param maxReconnectAttempts: (int)  Consecutive failed reconnects before run() gives up.  Connection
+                                     failures and the stream errors in RECOVERABLE_ERROR_CODES are retried.
+        """
+        self.apiKey = apiKey
+        self.sessionToken = sessionToken
+        self.marketFilter = marketFilter
+        self.marketDataFilter = (
+            marketDataFilter
+            if marketDataFilter is not None
+            else self.DEFAULT_MARKET_DATA_FILTER
+        )
+        self.host = host
+        self.port = port
+        self.useSsl = useSsl
+        self.heartbeatMs = heartbeatMs
+        self.conflateMs = conflateMs
+        self.reconnectDelay = reconnectDelay
+        self.maxReconnectAttempts = maxReconnectAttempts
+        self.cache = MarketStreamCache(markets=markets)
+        self.connectionId = None
+        self.initialClk = None
+        self.clk = None
+        self._callbacks = []
+        self._socket = None
+        self._reader = None
+        self._messageId = 0
+        self._segment = None
+        self._stopEvent = threading.Event()
+        self._thread = None
+        self._error = None
+
+    @classmethod
+    def from_client(cls, client, **kwargs) -> "BetfairStreamClient":
+        return cls(apiKey=client.apiKey, sessionToken=client.sessionToken, **kwargs)
+
+    def add_callback(self, callback: Callable[[Market], None]) -> None:
+        """
+        :param callback: (callable)  Called with each Market after a change to it has been applied.
+        """
+        self._callbacks.append(callback)
+
+    def connect(self) -> None:
+        rawSocket = socket.create_connection(
+            address=(self.host, self.port), timeout=self._socket_timeout()
+        )
+        if self.useSsl:
+            rawSocket = ssl.create_default_context().wrap_socket(
+                rawSocket, server_hostname=self.host
+            )
+        self._socket = rawSocket
+        self._reader = rawSocket.makefile("rb")
+        # the rest of a segmented message cut off by a reconnect is not resent
+        self._segment = None
+        connectionMessage = self._read_message()
+        if connectionMessage.get("op") != "connection":
+            raise StreamException(
+                errorCode="UNEXPECTED_MESSAGE", errorMessage=str(connectionMessage)
+            )
+        self.connectionId = connectionMessage.get("connectionId")
+        self._request(
+            message={
+                "op": "authentication",
+                "appKey": self.apiKey,
+                "session": self.sessionToken,
+            }
+        )
+        self.subscribe()
+
+    def subscribe(self) -> None:
+        subscription = {
+            "op": "marketSubscription",
+            "marketFilter": self.marketFilter,
+            "marketDataFilter": self.marketDataFilter,
+            "heartbeatMs": self.heartbeatMs,
+        }
+        if self.conflateMs is not None:
+            subscription["conflateMs"] = self.conflateMs
+        if self.initialClk is not None and self.clk is not None:
+            subscription["initialClk"] = self.initialClk
+            subscription["clk"] = self.clk
+        self._request(message=subscription)
+
+    def close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            finally:
+                self._socket = None
+
+    def process_next_message(self) -> None:
+        self._handle_message(message=self._read_message())
+
+    def run(self) -> None:
+        """
+        Connect and apply changes until stop() is called, reconnecting after connection failures.
+        """
+        failedAttempts = 0
+        while not self._stopEvent.is_set():
+            try:
+                if self._socket is None:
+                    self.connect()
+                    failedAttempts = 0
+                self.process_next_message()
+            except (OSError, ConnectionError, ValueError, StreamException) as ex:
+                self.close()
+                if self._stopEvent.is_set():
+                    break
+                if isinstance(ex, StreamException):
+                    if ex.errorCode not in RECOVERABLE_ERROR_CODES:
+                        raise
+                    if ex.errorCode == INVALID_CLOCK:
+                        # resubscribe for a new image rather than from the rejected clock
+                        self.initialClk = None
+                        self.clk = None
+                failedAttempts += 1
+                if failedAttempts > self.maxReconnectAttempts:
+                    raise
+                logging.warning(msg=f"Stream connection lost, reconnecting: {ex}")
+                self._stopEvent.wait(
+                    timeout=self.reconnectDelay * 2 ** (failedAttempts - 1)
+                )
+        self.close()
+
+    def start(self) -> None:
+        """
+        Run in a background thread.  An exception that stops it is raised by join() or stop().
+        """
+        self._stopEvent.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run_in_thread, daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for the background thread to finish, and raise the exception it stopped with, if any.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                return
+            self._thread = None
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def stop(self) -> None:
+        self._stopEvent.set()
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.join()
+
+    def _run_in_thread(self) -> None:
+        try:
+            self.run()
+        except Exception as ex:
+            logging.exception(msg=ex)
+            self._error = ex
+
+    def _request(self, message: dict) -> dict:
+        self._messageId += 1
+        message = dict(message, id=self._messageId)
+        self._socket.sendall(dumps(message) + b"\r\n")
+        while True:
+            response = self._read_message()
+            if response.get("op") == "status" and response.get("id") == message["id"]:
+                if response.get("statusCode") != "SUCCESS":
+                    raise StreamException(
+                        errorCode=response.get("errorCode"),
+                        errorMessage=response.get("errorMessage", ""),
+                    )
+                return response
+            self._handle_message(message=response)
+
+    def _read_message(self) -> dict:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Stream connection closed by server")
+        return loads(line)
+
+    def _handle_message(self, message: dict) -> None:
+        operation = message.get("op")
+        if operation == "mcm":
+            self._handle_market_change_message(message=message)
+        elif operation == "status":
+            if message.get("statusCode") == "FAILURE":
+                raise StreamException(
+                    errorCode=message.get("errorCode"),
+                    errorMessage=message.get("errorMessage", ""),
+                )
+            if message.get("connectionClosed"):
+                raise ConnectionError("Stream connection closed by server")
+
+    def _handle_market_change_message(self, message: dict) -> None:
+        segmentType = message.get("segmentType")
+        if segmentType is not None:
+            if segmentType == SEG_START:
+                self._segment = None
+            message = self._merge_segment(message=message)
+            if segmentType != SEG_END:
+                self._segment = message
+                return
+            self._segment = None
+        if message.get("ct") == SUB_IMAGE:
+            self.cache.clear_ladders()
+        if "initialClk" in message:
+            self.initialClk = message["initialClk"]
+        if "clk" in message:
+            self.clk = message["clk"]
+        for marketChange in message.get("mc", []):
+            market = self.cache.apply_market_change(marketChange=marketChange)
+            for callback in self._callbacks:
+                callback(market)
+
+    def _merge_segment(self, message: dict) -> dict:
+        """
+        The segments received so far with this one, as a single message.
+        """
+        if self._segment is None:
+            return dict(message, mc=list(message.get("mc", [])))
+        merged = dict(self._segment)
+        merged.update((key, value) for key, value in message.items() if key != "mc")
+        merged["mc"] = self._segment["mc"] + message.get("mc", [])
+        return merged
+
+    def _socket_timeout(self) -> float:
+        # heartbeats arrive every heartbeatMs, so a silent socket for several intervals is dead
+        return max(self.heartbeatMs / 1000 * 3, 15.0)
@@ -0,0 +1,411 @@
+import json
+import threading
+import time
+
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+from ..async_betfair_client import AsyncBetfairApiClient
+from ..base_client import BaseBetfairApiClient
+from ..betfair_client import BetfairApiClient
+
+
+class FakeApiError(Exception):
+    """
+    Raised by a handler to answer with a JSON-RPC error, eg. FakeApiError("ANGX-0001") for TooMuchData.
+    """
+
+
+class FakeHttpError(Exception):
+    def __init__(self, statusCode: int = 503):
+        """
+        Raised by a handler to answer with an HTTP error status, eg. a 503 while Betfair is unavailable.
+        """
+        super().__init__(f"HTTP {statusCode}")
+        self.statusCode = statusCode
+
+
+class FakeBetfairServer:
+
+    LOGIN_PATH = "/api/certlogin"
+    KEEP_ALIVE_PATH = "/api/keepAlive"
+    BETTING_PATH = "/exchange/betting/json-rpc/v1"
+    ACCOUNT_PATH = "/exchange/account/json-rpc/v1"
+    SESSION_TOKEN = "fake-session-token"
+
+    def __init__(self, latency: float = 0.0, idleTimeout: Optional[float] = None):
+        """
+        Local HTTP/1.1 server standing in for the Betfair identity and JSON-RPC endpoints.
+        Counts TCP connections and requests so that tests can check connection reuse.
+
+        :param latency: (float)  Seconds to sleep before answering each request.
+        :param idleTimeout: (float)  Seconds after which the server closes an idle keep-alive connection.
+        """
+        self.latency = latency
+        self.idleTimeout = idleTimeout
+        self.sessionToken = self.SESSION_TOKEN
+        self.logins = 0
+        self.connectionsOpened = 0
+        self.requestsHandled = 0
+        self.methodCalls = []
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def set_handler(self, method: str, handler: Callable[[dict], object]) -> None:
+        """
+        :param method: (str)  Full JSON-RPC method name, eg. "SportsAPING/v1.0/listMarketBook".
+        :param handler: (callable)  Receives the request params and returns the JSON-RPC result.
+        """
+        self._handlers[method] = handler
+
+    def expire_session(self) -> None:
+        """
+        Reject the current session token until the client logs in again.
+        """
+        with self._lock:
+            self.sessionToken = None
+
+    def start(self) -> "FakeBetfairServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+            timeout = self.idleTimeout
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connectionsOpened += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with server._lock:
+                    server.requestsHandled += 1
+                if server.latency > 0:
+                    time.sleep(server.latency)
+                status, payload = server._dispatch(
+                    path=self.path, body=body, headers=self.headers
+                )
+                content = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> "FakeBetfairServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _dispatch(self, path: str, body: bytes, headers) -> tuple:
+        if path == self.LOGIN_PATH:
+            with self._lock:
+                self.logins += 1
+                if self.sessionToken is None:
+                    self.sessionToken = f"{self.SESSION_TOKEN}-{self.logins}"
+                return 200, {
+                    "sessionToken": self.sessionToken,
+                    "loginStatus": "SUCCESS",
+                }
+        isValidSession = headers.get("X-Authentication") == self.sessionToken
+        if path == self.KEEP_ALIVE_PATH:
+            if not isValidSession:
+                return 200, {"token": "", "status": "FAIL", "error": "NO_SESSION"}
+            return 200, {"token": self.sessionToken, "status": "SUCCESS", "error": ""}
+        if path not in (self.BETTING_PATH, self.ACCOUNT_PATH):
+            return 404, {"error": f"unknown path {path}"}
+        jsonrpcRequest = json.loads(body.decode("utf-8"))
+        method = jsonrpcRequest["method"]
+        with self._lock:
+            self.methodCalls.append(method)
+        if not isValidSession:
+            return 200, {
+                "jsonrpc": "2.0",
+                "error": {"code": -32099, "message": "ANGX-0003"},
+                "id": jsonrpcRequest.get("id"),
+            }
+        if method not in self._handlers:
+            return 200, {
+                "jsonrpc": "2.0",
+                "error": {"code": -32601, "message": "DSC-0021"},
+                "id": jsonrpcRequest.get("id"),
+            }
+        try:
+            result = self._handlers[method](jsonrpcRequest.get("params", {}))
+        except FakeApiError as ex:
+            return 200, {
+                "jsonrpc": "2.0",
+                "error": {"code": -32099, "message": str(ex)},
+                "id": jsonrpcRequest.get("id"),
+            }
+        except FakeHttpError as ex:
+            return ex.statusCode, {"error": str(ex)}
+        return 200, {"jsonrpc": "2.0", "result": result, "id": jsonrpcRequest.get("id")}
+
+
+def create_client(server: FakeBetfairServer, **kwargs) -> BetfairApiClient:
+    """
+    Build a BetfairApiClient whose endpoints all point at the fake server.
+    """
+    fakeClientClass = type(
+        "FakeServerBetfairApiClient",
+        (BetfairApiClient,),
+        _fake_endpoints(server=server),
+    )
+    return fakeClientClass(
+        username="username",
+        password="password",
+        apiKey="apiKey",
+        clientCertificatePath=None,
+        certificateKeyPath=None,
+        **kwargs,
+    )
+
+
+def create_async_client(server: FakeBetfairServer, **kwargs) -> AsyncBetfairApiClient:
+    """
+    Build an AsyncBetfairApiClient whose endpoints all point at the fake server.  Not yet logged in.
+    """
+    fakeClientClass = type(
+        "FakeServerAsyncBetfairApiClient",
+        (AsyncBetfairApiClient,),
+        _fake_endpoints(server=server),
+    )
+    return fakeClientClass(
+        username="username",
+        password="password",
+        apiKey="apiKey",
+        clientCertificatePath=None,
+        certificateKeyPath=None,
+        **kwargs,
+    )
+
+
+def _fake_endpoints(server: FakeBetfairServer) -> Dict[str, str]:
+    return {
+        "LOGIN_ENDPOINT": server.url + FakeBetfairServer.LOGIN_PATH,
+        "KEEP_ALIVE_ENDPOINT": server.url + FakeBetfairServer.KEEP_ALIVE_PATH,
+        "BETTING_ENDPOINT": server.url + FakeBetfairServer.BETTING_PATH,
+        "ACCOUNT_ENDPOINT": server.url + FakeBetfairServer.ACCOUNT_PATH,
+    }
+
+
+def build_market_book(
+    marketId: str, selectionIds: List[int], depth: int = 3, isMarketDataDelayed=False
+) -> dict:
+    """
+    Synthetic listMarketBook entry with `depth` back and lay levels per runner.
+    """
+    runners = []
+    for i, selectionId in enumerate(selectionIds):
+        bestBack = round(2.0 + i * 0.5, 2)
+        runners.append(
+            {
+                "selectionId": selectionId,
+                "handicap": 0.0,
+                "status": "ACTIVE",
+                "ex": {
+                    "availableToBack": [
+                        {
+                            "price": round(bestBack - level * 0.02, 2),
+                            "size": 10.0 + level,
+                        }
+                        for level in range(depth)
+                    ],
+                    "availableToLay": [
+                        {
+                            "price": round(bestBack + 0.02 + level * 0.02, 2),
+                            "size": 20.0 + level,
+                        }
+                        for level in range(depth)
+                    ],
+                    "tradedVolume": [],
+                },
+            }
+        )
+    return {
+        "marketId": marketId,
+        "isMarketDataDelayed": isMarketDataDelayed,
+        "status": "OPEN",
+        "inplay": False,
+        "totalMatched": 0.0,
+        "runners": runners,
+    }
+
+
+def build_catalogue_market(
+    marketId: str,
+    eventId: int,
+    selectionIds: List[int],
+    marketStartTime: str = "2020-08-04T19:00:00.000Z",
+    marketType: str = "MATCH_ODDS",
+) -> dict:
+    """
+    Synthetic listMarketCatalogue entry with the projections requested by get_coming_events.
+    """
+    return {
+        "marketId": marketId,
+        "marketName": marketType.replace("_", " ").title(),
+        "marketStartTime": marketStartTime,
+        "description": {"marketType": marketType},
+        "totalMatched": 0.0,
+        "runners": [
+            {
+                "selectionId": selectionId,
+                "runnerName": f"runner {selectionId}",
+                "handicap": 0.0,
+                "sortPriority": i + 1,
+            }
+            for i, selectionId in enumerate(selectionIds)
+        ],
+        "eventType": {"id": "1", "name": "Soccer"},
+        "competition": {"id": "10932509", "name": "English Premier League"},
+        "event": {
+            "id": str(eventId),
+            "name": f"event {eventId}",
+            "countryCode": "GB",
+            "timezone": "GMT",
+            "openDate": marketStartTime,
+        },
+    }
+
+
+class SyntheticMarkets:
+
+    LIST_MARKET_CATALOGUE = "SportsAPING/v1.0/listMarketCatalogue"
+    LIST_MARKET_BOOK = "SportsAPING/v1.0/listMarketBook"
+    PLACE_ORDERS = "SportsAPING/v1.0/placeOrders"
+
+    def __init__(
+        self,
+        numMarkets: int,
+        marketsPerEvent: int = 3,
+        selectionIds: List[int] = (101, 102, 103),
+        depth: int = 3,
+        marketType: str = "MATCH_ODDS",
+    ):
+        """
+        listMarketCatalogue, listMarketBook and placeOrders handlers over `numMarkets` synthetic markets
+        starting evenly over the next six days.  Catalogue and market book entries are built once, so
+        that serving them costs little more than encoding the response.
+
+        :param depth: (int)  Back and lay levels per runner in the market books.
+        """
+        self.numMarkets = numMarkets
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.catalogue = []
+        self.marketBooks = {}
+        for i in range(numMarkets):
+            marketId = f"1.{i}"
+            marketStartTime = (
+                start + timedelta(days=1) + i * timedelta(days=6) / numMarkets
+            )
+            self.catalogue.append(
+                (
+                    marketStartTime,
+                    build_catalogue_market(
+                        marketId=marketId,
+                        eventId=i // marketsPerEvent,
+                        selectionIds=list(selectionIds),
+                        marketStartTime=marketStartTime.strftime(
+                            BaseBetfairApiClient.BETFAIR_DATETIME_FORMAT
+                        ),
+                        marketType=marketType,
+                    ),
+                )
+            )
+            self.marketBooks[marketId] = build_market_book(
+                marketId=marketId, selectionIds=list(selectionIds), depth=depth
+            )
+        self.betsPlaced = 0
+        self._lock = threading.Lock()
+
+    def install(self, server: FakeBetfairServer) -> FakeBetfairServer:
+        server.set_handler(
+            method=self.LIST_MARKET_CATALOGUE, handler=self.list_market_catalogue
+        )
+        server.set_handler(method=self.LIST_MARKET_BOOK, handler=self.list_market_book)
+        server.set_handler(method=self.PLACE_ORDERS, handler=self.place_orders)
+        return server
+
+    def list_market_catalogue(self, params: dict) -> List[dict]:
+        marketFilter = params["filter"]
+        windowStart = self._parse_window_time(
+            windowTime=marketFilter["marketStartTime"]["from"]
+        )
+        windowEnd = self._parse_window_time(
+            windowTime=marketFilter["marketStartTime"]["to"]
+        )
+        marketTypes = marketFilter.get("marketTypeCodes")
+        matching = [
+            rawMarket
+            for marketStartTime, rawMarket in self.catalogue
+            if windowStart <= marketStartTime <= windowEnd
+            and (
+                not marketTypes or rawMarket["description"]["marketType"] in marketTypes
+            )
+        ]
+        return matching[: params["maxResults"]]
+
+    def list_market_book(self, params: dict) -> List[dict]:
+        return [
+            self.marketBooks[marketId]
+            for marketId in params["marketIds"]
+            if marketId in self.marketBooks
+        ]
+
+    def place_orders(self, params: dict) -> dict:
+        with self._lock:
+            firstBetId = self.betsPlaced
+            self.betsPlaced += len(params["instructions"])
+        return {
+            "status": "SUCCESS",
+            "marketId": params["marketId"],
+            "customerRef": params.get("customerRef"),
+            "instructionReports": [
+                {
+                    "status": "SUCCESS",
+                    "instruction": instruction,
+                    "betId": str(firstBetId + index),
+                    "sizeMatched": 0.0,
+                }
+                for index, instruction in enumerate(params["instructions"])
+            ],
+        }
+
+    @staticmethod
+    def _parse_window_time(windowTime: str) -> datetime:
+        if len(windowTime) == len("2020-08-04"):
+            return datetime.strptime(windowTime, "%Y-%m-%d")
+        return datetime.strptime(
+            windowTime, BaseBetfairApiClient.CATALOGUE_WINDOW_FORMAT
+        )
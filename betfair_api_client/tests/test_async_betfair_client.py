@@ -0,0 +1,163 @@
+import asyncio
+import urllib.error
+from unittest import IsolatedAsyncioTestCase, mock
+
+from betfair_api_client.betfair_api_client.async_transport import (
+    AsyncPooledHttpTransport,
+    AsyncTransport,
+    _AsyncConnection,
+)
+from betfair_api_client.betfair_api_client.datamodel.bet_types import BetTypes
+from betfair_api_client.betfair_api_client.datamodel.competition import Competition
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeBetfairServer,
+    build_market_book,
+    create_async_client,
+)
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+    build_events,
+)
+
+
+class TestAsyncBetfairClient(IsolatedAsyncioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeBetfairServer().start()
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listCompetitions",
+            handler=lambda params: [
+                {"competition": {"id": "10932509", "name": "English Premier League"}}
+            ],
+        )
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listMarketBook",
+            handler=lambda params: [
+                build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+                for marketId in params["marketIds"]
+            ],
+        )
+        self.server.set_handler(
+            method="SportsAPING/v1.0/placeOrders",
+            handler=lambda params: {
+                "status": "SUCCESS",
+                "marketId": params["marketId"],
+                "instructionReports": [],
+            },
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.server.stop()
+
+    async def test_login_and_heartbeat(self):
+        async with create_async_client(server=self.server) as client:
+            self.assertEqual(client.sessionToken, FakeBetfairServer.SESSION_TOKEN)
+            response = await client.send_heartbeat()
+            self.assertTrue(response.ok)
+
+    async def test_list_competitions(self):
+        async with create_async_client(server=self.server) as client:
+            competitions = await client.list_competitions(sportTypeIds=[1])
+        self.assertEqual(
+            competitions,
+            [
+                Competition(
+                    competitionId=10932509, competitionName="English Premier League"
+                )
+            ],
+        )
+
+    async def test_concurrent_calls_share_pooled_connections(self):
+        transport = AsyncPooledHttpTransport(poolSize=5)
+        async with create_async_client(
+            server=self.server, transport=transport
+        ) as client:
+            results = await asyncio.gather(
+                *[client.list_competitions(sportTypeIds=[1]) for _ in range(200)]
+            )
+            poolStats = list(transport.get_pool_stats().values())[0]
+        self.assertEqual(len(results), 200)
+        self.assertTrue(self.server.connectionsOpened <= 5)
+        self.assertEqual(poolStats["requestsSent"], 201)
+
+    async def test_update_prices_for_events(self):
+        events = build_events(numEvents=30, marketsPerEvent=3)
+        async with create_async_client(server=self.server) as client:
+            updatedEvents = await client.update_prices_for_events(events=events)
+        self.assertEqual(
+            self.server.methodCalls.count("SportsAPING/v1.0/listMarketBook"), 3
+        )
+        for event in updatedEvents:
+            for market in event.get_all_markets():
+                for runner in market.get_all_runners():
+                    self.assertTrue(runner.get_best_back_price().price > 0)
+
+    async def test_update_prices_for_markets(self):
+        markets = build_events(numEvents=1, marketsPerEvent=2)[0].get_all_markets()
+        async with create_async_client(server=self.server) as client:
+            updatedMarkets = await client.update_prices_for_markets(markets=markets)
+        bestLayPrice = updatedMarkets[0].runners[SELECTION_IDS[0]].get_best_lay_price()
+        self.assertEqual(bestLayPrice.price, 2.02)
+
+    async def test_get_price_changes_for_events(self):
+        events = build_events(numEvents=2, marketsPerEvent=1)
+        async with create_async_client(server=self.server) as client:
+            firstChanges = await client.get_price_changes_for_events(events=events)
+            secondChanges = await client.get_price_changes_for_events(events=events)
+        self.assertEqual(len(firstChanges), 2 * 3 * 6)
+        self.assertEqual(
+            {priceChange.marketId for priceChange in firstChanges}, {"1.0", "1.1"}
+        )
+        self.assertEqual(secondChanges, [])
+
+    async def test_place_bet(self):
+        market = build_events(numEvents=1, marketsPerEvent=1)[0].get_all_markets()[0]
+        async with create_async_client(server=self.server) as client:
+            response = await client.place_bet(
+                market=market,
+                runner=market.runners[SELECTION_IDS[0]],
+                oddsToPlace=2.0,
+                side="BACK",
+                betSize=2.0,
+            )
+        self.assertEqual(response["status"], "SUCCESS")
+
+    async def test_connection_error_raises_url_error(self):
+        client = create_async_client(server=self.server)
+        client.LOGIN_ENDPOINT = "http://127.0.0.1:1" + FakeBetfairServer.LOGIN_PATH
+        with self.assertRaises(urllib.error.URLError):
+            await client.login()
+        await client.close()
+
+    async def test_stale_reused_connection(self):
+        server = FakeBetfairServer(idleTimeout=0.1).start()
+        transport = AsyncPooledHttpTransport()
+        url = server.url + "/missing"
+        try:
+            for idempotent in [True, False]:
+                await transport.post(url=url, data=b"", headers={})
+                await asyncio.sleep(0.3)
+                # as if the server closed the connection just after the pool checked it
+                with mock.patch.object(
+                    _AsyncConnection, "is_usable", return_value=True
+                ):
+                    if idempotent:
+                        response = await transport.post(
+                            url=url, data=b"", headers={}, idempotent=True
+                        )
+                        self.assertEqual(response.status_code, 404)
+                    else:
+                        with self.assertRaises(urllib.error.URLError):
+                            await transport.post(url=url, data=b"", headers={})
+            stats = list(transport.get_pool_stats().values())[0]
+        finally:
+            await transport.close()
+            server.stop()
+        self.assertEqual(stats["staleConnectionRetries"], 1)
+        self.assertEqual(server.connectionsOpened, 2)
+        self.assertEqual(server.requestsHandled, 3)
+
+    def test_transport_is_abstract(self):
+        with self.assertRaises(TypeError):
+            AsyncTransport()
@@ -0,0 +1,275 @@
+import threading
+import time
+from datetime import datetime
+from unittest import TestCase
+
+from betfair_api_client.betfair_api_client.datamodel.competition import Competition
+from betfair_api_client.betfair_api_client.datamodel.event import Event
+from betfair_api_client.betfair_api_client.datamodel.price_change import PriceChange
+from betfair_api_client.betfair_api_client.datamodel.price_data import PriceData
+from betfair_api_client.betfair_api_client.datamodel.price_projection import (
+    PriceProjection,
+)
+from betfair_api_client.betfair_api_client.datamodel.market import Market
+from betfair_api_client.betfair_api_client.datamodel.runner import Runner
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeBetfairServer,
+    SyntheticMarkets,
+    build_market_book,
+    create_client,
+)
+
+SELECTION_IDS = [101, 102, 103]
+
+
+def build_events(numEvents: int, marketsPerEvent: int):
+    events = []
+    for eventNumber in range(numEvents):
+        event = Event(
+            eventId=eventNumber,
+            eventName=f"event {eventNumber}",
+            eventDate=datetime(year=2020, month=8, day=4),
+            competition=Competition(competitionName="competition", competitionId=1),
+            countryCode="GB",
+        )
+        for marketNumber in range(marketsPerEvent):
+            market = Market(
+                marketId=f"1.{eventNumber * marketsPerEvent + marketNumber}",
+                marketName=f"market {marketNumber}",
+                marketStartTime=datetime(year=2020, month=8, day=4),
+            )
+            for selectionId in SELECTION_IDS:
+                market.add_runner(
+                    runner=Runner(
+                        runnerId=selectionId,
+                        runnerName=f"runner {selectionId}",
+                        handicap=0.0,
+                    )
+                )
+            event.add_market(market=market)
+        events.append(event)
+    return events
+
+
+class TestBetfairClientOffline(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeBetfairServer(latency=0.05).start()
+        self.requestedMarketIds = []
+        self.inFlight = 0
+        self.maxInFlight = 0
+        self.lock = threading.Lock()
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listMarketBook",
+            handler=self._list_market_book,
+        )
+        self.client = create_client(server=self.server, maxConcurrentRequests=4)
+
+    def tearDown(self):
+        super().tearDown()
+        self.client.close()
+        self.server.stop()
+
+    def _list_market_book(self, params):
+        with self.lock:
+            self.requestedMarketIds.append(params["marketIds"])
+            self.inFlight += 1
+            self.maxInFlight = max(self.maxInFlight, self.inFlight)
+        time.sleep(0.05)
+        with self.lock:
+            self.inFlight -= 1
+        return [
+            build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+            for marketId in params["marketIds"]
+        ]
+
+    def test_update_prices_for_events_batches_markets(self):
+        events = build_events(numEvents=100, marketsPerEvent=3)
+        updatedEvents = self.client.update_prices_for_events(events=events)
+        self.assertTrue(updatedEvents is events)
+        self.assertEqual(len(self.requestedMarketIds), 8)
+        self.assertTrue(all(len(chunk) <= 40 for chunk in self.requestedMarketIds))
+        self.assertEqual(
+            sorted(m for chunk in self.requestedMarketIds for m in chunk),
+            sorted(m for event in events for m in event.markets),
+        )
+        self.assertTrue(self.maxInFlight > 1)
+        self.assertTrue(self.maxInFlight <= 4)
+        for event in updatedEvents:
+            for market in event.get_all_markets():
+                for runner in market.get_all_runners():
+                    self.assertTrue(runner.get_best_back_price().price > 0)
+                    self.assertTrue(runner.get_best_lay_price().price > 0)
+
+    def test_update_prices_for_markets(self):
+        markets = build_events(numEvents=1, marketsPerEvent=2)[0].get_all_markets()
+        updatedMarkets = self.client.update_prices_for_markets(markets=markets)
+        self.assertEqual(len(self.requestedMarketIds), 1)
+        self.assertEqual(
+            [market.marketId for market in updatedMarkets],
+            [market.marketId for market in markets],
+        )
+        bestBackPrice = (
+            updatedMarkets[0].runners[SELECTION_IDS[0]].get_best_back_price()
+        )
+        self.assertEqual(bestBackPrice.price, 2.0)
+        self.assertEqual(bestBackPrice.size, 10.0)
+
+    def test_update_prices_for_markets_with_no_existing_runners(self):
+        market = Market(
+            marketId="1.1",
+            marketName="market",
+            marketStartTime=datetime(year=2020, month=8, day=4),
+        )
+        self.assertRaises(Exception, self.client.update_prices_for_markets, [market])
+
+    def test_get_price_changes_for_markets(self):
+        markets = build_events(numEvents=1, marketsPerEvent=2)[0].get_all_markets()
+        priceChanges = self.client.get_price_changes_for_markets(markets=markets)
+        # 2 markets x 3 runners x 3 back and 3 lay levels, all new
+        self.assertEqual(len(priceChanges), 36)
+        self.assertEqual(
+            priceChanges[0],
+            PriceChange(
+                marketId="1.0",
+                selectionId=SELECTION_IDS[0],
+                betType="availableToBack",
+                price=2.0,
+                oldSize=0.0,
+                newSize=10.0,
+            ),
+        )
+        self.assertEqual(self.client.get_price_changes_for_markets(markets=markets), [])
+        runner = markets[1].runners[SELECTION_IDS[2]]
+        runner.update_lay_levels(levels=[{"price": 3.02, "size": 25.0}])
+        self.assertEqual(
+            self.client.get_price_changes_for_markets(markets=markets),
+            [
+                PriceChange(
+                    marketId="1.1",
+                    selectionId=SELECTION_IDS[2],
+                    betType="availableToLay",
+                    price=3.02,
+                    oldSize=25.0,
+                    newSize=20.0,
+                ),
+                PriceChange(
+                    marketId="1.1",
+                    selectionId=SELECTION_IDS[2],
+                    betType="availableToLay",
+                    price=3.04,
+                    oldSize=0.0,
+                    newSize=21.0,
+                ),
+                PriceChange(
+                    marketId="1.1",
+                    selectionId=SELECTION_IDS[2],
+                    betType="availableToLay",
+                    price=3.06,
+                    oldSize=0.0,
+                    newSize=22.0,
+                ),
+            ],
+        )
+
+
+class TestPriceProjections(TestCase):
+    def test_projection_flows_through_to_the_model(self):
+        requests = []
+
+        def list_market_book(params):
+            requests.append(params)
+            marketBooks = []
+            for marketId in params["marketIds"]:
+                marketBook = build_market_book(
+                    marketId=marketId, selectionIds=SELECTION_IDS, depth=10
+                )
+                marketBook.update(
+                    {"inplay": True, "totalMatched": 1500.5, "betDelay": 5}
+                )
+                for runner in marketBook["runners"]:
+                    runner["lastPriceTraded"] = 2.5
+                    runner["totalMatched"] = 500.0
+                    runner["sp"] = {"nearPrice": 2.4, "farPrice": 2.6}
+                    runner["ex"]["tradedVolume"] = [
+                        {"price": 2.52, "size": 100.0},
+                        {"price": 2.5, "size": 400.0},
+                    ]
+                    del runner["ex"]["availableToLay"]
+                marketBooks.append(marketBook)
+            return marketBooks
+
+        with FakeBetfairServer() as server:
+            server.set_handler(
+                method="SportsAPING/v1.0/listMarketBook", handler=list_market_book
+            )
+            client = create_client(
+                server=server,
+                priceProjection=PriceProjection(
+                    priceData=[
+                        PriceData.EX_BEST_OFFERS,
+                        PriceData.EX_TRADED,
+                        PriceData.SP_TRADED,
+                    ],
+                    bestPricesDepth=10,
+                    virtualise=True,
+                ),
+            )
+            markets = build_events(numEvents=6, marketsPerEvent=1)
+            markets = [event.get_all_markets()[0] for event in markets]
+            layRunner = markets[0].runners[SELECTION_IDS[0]]
+            layRunner.update_lay_levels(levels=[{"price": 2.1, "size": 3.0}])
+            client.update_prices_for_markets(markets=markets)
+            client.close()
+        # a market weighs 17 (5 * 10 / 3 rounded up) + 17 + 7, so four fit in a request
+        self.assertEqual([len(params["marketIds"]) for params in requests], [4, 2])
+        self.assertEqual(
+            requests[0]["priceProjection"],
+            {
+                "priceData": ["EX_BEST_OFFERS", "EX_TRADED", "SP_TRADED"],
+                "exBestOffersOverrides": {"bestPricesDepth": 10},
+                "virtualise": True,
+            },
+        )
+        market = markets[0]
+        self.assertEqual(market.status, "OPEN")
+        self.assertTrue(market.inPlay)
+        self.assertEqual(market.totalMatched, 1500.5)
+        self.assertEqual(market.betDelay, 5)
+        runner = market.runners[SELECTION_IDS[0]]
+        self.assertEqual(len(runner.availableToBack), 10)
+        self.assertEqual(runner.get_best_lay_price().price, 2.1)
+        self.assertEqual(runner.status, "ACTIVE")
+        self.assertEqual(runner.lastPriceTraded, 2.5)
+        self.assertEqual(runner.totalMatched, 500.0)
+        self.assertEqual((runner.nearPrice, runner.farPrice), (2.4, 2.6))
+        self.assertIsNone(runner.actualSP)
+        self.assertEqual(list(runner.tradedLadder.prices), [2.5, 2.52])
+        self.assertEqual(runner.tradedVolume[0].size, 400.0)
+
+
+class TestSyntheticMarkets(TestCase):
+    def test_round_trip(self):
+        syntheticMarkets = SyntheticMarkets(numMarkets=2500, depth=5)
+        with FakeBetfairServer() as server:
+            syntheticMarkets.install(server=server)
+            client = create_client(server=server)
+            events = client.get_coming_events(sportTypeId=1, marketTypes=["MATCH_ODDS"])
+            markets = [market for event in events for market in event.get_all_markets()]
+            client.update_prices_for_markets(markets=markets)
+            response = client.place_bet(
+                market=markets[0],
+                runner=markets[0].runners[101],
+                oddsToPlace=2.0,
+                side="BACK",
+                betSize=2.0,
+            )
+            client.close()
+        self.assertEqual(len(events), 834)
+        self.assertEqual(
+            sorted(market.marketId for market in markets),
+            sorted(syntheticMarkets.marketBooks),
+        )
+        self.assertEqual(markets[0].runners[101].get_best_back_price().price, 2.0)
+        self.assertEqual(response["status"], "SUCCESS")
+        self.assertEqual(syntheticMarkets.betsPlaced, 1)
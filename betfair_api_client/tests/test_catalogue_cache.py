@@ -0,0 +1,89 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from betfair_api_client.betfair_api_client.catalogue_cache import CatalogueCache
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeBetfairServer,
+    build_catalogue_market,
+    create_client,
+)
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+)
+
+LIST_MARKET_CATALOGUE = "SportsAPING/v1.0/listMarketCatalogue"
+
+
+class TestCatalogueCache(TestCase):
+    def test_key_ignores_filter_order(self):
+        self.assertEqual(
+            CatalogueCache.make_key(
+                method="m", params={"filter": {"a": [2, 1], "b": ["x", "y"]}}
+            ),
+            CatalogueCache.make_key(
+                method="m", params={"filter": {"b": ["y", "x"], "a": [1, 2]}}
+            ),
+        )
+        self.assertNotEqual(
+            CatalogueCache.make_key(method="m", params={"filter": {"a": [1]}}),
+            CatalogueCache.make_key(method="m", params={"filter": {"a": [2]}}),
+        )
+
+    def test_lru_eviction_and_ttl(self):
+        cache = CatalogueCache(maxEntries=2)
+        cache.set(key="a", value=[1])
+        cache.set(key="b", value=[2])
+        self.assertEqual(cache.get(key="a"), [1])
+        cache.set(key="c", value=[3])
+        self.assertIsNone(cache.get(key="b"))
+        self.assertEqual(cache.get(key="a"), [1])
+        cache.set(key="d", value=[4], ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get(key="d"))
+        self.assertEqual(
+            cache.get_stats(), {"hits": 2, "misses": 2, "evictions": 2, "entries": 1}
+        )
+
+    def test_disk_store_survives_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catalogue.sqlite")
+            cache = CatalogueCache(path=path)
+            cache.set(key="a", value=[{"marketId": "1.1"}])
+            cache.set(key="expired", value=[], ttl=-1)
+            cache.close()
+            restartedCache = CatalogueCache(path=path)
+            self.assertEqual(restartedCache.get(key="a"), [{"marketId": "1.1"}])
+            self.assertIsNone(restartedCache.get(key="expired"))
+            restartedCache.close()
+
+
+class TestClientCatalogueCache(TestCase):
+    def test_get_coming_events_uses_cache(self):
+        with FakeBetfairServer() as server:
+            server.set_handler(
+                method=LIST_MARKET_CATALOGUE,
+                handler=lambda params: [
+                    build_catalogue_market(
+                        marketId="1.1", eventId=1, selectionIds=SELECTION_IDS
+                    )
+                ],
+            )
+            cache = CatalogueCache()
+            client = create_client(server=server, catalogueCache=cache)
+            firstEvents = client.get_coming_events(
+                sportTypeId=1, marketTypes=["MATCH_ODDS"]
+            )
+            secondEvents = client.get_coming_events(
+                sportTypeId=1, marketTypes=["MATCH_ODDS"]
+            )
+            client.get_coming_events(sportTypeId=1, marketTypes=["OVER_UNDER_25"])
+            client.close()
+        self.assertEqual(server.methodCalls.count(LIST_MARKET_CATALOGUE), 2)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 2)
+        firstMarket = firstEvents[0].get_all_markets()[0]
+        secondMarket = secondEvents[0].get_all_markets()[0]
+        self.assertEqual(firstMarket.marketId, secondMarket.marketId)
+        self.assertFalse(firstMarket is secondMarket)
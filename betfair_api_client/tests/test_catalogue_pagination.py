@@ -0,0 +1,201 @@
+import threading
+import warnings
+from datetime import datetime, timedelta
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from betfair_api_client.betfair_api_client.base_client import BaseBetfairApiClient
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeApiError,
+    FakeBetfairServer,
+    build_catalogue_market,
+    create_async_client,
+    create_client,
+)
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+)
+
+MARKET_TYPES = ["MATCH_ODDS", "OVER_UNDER_25"]
+
+
+class FakeCatalogue:
+    def __init__(self, numMarkets: int, tooMuchDataAbove: int):
+        """
+        listMarketCatalogue handler over markets spread evenly across the next six days.
+        Filters by market type and start time, fails with TooMuchData when more than tooMuchDataAbove
+        markets match, and otherwise returns at most maxResults of them.
+        """
+        self.tooMuchDataAbove = tooMuchDataAbove
+        self.requests = []
+        self._lock = threading.Lock()
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.markets = []
+        for i in range(numMarkets):
+            marketStartTime = (
+                start + timedelta(days=1) + i * timedelta(days=6) / numMarkets
+            )
+            self.markets.append(
+                (
+                    marketStartTime,
+                    build_catalogue_market(
+                        marketId=f"1.{i}",
+                        eventId=i // 2,
+                        selectionIds=SELECTION_IDS,
+                        marketStartTime=marketStartTime.strftime(
+                            BaseBetfairApiClient.BETFAIR_DATETIME_FORMAT
+                        ),
+                        marketType=MARKET_TYPES[i % 2],
+                    ),
+                )
+            )
+
+    def __call__(self, params):
+        with self._lock:
+            self.requests.append(params)
+        matching = self._get_matching(marketFilter=params["filter"])
+        if len(matching) > self.tooMuchDataAbove:
+            raise FakeApiError("ANGX-0001")
+        return matching[: params["maxResults"]]
+
+    def list_events(self, params):
+        eventIds = []
+        for rawMarket in self._get_matching(marketFilter=params["filter"]):
+            if rawMarket["event"]["id"] not in eventIds:
+                eventIds.append(rawMarket["event"]["id"])
+        return [{"event": {"id": eventId}, "marketCount": 1} for eventId in eventIds]
+
+    def _get_matching(self, marketFilter: dict) -> list:
+        windowStart = self._parse(marketFilter["marketStartTime"]["from"])
+        windowEnd = self._parse(marketFilter["marketStartTime"]["to"])
+        return [
+            rawMarket
+            for marketStartTime, rawMarket in self.markets
+            if windowStart <= marketStartTime <= windowEnd
+            and rawMarket["description"]["marketType"]
+            in marketFilter["marketTypeCodes"]
+            and rawMarket["event"]["id"]
+            in marketFilter.get("eventIds", [rawMarket["event"]["id"]])
+        ]
+
+    @staticmethod
+    def _parse(windowTime: str) -> datetime:
+        if len(windowTime) == len("2020-08-04"):
+            return datetime.strptime(windowTime, "%Y-%m-%d")
+        return datetime.strptime(windowTime, "%Y-%m-%dT%H:%M:%SZ")
+
+
+class TestCataloguePagination(TestCase):
+    def _get_coming_events(self, catalogue: FakeCatalogue):
+        with FakeBetfairServer() as server:
+            server.set_handler(
+                method="SportsAPING/v1.0/listMarketCatalogue", handler=catalogue
+            )
+            server.set_handler(
+                method="SportsAPING/v1.0/listEvents", handler=catalogue.list_events
+            )
+            client = create_client(server=server, maxConcurrentRequests=4)
+            events = client.get_coming_events(sportTypeId=1, marketTypes=MARKET_TYPES)
+            client.close()
+        return events
+
+    def test_single_page(self):
+        catalogue = FakeCatalogue(numMarkets=150, tooMuchDataAbove=1000)
+        events = self._get_coming_events(catalogue=catalogue)
+        self.assertEqual(len(catalogue.requests), 1)
+        self.assertEqual(catalogue.requests[0]["maxResults"], 200)
+        self.assertEqual(sum(len(event.markets) for event in events), 150)
+
+    def test_splits_full_pages_and_too_much_data(self):
+        catalogue = FakeCatalogue(numMarkets=1500, tooMuchDataAbove=600)
+        events = self._get_coming_events(catalogue=catalogue)
+        marketIds = [marketId for event in events for marketId in event.markets]
+        self.assertEqual(len(marketIds), 1500)
+        self.assertEqual(len(set(marketIds)), 1500)
+        self.assertTrue(
+            all(
+                len(params["filter"]["marketTypeCodes"]) == 1
+                for params in catalogue.requests[1:]
+            )
+        )
+
+    @staticmethod
+    def _build_simultaneous_markets(numMarkets: int, marketsPerEvent: int):
+        """
+        Markets of one type all starting at the same time, which no window split separates.
+        """
+        catalogue = FakeCatalogue(numMarkets=numMarkets, tooMuchDataAbove=1000)
+        marketStartTime = catalogue.markets[0][0]
+        catalogue.markets = [
+            (
+                marketStartTime,
+                dict(
+                    rawMarket,
+                    description={"marketType": "MATCH_ODDS"},
+                    event=dict(rawMarket["event"], id=str(i // marketsPerEvent)),
+                ),
+            )
+            for i, (_, rawMarket) in enumerate(catalogue.markets)
+        ]
+        return catalogue
+
+    def test_splits_minimal_window_by_event(self):
+        catalogue = self._build_simultaneous_markets(
+            numMarkets=300, marketsPerEvent=100
+        )
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            events = self._get_coming_events(catalogue=catalogue)
+        self.assertEqual(sum(len(event.markets) for event in events), 300)
+        self.assertEqual(len(events), 3)
+        self.assertEqual(caught, [])
+        self.assertEqual(
+            sorted(
+                params["filter"]["eventIds"]
+                for params in catalogue.requests
+                if "eventIds" in params["filter"]
+            ),
+            [["0"], ["1"], ["2"]],
+        )
+
+    def test_warns_when_window_can_not_be_split(self):
+        # 300 markets of one event starting at the same time never fit in one page
+        catalogue = self._build_simultaneous_markets(
+            numMarkets=300, marketsPerEvent=300
+        )
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            events = self._get_coming_events(catalogue=catalogue)
+        self.assertEqual(sum(len(event.markets) for event in events), 200)
+        self.assertTrue(any("some are missing" in str(w.message) for w in caught))
+        self.assertTrue(len(catalogue.requests) < 50)
+
+
+class TestAsyncCataloguePagination(IsolatedAsyncioTestCase):
+    async def test_splits_pages(self):
+        catalogue = FakeCatalogue(numMarkets=900, tooMuchDataAbove=1000)
+        with FakeBetfairServer() as server:
+            server.set_handler(
+                method="SportsAPING/v1.0/listMarketCatalogue", handler=catalogue
+            )
+            async with create_async_client(server=server) as client:
+                events = await client.get_coming_events(
+                    sportTypeId=1, marketTypes=MARKET_TYPES
+                )
+        self.assertEqual(sum(len(event.markets) for event in events), 900)
+
+    async def test_splits_minimal_window_by_event(self):
+        catalogue = TestCataloguePagination._build_simultaneous_markets(
+            numMarkets=300, marketsPerEvent=100
+        )
+        with FakeBetfairServer() as server:
+            server.set_handler(
+                method="SportsAPING/v1.0/listMarketCatalogue", handler=catalogue
+            )
+            server.set_handler(
+                method="SportsAPING/v1.0/listEvents", handler=catalogue.list_events
+            )
+            async with create_async_client(server=server) as client:
+                events = await client.get_coming_events(
+                    sportTypeId=1, marketTypes=MARKET_TYPES
+                )
+        self.assertEqual(sum(len(event.markets) for event in events), 300)
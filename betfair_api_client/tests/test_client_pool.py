@@ -0,0 +1,277 @@
+import threading
+import time
+from unittest import TestCase
+
+from betfair_api_client.betfair_api_client.client_pool import (
+    BetfairClientPool,
+    RoutingStrategies,
+)
+from betfair_api_client.betfair_api_client.datamodel.exceptions import (
+    BetfairException,
+    TooMuchData,
+)
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeApiError,
+    FakeBetfairServer,
+    FakeHttpError,
+    build_market_book,
+    create_client,
+)
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+    build_events,
+)
+
+
+class TestBetfairClientPool(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.servers = [FakeBetfairServer(latency=0.01).start() for _ in range(3)]
+        self.requestedMarketIds = [[] for _ in self.servers]
+        self.lock = threading.Lock()
+        for serverIndex, server in enumerate(self.servers):
+            server.set_handler(
+                method="SportsAPING/v1.0/listMarketBook",
+                handler=self._build_handler(serverIndex=serverIndex),
+            )
+        self.events = build_events(numEvents=100, marketsPerEvent=3)
+
+    def tearDown(self):
+        super().tearDown()
+        for server in self.servers:
+            server.stop()
+
+    def _build_handler(self, serverIndex: int):
+        def list_market_book(params):
+            with self.lock:
+                self.requestedMarketIds[serverIndex].extend(params["marketIds"])
+            time.sleep(0.02)
+            return [
+                build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+                for marketId in params["marketIds"]
+            ]
+
+        return list_market_book
+
+    def _create_pool(self, **kwargs) -> BetfairClientPool:
+        return BetfairClientPool(
+            clients=[
+                create_client(server=server, maxConcurrentRequests=2)
+                for server in self.servers
+            ],
+            **kwargs,
+        )
+
+    def _assert_all_updated(self):
+        for event in self.events:
+            for market in event.get_all_markets():
+                runner = market.runners[SELECTION_IDS[0]]
+                self.assertEqual(runner.get_best_back_price().price, 2.0)
+
+    def test_least_loaded(self):
+        pool = self._create_pool(routing=RoutingStrategies.LEAST_LOADED)
+        try:
+            self.assertTrue(
+                pool.update_prices_for_events(events=self.events) is self.events
+            )
+            stats = pool.get_stats()
+        finally:
+            pool.close()
+        self._assert_all_updated()
+        self.assertEqual(
+            sorted(m for marketIds in self.requestedMarketIds for m in marketIds),
+            sorted(m for event in self.events for m in event.markets),
+        )
+        # 300 markets make 8 requests, shared between all three accounts
+        self.assertEqual(sum(clientStats["requestsRouted"] for clientStats in stats), 8)
+        self.assertTrue(
+            all(clientStats["requestsRouted"] >= 2 for clientStats in stats)
+        )
+        self.assertTrue(all(clientStats["inFlight"] == 0 for clientStats in stats))
+
+    def test_consistent_hash_keeps_markets_on_one_client(self):
+        pool = self._create_pool(routing=RoutingStrategies.CONSISTENT_HASH)
+        try:
+            pool.update_prices_for_events(events=self.events)
+            firstRequestedMarketIds = [
+                set(marketIds) for marketIds in self.requestedMarketIds
+            ]
+            markets = self.events[0].get_all_markets()
+            pool.update_prices_for_markets(markets=markets)
+        finally:
+            pool.close()
+        self._assert_all_updated()
+        self.assertTrue(
+            all(len(marketIds) > 50 for marketIds in firstRequestedMarketIds)
+        )
+        self.assertEqual(
+            sum(len(marketIds) for marketIds in firstRequestedMarketIds), 300
+        )
+        for market in markets:
+            servers = [
+                serverIndex
+                for serverIndex, marketIds in enumerate(self.requestedMarketIds)
+                if market.marketId in marketIds
+            ]
+            self.assertEqual(len(servers), 1)
+            self.assertEqual(
+                self.requestedMarketIds[servers[0]].count(market.marketId), 2
+            )
+
+    def test_failing_client_markets_are_moved(self):
+        def unavailable(params):
+            raise FakeHttpError(statusCode=503)
+
+        self.servers[1].set_handler(
+            method="SportsAPING/v1.0/listMarketBook", handler=unavailable
+        )
+        for routing in RoutingStrategies.ALL:
+            now = [0.0]
+            self.events = build_events(numEvents=100, marketsPerEvent=3)
+            pool = self._create_pool(routing=routing, clock=lambda: now[0])
+            try:
+                priceChanges = pool.get_price_changes_for_events(events=self.events)
+                self.assertEqual(len(priceChanges), 300 * 3 * 6)
+                # requests already in flight can fail before the client is left out
+                failuresBefore = pool.get_stats()[1]["failures"]
+                self.assertGreaterEqual(failuresBefore, 1)
+                routedBefore = pool.get_stats()[1]["requestsRouted"]
+                pool.update_prices_for_events(events=self.events)
+                # left out until the cooldown has passed
+                self.assertEqual(pool.get_stats()[1]["requestsRouted"], routedBefore)
+                now[0] = 31.0
+                pool.update_prices_for_events(events=self.events)
+                self.assertGreater(pool.get_stats()[1]["failures"], failuresBefore)
+            finally:
+                pool.close()
+        self._assert_all_updated()
+
+    def test_changes_applied_before_a_failure_are_returned(self):
+        calls = []
+
+        def fails_after_first_request(params):
+            with self.lock:
+                calls.append(params["marketIds"])
+                if len(calls) > 1:
+                    raise FakeHttpError(statusCode=503)
+            # the same prices as the other servers
+            return [
+                build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+                for marketId in params["marketIds"]
+            ]
+
+        self.servers[1].set_handler(
+            method="SportsAPING/v1.0/listMarketBook", handler=fails_after_first_request
+        )
+        pool = BetfairClientPool(
+            clients=[
+                create_client(server=server, maxConcurrentRequests=1)
+                for server in self.servers
+            ],
+            routing=RoutingStrategies.CONSISTENT_HASH,
+        )
+        try:
+            priceChanges = pool.get_price_changes_for_events(events=self.events)
+        finally:
+            pool.close()
+        self._assert_all_updated()
+        self.assertGreater(len(calls), 1)
+        self.assertEqual(len(priceChanges), 300 * 3 * 6)
+        self.assertEqual(
+            {priceChange.marketId for priceChange in priceChanges},
+            {marketId for event in self.events for marketId in event.markets},
+        )
+        keys = [
+            (
+                priceChange.marketId,
+                priceChange.selectionId,
+                priceChange.betType,
+                priceChange.price,
+            )
+            for priceChange in priceChanges
+        ]
+        self.assertEqual(len(keys), len(set(keys)))
+
+    def test_expired_session_fails_over(self):
+        def expired(params):
+            raise FakeApiError("ANGX-0003")
+
+        self.servers[0].set_handler(
+            method="SportsAPING/v1.0/listMarketBook", handler=expired
+        )
+        pool = self._create_pool(routing=RoutingStrategies.CONSISTENT_HASH)
+        try:
+            pool.update_prices_for_events(events=self.events)
+            stats = pool.get_stats()
+        finally:
+            pool.close()
+        self._assert_all_updated()
+        self.assertEqual(stats[0]["failures"], 1)
+        self.assertGreater(self.servers[0].logins, 1)
+
+    def test_busy_service_fails_over(self):
+        def busy(params):
+            raise FakeApiError("ANGX-0009")
+
+        self.servers[0].set_handler(
+            method="SportsAPING/v1.0/listMarketBook", handler=busy
+        )
+        pool = self._create_pool(routing=RoutingStrategies.CONSISTENT_HASH)
+        try:
+            pool.update_prices_for_events(events=self.events)
+            stats = pool.get_stats()
+        finally:
+            pool.close()
+        self._assert_all_updated()
+        self.assertEqual(stats[0]["failures"], 1)
+
+    def test_request_errors_are_not_retried(self):
+        # TOO_MUCH_DATA, and INVALID_INPUT_DATA which has no exception class of its own
+        for errorCode, exceptionClass in [
+            ("ANGX-0001", TooMuchData),
+            ("ANGX-0002", BetfairException),
+        ]:
+
+            def request_error(params):
+                raise FakeApiError(errorCode)
+
+            for server in self.servers:
+                server.set_handler(
+                    method="SportsAPING/v1.0/listMarketBook", handler=request_error
+                )
+            pool = self._create_pool()
+            try:
+                with self.assertRaises(exceptionClass):
+                    pool.update_prices_for_events(events=self.events[:1])
+                self.assertEqual(
+                    sum(stats["failures"] for stats in pool.get_stats()), 0
+                )
+            finally:
+                pool.close()
+
+    def test_all_clients_failing_raises(self):
+        def unavailable(params):
+            raise FakeHttpError(statusCode=503)
+
+        for server in self.servers:
+            server.set_handler(
+                method="SportsAPING/v1.0/listMarketBook", handler=unavailable
+            )
+        pool = self._create_pool()
+        try:
+            with self.assertRaises(Exception):
+                pool.update_prices_for_events(events=self.events[:1])
+            self.assertEqual(
+                [stats["failures"] for stats in pool.get_stats()], [1, 1, 1]
+            )
+        finally:
+            pool.close()
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, BetfairClientPool, clients=[])
+        self.assertRaises(
+            ValueError,
+            BetfairClientPool,
+            clients=[create_client(server=self.servers[0])],
+            routing="ROUND_ROBIN",
+        )
@@ -67,3 +67,22 @@ class TestEvent(TestCase):
             addedMarketClassIds
             == {self.firstTestMarket.marketId, self.secondTestMarket.marketId}
         )
+
+    def test_competition_equality(self):
+        competition = Competition(competitionName="testCompetition", competitionId=24)
+        self.assertEqual(self.testEvent.competition, competition)
+        self.assertEqual(hash(self.testEvent.competition), hash(competition))
+        self.assertNotEqual(
+            competition,
+            Competition(competitionName="testCompetition", competitionId=25),
+        )
+        self.assertNotEqual(competition, "testCompetition")
+        self.assertEqual({competition: 1}[self.testEvent.competition], 1)
+
+    def test_no_instance_dict(self):
+        for instance in [
+            self.testEvent,
+            self.firstTestMarket,
+            self.testEvent.competition,
+        ]:
+            self.assertFalse(hasattr(instance, "__dict__"))
@@ -0,0 +1,122 @@
+import json
+from datetime import datetime
+from unittest import TestCase, skipIf
+
+from betfair_api_client.betfair_api_client.export import (
+    LADDER_SCHEMA,
+    MARKET_BOOK_SCHEMA,
+    build_ladder_columns,
+    build_market_book_columns,
+    market_books_to_arrow,
+    market_books_to_pandas,
+    pandas,
+    pyarrow,
+    to_arrow,
+    to_pandas,
+)
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    build_market_book,
+)
+from betfair_api_client.betfair_api_client.tests.test_recording import build_markets
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+    build_events,
+)
+
+
+def build_priced_events(numEvents: int, marketsPerEvent: int):
+    events = build_events(numEvents=numEvents, marketsPerEvent=marketsPerEvent)
+    for event in events:
+        for market in event.get_all_markets():
+            for runner in market.get_all_runners():
+                runner.update_back_levels(
+                    levels=[{"price": 2.0, "size": 10.0}, {"price": 1.98, "size": 5.0}]
+                )
+                runner.update_lay_levels(levels=[{"price": 2.02, "size": 7.0}])
+    return events
+
+
+class TestExport(TestCase):
+    def test_ladder_columns(self):
+        events = build_priced_events(numEvents=2, marketsPerEvent=2)
+        columns = build_ladder_columns(events=events)
+        self.assertEqual(list(columns), [column for column, _ in LADDER_SCHEMA])
+        # 2 events x 2 markets x 3 runners x 3 levels
+        self.assertTrue(all(len(values) == 36 for values in columns.values()))
+        firstRows = {column: values[:3] for column, values in columns.items()}
+        self.assertEqual(firstRows["eventId"], [0, 0, 0])
+        self.assertEqual(firstRows["eventDate"], [datetime(2020, 8, 4)] * 3)
+        self.assertEqual(firstRows["competitionId"], [1, 1, 1])
+        self.assertEqual(firstRows["marketId"], ["1.0", "1.0", "1.0"])
+        self.assertEqual(firstRows["selectionId"], [SELECTION_IDS[0]] * 3)
+        self.assertEqual(
+            firstRows["betType"],
+            ["availableToBack", "availableToBack", "availableToLay"],
+        )
+        self.assertEqual(firstRows["level"], [0, 1, 0])
+        self.assertEqual(firstRows["price"], [2.0, 1.98, 2.02])
+        self.assertEqual(firstRows["size"], [10.0, 5.0, 7.0])
+        self.assertEqual(columns["marketId"][-1], "1.3")
+
+    def test_markets_without_events(self):
+        columns = build_ladder_columns(markets=build_markets(numMarkets=1, depth=2))
+        self.assertEqual(len(columns["price"]), 12)
+        self.assertEqual(set(columns["eventId"]), {None})
+        self.assertEqual(set(columns["marketId"]), {"1.0"})
+
+    def test_runners_without_prices_have_no_rows(self):
+        events = build_events(numEvents=1, marketsPerEvent=1)
+        columns = build_ladder_columns(events=events)
+        self.assertEqual(len(columns["price"]), 0)
+
+    def test_market_book_columns(self):
+        marketBooks = [
+            build_market_book(marketId=f"1.{i}", selectionIds=SELECTION_IDS, depth=2)
+            for i in range(3)
+        ]
+        response = json.dumps({"jsonrpc": "2.0", "result": marketBooks, "id": 1})
+        for source in [marketBooks, response, response.encode("utf-8")]:
+            columns = build_market_book_columns(marketBooks=source)
+            self.assertEqual(
+                list(columns), [column for column, _ in MARKET_BOOK_SCHEMA]
+            )
+            self.assertEqual(len(columns["price"]), 36)
+            self.assertEqual(columns["marketStatus"][0], "OPEN")
+            self.assertEqual(columns["runnerStatus"][0], "ACTIVE")
+            self.assertEqual(columns["price"][:4], [2.0, 1.98, 2.02, 2.04])
+
+    @skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_to_arrow(self):
+        events = build_priced_events(numEvents=3, marketsPerEvent=2)
+        table = to_arrow(events=events)
+        self.assertEqual(table.num_rows, 54)
+        self.assertEqual(table.schema.field("eventDate").type, pyarrow.timestamp("us"))
+        self.assertEqual(table.schema.field("level").type, pyarrow.int16())
+        self.assertEqual(table.to_pydict(), build_ladder_columns(events=events))
+
+    @skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_market_books_to_arrow(self):
+        marketBooks = [
+            build_market_book(marketId=f"1.{i}", selectionIds=SELECTION_IDS)
+            for i in range(2)
+        ]
+        table = market_books_to_arrow(marketBooks=marketBooks)
+        self.assertEqual(table.num_rows, 36)
+        self.assertEqual(table.schema.field("selectionId").type, pyarrow.int64())
+        self.assertEqual(
+            table.to_pydict(), build_market_book_columns(marketBooks=marketBooks)
+        )
+
+    @skipIf(pandas is None, "pandas is not installed")
+    def test_to_pandas(self):
+        dataFrame = to_pandas(
+            events=build_priced_events(numEvents=2, marketsPerEvent=1)
+        )
+        self.assertEqual(len(dataFrame), 18)
+        self.assertEqual(str(dataFrame["price"].dtype), "float64")
+        self.assertEqual(
+            dataFrame.groupby("betType")["size"].sum().to_dict(),
+            {"availableToBack": 90.0, "availableToLay": 42.0},
+        )
+        marketBooks = [build_market_book(marketId="1.1", selectionIds=SELECTION_IDS)]
+        self.assertEqual(len(market_books_to_pandas(marketBooks=marketBooks)), 18)
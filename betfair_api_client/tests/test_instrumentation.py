@@ -0,0 +1,181 @@
+import urllib.error
+from unittest import IsolatedAsyncioTestCase, TestCase, skipIf
+
+from betfair_api_client.betfair_api_client.instrumentation import (
+    CallbackInstrumentation,
+    LatencyStats,
+    PrometheusInstrumentation,
+    prometheus_client,
+)
+from betfair_api_client.betfair_api_client.parsing import ijson
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeBetfairServer,
+    FakeHttpError,
+    build_market_book,
+    create_async_client,
+    create_client,
+)
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+    build_events,
+)
+
+LIST_MARKET_BOOK = "SportsAPING/v1.0/listMarketBook"
+COMPETITIONS = [{"competition": {"id": "10932509", "name": "English Premier League"}}]
+
+
+def list_market_book(params):
+    return [
+        build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+        for marketId in params["marketIds"]
+    ]
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeBetfairServer().start()
+        self.server.set_handler(method=LIST_MARKET_BOOK, handler=list_market_book)
+        self.records = []
+        self.hydrations = []
+        self.instrumentation = CallbackInstrumentation(
+            onCall=self.records.append,
+            onHydration=lambda *args: self.hydrations.append(args),
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.server.stop()
+
+    def test_call_records(self):
+        client = create_client(server=self.server, instrumentation=self.instrumentation)
+        client.update_prices_for_events(
+            events=build_events(numEvents=5, marketsPerEvent=2)
+        )
+        client.close()
+        self.assertEqual(len(self.records), 1)
+        record = self.records[0]
+        self.assertEqual(record.method, LIST_MARKET_BOOK)
+        self.assertEqual(record.statusCode, 200)
+        self.assertEqual(record.marketCount, 10)
+        self.assertGreater(record.requestBytes, 0)
+        self.assertGreater(record.responseBytes, 0)
+        self.assertIsNone(record.error)
+        for duration in [
+            record.connectTime,
+            record.timeToFirstByte,
+            record.decodeTime,
+        ]:
+            self.assertGreaterEqual(duration, 0)
+        self.assertGreaterEqual(
+            record.totalTime, record.timeToFirstByte + record.decodeTime
+        )
+        self.assertEqual(len(self.hydrations), 1)
+        method, duration, itemCount = self.hydrations[0]
+        self.assertEqual((method, itemCount), (LIST_MARKET_BOOK, 10))
+        self.assertGreater(duration, 0)
+
+    def test_failed_call_is_recorded(self):
+        def fail(params):
+            raise FakeHttpError(statusCode=503)
+
+        self.server.set_handler(method=LIST_MARKET_BOOK, handler=fail)
+        client = create_client(server=self.server, instrumentation=self.instrumentation)
+        with self.assertRaises(urllib.error.HTTPError):
+            client.update_prices_for_events(
+                events=build_events(numEvents=1, marketsPerEvent=1)
+            )
+        client.close()
+        self.assertEqual(len(self.records), 1)
+        self.assertEqual(self.records[0].statusCode, 503)
+        self.assertIsInstance(self.records[0].error, urllib.error.HTTPError)
+        self.assertIsNone(self.records[0].decodeTime)
+
+    def test_failing_hook_does_not_fail_the_call(self):
+        def fail(record):
+            raise ValueError("broken dashboard")
+
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listCompetitions",
+            handler=lambda params: COMPETITIONS,
+        )
+        client = create_client(
+            server=self.server, instrumentation=CallbackInstrumentation(onCall=fail)
+        )
+        with self.assertLogs(level="ERROR"):
+            competitions = client.list_competitions(sportTypeIds=[1])
+        client.close()
+        self.assertEqual(len(competitions), 1)
+
+    @skipIf(ijson is None, "ijson is not installed")
+    def test_streamed_call_records(self):
+        client = create_client(
+            server=self.server,
+            streamResponses=True,
+            instrumentation=self.instrumentation,
+        )
+        client.update_prices_for_events(
+            events=build_events(numEvents=3, marketsPerEvent=2)
+        )
+        client.close()
+        self.assertEqual(len(self.records), 1)
+        self.assertEqual(self.records[0].marketCount, 6)
+        self.assertGreater(self.records[0].responseBytes, 0)
+        self.assertIsNotNone(self.records[0].decodeTime)
+
+    def test_latency_stats(self):
+        latencyStats = LatencyStats()
+        client = create_client(server=self.server, instrumentation=latencyStats)
+        events = build_events(numEvents=3, marketsPerEvent=2)
+        for _ in range(4):
+            client.update_prices_for_events(events=events)
+        client.close()
+        stats = latencyStats.get_stats()[LIST_MARKET_BOOK]
+        self.assertEqual(stats["calls"], 4)
+        self.assertEqual(stats["errors"], 0)
+        self.assertEqual(stats["markets"], 24)
+        self.assertLessEqual(stats["p50"], stats["p99"])
+        self.assertGreater(stats["hydrationTime"], 0)
+
+    @skipIf(prometheus_client is None, "prometheus_client is not installed")
+    def test_prometheus(self):
+        registry = prometheus_client.CollectorRegistry()
+        client = create_client(
+            server=self.server,
+            instrumentation=PrometheusInstrumentation(registry=registry),
+        )
+        client.update_prices_for_events(
+            events=build_events(numEvents=3, marketsPerEvent=2)
+        )
+        client.close()
+        self.assertEqual(
+            registry.get_sample_value(
+                "betfair_api_markets_total", {"method": LIST_MARKET_BOOK}
+            ),
+            6,
+        )
+        self.assertEqual(
+            registry.get_sample_value(
+                "betfair_api_call_seconds_count", {"method": LIST_MARKET_BOOK}
+            ),
+            1,
+        )
+
+
+class TestAsyncInstrumentation(IsolatedAsyncioTestCase):
+    async def test_call_records(self):
+        records = []
+        with FakeBetfairServer() as server:
+            server.set_handler(method=LIST_MARKET_BOOK, handler=list_market_book)
+            async with create_async_client(
+                server=server,
+                instrumentation=CallbackInstrumentation(onCall=records.append),
+            ) as client:
+                await client.update_prices_for_events(
+                    events=build_events(numEvents=2, marketsPerEvent=2)
+                )
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].marketCount, 4)
+        self.assertIsNotNone(records[0].connectTime)
+        self.assertIsNotNone(records[0].timeToFirstByte)
+        self.assertGreater(records[0].responseBytes, 0)
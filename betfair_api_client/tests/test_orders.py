@@ -0,0 +1,269 @@
+import itertools
+import threading
+import urllib.error
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from betfair_api_client.betfair_api_client.datamodel.exceptions import (
+    BetfairException,
+    InvalidOdds,
+)
+from betfair_api_client.betfair_api_client.datamodel.orders import (
+    CancelInstruction,
+    OrderSides,
+    PlaceInstruction,
+    ReplaceInstruction,
+    UpdateInstruction,
+)
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeApiError,
+    FakeBetfairServer,
+    FakeHttpError,
+    create_async_client,
+    create_client,
+)
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    build_events,
+)
+
+SUSPENDED_MARKET_ID = "1.999"
+# requests on these markets are answered with a JSON-RPC error, or an HTTP error
+ERROR_MARKET_ID = "1.998"
+UNAVAILABLE_MARKET_ID = "1.997"
+
+
+class FakeOrderBook:
+    def __init__(self, server: FakeBetfairServer):
+        """
+        Handlers for the order operations, answering every instruction with a successful report.
+        """
+        self.requests = []
+        self._betIds = itertools.count(1)
+        self._lock = threading.Lock()
+        for operation, handler in [
+            ("placeOrders", self._place),
+            ("cancelOrders", self._cancel),
+            ("replaceOrders", self._replace),
+            ("updateOrders", self._update),
+        ]:
+            server.set_handler(
+                method=f"SportsAPING/v1.0/{operation}",
+                handler=self._record(operation=operation, handler=handler),
+            )
+
+    def _record(self, operation: str, handler):
+        def record(params):
+            with self._lock:
+                self.requests.append((operation, params))
+            if params["marketId"] == ERROR_MARKET_ID:
+                raise FakeApiError("ANGX-0002")
+            if params["marketId"] == UNAVAILABLE_MARKET_ID:
+                raise FakeHttpError(statusCode=500)
+            if params["marketId"] == SUSPENDED_MARKET_ID:
+                return {
+                    "status": "FAILURE",
+                    "errorCode": "MARKET_SUSPENDED",
+                    "marketId": params["marketId"],
+                }
+            return {
+                "status": "SUCCESS",
+                "marketId": params["marketId"],
+                "instructionReports": [
+                    handler(instruction) for instruction in params["instructions"]
+                ],
+            }
+
+        return record
+
+    def _place(self, instruction):
+        with self._lock:
+            betId = str(next(self._betIds))
+        return {
+            "status": "SUCCESS",
+            "instruction": instruction,
+            "betId": betId,
+            "orderStatus": "EXECUTABLE",
+            "sizeMatched": 0.0,
+            "averagePriceMatched": 0.0,
+        }
+
+    def _cancel(self, instruction):
+        return {
+            "status": "SUCCESS",
+            "instruction": instruction,
+            "sizeCancelled": instruction.get("sizeReduction", 2.0),
+        }
+
+    def _replace(self, instruction):
+        return {
+            "status": "SUCCESS",
+            "cancelInstructionReport": self._cancel(
+                instruction={"betId": instruction["betId"]}
+            ),
+            "placeInstructionReport": self._place(instruction=instruction),
+        }
+
+    def _update(self, instruction):
+        return {"status": "SUCCESS", "instruction": instruction}
+
+
+def build_place_instructions(markets, price: float = 2.0):
+    return [
+        PlaceInstruction(
+            market=market,
+            runner=runner,
+            side=OrderSides.BACK,
+            price=price,
+            size=2,
+        )
+        for market in markets
+        for runner in market.get_all_runners()
+    ]
+
+
+class TestOrders(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeBetfairServer(latency=0.02).start()
+        self.orderBook = FakeOrderBook(server=self.server)
+        self.client = create_client(server=self.server, maxConcurrentRequests=4)
+
+    def tearDown(self):
+        super().tearDown()
+        self.client.close()
+        self.server.stop()
+
+    def test_place_orders_chunks_by_market(self):
+        markets = build_events(numEvents=1, marketsPerEvent=70)[0].get_all_markets()
+        # 210 instructions on the first market, 3 on each of the others
+        instructions = build_place_instructions(markets=markets[:1]) * 70
+        instructions += build_place_instructions(markets=markets[1:])
+        reports = self.client.place_orders(instructions=instructions)
+        self.assertEqual(len(self.orderBook.requests), 71)
+        firstMarketRequests = [
+            params
+            for _, params in self.orderBook.requests
+            if params["marketId"] == markets[0].marketId
+        ]
+        self.assertEqual(
+            sorted(len(params["instructions"]) for params in firstMarketRequests),
+            [10, 200],
+        )
+        self.assertEqual(len(reports), len(instructions))
+        self.assertEqual(len({report.betId for report in reports}), len(reports))
+        for instruction, report in zip(instructions, reports):
+            self.assertTrue(report.instruction is instruction)
+            self.assertTrue(report.isSuccess)
+            self.assertTrue(report.runner is instruction.runner)
+            self.assertTrue(report.market is instruction.market)
+
+    def test_failed_market_reports_every_instruction(self):
+        markets = build_events(numEvents=1, marketsPerEvent=2)[0].get_all_markets()
+        markets[1].marketId = SUSPENDED_MARKET_ID
+        reports = self.client.place_orders(
+            instructions=build_place_instructions(markets=markets)
+        )
+        self.assertEqual([report.isSuccess for report in reports[:3]], [True] * 3)
+        self.assertEqual(
+            [report.errorCode for report in reports[3:]], ["MARKET_SUSPENDED"] * 3
+        )
+
+    def test_failed_requests_keep_the_other_reports(self):
+        markets = build_events(numEvents=1, marketsPerEvent=3)[0].get_all_markets()
+        markets[1].marketId = ERROR_MARKET_ID
+        markets[2].marketId = UNAVAILABLE_MARKET_ID
+        reports = self.client.place_orders(
+            instructions=build_place_instructions(markets=markets)
+        )
+        self.assertEqual([report.isSuccess for report in reports[:3]], [True] * 3)
+        self.assertTrue(all(report.betId is not None for report in reports[:3]))
+        for report in reports[3:]:
+            self.assertEqual(report.status, "FAILURE")
+            self.assertIsInstance(report.exception, BaseException)
+        self.assertIsInstance(reports[3].exception, BetfairException)
+        self.assertIsInstance(reports[6].exception, urllib.error.HTTPError)
+
+    def test_error_is_raised_when_every_request_failed(self):
+        market = build_events(numEvents=1, marketsPerEvent=1)[0].get_all_markets()[0]
+        market.marketId = ERROR_MARKET_ID
+        with self.assertRaises(BetfairException):
+            self.client.place_orders(
+                instructions=build_place_instructions(markets=[market])
+            )
+        with self.assertRaises(BetfairException):
+            self.client.place_bet(
+                market=market,
+                runner=market.get_all_runners()[0],
+                oddsToPlace=2.0,
+                side=OrderSides.BACK,
+                betSize=2,
+            )
+
+    def test_cancel_replace_and_update(self):
+        market = build_events(numEvents=1, marketsPerEvent=1)[0].get_all_markets()[0]
+        reports = self.client.cancel_orders(
+            instructions=[
+                CancelInstruction(market=market, betId=str(betId), sizeReduction=1.0)
+                for betId in range(61)
+            ]
+        )
+        # the two requests are sent in parallel
+        self.assertEqual(
+            sorted(
+                len(params["instructions"]) for _, params in self.orderBook.requests
+            ),
+            [1, 60],
+        )
+        self.assertEqual(reports[0].sizeCancelled, 1.0)
+        replaceReport = self.client.replace_orders(
+            instructions=[ReplaceInstruction(market=market, betId="7", newPrice=3.05)]
+        )[0]
+        self.assertTrue(replaceReport.isSuccess)
+        self.assertEqual(replaceReport.sizeCancelled, 2.0)
+        self.assertEqual(replaceReport.orderStatus, "EXECUTABLE")
+        updateReport = self.client.update_orders(
+            instructions=[
+                UpdateInstruction(
+                    market=market, betId="7", newPersistenceType="PERSIST"
+                )
+            ]
+        )[0]
+        self.assertTrue(updateReport.isSuccess)
+
+    def test_invalid_instructions_are_not_sent(self):
+        markets = build_events(numEvents=1, marketsPerEvent=1)[0].get_all_markets()
+        with self.assertRaises(InvalidOdds):
+            self.client.place_orders(
+                instructions=build_place_instructions(markets=markets, price=2.01)
+            )
+        with self.assertRaises(ValueError):
+            self.client.cancel_orders(
+                instructions=build_place_instructions(markets=markets)
+            )
+        self.assertEqual(self.orderBook.requests, [])
+
+
+class TestAsyncOrders(IsolatedAsyncioTestCase):
+    async def test_place_orders(self):
+        with FakeBetfairServer() as server:
+            orderBook = FakeOrderBook(server=server)
+            markets = build_events(numEvents=1, marketsPerEvent=3)[0].get_all_markets()
+            instructions = build_place_instructions(markets=markets)
+            async with create_async_client(server=server) as client:
+                reports = await client.place_orders(instructions=instructions)
+            self.assertEqual(len(orderBook.requests), 3)
+            self.assertEqual([report.instruction for report in reports], instructions)
+            self.assertTrue(all(report.isSuccess for report in reports))
+
+    async def test_failed_requests_keep_the_other_reports(self):
+        with FakeBetfairServer() as server:
+            FakeOrderBook(server=server)
+            markets = build_events(numEvents=1, marketsPerEvent=2)[0].get_all_markets()
+            markets[1].marketId = ERROR_MARKET_ID
+            async with create_async_client(server=server) as client:
+                reports = await client.place_orders(
+                    instructions=build_place_instructions(markets=markets)
+                )
+            self.assertEqual(
+                [report.isSuccess for report in reports], [True] * 3 + [False] * 3
+            )
+            self.assertIsInstance(reports[3].exception, BetfairException)
@@ -0,0 +1,52 @@
+import json
+from datetime import datetime
+from unittest import TestCase
+
+from betfair_api_client.betfair_api_client import parsing
+from betfair_api_client.betfair_api_client.parsing import (
+    BETFAIR_DATETIME_FORMAT,
+    CatalogueParser,
+    parse_betfair_datetime,
+)
+
+
+class TestParsing(TestCase):
+    def test_parse_betfair_datetime_matches_strptime(self):
+        for value in ["2020-08-04T19:00:00.000Z", "2020-12-16T20:00:00.123Z"]:
+            self.assertEqual(
+                parse_betfair_datetime(value=value),
+                datetime.strptime(value, BETFAIR_DATETIME_FORMAT),
+            )
+        self.assertEqual(
+            parse_betfair_datetime(value="2020-08-04T19:00:00Z"),
+            datetime(year=2020, month=8, day=4, hour=19),
+        )
+
+    def test_loads_and_dumps_round_trip(self):
+        payload = {"result": [{"marketId": "1.1", "runnerName": "Atlético", "x": 1.5}]}
+        self.assertEqual(parsing.loads(parsing.dumps(payload)), payload)
+        self.assertEqual(parsing.loads(json.dumps(payload).encode("utf-8")), payload)
+        self.assertTrue(parsing.JSON_BACKEND in ("orjson", "ujson", "json"))
+
+    def test_catalogue_parser_caches(self):
+        parser = CatalogueParser(maxCachedDatetimes=2)
+        first = parser.parse_datetime(value="2020-08-04T19:00:00.000Z")
+        self.assertTrue(
+            parser.parse_datetime(value="2020-08-04T19:00:00.000Z") is first
+        )
+        parser.parse_datetime(value="2020-08-04T20:00:00.000Z")
+        parser.parse_datetime(value="2020-08-04T21:00:00.000Z")
+        self.assertFalse(
+            parser.parse_datetime(value="2020-08-04T19:00:00.000Z") is first
+        )
+        competition = parser.get_competition(
+            rawCompetition={"id": "10932509", "name": "English Premier League "}
+        )
+        self.assertEqual(competition.competitionId, 10932509)
+        self.assertEqual(competition.competitionName, "English Premier League")
+        self.assertTrue(
+            parser.get_competition(
+                rawCompetition={"id": "10932509", "name": "English Premier League"}
+            )
+            is competition
+        )
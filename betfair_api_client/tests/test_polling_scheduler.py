@@ -0,0 +1,215 @@
+import threading
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+from betfair_api_client.betfair_api_client.datamodel.exceptions import TooMuchData
+from betfair_api_client.betfair_api_client.polling_scheduler import PollingScheduler
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeApiError,
+    FakeBetfairServer,
+    build_market_book,
+    create_client,
+)
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+    build_events,
+)
+
+NOW = datetime(year=2020, month=8, day=4, hour=12)
+
+
+class TestPollingScheduler(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeBetfairServer().start()
+        self.requestedMarketIds = []
+        self.inPlayMarketIds = set()
+        self.closedMarketIds = set()
+        self.movingMarketIds = set()
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listMarketBook", handler=self._list_market_book
+        )
+        self.client = create_client(server=self.server)
+        self.now = [0.0]
+        self.events = build_events(numEvents=1, marketsPerEvent=3)
+        self.markets = self.events[0].get_all_markets()
+        for market, startsIn in zip(
+            self.markets,
+            [timedelta(minutes=5), timedelta(hours=3), timedelta(days=3)],
+        ):
+            market.marketStartTime = NOW + startsIn
+
+    def tearDown(self):
+        super().tearDown()
+        self.client.close()
+        self.server.stop()
+
+    def _list_market_book(self, params):
+        self.requestedMarketIds.append(list(params["marketIds"]))
+        marketBooks = []
+        for marketId in params["marketIds"]:
+            marketBook = build_market_book(
+                marketId=marketId, selectionIds=SELECTION_IDS
+            )
+            marketBook["inplay"] = marketId in self.inPlayMarketIds
+            if marketId in self.closedMarketIds:
+                marketBook["status"] = "CLOSED"
+            if marketId in self.movingMarketIds:
+                # a different best price at every refresh
+                shift = 0.02 * (len(self.requestedMarketIds) % 2)
+                for runner in marketBook["runners"]:
+                    for level in runner["ex"]["availableToBack"]:
+                        level["price"] = round(level["price"] + shift, 2)
+            marketBooks.append(marketBook)
+        return marketBooks
+
+    def _create_scheduler(self, **kwargs) -> PollingScheduler:
+        return PollingScheduler(
+            client=self.client,
+            events=self.events,
+            clock=lambda: self.now[0],
+            utcNow=lambda: NOW,
+            **kwargs,
+        )
+
+    def test_refresh_intervals(self):
+        scheduler = self._create_scheduler()
+        self.assertEqual(
+            [scheduler.get_refresh_interval(market=market) for market in self.markets],
+            [2.0, 60.0, 900.0],
+        )
+        self.markets[2].inPlay = True
+        self.assertEqual(scheduler.get_refresh_interval(market=self.markets[2]), 1.0)
+        # markets past their start that have not gone in play yet get the shortest pre-play interval
+        self.markets[1].marketStartTime = NOW - timedelta(minutes=1)
+        self.assertEqual(scheduler.get_refresh_interval(market=self.markets[1]), 2.0)
+        with self.assertRaises(ValueError):
+            self._create_scheduler(startTimeIntervals=[])
+
+    def test_markets_are_refreshed_when_due(self):
+        scheduler = self._create_scheduler()
+        self.assertEqual(scheduler.get_wait_time(), 0.0)
+        priceChanges = scheduler.run_pending()
+        self.assertEqual(len(priceChanges), 3 * len(SELECTION_IDS) * 6)
+        self.assertEqual(
+            self.requestedMarketIds, [[market.marketId for market in self.markets]]
+        )
+        self.assertEqual(scheduler.get_wait_time(), 2.0)
+        self.now[0] = 1.0
+        self.assertEqual(scheduler.run_pending(), [])
+        self.assertEqual(len(self.requestedMarketIds), 1)
+        self.now[0] = 2.0
+        scheduler.run_pending()
+        self.assertEqual(self.requestedMarketIds[-1], [self.markets[0].marketId])
+        # the first market, due again at 62.0, is within the batch window and goes with the second
+        self.now[0] = 61.6
+        scheduler.run_pending()
+        self.assertEqual(
+            self.requestedMarketIds[-1],
+            [self.markets[0].marketId, self.markets[1].marketId],
+        )
+        stats = scheduler.get_stats()
+        self.assertEqual(stats["refreshes"], 3)
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["marketsRefreshed"], 6)
+        self.assertEqual(stats["scheduledMarkets"], 3)
+
+    def test_in_play_markets_are_refreshed_more_often(self):
+        scheduler = self._create_scheduler()
+        self.inPlayMarketIds.add(self.markets[2].marketId)
+        scheduler.run_pending()
+        self.assertTrue(self.markets[2].inPlay)
+        self.now[0] = 1.0
+        scheduler.run_pending()
+        self.assertEqual(self.requestedMarketIds[-1], [self.markets[2].marketId])
+
+    def test_volatile_markets_are_refreshed_more_often(self):
+        scheduler = self._create_scheduler(volatilityFactor=4.0, volatilityWeight=0.5)
+        self.assertIsNone(scheduler.get_volatility(marketId=self.markets[1].marketId))
+        self.movingMarketIds.add(self.markets[1].marketId)
+        scheduler.run_pending()
+        self.assertEqual(
+            scheduler.get_volatility(marketId=self.markets[1].marketId), 0.0
+        )
+        for _ in range(3):
+            self.now[0] += 900.0
+            scheduler.run_pending()
+        self.assertEqual(
+            scheduler.get_volatility(marketId=self.markets[1].marketId), 0.875
+        )
+        self.assertEqual(
+            scheduler.get_volatility(marketId=self.markets[2].marketId), 0.0
+        )
+        self.assertEqual(
+            scheduler.get_refresh_interval(market=self.markets[1]), 60.0 / 4.5
+        )
+        self.assertEqual(scheduler.get_refresh_interval(market=self.markets[2]), 900.0)
+        # never below minInterval
+        self.assertEqual(scheduler.get_refresh_interval(market=self.markets[0]), 2.0)
+        scheduler.minInterval = 20.0
+        self.assertEqual(scheduler.get_refresh_interval(market=self.markets[1]), 20.0)
+
+    def test_closed_markets_are_dropped(self):
+        scheduler = self._create_scheduler()
+        self.closedMarketIds.add(self.markets[0].marketId)
+        scheduler.run_pending()
+        self.assertEqual(
+            [market.marketId for market in scheduler.get_markets()],
+            [self.markets[1].marketId, self.markets[2].marketId],
+        )
+        self.now[0] = 2.0
+        scheduler.run_pending()
+        self.assertEqual(len(self.requestedMarketIds), 1)
+        scheduler.remove_market(marketId=self.markets[1].marketId)
+        self.assertEqual(scheduler.get_wait_time(), 898.0)
+
+    def test_request_budget(self):
+        self.events = build_events(numEvents=50, marketsPerEvent=2)
+        scheduler = self._create_scheduler(requestsPerSecond=2.0)
+        marketIds = [
+            market.marketId
+            for event in self.events
+            for market in event.markets.values()
+        ]
+        # EX_BEST_OFFERS markets weigh 5, so 40 go in a request
+        self.assertEqual(len(scheduler.run_pending()), 80 * len(SELECTION_IDS) * 6)
+        # the requests of one refresh are sent concurrently
+        self.assertCountEqual(
+            self.requestedMarketIds, [marketIds[:40], marketIds[40:80]]
+        )
+        self.assertEqual(scheduler.run_pending(), [])
+        self.assertEqual(scheduler.get_stats()["marketsDeferred"], 20 + 20)
+        # the refreshed markets, past their start, are due again after 2s, when the budget is full again
+        self.now[0] = 2.0
+        scheduler.run_pending()
+        # markets put off go before those refreshed since
+        self.assertCountEqual(
+            self.requestedMarketIds[2:],
+            [marketIds[80:] + marketIds[:20], marketIds[20:60]],
+        )
+
+    def test_failed_refreshes_are_rescheduled(self):
+        def too_much_data(params):
+            raise FakeApiError("ANGX-0001")
+
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listMarketBook", handler=too_much_data
+        )
+        scheduler = self._create_scheduler()
+        with self.assertRaises(TooMuchData):
+            scheduler.run_pending()
+        self.assertIsNone(scheduler.get_volatility(marketId=self.markets[0].marketId))
+        self.assertEqual(scheduler.get_stats()["marketsRefreshed"], 0)
+        self.assertEqual(scheduler.get_wait_time(), 2.0)
+
+    def test_run_until_no_market_is_left(self):
+        scheduler = PollingScheduler(
+            client=self.client, events=self.events, utcNow=lambda: NOW
+        )
+        self.closedMarketIds.update(market.marketId for market in self.markets)
+        refreshedPriceChanges = []
+        stopEvent = threading.Event()
+        scheduler.run(stopEvent=stopEvent, onPriceChanges=refreshedPriceChanges.append)
+        self.assertEqual(len(refreshedPriceChanges), 1)
+        self.assertEqual(scheduler.get_markets(), [])
+        self.assertIsNone(scheduler.get_wait_time())
@@ -0,0 +1,111 @@
+from unittest import TestCase
+
+from betfair_api_client.betfair_api_client.datamodel.bet_types import BetTypes
+from betfair_api_client.betfair_api_client.datamodel.price_ladder import (
+    NO_CHANGES,
+    PriceLadder,
+)
+from betfair_api_client.betfair_api_client.datamodel.runner_price import RunnerPrice
+
+
+class TestPriceLadder(TestCase):
+    def __init__(self, methodName="runTest"):
+        super(TestPriceLadder, self).__init__(methodName=methodName)
+        self.levels = [
+            {"price": 1.84, "size": 834.72},
+            {"price": 1.83, "size": 984.71},
+            {"price": 1.85, "size": 171.47},
+        ]
+
+    def setUp(self):
+        super().setUp()
+        self.ladder = PriceLadder(betType=BetTypes.BACK)
+        self.ladder.update_from_levels(levels=self.levels)
+
+    def test_update_from_levels_orders_best_first(self):
+        self.assertEqual(len(self.ladder), 3)
+        self.assertEqual(list(self.ladder.prices), [1.85, 1.84, 1.83])
+        self.assertEqual(list(self.ladder.sizes), [171.47, 834.72, 984.71])
+        layLadder = PriceLadder(betType=BetTypes.LAY)
+        layLadder.update_from_levels(levels=self.levels)
+        self.assertEqual(list(layLadder.prices), [1.83, 1.84, 1.85])
+
+    def test_get_runner_prices_is_lazy_and_cached(self):
+        self.assertIsNone(self.ladder._runnerPrices)
+        runnerPrices = self.ladder.get_runner_prices()
+        self.assertEqual(
+            runnerPrices[0], RunnerPrice(betType=BetTypes.BACK, price=1.85, size=171.47)
+        )
+        self.assertTrue(self.ladder.get_runner_prices() is runnerPrices)
+        self.ladder.update_from_levels(levels=self.levels[:1])
+        self.assertEqual(len(self.ladder.get_runner_prices()), 1)
+
+    def test_get_best_price(self):
+        self.assertEqual(self.ladder.get_best_price(), 1.85)
+        self.assertEqual(
+            self.ladder.get_best_runner_price(),
+            RunnerPrice(betType=BetTypes.BACK, price=1.85, size=171.47),
+        )
+        emptyLadder = PriceLadder(betType=BetTypes.LAY)
+        self.assertIsNone(emptyLadder.get_best_price())
+        self.assertIsNone(emptyLadder.get_best_runner_price())
+
+    def test_get_depth(self):
+        self.assertEqual(
+            [runnerPrice.price for runnerPrice in self.ladder.get_depth(levels=2)],
+            [1.85, 1.84],
+        )
+        self.assertEqual(len(self.ladder.get_depth(levels=10)), 3)
+
+    def test_get_volume_to_price(self):
+        self.assertAlmostEqual(self.ladder.get_volume_to_price(price=1.84), 1006.19)
+        self.assertEqual(self.ladder.get_volume_to_price(price=1.86), 0.0)
+        layLadder = PriceLadder(betType=BetTypes.LAY)
+        layLadder.update_from_levels(levels=self.levels)
+        self.assertAlmostEqual(layLadder.get_volume_to_price(price=1.84), 1819.43)
+
+    def test_update_from_runner_prices_keeps_objects(self):
+        runnerPrices = [RunnerPrice(betType=BetTypes.BACK, price=3.0, size=1.0)]
+        self.ladder.update_from_runner_prices(runnerPrices=runnerPrices)
+        self.assertTrue(self.ladder.get_runner_price(index=0) is runnerPrices[0])
+        self.assertEqual(list(self.ladder.prices), [3.0])
+
+    def test_update_from_levels_without_changes(self):
+        runnerPrices = self.ladder.get_runner_prices()
+        prices = self.ladder.prices
+        changes = self.ladder.update_from_levels(
+            levels=sorted(self.levels, key=lambda level: -level["price"])
+        )
+        self.assertTrue(changes is NO_CHANGES)
+        self.assertTrue(self.ladder.prices is prices)
+        self.assertTrue(self.ladder.get_runner_prices() is runnerPrices)
+
+    def test_update_from_levels_changes_sizes_in_place(self):
+        self.ladder.get_runner_prices()
+        prices = self.ladder.prices
+        changes = self.ladder.update_from_levels(
+            levels=[
+                {"price": 1.85, "size": 171.47},
+                {"price": 1.84, "size": 800.0},
+                {"price": 1.83, "size": 984.71},
+            ]
+        )
+        self.assertEqual(changes, [(1.84, 834.72, 800.0)])
+        self.assertTrue(self.ladder.prices is prices)
+        self.assertEqual(list(self.ladder.sizes), [171.47, 800.0, 984.71])
+        self.assertEqual(self.ladder.get_runner_price(index=1).size, 800.0)
+
+    def test_update_from_levels_reports_prices_that_came_and_went(self):
+        changes = self.ladder.update_from_levels(
+            levels=[
+                {"price": 1.86, "size": 5.0},
+                {"price": 1.85, "size": 171.47},
+                {"price": 1.84, "size": 834.72},
+            ]
+        )
+        self.assertEqual(changes, [(1.86, 0.0, 5.0), (1.83, 984.71, 0.0)])
+        self.assertEqual(list(self.ladder.prices), [1.86, 1.85, 1.84])
+        self.assertEqual(
+            self.ladder.update_from_levels(levels=[]),
+            [(1.86, 5.0, 0.0), (1.85, 171.47, 0.0), (1.84, 834.72, 0.0)],
+        )
@@ -0,0 +1,42 @@
+from unittest import TestCase
+
+from betfair_api_client.betfair_api_client.datamodel.price_data import PriceData
+from betfair_api_client.betfair_api_client.datamodel.price_projection import (
+    PriceProjection,
+    RollupModels,
+)
+
+
+class TestPriceProjection(TestCase):
+    def test_default(self):
+        self.assertEqual(PriceProjection().to_dict(), {"priceData": ["EX_BEST_OFFERS"]})
+
+    def test_to_dict(self):
+        priceProjection = PriceProjection(
+            priceData=[PriceData.EX_BEST_OFFERS, PriceData.EX_TRADED],
+            bestPricesDepth=10,
+            rollupModel=RollupModels.STAKE,
+            rollupLimit=2,
+            virtualise=True,
+        )
+        self.assertEqual(
+            priceProjection.to_dict(),
+            {
+                "priceData": ["EX_BEST_OFFERS", "EX_TRADED"],
+                "exBestOffersOverrides": {
+                    "bestPricesDepth": 10,
+                    "rollupModel": "STAKE",
+                    "rollupLimit": 2,
+                },
+                "virtualise": True,
+            },
+        )
+        self.assertEqual(
+            PriceProjection(priceData=[], rolloverStakes=False).to_dict(),
+            {"priceData": [], "rolloverStakes": False},
+        )
+
+    def test_invalid_values(self):
+        self.assertRaises(ValueError, PriceProjection, priceData=["EX_SOME_OFFERS"])
+        self.assertRaises(ValueError, PriceProjection, rollupModel="VOLUME")
+        self.assertRaises(ValueError, PriceProjection, bestPricesDepth=0)
@@ -0,0 +1,85 @@
+from unittest import TestCase, skipIf
+
+from betfair_api_client.betfair_api_client.datamodel.exceptions import InvalidOdds
+from betfair_api_client.betfair_api_client.datamodel.runner import Runner
+from betfair_api_client.betfair_api_client.price_ticks import (
+    MAX_PRICE,
+    MIN_PRICE,
+    NUM_TICKS,
+    PriceRounding,
+    add_ticks,
+    is_valid_price,
+    np,
+    price_to_tick,
+    snap_price,
+    tick_distance,
+    tick_to_price,
+)
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeBetfairServer,
+    create_client,
+)
+
+
+class TestPriceTicks(TestCase):
+    def test_ladder_bounds(self):
+        self.assertEqual(NUM_TICKS, 350)
+        self.assertEqual(price_to_tick(MIN_PRICE), 0)
+        self.assertEqual(price_to_tick(MAX_PRICE), NUM_TICKS - 1)
+        self.assertEqual(tick_to_price(price_to_tick(2.02)), 2.02)
+        with self.assertRaises(IndexError):
+            tick_to_price(NUM_TICKS)
+
+    def test_is_valid_price(self):
+        self.assertTrue(is_valid_price(1.1))
+        self.assertTrue(is_valid_price(3.05))
+        self.assertTrue(is_valid_price(110))
+        self.assertFalse(is_valid_price(2.01))
+        self.assertFalse(is_valid_price(1.005))
+        self.assertFalse(is_valid_price(1001))
+        with self.assertRaises(ValueError):
+            price_to_tick(2.01)
+
+    def test_tick_arithmetic_crosses_bands(self):
+        self.assertEqual(tick_distance(fromPrice=1.99, toPrice=2.02), 2)
+        self.assertEqual(tick_distance(fromPrice=2.02, toPrice=1.99), -2)
+        self.assertEqual(add_ticks(price=2.98, ticks=2), 3.05)
+        self.assertEqual(add_ticks(price=1.02, ticks=-5), MIN_PRICE)
+        self.assertEqual(add_ticks(price=990, ticks=5), MAX_PRICE)
+
+    def test_snap_price(self):
+        self.assertEqual(snap_price(2.03), 2.04)
+        self.assertEqual(snap_price(2.03, rounding=PriceRounding.DOWN), 2.02)
+        self.assertEqual(snap_price(3.01, rounding=PriceRounding.UP), 3.05)
+        self.assertEqual(snap_price(1.1), 1.1)
+        self.assertEqual(snap_price(0.5), MIN_PRICE)
+        self.assertEqual(snap_price(5000), MAX_PRICE)
+
+    @skipIf(np is None, "numpy is not installed")
+    def test_vectorized_matches_scalar(self):
+        prices = np.linspace(1.0, 1100, 5000)
+        for rounding in PriceRounding.ALL:
+            vectorized = snap_price(prices, rounding=rounding)
+            scalar = [snap_price(float(price), rounding=rounding) for price in prices]
+            np.testing.assert_allclose(vectorized, scalar)
+        ticks = np.arange(NUM_TICKS)
+        np.testing.assert_array_equal(price_to_tick(tick_to_price(ticks)), ticks)
+
+    def test_runner_spread_in_ticks(self):
+        runner = Runner(runnerId=1, runnerName="runner", handicap=0)
+        self.assertIsNone(runner.get_spread_in_ticks())
+        runner.update_back_levels(levels=[{"price": 1.98, "size": 10.0}])
+        runner.update_lay_levels(levels=[{"price": 2.02, "size": 10.0}])
+        self.assertEqual(runner.get_spread_in_ticks(), 3)
+        self.assertEqual(list(runner.backLadder.get_ticks()), [price_to_tick(1.98)])
+
+    def test_place_bet_rejects_off_ladder_odds(self):
+        server = FakeBetfairServer().start()
+        client = create_client(server=server)
+        runner = Runner(runnerId=1, runnerName="runner", handicap=0)
+        with self.assertRaises(InvalidOdds):
+            client._build_place_order_request(
+                market=None, runner=runner, oddsToPlace=2.01, side="BACK", betSize=2
+            )
+        client.close()
+        server.stop()
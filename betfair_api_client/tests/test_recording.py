@@ -0,0 +1,148 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from betfair_api_client.betfair_api_client.base_client import BaseBetfairApiClient
+from betfair_api_client.betfair_api_client.recording import (
+    MarketBookRecorder,
+    MarketBookReplayer,
+)
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    build_market_book,
+)
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+    build_events,
+)
+
+
+def build_markets(numMarkets: int, depth: int = 3):
+    markets = build_events(numEvents=1, marketsPerEvent=numMarkets)[0].get_all_markets()
+    for market in markets:
+        BaseBetfairApiClient._update_market_prices(
+            market=market,
+            marketData=build_market_book(
+                marketId=market.marketId, selectionIds=SELECTION_IDS, depth=depth
+            ),
+        )
+    return markets
+
+
+class TestRecording(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "markets.bfmb")
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+
+    def test_replay_into_new_markets(self):
+        markets = build_markets(numMarkets=3)
+        with MarketBookRecorder(path=self.path, blockSize=4) as recorder:
+            recorder.record_markets(markets=markets, timestamp=100.0)
+            markets[1].runners[SELECTION_IDS[0]].update_back_levels(
+                levels=[{"price": 3.0, "size": 5.0}]
+            )
+            recorder.record_market(market=markets[1], timestamp=101.0)
+        replayer = MarketBookReplayer(path=self.path)
+        updates = []
+        replayer.add_callback(
+            lambda market: updates.append(
+                (
+                    market.marketId,
+                    market.runners[SELECTION_IDS[0]].get_best_back_price().price,
+                )
+            )
+        )
+        self.assertEqual(replayer.replay(), 4)
+        self.assertEqual(
+            updates, [("1.0", 2.0), ("1.1", 2.0), ("1.2", 2.0), ("1.1", 3.0)]
+        )
+        self.assertEqual(replayer.get_time_range(), (100.0, 101.0))
+        for market in markets:
+            replayedMarket = replayer.markets[market.marketId]
+            for selectionId, runner in market.runners.items():
+                replayedRunner = replayedMarket.runners[selectionId]
+                self.assertEqual(
+                    [(p.price, p.size) for p in replayedRunner.availableToBack],
+                    [(p.price, p.size) for p in runner.availableToBack],
+                )
+                self.assertEqual(
+                    [(p.price, p.size) for p in replayedRunner.availableToLay],
+                    [(p.price, p.size) for p in runner.availableToLay],
+                )
+
+    def test_replay_updates_markets_in_place(self):
+        with MarketBookRecorder(path=self.path) as recorder:
+            recorder.record_markets(markets=build_markets(numMarkets=2, depth=5))
+        markets = build_events(numEvents=1, marketsPerEvent=2)[0].get_all_markets()
+        replayer = MarketBookReplayer(path=self.path, markets=markets)
+        replayer.replay()
+        runner = markets[0].runners[SELECTION_IDS[1]]
+        self.assertEqual(runner.runnerName, f"runner {SELECTION_IDS[1]}")
+        self.assertEqual(len(runner.availableToBack), 5)
+        self.assertEqual(runner.get_best_lay_price().price, 2.52)
+
+    def test_compressed_blocks_appended_to_a_recording(self):
+        markets = build_markets(numMarkets=2)
+        with MarketBookRecorder(path=self.path) as recorder:
+            recorder.record_markets(markets=markets, timestamp=1.0)
+        with MarketBookRecorder(path=self.path, compress=True) as recorder:
+            for timestamp in [2.0, 3.0, 4.0]:
+                recorder.record_markets(markets=markets, timestamp=timestamp)
+        replayer = MarketBookReplayer(path=self.path)
+        self.assertEqual(
+            [timestamp for timestamp, _ in replayer.iter_updates()],
+            [1.0, 1.0, 2.0, 2.0, 3.0, 3.0, 4.0, 4.0],
+        )
+        self.assertEqual(replayer.replay(startTime=2.0, endTime=3.0), 4)
+
+    def test_scaled_wall_clock_replay(self):
+        markets = build_markets(numMarkets=1)
+        with MarketBookRecorder(path=self.path) as recorder:
+            recorder.record_markets(markets=markets, timestamp=10.0)
+            recorder.record_markets(markets=markets, timestamp=10.4)
+        startedAt = time.monotonic()
+        MarketBookReplayer(path=self.path).replay(speed=4.0)
+        self.assertGreaterEqual(time.monotonic() - startedAt, 0.1)
+
+    def test_truncated_block_is_skipped(self):
+        markets = build_markets(numMarkets=1)
+        with MarketBookRecorder(path=self.path, blockSize=1) as recorder:
+            recorder.record_markets(markets=markets, timestamp=1.0)
+            recorder.record_markets(markets=markets, timestamp=2.0)
+        with open(self.path, "r+b") as recordingFile:
+            recordingFile.truncate(os.path.getsize(self.path) - 8)
+        self.assertEqual(MarketBookReplayer(path=self.path).replay(), 1)
+
+    def test_recording_appended_to_after_a_truncated_block(self):
+        markets = build_markets(numMarkets=1)
+        with MarketBookRecorder(path=self.path, blockSize=1) as recorder:
+            recorder.record_markets(markets=markets, timestamp=1.0)
+            recorder.record_markets(markets=markets, timestamp=2.0)
+        # into the last block, then into the first one
+        for truncatedBytes, expectedTimestamps in [
+            (8, [1.0, 3.0]),
+            (os.path.getsize(self.path) // 2, [3.0]),
+        ]:
+            with self.subTest(truncatedBytes=truncatedBytes):
+                with open(self.path, "r+b") as recordingFile:
+                    recordingFile.truncate(os.path.getsize(self.path) - truncatedBytes)
+                with MarketBookRecorder(path=self.path, blockSize=1) as recorder:
+                    recorder.record_markets(markets=markets, timestamp=3.0)
+                replayer = MarketBookReplayer(path=self.path)
+                self.assertEqual(
+                    [timestamp for timestamp, _ in replayer.iter_updates()],
+                    expectedTimestamps,
+                )
+
+    def test_not_a_recording(self):
+        with open(self.path, "w") as notARecording:
+            notARecording.write('{"marketId": "1.1"}')
+        with self.assertRaises(ValueError):
+            MarketBookReplayer(path=self.path).replay()
+        with self.assertRaises(ValueError):
+            MarketBookRecorder(path=self.path)
@@ -0,0 +1,143 @@
+import threading
+import time
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from betfair_api_client.betfair_api_client.datamodel.exceptions import TooMuchData
+from betfair_api_client.betfair_api_client.request_scheduler import RequestScheduler
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeBetfairServer,
+    build_market_book,
+    create_client,
+)
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+    build_events,
+)
+
+
+def build_market_book_request(numMarkets: int) -> dict:
+    return {
+        "method": "SportsAPING/v1.0/listMarketBook",
+        "params": {
+            "marketIds": [f"1.{i}" for i in range(numMarkets)],
+            "priceProjection": {"priceData": ["EX_BEST_OFFERS"]},
+        },
+    }
+
+
+def build_place_orders_request(numInstructions: int) -> dict:
+    return {
+        "method": "SportsAPING/v1.0/placeOrders",
+        "params": {"marketId": "1.1", "instructions": [{}] * numInstructions},
+    }
+
+
+class TestRequestScheduler(TestCase):
+    def test_request_weight(self):
+        scheduler = RequestScheduler()
+        self.assertEqual(
+            scheduler.get_request_weight(
+                jsonrpcRequest=build_market_book_request(numMarkets=40)
+            ),
+            200,
+        )
+        deepRequest = build_market_book_request(numMarkets=10)
+        deepRequest["params"]["priceProjection"]["exBestOffersOverrides"] = {
+            "bestPricesDepth": 9
+        }
+        self.assertEqual(scheduler.get_request_weight(jsonrpcRequest=deepRequest), 150)
+        scheduler.acquire(jsonrpcRequest=build_market_book_request(numMarkets=40))
+        with self.assertRaises(TooMuchData):
+            scheduler.acquire(jsonrpcRequest=build_market_book_request(numMarkets=41))
+
+    def test_requests_per_second(self):
+        scheduler = RequestScheduler(requestsPerSecond=50)
+        startedAt = time.monotonic()
+        for _ in range(75):
+            scheduler.acquire(jsonrpcRequest=build_market_book_request(numMarkets=1))
+        elapsed = time.monotonic() - startedAt
+        self.assertTrue(0.4 < elapsed < 1.5)
+        self.assertEqual(scheduler.requestsScheduled, 75)
+        self.assertTrue(scheduler.requestsDelayed >= 20)
+
+    def test_orders_go_before_waiting_data_calls(self):
+        scheduler = RequestScheduler(requestsPerSecond=10)
+        for _ in range(10):
+            scheduler.acquire(jsonrpcRequest=build_market_book_request(numMarkets=1))
+        completed = []
+
+        def acquire(name: str, jsonrpcRequest: dict):
+            scheduler.acquire(jsonrpcRequest=jsonrpcRequest)
+            completed.append(name)
+
+        threads = [
+            threading.Thread(
+                target=acquire,
+                args=(f"data {i}", build_market_book_request(numMarkets=1)),
+            )
+            for i in range(3)
+        ]
+        threads.append(
+            threading.Thread(
+                target=acquire,
+                args=("order", build_place_orders_request(numInstructions=1)),
+            )
+        )
+        for thread in threads:
+            thread.start()
+            time.sleep(0.01)
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(completed[0], "order")
+        self.assertEqual(len(completed), 4)
+
+    def test_hourly_order_limit_does_not_hold_up_data_calls(self):
+        scheduler = RequestScheduler(ordersPerHour=5)
+        scheduler.acquire(jsonrpcRequest=build_place_orders_request(numInstructions=5))
+        threading.Thread(
+            target=scheduler.acquire,
+            args=(build_place_orders_request(numInstructions=1),),
+            daemon=True,
+        ).start()
+        time.sleep(0.05)
+        self.assertTrue(
+            scheduler.acquire(jsonrpcRequest=build_market_book_request(numMarkets=1))
+            < 0.01
+        )
+        self.assertTrue(
+            scheduler.acquire(
+                jsonrpcRequest={
+                    "method": "SportsAPING/v1.0/cancelOrders",
+                    "params": {"marketId": "1.1", "instructions": [{}]},
+                }
+            )
+            < 0.01
+        )
+
+    def test_client_calls_go_through_scheduler(self):
+        scheduler = RequestScheduler(requestsPerSecond=100)
+        with FakeBetfairServer() as server:
+            server.set_handler(
+                method="SportsAPING/v1.0/listMarketBook",
+                handler=lambda params: [
+                    build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+                    for marketId in params["marketIds"]
+                ],
+            )
+            client = create_client(server=server, requestScheduler=scheduler)
+            client.update_prices_for_events(
+                events=build_events(numEvents=50, marketsPerEvent=2)
+            )
+            client.close()
+        self.assertEqual(scheduler.requestsScheduled, 3)
+
+
+class TestAsyncRequestScheduler(IsolatedAsyncioTestCase):
+    async def test_requests_per_second(self):
+        scheduler = RequestScheduler(requestsPerSecond=50)
+        startedAt = time.monotonic()
+        for _ in range(75):
+            await scheduler.acquire_async(
+                jsonrpcRequest=build_market_book_request(numMarkets=1)
+            )
+        self.assertTrue(0.4 < time.monotonic() - startedAt < 1.5)
@@ -0,0 +1,100 @@
+from unittest import TestCase
+
+from betfair_api_client.betfair_api_client.datamodel.price_data import PriceData
+from betfair_api_client.betfair_api_client.request_weights import (
+    chunk_market_ids,
+    get_catalogue_max_results,
+    get_market_book_weight,
+)
+
+
+class TestRequestWeights(TestCase):
+    def __init__(self, methodName="runTest"):
+        super(TestRequestWeights, self).__init__(methodName=methodName)
+        self.marketIds = [f"1.{i}" for i in range(101)]
+
+    def test_get_market_book_weight(self):
+        self.assertEqual(get_market_book_weight(priceData=[]), 2)
+        self.assertEqual(
+            get_market_book_weight(priceData=[PriceData.EX_BEST_OFFERS]), 5
+        )
+        self.assertEqual(
+            get_market_book_weight(
+                priceData=[PriceData.EX_BEST_OFFERS, PriceData.EX_TRADED]
+            ),
+            22,
+        )
+
+    def test_all_offers_and_traded_weight(self):
+        self.assertEqual(
+            get_market_book_weight(
+                priceData=[PriceData.EX_ALL_OFFERS, PriceData.EX_TRADED]
+            ),
+            20,
+        )
+        self.assertEqual(
+            get_market_book_weight(
+                priceData=[
+                    PriceData.EX_TRADED,
+                    PriceData.SP_AVAILABLE,
+                    PriceData.EX_ALL_OFFERS,
+                ]
+            ),
+            20 + 3,
+        )
+        chunks = chunk_market_ids(
+            marketIds=self.marketIds,
+            priceData=[PriceData.EX_ALL_OFFERS, PriceData.EX_TRADED],
+        )
+        self.assertEqual([len(chunk) for chunk in chunks], [10] * 10 + [1])
+
+    def test_best_prices_depth_weight(self):
+        self.assertEqual(
+            get_market_book_weight(
+                priceData=[PriceData.EX_BEST_OFFERS], bestPricesDepth=1
+            ),
+            5,
+        )
+        self.assertEqual(
+            get_market_book_weight(
+                priceData=[PriceData.EX_BEST_OFFERS, PriceData.SP_AVAILABLE],
+                bestPricesDepth=10,
+            ),
+            17 + 3,
+        )
+        chunks = chunk_market_ids(
+            marketIds=self.marketIds,
+            priceData=[PriceData.EX_BEST_OFFERS],
+            bestPricesDepth=6,
+        )
+        self.assertEqual([len(chunk) for chunk in chunks], [20] * 5 + [1])
+
+    def test_chunk_market_ids_respects_weight_limit(self):
+        chunks = chunk_market_ids(
+            marketIds=self.marketIds, priceData=[PriceData.EX_BEST_OFFERS]
+        )
+        self.assertEqual([len(chunk) for chunk in chunks], [40, 40, 21])
+        self.assertEqual([m for chunk in chunks for m in chunk], self.marketIds)
+
+    def test_chunk_market_ids_heavy_projection(self):
+        chunks = chunk_market_ids(
+            marketIds=self.marketIds,
+            priceData=[PriceData.EX_ALL_OFFERS],
+            maxRequestWeight=10,
+        )
+        self.assertEqual(len(chunks), 101)
+
+    def test_get_catalogue_max_results(self):
+        self.assertEqual(get_catalogue_max_results(marketProjection=["EVENT"]), 1000)
+        self.assertEqual(
+            get_catalogue_max_results(
+                marketProjection=["RUNNER_DESCRIPTION", "RUNNER_METADATA"]
+            ),
+            200,
+        )
+        self.assertEqual(
+            get_catalogue_max_results(
+                marketProjection=["MARKET_DESCRIPTION", "RUNNER_METADATA"]
+            ),
+            100,
+        )
@@ -0,0 +1,387 @@
+import threading
+import time
+import urllib.error
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from betfair_api_client.betfair_api_client.datamodel.exceptions import CircuitOpen
+from betfair_api_client.betfair_api_client.datamodel.orders import (
+    OrderSides,
+    PlaceInstruction,
+)
+from betfair_api_client.betfair_api_client.resilience import (
+    CircuitBreaker,
+    CircuitStates,
+    LatencyTracker,
+    ResiliencePolicy,
+    is_retryable_exception,
+)
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeApiError,
+    FakeBetfairServer,
+    FakeHttpError,
+    build_market_book,
+    create_async_client,
+    create_client,
+)
+from betfair_api_client.betfair_api_client.transport import PooledHttpTransport
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+    build_events,
+)
+
+COMPETITIONS = [{"competition": {"id": "10932509", "name": "English Premier League"}}]
+
+
+class FlakyHandler:
+    def __init__(self, result, failures: int = 0, error=None, delays=None):
+        """
+        Fails the first `failures` calls with `error` and sleeps for the given delays of the first calls.
+        """
+        self.result = result
+        self.failures = failures
+        self.error = error if error is not None else FakeHttpError(statusCode=503)
+        self.delays = list(delays or [])
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, params):
+        with self._lock:
+            self.calls.append(params)
+            callIndex = len(self.calls) - 1
+        if callIndex < len(self.delays):
+            time.sleep(self.delays[callIndex])
+        if callIndex < self.failures:
+            raise self.error
+        return self.result(params) if callable(self.result) else self.result
+
+
+def fast_policy(**kwargs) -> ResiliencePolicy:
+    return ResiliencePolicy(backoffBase=0.001, backoffMax=0.01, **kwargs)
+
+
+class TestCircuitBreaker(TestCase):
+    def test_opens_after_consecutive_failures(self):
+        circuitBreaker = CircuitBreaker(failureThreshold=2, resetTimeout=60)
+        circuitBreaker.record_failure()
+        circuitBreaker.record_success()
+        circuitBreaker.record_failure()
+        self.assertTrue(circuitBreaker.allow_request())
+        circuitBreaker.record_failure()
+        self.assertEqual(circuitBreaker.state, CircuitStates.OPEN)
+        self.assertFalse(circuitBreaker.allow_request())
+
+    def test_half_open_trial(self):
+        circuitBreaker = CircuitBreaker(failureThreshold=1, resetTimeout=0.05)
+        circuitBreaker.record_failure()
+        self.assertFalse(circuitBreaker.allow_request())
+        time.sleep(0.06)
+        self.assertTrue(circuitBreaker.allow_request())
+        self.assertEqual(circuitBreaker.state, CircuitStates.HALF_OPEN)
+        # only one trial call at a time
+        self.assertFalse(circuitBreaker.allow_request())
+        circuitBreaker.record_failure()
+        self.assertEqual(circuitBreaker.state, CircuitStates.OPEN)
+        time.sleep(0.06)
+        self.assertTrue(circuitBreaker.allow_request())
+        circuitBreaker.record_success()
+        self.assertEqual(circuitBreaker.state, CircuitStates.CLOSED)
+        self.assertTrue(circuitBreaker.allow_request())
+
+
+class TestResiliencePolicy(TestCase):
+    def test_latency_quantile(self):
+        latencyTracker = LatencyTracker(windowSize=100)
+        self.assertIsNone(latencyTracker.get_quantile(quantile=0.95))
+        for latency in range(200):
+            latencyTracker.record(latency=latency / 1000)
+        self.assertEqual(len(latencyTracker), 100)
+        self.assertAlmostEqual(latencyTracker.get_quantile(quantile=0.95), 0.195)
+
+    def test_retryable_exceptions(self):
+        def http_error(code: int) -> urllib.error.HTTPError:
+            return urllib.error.HTTPError(url="", code=code, msg="", hdrs=None, fp=None)
+
+        self.assertTrue(is_retryable_exception(ex=http_error(code=503)))
+        self.assertTrue(is_retryable_exception(ex=http_error(code=429)))
+        self.assertFalse(is_retryable_exception(ex=http_error(code=400)))
+        self.assertTrue(
+            is_retryable_exception(ex=urllib.error.URLError(reason="refused"))
+        )
+        self.assertFalse(is_retryable_exception(ex=ValueError()))
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = ResiliencePolicy(backoffBase=0.1, backoffMax=1.0)
+        with patch("random.uniform", side_effect=lambda low, high: high):
+            self.assertEqual(
+                [policy.get_backoff(attempt=attempt) for attempt in range(1, 6)],
+                [0.2, 0.4, 0.8, 1.0, 1.0],
+            )
+
+    def test_orders_without_customer_ref_are_not_retried(self):
+        policy = fast_policy()
+        calls = []
+
+        def send():
+            calls.append(1)
+            raise urllib.error.URLError(reason="reset")
+
+        with self.assertRaises(urllib.error.URLError):
+            policy.call(
+                send=send,
+                jsonrpcRequest={
+                    "method": "SportsAPING/v1.0/placeOrders",
+                    "params": {"marketId": "1.1", "instructions": []},
+                },
+                endpointURL="betting",
+            )
+        self.assertEqual(len(calls), 1)
+
+    def test_orders_are_only_retried_when_not_processed(self):
+        def call(failure) -> int:
+            calls = []
+
+            def send():
+                calls.append(1)
+                if len(calls) > 1:
+                    return {"status": "SUCCESS"}
+                if isinstance(failure, Exception):
+                    raise failure
+                return failure
+
+            try:
+                fast_policy().call(
+                    send=send,
+                    jsonrpcRequest={
+                        "method": "SportsAPING/v1.0/placeOrders",
+                        "params": {"marketId": "1.1", "customerRef": "ref"},
+                    },
+                    endpointURL="betting",
+                )
+            except urllib.error.URLError:
+                pass
+            return len(calls)
+
+        self.assertEqual(
+            call(failure=urllib.error.URLError(reason=ConnectionRefusedError())), 2
+        )
+        self.assertEqual(call(failure={"error": {"message": "ANGX-0008"}}), 2)
+        # Betfair may have placed the bets before these
+        self.assertEqual(call(failure=urllib.error.URLError(reason=TimeoutError())), 1)
+        self.assertEqual(call(failure={"error": {"message": "ANGX-0009"}}), 1)
+
+    def test_event_reads_are_retried(self):
+        calls = []
+
+        def send():
+            calls.append(1)
+            if len(calls) == 1:
+                raise urllib.error.URLError(reason=TimeoutError())
+            return []
+
+        fast_policy().call(
+            send=send,
+            jsonrpcRequest={"method": "SportsAPING/v1.0/listEvents", "params": {}},
+            endpointURL="betting",
+        )
+        self.assertEqual(len(calls), 2)
+
+
+class TestResilientClient(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeBetfairServer().start()
+
+    def tearDown(self):
+        super().tearDown()
+        self.server.stop()
+
+    def _set_market_book_handler(self, **kwargs) -> FlakyHandler:
+        handler = FlakyHandler(
+            result=lambda params: [
+                build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+                for marketId in params["marketIds"]
+            ],
+            **kwargs,
+        )
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listMarketBook", handler=handler
+        )
+        return handler
+
+    def test_transient_errors_are_retried(self):
+        handler = self._set_market_book_handler(failures=2)
+        policy = fast_policy(maxAttempts=3)
+        client = create_client(server=self.server, resiliencePolicy=policy)
+        events = build_events(numEvents=1, marketsPerEvent=2)
+        client.update_prices_for_events(events=events)
+        client.close()
+        self.assertEqual(len(handler.calls), 3)
+        self.assertEqual(policy.get_stats()["retries"], 2)
+        for market in events[0].get_all_markets():
+            runner = market.runners[SELECTION_IDS[0]]
+            self.assertEqual(runner.get_best_back_price().price, 2.0)
+
+    def test_without_policy_errors_are_raised(self):
+        self._set_market_book_handler(failures=1)
+        client = create_client(server=self.server)
+        with self.assertRaises(urllib.error.HTTPError):
+            client.update_prices_for_events(
+                events=build_events(numEvents=1, marketsPerEvent=2)
+            )
+        client.close()
+
+    def test_busy_service_is_retried(self):
+        handler = FlakyHandler(
+            result=COMPETITIONS, failures=1, error=FakeApiError("ANGX-0009")
+        )
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listCompetitions", handler=handler
+        )
+        client = create_client(server=self.server, resiliencePolicy=fast_policy())
+        competitions = client.list_competitions(sportTypeIds=[1])
+        client.close()
+        self.assertEqual(len(competitions), 1)
+        self.assertEqual(len(handler.calls), 2)
+
+    def test_orders_are_retried_with_the_same_customer_ref(self):
+        handler = FlakyHandler(
+            result=lambda params: {
+                "status": "SUCCESS",
+                "marketId": params["marketId"],
+                "instructionReports": [
+                    {"status": "SUCCESS", "betId": str(index)}
+                    for index, _ in enumerate(params["instructions"])
+                ],
+            },
+            failures=1,
+        )
+        self.server.set_handler(method="SportsAPING/v1.0/placeOrders", handler=handler)
+        client = create_client(server=self.server, resiliencePolicy=fast_policy())
+        market = build_events(numEvents=1, marketsPerEvent=1)[0].get_all_markets()[0]
+        reports = client.place_orders(
+            instructions=[
+                PlaceInstruction(
+                    market=market,
+                    runner=market.runners[SELECTION_IDS[0]],
+                    side=OrderSides.BACK,
+                    price=2.0,
+                    size=2,
+                )
+            ]
+        )
+        client.close()
+        self.assertTrue(reports[0].isSuccess)
+        self.assertEqual(len(handler.calls), 2)
+        self.assertEqual(len(handler.calls[0]["customerRef"]), 32)
+        self.assertEqual(
+            handler.calls[0]["customerRef"], handler.calls[1]["customerRef"]
+        )
+
+    def test_orders_accepted_before_a_timeout_are_not_resent(self):
+        handler = FlakyHandler(
+            result=lambda params: {
+                "status": "SUCCESS",
+                "marketId": params["marketId"],
+                "instructionReports": [{"status": "SUCCESS", "betId": "1"}],
+            },
+            delays=[0.5],
+        )
+        self.server.set_handler(method="SportsAPING/v1.0/placeOrders", handler=handler)
+        client = create_client(
+            server=self.server,
+            resiliencePolicy=fast_policy(),
+            transport=PooledHttpTransport(readTimeout=0.2),
+        )
+        market = build_events(numEvents=1, marketsPerEvent=1)[0].get_all_markets()[0]
+        try:
+            # the bet is live, a retry would only come back as DUPLICATE_TRANSACTION
+            with self.assertRaises(urllib.error.URLError):
+                client.place_orders(
+                    instructions=[
+                        PlaceInstruction(
+                            market=market,
+                            runner=market.runners[SELECTION_IDS[0]],
+                            side=OrderSides.BACK,
+                            price=2.0,
+                            size=2,
+                        )
+                    ]
+                )
+            time.sleep(0.4)
+        finally:
+            client.close()
+        self.assertEqual(len(handler.calls), 1)
+
+    def test_open_circuit_fails_fast(self):
+        self._set_market_book_handler(failures=100)
+        policy = fast_policy(maxAttempts=2, failureThreshold=2, resetTimeout=60)
+        client = create_client(server=self.server, resiliencePolicy=policy)
+        events = build_events(numEvents=1, marketsPerEvent=2)
+        with self.assertRaises(urllib.error.HTTPError):
+            client.update_prices_for_events(events=events)
+        requestsHandled = self.server.requestsHandled
+        with self.assertRaises(CircuitOpen):
+            client.update_prices_for_events(events=events)
+        client.close()
+        self.assertEqual(self.server.requestsHandled, requestsHandled)
+        self.assertEqual(policy.get_stats()["openCircuits"], 1)
+        self.assertEqual(policy.get_stats()["circuitRejections"], 1)
+
+    def test_slow_reads_are_hedged(self):
+        handler = FlakyHandler(result=COMPETITIONS, delays=[0.0] * 5 + [1.0])
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listCompetitions", handler=handler
+        )
+        policy = fast_policy(hedgeRequests=True, minHedgeSamples=5)
+        client = create_client(server=self.server, resiliencePolicy=policy)
+        for _ in range(5):
+            client.list_competitions(sportTypeIds=[1])
+        startedAt = time.monotonic()
+        competitions = client.list_competitions(sportTypeIds=[1])
+        elapsed = time.monotonic() - startedAt
+        client.close()
+        self.assertEqual(len(competitions), 1)
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(policy.get_stats()["hedgesSent"], 1)
+        self.assertEqual(policy.get_stats()["hedgesWon"], 1)
+
+
+class TestAsyncResilientClient(IsolatedAsyncioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeBetfairServer().start()
+
+    def tearDown(self):
+        super().tearDown()
+        self.server.stop()
+
+    async def test_transient_errors_are_retried(self):
+        handler = FlakyHandler(result=COMPETITIONS, failures=2)
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listCompetitions", handler=handler
+        )
+        async with create_async_client(
+            server=self.server, resiliencePolicy=fast_policy(maxAttempts=3)
+        ) as client:
+            competitions = await client.list_competitions(sportTypeIds=[1])
+        self.assertEqual(len(competitions), 1)
+        self.assertEqual(len(handler.calls), 3)
+
+    async def test_slow_reads_are_hedged(self):
+        handler = FlakyHandler(result=COMPETITIONS, delays=[0.0] * 5 + [1.0])
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listCompetitions", handler=handler
+        )
+        policy = fast_policy(hedgeRequests=True, minHedgeSamples=5)
+        async with create_async_client(
+            server=self.server, resiliencePolicy=policy
+        ) as client:
+            for _ in range(5):
+                await client.list_competitions(sportTypeIds=[1])
+            startedAt = time.monotonic()
+            competitions = await client.list_competitions(sportTypeIds=[1])
+            elapsed = time.monotonic() - startedAt
+        self.assertEqual(len(competitions), 1)
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(policy.get_stats()["hedgesWon"], 1)
@@ -56,3 +56,68 @@ class TestRunner(TestCase):
         self.noOddsRunner.update_lay_odds(availableToLay=self.availableToLay)
         bestLayPrice = self.noOddsRunner.get_best_lay_price()
         self.assertEqual(bestLayPrice, self.bestAvailableToLay)
+
+    def test_update_back_and_lay_levels(self):
+        self.noOddsRunner.update_back_levels(
+            levels=[{"price": 9, "size": 900}, {"price": 6, "size": 600}]
+        )
+        self.noOddsRunner.update_lay_levels(levels=[{"price": 10, "size": 1000}])
+        self.assertEqual(
+            self.noOddsRunner.get_best_back_price(), self.bestAvailableToBack
+        )
+        self.assertEqual(
+            self.noOddsRunner.get_best_lay_price(), self.bestAvailableToLay
+        )
+        self.assertEqual(len(self.noOddsRunner.get_all_available_runner_prices()), 3)
+
+    def test_get_spread_and_mid_price(self):
+        self.assertEqual(self.oddsRunner.get_spread(), 1)
+        self.assertEqual(self.oddsRunner.get_mid_price(), 9.5)
+        self.assertIsNone(self.noOddsRunner.get_spread())
+        self.assertIsNone(self.noOddsRunner.get_mid_price())
+
+    def test_get_depth(self):
+        self.assertEqual(
+            [
+                runnerPrice.price
+                for runnerPrice in self.oddsRunner.get_back_depth(levels=2)
+            ],
+            [9, 6],
+        )
+        self.assertEqual(
+            [
+                runnerPrice.price
+                for runnerPrice in self.oddsRunner.get_lay_depth(levels=2)
+            ],
+            [10, 13],
+        )
+
+    def test_get_volume_to_price(self):
+        self.assertEqual(self.oddsRunner.get_back_volume_to_price(price=6), 1500)
+        self.assertEqual(self.oddsRunner.get_lay_volume_to_price(price=13), 2300)
+
+    def test_runner_price_equality(self):
+        runnerPrice = RunnerPrice(betType=BetTypes.BACK, price=2.0, size=10.0)
+        self.assertEqual(
+            runnerPrice, RunnerPrice(betType=BetTypes.BACK, price=2.0, size=10.0)
+        )
+        self.assertNotEqual(
+            runnerPrice, RunnerPrice(betType=BetTypes.LAY, price=2.0, size=10.0)
+        )
+        self.assertNotEqual(
+            runnerPrice, RunnerPrice(betType=BetTypes.BACK, price=2.0, size=10.5)
+        )
+        self.assertNotEqual(runnerPrice, (BetTypes.BACK, 2.0, 10.0))
+        self.assertNotEqual(runnerPrice, None)
+        self.assertEqual(
+            len({runnerPrice, RunnerPrice(betType=BetTypes.BACK, price=2, size=10)}), 1
+        )
+
+    def test_no_instance_dict(self):
+        for instance in [
+            self.oddsRunner,
+            RunnerPrice(betType=BetTypes.BACK, price=2.0, size=10.0),
+        ]:
+            self.assertFalse(hasattr(instance, "__dict__"))
+            with self.assertRaises(AttributeError):
+                instance.unknownAttribute = 1
@@ -0,0 +1,157 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import IsolatedAsyncioTestCase, TestCase, skipIf
+
+from betfair_api_client.betfair_api_client.parsing import ijson
+
+from betfair_api_client.betfair_api_client.session_manager import is_session_error
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeBetfairServer,
+    build_market_book,
+    create_async_client,
+    create_client,
+)
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+    build_events,
+)
+
+COMPETITIONS = [{"competition": {"id": "10932509", "name": "English Premier League"}}]
+
+
+class TestSessionManager(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeBetfairServer().start()
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listCompetitions",
+            handler=lambda params: COMPETITIONS,
+        )
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listMarketBook",
+            handler=lambda params: [
+                build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+                for marketId in params["marketIds"]
+            ],
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.server.stop()
+
+    def test_is_session_error(self):
+        self.assertTrue(is_session_error(result={"error": {"message": "ANGX-0003"}}))
+        self.assertTrue(
+            is_session_error(
+                result={
+                    "error": {
+                        "message": "ANGX-0005",
+                        "data": {"APINGException": {"errorCode": "NO_SESSION"}},
+                    }
+                }
+            )
+        )
+        self.assertFalse(is_session_error(result={"error": {"message": "ANGX-0001"}}))
+        self.assertFalse(is_session_error(result=[{"marketId": "1.1"}]))
+
+    def test_expired_session_is_renewed_once_for_concurrent_calls(self):
+        client = create_client(server=self.server)
+        try:
+            self.server.expire_session()
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(
+                    executor.map(
+                        lambda _: client.list_competitions(sportTypeIds=[1]), range(8)
+                    )
+                )
+            self.assertTrue(all(len(competitions) == 1 for competitions in results))
+            self.assertEqual(self.server.logins, 2)
+            self.assertEqual(client.sessionToken, self.server.sessionToken)
+            self.assertEqual(client.sessionManager.get_stats()["logins"], 2)
+        finally:
+            client.close()
+
+    @skipIf(ijson is None, "ijson is not installed")
+    def test_expired_session_is_renewed_for_streamed_market_books(self):
+        client = create_client(server=self.server, streamResponses=True)
+        try:
+            events = build_events(numEvents=2, marketsPerEvent=2)
+            self.server.expire_session()
+            client.update_prices_for_events(events=events)
+            self.assertEqual(self.server.logins, 2)
+            for event in events:
+                for market in event.get_all_markets():
+                    runner = market.runners[SELECTION_IDS[0]]
+                    self.assertEqual(runner.get_best_back_price().price, 2.0)
+        finally:
+            client.close()
+
+    def test_keep_alive_thread(self):
+        client = create_client(server=self.server, keepAliveInterval=0.05)
+        try:
+            time.sleep(0.3)
+            self.server.expire_session()
+            time.sleep(0.3)
+            stats = client.sessionManager.get_stats()
+        finally:
+            client.close()
+        self.assertGreater(stats["heartbeatsSent"], 2)
+        self.assertGreaterEqual(stats["heartbeatFailures"], 1)
+        self.assertEqual(self.server.logins, 2)
+        self.assertEqual(client.sessionToken, self.server.sessionToken)
+        self.assertIsNotNone(stats["meanHeartbeatLatency"])
+        self.assertIsNotNone(stats["lastLoginLatency"])
+
+    def test_no_keep_alive_thread_by_default(self):
+        client = create_client(server=self.server)
+        client.close()
+        self.assertIsNone(client.sessionManager._thread)
+        self.assertEqual(client.sessionManager.get_stats()["heartbeatsSent"], 0)
+
+
+class TestAsyncSessionManager(IsolatedAsyncioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeBetfairServer().start()
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listCompetitions",
+            handler=lambda params: COMPETITIONS,
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.server.stop()
+
+    async def test_expired_session_is_renewed(self):
+        async with create_async_client(server=self.server) as client:
+            self.server.expire_session()
+            results = await asyncio.gather(
+                *[client.list_competitions(sportTypeIds=[1]) for _ in range(5)]
+            )
+        self.assertTrue(all(len(competitions) == 1 for competitions in results))
+        self.assertEqual(self.server.logins, 2)
+        self.assertEqual(client.sessionToken, self.server.sessionToken)
+
+    async def test_keep_alive_task(self):
+        async with create_async_client(
+            server=self.server, keepAliveInterval=0.05
+        ) as client:
+            await asyncio.sleep(0.3)
+            self.server.expire_session()
+            await asyncio.sleep(0.3)
+        stats = client.sessionManager.get_stats()
+        self.assertGreater(stats["heartbeatsSent"], 2)
+        self.assertEqual(self.server.logins, 2)
+        self.assertIsNone(client.sessionManager._task)
+
+    async def test_stop_does_not_wait_for_the_next_keep_alive(self):
+        client = create_async_client(server=self.server, keepAliveInterval=60.0)
+        async with client:
+            task = client.sessionManager._task
+            startedAt = time.monotonic()
+        self.assertLess(time.monotonic() - startedAt, 1.0)
+        # the task returned rather than being cancelled
+        self.assertTrue(task.done())
+        self.assertFalse(task.cancelled())
+        self.assertEqual(client.sessionManager.get_stats()["heartbeatsSent"], 0)
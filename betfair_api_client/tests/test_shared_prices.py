@@ -0,0 +1,359 @@
+import functools
+import math
+import multiprocessing
+import signal
+import threading
+import time
+from unittest import TestCase, mock
+
+from betfair_api_client.betfair_api_client.datamodel.bet_types import BetTypes
+from betfair_api_client.betfair_api_client.datamodel.exceptions import TooMuchData
+from betfair_api_client.betfair_api_client.price_ticks import np
+from betfair_api_client.betfair_api_client.shared_prices import (
+    MultiProcessPoller,
+    SharedPriceBook,
+    _WorkerShutdown,
+    _poll_markets,
+)
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeApiError,
+    FakeBetfairServer,
+    FakeHttpError,
+    build_market_book,
+    create_client,
+)
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+    build_events,
+)
+
+
+class ServerURL:
+    def __init__(self, url: str):
+        """
+        Stands in for a FakeBetfairServer in worker processes, which only need its URL.
+        """
+        self.url = url
+
+
+def _get_markets(numEvents: int):
+    return [
+        market
+        for event in build_events(numEvents=numEvents, marketsPerEvent=2)
+        for market in event.get_all_markets()
+    ]
+
+
+def _read_in_process(bookName: str, marketId: str, results) -> None:
+    priceBook = SharedPriceBook.attach(name=bookName)
+    try:
+        results.put(priceBook.read_market(marketId=marketId))
+    finally:
+        priceBook.close()
+
+
+class TestSharedPriceBook(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.markets = _get_markets(numEvents=3)
+        self.priceBook = SharedPriceBook.create(
+            markets=self.markets, depth=3, maxRunners=4
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.priceBook.close()
+        self.priceBook.unlink()
+
+    def test_write_and_read_market_books(self):
+        marketBook = build_market_book(
+            marketId=self.markets[1].marketId, selectionIds=SELECTION_IDS, depth=5
+        )
+        marketBook["runners"][0]["lastPriceTraded"] = 2.04
+        self.assertEqual(
+            self.priceBook.write_market_books(
+                marketBooks=[
+                    marketBook,
+                    build_market_book(marketId="1.999", selectionIds=SELECTION_IDS),
+                ],
+                timestamp=100.0,
+            ),
+            1,
+        )
+        snapshot = self.priceBook.read_market(marketId=self.markets[1].marketId)
+        self.assertEqual(snapshot["sequence"], 2)
+        self.assertEqual(snapshot["updatedAt"], 100.0)
+        self.assertEqual(sorted(snapshot["runners"]), SELECTION_IDS)
+        runner = snapshot["runners"][SELECTION_IDS[0]]
+        self.assertEqual(runner["lastPriceTraded"], 2.04)
+        # only the first `depth` levels are kept
+        self.assertEqual(
+            runner[BetTypes.BACK], [(2.0, 10.0), (1.98, 11.0), (1.96, 12.0)]
+        )
+        self.assertEqual(
+            runner[BetTypes.LAY], [(2.02, 20.0), (2.04, 21.0), (2.06, 22.0)]
+        )
+        self.assertIsNone(snapshot["runners"][SELECTION_IDS[1]]["lastPriceTraded"])
+        untouched = self.priceBook.read_market(marketId=self.markets[0].marketId)
+        self.assertEqual(untouched["sequence"], 0)
+        self.assertEqual(untouched["runners"][SELECTION_IDS[0]][BetTypes.BACK], [])
+
+    def test_shorter_ladders_and_missing_sides(self):
+        marketId = self.markets[0].marketId
+        self.priceBook.write_market_books(
+            marketBooks=[
+                build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+            ]
+        )
+        marketBook = build_market_book(
+            marketId=marketId, selectionIds=SELECTION_IDS, depth=1
+        )
+        del marketBook["runners"][0]["ex"][BetTypes.LAY]
+        self.priceBook.write_market_books(marketBooks=[marketBook])
+        runner = self.priceBook.read_market(marketId=marketId)["runners"][
+            SELECTION_IDS[0]
+        ]
+        self.assertEqual(runner[BetTypes.BACK], [(2.0, 10.0)])
+        self.assertEqual(len(runner[BetTypes.LAY]), 3)
+        self.assertEqual(self.priceBook.get_sequence(marketId=marketId), 4)
+
+    def test_new_runners_take_spare_slots(self):
+        marketId = self.markets[0].marketId
+        self.priceBook.write_market_books(
+            marketBooks=[
+                build_market_book(
+                    marketId=marketId, selectionIds=SELECTION_IDS + [104, 105]
+                )
+            ]
+        )
+        runnerSlots = self.priceBook.get_runner_slots(marketId=marketId)
+        self.assertEqual(runnerSlots, {101: 0, 102: 1, 103: 2, 104: 3})
+        self.assertEqual(
+            sorted(self.priceBook.read_market(marketId=marketId)["runners"]),
+            SELECTION_IDS + [104],
+        )
+
+    def test_write_market_and_read_into_market(self):
+        market = self.markets[2]
+        runner = market.runners[SELECTION_IDS[2]]
+        runner.update_back_levels(levels=[{"price": 3.5, "size": 7.0}])
+        runner.update_lay_levels(
+            levels=[{"price": 3.6, "size": 8.0}, {"price": 3.7, "size": 9.0}]
+        )
+        runner.lastPriceTraded = 3.55
+        self.priceBook.write_market(market=market)
+        consumerMarket = _get_markets(numEvents=3)[2]
+        sequence = self.priceBook.read_into_market(market=consumerMarket)
+        self.assertEqual(sequence, 2)
+        consumerRunner = consumerMarket.runners[SELECTION_IDS[2]]
+        self.assertEqual(consumerRunner.get_best_back_price().price, 3.5)
+        self.assertEqual(consumerRunner.get_best_lay_price().size, 8.0)
+        self.assertEqual(list(consumerRunner.layLadder.sizes), [8.0, 9.0])
+        self.assertEqual(consumerRunner.lastPriceTraded, 3.55)
+        self.assertIsNone(consumerMarket.runners[SELECTION_IDS[0]].lastPriceTraded)
+
+    def test_get_arrays(self):
+        marketId = self.markets[1].marketId
+        self.priceBook.write_market_books(
+            marketBooks=[
+                build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+            ]
+        )
+        arrays = self.priceBook.get_arrays()
+        if np is None:
+            self.assertEqual(arrays["backPrices"][(1 * 4 + 0) * 3], 2.0)
+            return
+        self.assertEqual(arrays["backPrices"].shape, (6, 4, 3))
+        self.assertEqual(arrays["backPrices"][1, 0, 0], 2.0)
+        self.assertEqual(arrays["laySizes"][1, 2].tolist(), [20.0, 21.0, 22.0])
+        self.assertEqual(arrays["selectionIds"][1].tolist(), SELECTION_IDS + [0])
+        self.assertTrue(math.isnan(arrays["lastPriceTraded"][1, 0]))
+        del arrays
+
+    def test_attach_from_another_process(self):
+        marketId = self.markets[3].marketId
+        self.priceBook.write_market_books(
+            marketBooks=[
+                build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+            ]
+        )
+        attached = SharedPriceBook.attach(name=self.priceBook.name)
+        try:
+            self.assertFalse(attached.isOwner)
+            self.assertEqual(attached.marketIds, self.priceBook.marketIds)
+            self.assertEqual(attached.depth, 3)
+        finally:
+            attached.close()
+        results = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_read_in_process,
+            kwargs={
+                "bookName": self.priceBook.name,
+                "marketId": marketId,
+                "results": results,
+            },
+        )
+        process.start()
+        snapshot = results.get(timeout=10)
+        process.join(timeout=10)
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(snapshot, self.priceBook.read_market(marketId=marketId))
+
+    def test_read_times_out_on_an_unfinished_write(self):
+        marketId = self.markets[0].marketId
+        # a writer that died between starting and finishing its write
+        self.priceBook._begin_write(marketIndex=0)
+        with self.assertRaises(TimeoutError):
+            self.priceBook.read_market(marketId=marketId, timeout=0.05)
+        with self.assertRaises(TimeoutError):
+            self.priceBook.read_into_market(market=self.markets[0], timeout=0.05)
+        self.assertEqual(
+            self.priceBook.read_market(marketId=self.markets[1].marketId)["sequence"],
+            0,
+        )
+
+    def test_worker_shutdown_waits_for_the_write(self):
+        shutdown = _WorkerShutdown()
+        with self.assertRaises(SystemExit):
+            with shutdown.writing():
+                shutdown(signal.SIGTERM, None)
+                self.priceBook.write_market(market=self.markets[0])
+        self.assertEqual(
+            self.priceBook.get_sequence(marketId=self.markets[0].marketId), 2
+        )
+        with self.assertRaises(SystemExit):
+            _WorkerShutdown()(signal.SIGTERM, None)
+
+    def test_invalid_books(self):
+        with self.assertRaises(ValueError):
+            SharedPriceBook.create(markets=self.markets, maxRunners=2)
+
+
+class TestMultiProcessPoller(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeBetfairServer().start()
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listMarketBook",
+            handler=lambda params: [
+                build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+                for marketId in params["marketIds"]
+            ],
+        )
+        self.markets = _get_markets(numEvents=20)
+        self.clientFactory = functools.partial(
+            create_client, server=ServerURL(url=self.server.url)
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.server.stop()
+
+    def test_workers_fill_the_price_book(self):
+        with MultiProcessPoller(
+            clientFactory=self.clientFactory,
+            markets=self.markets,
+            numWorkers=2,
+            interval=0.05,
+        ) as poller:
+            self.assertTrue(poller.wait_for_polls(polls=2, timeout=30))
+            stats = poller.get_stats()
+            consumer = SharedPriceBook.attach(name=poller.priceBook.name)
+            try:
+                for market in self.markets:
+                    snapshot = consumer.read_market(marketId=market.marketId)
+                    self.assertGreaterEqual(snapshot["sequence"], 2)
+                    self.assertEqual(
+                        snapshot["runners"][SELECTION_IDS[1]][BetTypes.BACK][0],
+                        (2.5, 10.0),
+                    )
+            finally:
+                consumer.close()
+        self.assertEqual(len(stats), 2)
+        self.assertTrue(all(workerStats["alive"] for workerStats in stats))
+        self.assertTrue(all(workerStats["errors"] == 0 for workerStats in stats))
+        self.assertIsNone(poller.priceBook)
+        # each worker logs in with its own session
+        self.assertEqual(self.server.logins, 2)
+
+    def test_failed_polls_are_counted(self):
+        def unavailable(params):
+            raise FakeHttpError(statusCode=503)
+
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listMarketBook", handler=unavailable
+        )
+        poller = MultiProcessPoller(
+            clientFactory=self.clientFactory,
+            markets=self.markets[:3],
+            numWorkers=4,
+            interval=0.01,
+        ).start()
+        try:
+            self.assertEqual(poller.numWorkers, 3)
+            self.assertFalse(poller.wait_for_polls(polls=1, timeout=0.5))
+            stats = poller.get_stats()
+        finally:
+            poller.stop()
+        self.assertTrue(all(workerStats["alive"] for workerStats in stats))
+        self.assertTrue(all(workerStats["errors"] >= 1 for workerStats in stats))
+
+    def test_poll_errors_are_raised_as_their_exception_class(self):
+        def too_much_data(params):
+            raise FakeApiError("ANGX-0001")
+
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listMarketBook", handler=too_much_data
+        )
+        errors = [0]
+        stopEvent = threading.Event()
+        with SharedPriceBook.create(markets=self.markets[:2]) as priceBook:
+            # the worker loop runs in a thread here, where it can not install its signal handler
+            with mock.patch.object(signal, "signal"), mock.patch(
+                "logging.exception"
+            ) as logException:
+                worker = threading.Thread(
+                    target=_poll_markets,
+                    kwargs={
+                        "clientFactory": self.clientFactory,
+                        "bookName": priceBook.name,
+                        "marketIds": [market.marketId for market in self.markets[:2]],
+                        "interval": 0.01,
+                        "stopEvent": stopEvent,
+                        "polls": [0],
+                        "errors": errors,
+                        "workerIndex": 0,
+                    },
+                )
+                worker.start()
+                deadline = time.monotonic() + 10
+                while errors[0] == 0 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                stopEvent.set()
+                worker.join(timeout=10)
+        self.assertGreaterEqual(errors[0], 1)
+        self.assertIsInstance(logException.call_args.kwargs["msg"], TooMuchData)
+
+    def test_workers_waiting_on_a_response_are_stopped_cleanly(self):
+        released = threading.Event()
+        requested = threading.Event()
+
+        def slow(params):
+            requested.set()
+            released.wait(timeout=10)
+            return []
+
+        self.server.set_handler(method="SportsAPING/v1.0/listMarketBook", handler=slow)
+        poller = MultiProcessPoller(
+            clientFactory=self.clientFactory, markets=self.markets[:2], numWorkers=1
+        ).start()
+        try:
+            self.assertTrue(requested.wait(timeout=30))
+            worker = poller._workers[0]
+            startedAt = time.monotonic()
+            poller.stop(timeout=0.1)
+        finally:
+            released.set()
+        self.assertLess(time.monotonic() - startedAt, 5)
+        # exited through SystemExit rather than killed by the signal
+        self.assertEqual(worker.exitcode, 0)
@@ -0,0 +1,343 @@
+import json
+import socket
+import threading
+from unittest import TestCase
+
+from betfair_api_client.betfair_api_client.datamodel.exceptions import StreamException
+from betfair_api_client.betfair_api_client.streaming import (
+    BetfairStreamClient,
+    MarketStreamCache,
+)
+
+MARKET_ID = "1.171796736"
+
+SUB_IMAGE = {
+    "op": "mcm",
+    "id": 2,
+    "initialClk": "AAA",
+    "clk": "AAB",
+    "ct": "SUB_IMAGE",
+    "pt": 1596533400000,
+    "mc": [
+        {
+            "id": MARKET_ID,
+            "img": True,
+            "marketDefinition": {
+                "marketTime": "2020-08-04T09:30:00.000Z",
+                "runners": [{"id": 6480414, "hc": 0}, {"id": 58805, "hc": 0}],
+            },
+            "rc": [
+                {
+                    "id": 6480414,
+                    "batb": [[0, 2.0, 10.0], [1, 1.99, 5.0]],
+                    "batl": [[0, 2.02, 8.0]],
+                },
+                {"id": 58805, "batb": [[0, 3.5, 2.0]], "batl": [[0, 3.6, 4.0]]},
+            ],
+        }
+    ],
+}
+DELTA = {
+    "op": "mcm",
+    "id": 2,
+    "clk": "AAC",
+    "pt": 1596533401000,
+    "mc": [{"id": MARKET_ID, "rc": [{"id": 6480414, "batb": [[1, 1.99, 0]]}]}],
+}
+RESUB_DELTA = {
+    "op": "mcm",
+    "id": 2,
+    "clk": "AAD",
+    "ct": "RESUB_DELTA",
+    "pt": 1596533402000,
+    "mc": [{"id": MARKET_ID, "rc": [{"id": 58805, "batb": [[0, 3.55, 7.0]]}]}],
+}
+
+# a new subscription image in two segments, without runner 58805
+SEGMENTED_IMAGE = [
+    {
+        "op": "mcm",
+        "id": 2,
+        "initialClk": "BBA",
+        "ct": "SUB_IMAGE",
+        "segmentType": "SEG_START",
+        "pt": 1596533403000,
+        "mc": [
+            {
+                "id": MARKET_ID,
+                "img": True,
+                "marketDefinition": {
+                    "status": "OPEN",
+                    "inPlay": True,
+                    "runners": [{"id": 6480414, "hc": 0}],
+                },
+                "rc": [{"id": 6480414, "batb": [[0, 1.9, 3.0]]}],
+            }
+        ],
+    },
+    {
+        "op": "mcm",
+        "id": 2,
+        "clk": "BBB",
+        "segmentType": "SEG_END",
+        "pt": 1596533403000,
+        "mc": [{"id": "1.2", "img": True, "rc": [{"id": 1, "batl": [[0, 5.0, 1.0]]}]}],
+    },
+]
+
+
+def build_failure_status(errorCode: str) -> dict:
+    return {
+        "op": "status",
+        "statusCode": "FAILURE",
+        "errorCode": errorCode,
+        "errorMessage": "",
+        "connectionClosed": True,
+    }
+
+
+class ReplayStreamServer:
+    def __init__(self, connectionFrames, authenticationStatus="SUCCESS"):
+        """
+        Plain TCP server speaking the stream protocol handshake, then replaying the recorded frames
+        for each successive connection.  Connections run out of frames are closed by the server,
+        except the last one, which stays open.
+        """
+        self.connectionFrames = connectionFrames
+        self.authenticationStatus = authenticationStatus
+        self.subscriptions = []
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self._openConnections = []
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._listener.getsockname()[1]
+
+    def start(self) -> "ReplayStreamServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._listener.close()
+        for connection in self._openConnections:
+            connection.close()
+
+    def _serve(self) -> None:
+        for i, frames in enumerate(self.connectionFrames):
+            try:
+                connection, _ = self._listener.accept()
+            except OSError:
+                return
+            reader = connection.makefile("rb")
+            self._send(connection, {"op": "connection", "connectionId": f"c{i}"})
+            authentication = json.loads(reader.readline())
+            if self.authenticationStatus != "SUCCESS":
+                self._send(
+                    connection,
+                    {
+                        "op": "status",
+                        "id": authentication["id"],
+                        "statusCode": "FAILURE",
+                        "errorCode": self.authenticationStatus,
+                        "connectionClosed": True,
+                    },
+                )
+                reader.close()
+                connection.close()
+                return
+            self._send(
+                connection,
+                {"op": "status", "id": authentication["id"], "statusCode": "SUCCESS"},
+            )
+            subscription = json.loads(reader.readline())
+            self.subscriptions.append(subscription)
+            self._send(
+                connection,
+                {"op": "status", "id": subscription["id"], "statusCode": "SUCCESS"},
+            )
+            for frame in frames:
+                self._send(connection, frame)
+            if i < len(self.connectionFrames) - 1:
+                reader.close()
+                connection.close()
+            else:
+                self._openConnections.append(connection)
+
+    @staticmethod
+    def _send(connection: socket.socket, message: dict) -> None:
+        connection.sendall((json.dumps(message) + "\r\n").encode("utf-8"))
+
+
+class TestMarketStreamCache(TestCase):
+    def test_apply_image_then_delta(self):
+        cache = MarketStreamCache()
+        cache.apply_market_changes(marketChanges=SUB_IMAGE["mc"])
+        runner = cache.get_market(marketId=MARKET_ID).runners[6480414]
+        self.assertEqual(
+            [(p.price, p.size) for p in runner.availableToBack],
+            [(2.0, 10.0), (1.99, 5.0)],
+        )
+        self.assertEqual(runner.get_best_lay_price().price, 2.02)
+        cache.apply_market_changes(marketChanges=DELTA["mc"])
+        self.assertEqual(
+            [(p.price, p.size) for p in runner.availableToBack], [(2.0, 10.0)]
+        )
+
+    def test_full_depth_deltas(self):
+        cache = MarketStreamCache()
+        cache.apply_market_change(
+            marketChange={
+                "id": MARKET_ID,
+                "rc": [{"id": 1, "atb": [[1.5, 3.0], [1.6, 2.0]], "atl": [[1.7, 9.0]]}],
+            }
+        )
+        cache.apply_market_change(
+            marketChange={"id": MARKET_ID, "rc": [{"id": 1, "atb": [[1.6, 0]]}]}
+        )
+        runner = cache.get_market(marketId=MARKET_ID).runners[1]
+        self.assertEqual(runner.get_best_back_price().price, 1.5)
+        self.assertEqual(runner.get_best_lay_price().size, 9.0)
+
+    def test_market_definition_status(self):
+        cache = MarketStreamCache()
+        cache.apply_market_changes(marketChanges=SUB_IMAGE["mc"])
+        market = cache.get_market(marketId=MARKET_ID)
+        self.assertIsNone(market.status)
+        cache.apply_market_changes(marketChanges=SEGMENTED_IMAGE[0]["mc"])
+        self.assertEqual(market.status, "OPEN")
+        self.assertTrue(market.inPlay)
+        cache.apply_market_change(
+            marketChange={
+                "id": MARKET_ID,
+                "marketDefinition": {"status": "SUSPENDED", "inPlay": True},
+            }
+        )
+        self.assertEqual(market.status, "SUSPENDED")
+
+
+class TestBetfairStreamClient(TestCase):
+    def _create_stream_client(self, server: ReplayStreamServer) -> BetfairStreamClient:
+        return BetfairStreamClient(
+            apiKey="apiKey",
+            sessionToken="sessionToken",
+            marketFilter={"marketIds": [MARKET_ID]},
+            host="127.0.0.1",
+            port=server.port,
+            useSsl=False,
+            reconnectDelay=0.01,
+        )
+
+    def test_subscribe_and_apply_changes(self):
+        server = ReplayStreamServer(connectionFrames=[[SUB_IMAGE, DELTA]]).start()
+        streamClient = self._create_stream_client(server=server)
+        updates = []
+        streamClient.add_callback(updates.append)
+        streamClient.connect()
+        streamClient.process_next_message()
+        streamClient.process_next_message()
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(streamClient.initialClk, "AAA")
+        self.assertEqual(streamClient.clk, "AAC")
+        self.assertEqual(
+            server.subscriptions[0]["marketFilter"]["marketIds"], [MARKET_ID]
+        )
+        self.assertFalse("clk" in server.subscriptions[0])
+        market = streamClient.cache.get_market(marketId=MARKET_ID)
+        self.assertEqual(len(market.runners[6480414].availableToBack), 1)
+        streamClient.close()
+        server.stop()
+
+    def test_reconnect_resubscribes_from_clock(self):
+        server = ReplayStreamServer(
+            connectionFrames=[[SUB_IMAGE, DELTA], [RESUB_DELTA]]
+        ).start()
+        streamClient = self._create_stream_client(server=server)
+        resubscribed = threading.Event()
+
+        def on_update(market):
+            if streamClient.clk == "AAD":
+                resubscribed.set()
+
+        streamClient.add_callback(on_update)
+        streamClient.start()
+        self.assertTrue(resubscribed.wait(timeout=5))
+        streamClient.stop()
+        server.stop()
+        self.assertEqual(len(server.subscriptions), 2)
+        self.assertEqual(server.subscriptions[1]["initialClk"], "AAA")
+        self.assertEqual(server.subscriptions[1]["clk"], "AAC")
+        market = streamClient.cache.get_market(marketId=MARKET_ID)
+        self.assertEqual(market.runners[58805].get_best_back_price().price, 3.55)
+
+    def test_authentication_failure(self):
+        server = ReplayStreamServer(
+            connectionFrames=[[]], authenticationStatus="INVALID_SESSION_INFORMATION"
+        ).start()
+        streamClient = self._create_stream_client(server=server)
+        with self.assertRaises(StreamException) as context:
+            streamClient.connect()
+        self.assertEqual(context.exception.errorCode, "INVALID_SESSION_INFORMATION")
+        streamClient.close()
+        server.stop()
+
+    def test_segmented_image_replaces_ladders(self):
+        server = ReplayStreamServer(
+            connectionFrames=[[SUB_IMAGE] + SEGMENTED_IMAGE]
+        ).start()
+        streamClient = self._create_stream_client(server=server)
+        updates = []
+        streamClient.add_callback(updates.append)
+        streamClient.connect()
+        streamClient.process_next_message()
+        streamClient.process_next_message()
+        # nothing is applied until the last segment
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(streamClient.clk, "AAB")
+        streamClient.process_next_message()
+        self.assertEqual(
+            [market.marketId for market in updates], [MARKET_ID, MARKET_ID, "1.2"]
+        )
+        self.assertEqual(streamClient.initialClk, "BBA")
+        self.assertEqual(streamClient.clk, "BBB")
+        market = streamClient.cache.get_market(marketId=MARKET_ID)
+        self.assertEqual(market.runners[6480414].get_best_back_price().price, 1.9)
+        self.assertEqual(len(market.runners[58805].availableToBack), 0)
+        self.assertEqual(len(market.runners[58805].availableToLay), 0)
+        self.assertTrue(market.inPlay)
+        streamClient.close()
+        server.stop()
+
+    def test_reconnect_after_recoverable_error(self):
+        server = ReplayStreamServer(
+            connectionFrames=[
+                [SUB_IMAGE, build_failure_status(errorCode="TIMEOUT")],
+                [RESUB_DELTA],
+            ]
+        ).start()
+        streamClient = self._create_stream_client(server=server)
+        resubscribed = threading.Event()
+        streamClient.add_callback(
+            lambda market: streamClient.clk == "AAD" and resubscribed.set()
+        )
+        streamClient.start()
+        self.assertTrue(resubscribed.wait(timeout=5))
+        streamClient.stop()
+        server.stop()
+        self.assertEqual(server.subscriptions[1]["clk"], "AAB")
+
+    def test_error_stopping_the_thread_is_raised(self):
+        server = ReplayStreamServer(
+            connectionFrames=[
+                [SUB_IMAGE, build_failure_status(errorCode="NOT_AUTHORIZED")]
+            ]
+        ).start()
+        streamClient = self._create_stream_client(server=server)
+        streamClient.start()
+        with self.assertRaises(StreamException) as context:
+            streamClient.join(timeout=5)
+        self.assertEqual(context.exception.errorCode, "NOT_AUTHORIZED")
+        self.assertEqual(len(server.subscriptions), 1)
+        # raised once
+        streamClient.stop()
+        server.stop()
@@ -0,0 +1,89 @@
+import io
+from unittest import TestCase, skipIf
+
+from betfair_api_client.betfair_api_client.datamodel.exceptions import TooMuchData
+from betfair_api_client.betfair_api_client.parsing import ijson, iter_result_items
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeApiError,
+    FakeBetfairServer,
+    build_market_book,
+    create_client,
+)
+from betfair_api_client.betfair_api_client.tests.test_betfair_api_client_offline import (
+    SELECTION_IDS,
+    build_events,
+)
+from betfair_api_client.betfair_api_client.transport import (
+    Transport,
+    TransportResponse,
+)
+
+
+class BufferedTransport(Transport):
+    def post(
+        self, url, data, headers, cert=None, idempotent=False
+    ) -> TransportResponse:
+        return TransportResponse(
+            status_code=200, reason="OK", content=b'{"result": [1, 2]}', headers={}
+        )
+
+
+@skipIf(ijson is None, "ijson is not installed")
+class TestStreamingResponses(TestCase):
+    def test_iter_result_items(self):
+        items = iter_result_items(
+            fileObject=io.BytesIO(
+                b'{"jsonrpc": "2.0", "result": [{"a": 1.5}, {"a": 2}]}'
+            )
+        )
+        self.assertEqual(list(items), [{"a": 1.5}, {"a": 2}])
+        with self.assertRaises(TooMuchData):
+            list(
+                iter_result_items(
+                    fileObject=io.BytesIO(b'{"error": {"message": "ANGX-0001"}}')
+                )
+            )
+
+    def test_transport_without_streaming_support(self):
+        with BufferedTransport().stream_post(url="", data=b"", headers={}) as response:
+            self.assertEqual(list(iter_result_items(fileObject=response.raw)), [1, 2])
+
+    def test_update_prices_streams_market_books(self):
+        with FakeBetfairServer() as server:
+            server.set_handler(
+                method="SportsAPING/v1.0/listMarketBook",
+                handler=lambda params: [
+                    build_market_book(marketId=marketId, selectionIds=SELECTION_IDS)
+                    for marketId in params["marketIds"]
+                ],
+            )
+            client = create_client(
+                server=server, streamResponses=True, maxConcurrentRequests=2
+            )
+            events = build_events(numEvents=50, marketsPerEvent=2)
+            firstChanges = client.get_price_changes_for_events(events=events)
+            client.update_prices_for_events(events=events)
+            secondChanges = client.get_price_changes_for_events(events=events)
+            client.close()
+        self.assertEqual(len(firstChanges), 100 * 3 * 6)
+        self.assertEqual(secondChanges, [])
+        self.assertEqual(server.requestsHandled, 1 + 3 * 3)
+        self.assertTrue(server.connectionsOpened <= 3)
+        for event in events:
+            for market in event.get_all_markets():
+                runner = market.runners[SELECTION_IDS[0]]
+                self.assertEqual(runner.get_best_back_price().price, 2.0)
+                self.assertEqual(len(runner.availableToLay), 3)
+
+    def test_error_response_raises_and_drops_connection(self):
+        def fail(params):
+            raise FakeApiError("ANGX-0001")
+
+        with FakeBetfairServer() as server:
+            server.set_handler(method="SportsAPING/v1.0/listMarketBook", handler=fail)
+            client = create_client(server=server, streamResponses=True)
+            with self.assertRaises(TooMuchData):
+                client.update_prices_for_events(
+                    events=build_events(numEvents=1, marketsPerEvent=1)
+                )
+            client.close()
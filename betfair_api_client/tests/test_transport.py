@@ -0,0 +1,115 @@
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase, mock
+
+from betfair_api_client.betfair_api_client.tests.fake_betfair_server import (
+    FakeBetfairServer,
+    create_client,
+)
+from betfair_api_client.betfair_api_client.transport import (
+    ConnectionPool,
+    PooledHttpTransport,
+    Transport,
+)
+
+
+class TestPooledHttpTransport(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = FakeBetfairServer().start()
+        self.server.set_handler(
+            method="AccountAPING/v1.0/getAccountFunds",
+            handler=lambda params: {"availableToBetBalance": 10.0},
+        )
+        self.server.set_handler(
+            method="SportsAPING/v1.0/listCompetitions",
+            handler=lambda params: [
+                {"competition": {"id": "10932509", "name": "English Premier League"}}
+            ],
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.server.stop()
+
+    def test_login_uses_transport(self):
+        client = create_client(server=self.server)
+        self.assertEqual(client.sessionToken, FakeBetfairServer.SESSION_TOKEN)
+        client.close()
+
+    def test_send_heartbeat(self):
+        client = create_client(server=self.server)
+        response = client.send_heartbeat()
+        self.assertTrue(response.ok)
+        self.assertEqual(response.json()["status"], "SUCCESS")
+        client.close()
+
+    def test_sequential_calls_reuse_connection(self):
+        client = create_client(server=self.server)
+        for _ in range(20):
+            self.assertTrue("availableToBetBalance" in client.check_balance())
+            client.list_competitions(sportTypeIds=[1])
+        self.assertEqual(self.server.requestsHandled, 41)
+        self.assertEqual(self.server.connectionsOpened, 1)
+        poolStats = list(client.transport.get_pool_stats().values())[0]
+        self.assertEqual(poolStats["connectionsCreated"], 1)
+        self.assertEqual(poolStats["connectionsReused"], 40)
+        client.close()
+
+    def test_concurrent_calls_bounded_by_pool_size(self):
+        client = create_client(
+            server=self.server, transport=PooledHttpTransport(poolSize=3)
+        )
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: client.check_balance(), range(50)))
+        self.assertEqual(len(results), 50)
+        self.assertTrue(self.server.connectionsOpened <= 3)
+        client.close()
+
+    def test_connection_error_raises_url_error(self):
+        client = create_client(server=self.server)
+        client.ACCOUNT_ENDPOINT = "http://127.0.0.1:1" + FakeBetfairServer.ACCOUNT_PATH
+        self.assertRaises(urllib.error.URLError, client.check_balance)
+        client.close()
+
+    def test_unknown_path_returns_error_status(self):
+        transport = PooledHttpTransport()
+        response = transport.post(
+            url=self.server.url + "/missing", data=b"", headers={}
+        )
+        self.assertFalse(response.ok)
+        self.assertEqual(response.status_code, 404)
+        transport.close()
+
+    def test_stale_reused_connection(self):
+        server = FakeBetfairServer(idleTimeout=0.1).start()
+        transport = PooledHttpTransport()
+        url = server.url + "/missing"
+        try:
+            for idempotent in [True, False]:
+                transport.post(url=url, data=b"", headers={})
+                time.sleep(0.3)
+                # as if the server closed the connection just after the pool checked it
+                with mock.patch.object(
+                    ConnectionPool, "_is_dropped", return_value=False
+                ):
+                    if idempotent:
+                        response = transport.post(
+                            url=url, data=b"", headers={}, idempotent=True
+                        )
+                        self.assertEqual(response.status_code, 404)
+                    else:
+                        with self.assertRaises(urllib.error.URLError):
+                            transport.post(url=url, data=b"", headers={})
+            stats = list(transport.get_pool_stats().values())[0]
+        finally:
+            transport.close()
+            server.stop()
+        self.assertEqual(stats["staleConnectionRetries"], 1)
+        self.assertEqual(server.connectionsOpened, 2)
+        self.assertEqual(server.requestsHandled, 3)
+
+    def test_transport_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Transport()
@@ -0,0 +1,451 @@
+import abc
+import http.client
+import io
+import select
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+
+from collections import deque
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .parsing import loads
+
+# a reused keep-alive connection that the server has closed fails with these, when the request is written
+# or, as http.client.RemoteDisconnected, when the response is read
+STALE_CONNECTION_ERRORS = (BrokenPipeError, ConnectionResetError)
+
+
+class TransportResponse:
+    """
+    Minimal HTTP response returned by a Transport.
+    Mirrors the parts of requests.Response that the client (and its callers) rely on.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        reason: str,
+        content: bytes,
+        headers: http.client.HTTPMessage,
+        connectTime: Optional[float] = None,
+        timeToFirstByte: Optional[float] = None,
+    ):
+        """
+        :param connectTime: (float)  Seconds spent getting a connection, near 0 when a pooled one was reused.
+        :param timeToFirstByte: (float)  Seconds from getting a connection until the response headers arrived.
+        """
+        self.status_code = status_code
+        self.reason = reason
+        self.content = content
+        self.headers = headers
+        self.connectTime = connectTime
+        self.timeToFirstByte = timeToFirstByte
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self):
+        return loads(self.content)
+
+
+class StreamingTransportResponse:
+    """
+    Response whose body has not been read yet: read it incrementally from `raw`.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        reason: str,
+        raw: BinaryIO,
+        headers: http.client.HTTPMessage,
+        connectTime: Optional[float] = None,
+        timeToFirstByte: Optional[float] = None,
+    ):
+        self.status_code = status_code
+        self.reason = reason
+        self.raw = raw
+        self.headers = headers
+        self.connectTime = connectTime
+        self.timeToFirstByte = timeToFirstByte
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+
+class Transport(abc.ABC):
+    @abc.abstractmethod
+    def post(
+        self,
+        url: str,
+        data: bytes,
+        headers: Dict[str, str],
+        cert: Optional[Tuple[str, str]] = None,
+        idempotent: bool = False,
+    ) -> TransportResponse:
+        """
+        :param idempotent: (bool)  The request can safely be sent twice, eg. again on a new connection
+                           when the server closed a reused one without answering.
+        """
+
+    @contextmanager
+    def stream_post(
+        self,
+        url: str,
+        data: bytes,
+        headers: Dict[str, str],
+        cert: Optional[Tuple[str, str]] = None,
+        idempotent: bool = False,
+    ) -> Iterator[StreamingTransportResponse]:
+        """
+        Like post(), but the body is only read by the caller, inside the with block.
+        Transports that can not stream read the whole body first.
+        """
+        response = self.post(
+            url=url, data=data, headers=headers, cert=cert, idempotent=idempotent
+        )
+        yield StreamingTransportResponse(
+            status_code=response.status_code,
+            reason=response.reason,
+            raw=io.BytesIO(response.content),
+            headers=response.headers,
+            connectTime=response.connectTime,
+            timeToFirstByte=response.timeToFirstByte,
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        scheme: str,
+        host: str,
+        port: int,
+        maxSize: int,
+        connectTimeout: float,
+        readTimeout: float,
+        idleTimeout: float,
+        sslContext: Optional[ssl.SSLContext] = None,
+    ):
+        """
+        Pool of keep-alive connections to a single host.
+
+        :param scheme: (str)  "http" or "https".
+        :param host: (str)
+        :param port: (int)
+        :param maxSize: (int)  Maximum number of simultaneous connections to the host.
+        :param connectTimeout: (float)  Seconds allowed for the TCP/TLS handshake.
+        :param readTimeout: (float)  Seconds allowed between bytes of a response.
+        :param idleTimeout: (float)  Idle connections older than this are discarded rather than reused.
+        :param sslContext: (ssl.SSLContext)  Only used for https.
+        """
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.maxSize = maxSize
+        self.connectTimeout = connectTimeout
+        self.readTimeout = readTimeout
+        self.idleTimeout = idleTimeout
+        self.sslContext = sslContext
+        self.connectionsCreated = 0
+        self.connectionsReused = 0
+        self.requestsSent = 0
+        self.staleConnectionRetries = 0
+        self._idleConnections = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(value=maxSize)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes,
+        headers: Dict[str, str],
+        idempotent: bool = False,
+    ) -> TransportResponse:
+        with self.stream_request(
+            method=method,
+            path=path,
+            body=body,
+            headers=headers,
+            idempotent=idempotent,
+        ) as response:
+            content = response.raw.read()
+        return TransportResponse(
+            status_code=response.status_code,
+            reason=response.reason,
+            content=content,
+            headers=response.headers,
+            connectTime=response.connectTime,
+            timeToFirstByte=response.timeToFirstByte,
+        )
+
+    @contextmanager
+    def stream_request(
+        self,
+        method: str,
+        path: str,
+        body: bytes,
+        headers: Dict[str, str],
+        idempotent: bool = False,
+    ) -> Iterator[StreamingTransportResponse]:
+        """
+        :param idempotent: (bool)  Resend the request once on a new connection when a reused connection
+                           turns out to have been closed by the server without a response.  Requests that
+                           could not be written at all are resent either way.
+        """
+        with self._slots:
+            startedAt = time.perf_counter()
+            connection, isReused = self._get_connection()
+            connectedAt = time.perf_counter()
+            isWritten = False
+            try:
+                try:
+                    connection.request(
+                        method=method, url=path, body=body, headers=headers
+                    )
+                    isWritten = True
+                    rawResponse = connection.getresponse()
+                except STALE_CONNECTION_ERRORS:
+                    # a request that was written may have been processed before the connection dropped
+                    if not isReused or (isWritten and not idempotent):
+                        raise
+                    connection.close()
+                    connection = self._new_connection()
+                    with self._lock:
+                        self.connectionsCreated += 1
+                        self.staleConnectionRetries += 1
+                    connectedAt = time.perf_counter()
+                    connection.request(
+                        method=method, url=path, body=body, headers=headers
+                    )
+                    rawResponse = connection.getresponse()
+                yield StreamingTransportResponse(
+                    status_code=rawResponse.status,
+                    reason=rawResponse.reason,
+                    raw=rawResponse,
+                    headers=rawResponse.headers,
+                    connectTime=connectedAt - startedAt,
+                    timeToFirstByte=time.perf_counter() - connectedAt,
+                )
+                # anything the caller left unread has to be drained before the connection is reused
+                rawResponse.read()
+            except BaseException:
+                connection.close()
+                raise
+            with self._lock:
+                self.requestsSent += 1
+            if rawResponse.will_close:
+                connection.close()
+            else:
+                self._return_connection(connection=connection)
+
+    def close(self) -> None:
+        with self._lock:
+            while self._idleConnections:
+                connection, _ = self._idleConnections.pop()
+                connection.close()
+
+    def _get_connection(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        :return: (tuple)  An idle connection, or a new one, and whether it was idle.
+        """
+        while True:
+            with self._lock:
+                if not self._idleConnections:
+                    break
+                connection, releasedAt = self._idleConnections.pop()
+            if time.monotonic() - releasedAt > self.idleTimeout or self._is_dropped(
+                connection=connection
+            ):
+                connection.close()
+                continue
+            with self._lock:
+                self.connectionsReused += 1
+            return connection, True
+        connection = self._new_connection()
+        with self._lock:
+            self.connectionsCreated += 1
+        return connection, False
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            connection = http.client.HTTPSConnection(
+                host=self.host,
+                port=self.port,
+                timeout=self.connectTimeout,
+                context=self.sslContext,
+            )
+        else:
+            connection = http.client.HTTPConnection(
+                host=self.host, port=self.port, timeout=self.connectTimeout
+            )
+        connection.connect()
+        # http.client writes headers and body separately, which Nagle's algorithm would hold back
+        connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connection.sock.settimeout(self.readTimeout)
+        return connection
+
+    def _return_connection(self, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idleConnections.append((connection, time.monotonic()))
+
+    @staticmethod
+    def _is_dropped(connection: http.client.HTTPConnection) -> bool:
+        # an idle keep-alive socket is only readable if the server has closed it (or sent garbage)
+        if connection.sock is None:
+            return True
+        try:
+            readable, _, _ = select.select([connection.sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return len(readable) > 0
+
+
+class PooledHttpTransport(Transport):
+    def __init__(
+        self,
+        poolSize: int = 10,
+        connectTimeout: float = 10.0,
+        readTimeout: float = 30.0,
+        idleTimeout: float = 60.0,
+    ):
+        """
+        Transport keeping a pool of keep-alive connections per host, so that repeated calls
+        to the same endpoint skip the TCP and TLS handshakes.
+
+        :param poolSize: (int)  Maximum number of connections held per host (and client certificate).
+        :param connectTimeout: (float)  Seconds.
+        :param readTimeout: (float)  Seconds.
+        :param idleTimeout: (float)  Seconds an idle connection may be kept before it is discarded.
+        """
+        self.poolSize = poolSize
+        self.connectTimeout = connectTimeout
+        self.readTimeout = readTimeout
+        self.idleTimeout = idleTimeout
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def post(
+        self,
+        url: str,
+        data: bytes,
+        headers: Dict[str, str],
+        cert: Optional[Tuple[str, str]] = None,
+        idempotent: bool = False,
+    ) -> TransportResponse:
+        pool, path = self._get_pool_and_path(url=url, cert=cert)
+        try:
+            return pool.request(
+                method="POST",
+                path=path,
+                body=data,
+                headers=headers,
+                idempotent=idempotent,
+            )
+        except (OSError, http.client.HTTPException) as ex:
+            # keep the error contract of urllib.request.urlopen
+            raise urllib.error.URLError(reason=ex) from ex
+
+    @contextmanager
+    def stream_post(
+        self,
+        url: str,
+        data: bytes,
+        headers: Dict[str, str],
+        cert: Optional[Tuple[str, str]] = None,
+        idempotent: bool = False,
+    ) -> Iterator[StreamingTransportResponse]:
+        pool, path = self._get_pool_and_path(url=url, cert=cert)
+        try:
+            with pool.stream_request(
+                method="POST",
+                path=path,
+                body=data,
+                headers=headers,
+                idempotent=idempotent,
+            ) as response:
+                yield response
+        except (OSError, http.client.HTTPException) as ex:
+            raise urllib.error.URLError(reason=ex) from ex
+
+    def get_pool_stats(self) -> Dict[str, dict]:
+        with self._lock:
+            pools = list(self._pools.values())
+        return {
+            f"{pool.scheme}://{pool.host}:{pool.port}": {
+                "connectionsCreated": pool.connectionsCreated,
+                "connectionsReused": pool.connectionsReused,
+                "requestsSent": pool.requestsSent,
+                "staleConnectionRetries": pool.staleConnectionRetries,
+            }
+            for pool in pools
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools = {}
+        for pool in pools:
+            pool.close()
+
+    def _get_pool_and_path(
+        self, url: str, cert: Optional[Tuple[str, str]]
+    ) -> Tuple[ConnectionPool, str]:
+        splitUrl = urlsplit(url)
+        path = splitUrl.path or "/"
+        if splitUrl.query:
+            path = f"{path}?{splitUrl.query}"
+        pool = self._get_pool(
+            scheme=splitUrl.scheme,
+            host=splitUrl.hostname,
+            port=splitUrl.port,
+            cert=cert,
+        )
+        return pool, path
+
+    def _get_pool(
+        self,
+        scheme: str,
+        host: str,
+        port: Optional[int],
+        cert: Optional[Tuple[str, str]],
+    ) -> ConnectionPool:
+        if port is None:
+            port = 443 if scheme == "https" else 80
+        if scheme != "https" or cert is None or cert[0] is None:
+            cert = None
+        poolKey = (scheme, host, port, cert)
+        with self._lock:
+            if poolKey not in self._pools:
+                self._pools[poolKey] = ConnectionPool(
+                    scheme=scheme,
+                    host=host,
+                    port=port,
+                    maxSize=self.poolSize,
+                    connectTimeout=self.connectTimeout,
+                    readTimeout=self.readTimeout,
+                    idleTimeout=self.idleTimeout,
+                    sslContext=(
+                        self._create_ssl_context(cert=cert)
+                        if scheme == "https"
+                        else None
+                    ),
+                )
+            return self._pools[poolKey]
+
+    @staticmethod
+    def _create_ssl_context(cert: Optional[Tuple[str, str]]) -> ssl.SSLContext:
+        sslContext = ssl.create_default_context()
+        if cert is not None:
+            sslContext.load_cert_chain(certfile=cert[0], keyfile=cert[1])
+        return sslContext
@@ -10,7 +10,7 @@ setuptools.setup(
     url='https://github.com/miksyr/betfair_api_client',
     download_url='https://github.com/miksyr/betfair_api_client/archive/v_04.tar.gz',
     keywords=['betfair', 'betfair odds api', 'sports betting'],
-    install_requires=['requests>=2.24.0'],
+    install_requires=[],
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: GNU General Public License v3 (GPLv3)",